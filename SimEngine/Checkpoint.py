@@ -0,0 +1,155 @@
+#!/usr/bin/python
+"""
+\brief Checkpoints of a running simulation.
+
+save() pickles a Simulation with everything it owns: the settings, the event
+queue (of which the callbacks are bound methods of the motes and the other
+components), the motes with their schedules and queues, the propagation, the
+ReSF engine and tuples, the statistics and the state of all random streams.
+load() restores it, possibly with other settings, and the restored Simulation
+continues the run where it was saved with run().
+
+The engine saves a checkpoint in its event loop at the first ASN reached at or
+after --checkpointAsn (before the events of that ASN are executed), or at the
+ASN passed to SimEngine.checkpointAt(). Resuming a checkpoint without changing
+the settings gives the same results as the uninterrupted run. Resuming it with
+other settings forks the run: only the code which reads those settings after
+the checkpoint sees the new values, e.g. resfPriority or
+resfChangeParentPolicy once the network converged. The traffic periods are
+drawn at the start of the run, they are part of the checkpoint.
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('Checkpoint')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+import sys
+import types
+import random
+import thread
+import threading
+import copy_reg
+import cPickle as pickle
+
+import numpy as np
+
+#============================ defines =========================================
+
+VERSION = 1
+
+# the mote objects are deeply nested (packets, neighbors, parents), pickling them recurses deeply
+RECURSION_LIMIT = 100000
+
+#============================ helpers =========================================
+
+def _newObject(cls):
+    """ a new instance of cls, bypassing the singleton __new__ of the components """
+    return object.__new__(cls)
+
+def _reduceMethod(method):
+    return (getattr, (method.im_self, method.im_func.__name__))
+
+def _reduceLock(lock):
+    return (thread.allocate_lock, ())
+
+def _reduceRLock(lock):
+    return (threading.RLock, ())
+
+def _reduceSemaphore(semaphore):
+    return (threading.Semaphore, (semaphore._Semaphore__value,))
+
+def _reduceComponent(obj):
+    state = obj.__getstate__() if hasattr(obj, '__getstate__') else obj.__dict__
+    return (_newObject, (type(obj),), state)
+
+_registered = False
+
+def _register():
+    """ register how to pickle what cPickle cannot pickle on its own """
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    # imported here, SimEngine imports this module
+    import SimSettings
+    import SimEngine
+    import SimStats
+    import Propagation
+    import ReSFEngine
+
+    copy_reg.pickle(types.MethodType, _reduceMethod)
+    copy_reg.pickle(thread.LockType, _reduceLock)
+    copy_reg.pickle(type(threading.RLock()), _reduceRLock)
+    copy_reg.pickle(threading._Semaphore, _reduceSemaphore)
+    for cls in [
+            SimSettings.SimSettings,
+            SimEngine.SimEngine,
+            SimStats.SimStats,
+            Propagation.PropagationFromModel,
+            Propagation.PropagationFromTrace,
+            ReSFEngine.ReSFEngine,
+        ]:
+        copy_reg.pickle(cls, _reduceComponent)
+
+#============================ public ==========================================
+
+def save(sim, filename):
+    """ save a checkpoint of a Simulation to filename """
+    _register()
+    checkpoint = {
+        'version':       VERSION,
+        'sim':           sim,
+        'random':        random.getstate(),
+        'numpyRandom':   np.random.get_state(),
+    }
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, RECURSION_LIMIT))
+    try:
+        f = open(filename, 'wb')
+        try:
+            pickle.dump(checkpoint, f, pickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    log.info("checkpoint written to {0}".format(filename))
+
+def load(filename, outputBuffer=None, **settings):
+    """
+    Restore a Simulation from a checkpoint.
+    :param outputBuffer: where the statistics are written, as in Simulation
+    :param settings: settings to change, to fork the run
+    :return: the Simulation, ready to continue with run()
+    """
+    _register()
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, RECURSION_LIMIT))
+    try:
+        f = open(filename, 'rb')
+        try:
+            checkpoint = pickle.load(f)
+        finally:
+            f.close()
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    if checkpoint['version'] != VERSION:
+        raise ValueError('checkpoint version {0} is not supported'.format(checkpoint['version']))
+
+    sim = checkpoint['sim']
+    random.setstate(checkpoint['random'])
+    np.random.set_state(checkpoint['numpyRandom'])
+
+    # the output directory depends on the settings
+    sim.settings.__dict__.update(settings)
+    sim.settings._outputDir = None
+    sim.stats.outputBuffer = outputBuffer
+    return sim
@@ -0,0 +1,148 @@
+#!/usr/bin/python
+"""
+\brief Guards of the log calls of the motes, ReSF and ReSFEngine, and the
+binary log of their events.
+
+The call sites of _log() build their parameters (and sometimes strings) before
+_log() finds out that the logger drops the line. Each of these modules keeps a
+LogFlags of its logger, and guards its calls with
+
+    if logFlags.info:
+        self._log(INFO, "...", (...))
+
+so that with logging disabled, a log call costs a single attribute check. The
+flags are read from the levels of the loggers, again by each new SimEngine with
+refresh(), after the logging configuration of runSim.py.
+
+Enabled with --eventLog 1, the engine records every _log() call as a binary
+record, whatever the level of the loggers: (asn, mote, severity, template) and
+the marshalled parameters. The templates are stored once. At the end of the
+run, the records are written next to the output file (output_cpuN_runM.events,
+gzipped) and read() gives them back, to be filtered or formatted offline.
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('EventLog')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+import gzip
+import struct
+import marshal
+
+#============================ defines =========================================
+
+VERSION = 1
+
+SEVERITIES = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
+
+NO_MOTE = 0xffff # mote of the records of ReSFEngine
+
+# asn, mote, severity, template, length of the parameters
+RECORD = struct.Struct('<IHBHI')
+
+# version, length of the templates
+HEADER = struct.Struct('<II')
+
+# types of the parameters which are stored as they are, the others as str()
+_PLAIN_TYPES = (int, long, float, bool, str, unicode, type(None))
+
+#============================ flags ===========================================
+
+_allFlags = []
+
+class LogFlags(object):
+    """ whether a logger logs each severity """
+
+    def __init__(self, logger):
+
+        # store params
+        self.logger                    = logger
+
+        # local variables
+        self.debug                     = True
+        self.info                      = True
+        self.warning                   = True
+        self.error                     = True
+
+        self.refresh()
+        _allFlags.append(self)
+
+    def refresh(self, force=False):
+        self.debug                     = force or self.logger.isEnabledFor(logging.DEBUG)
+        self.info                      = force or self.logger.isEnabledFor(logging.INFO)
+        self.warning                   = force or self.logger.isEnabledFor(logging.WARNING)
+        self.error                     = force or self.logger.isEnabledFor(logging.ERROR)
+
+def refresh(force=False):
+    """ read the levels of the loggers again; force to make all calls (event log) """
+    for flags in _allFlags:
+        flags.refresh(force)
+
+#============================ body ============================================
+
+class EventLogRecorder(object):
+
+    def __init__(self):
+
+        # local variables
+        self.templates                 = [] # templates of the log lines
+        self.templateIndex             = {} # template -> index in templates
+        self.records                   = [] # packed records
+
+    #======================== public ==========================================
+
+    def record(self, asn, moteId, severity, template, params):
+        index = self.templateIndex.get(template)
+        if index is None:
+            index = len(self.templates)
+            self.templates += [template]
+            self.templateIndex[template] = index
+        params = marshal.dumps(tuple(p if isinstance(p, _PLAIN_TYPES) else str(p) for p in params))
+        self.records += [
+            RECORD.pack(asn, NO_MOTE if moteId is None else moteId, SEVERITIES.index(severity), index, len(params)),
+            params,
+        ]
+
+    def write(self, filename):
+        templates = marshal.dumps(self.templates)
+        with gzip.open(filename, 'wb') as f:
+            f.write(HEADER.pack(VERSION, len(templates)))
+            f.write(templates)
+            f.write(''.join(self.records))
+
+#============================ read ============================================
+
+def read(filename):
+    """ the records of an event log, as (asn, mote id or None, severity, template, params) """
+    with gzip.open(filename, 'rb') as f:
+        data = f.read()
+    (version, length) = HEADER.unpack_from(data, 0)
+    assert version == VERSION, "unsupported event log version {0}".format(version)
+    offset    = HEADER.size
+    templates = marshal.loads(data[offset:offset + length])
+    offset   += length
+    records   = []
+    while offset < len(data):
+        (asn, moteId, severity, index, length) = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        params  = marshal.loads(data[offset:offset + length])
+        offset += length
+        records += [(asn, None if moteId == NO_MOTE else moteId, SEVERITIES[severity], templates[index], params)]
+    return records
+
+def formatRecord(record):
+    """ a record as the line _log() writes """
+    (asn, moteId, severity, template, params) = record
+    if moteId is None:
+        prefix = '[ASN={0:>6}] '.format(asn)
+    else:
+        prefix = '[ASN={0:>6} id={1:>4}] '.format(asn, moteId)
+    return prefix + template.format(*params)
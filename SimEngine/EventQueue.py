@@ -0,0 +1,181 @@
+#!/usr/bin/python
+"""
+\brief Priority queue holding the pending events of the simulation engine.
+
+Events are kept in a binary heap keyed on (asn, priority, seq), where seq is
+an insertion counter. Events at the same ASN and with the same priority are
+hence consumed in the order in which they were scheduled, exactly as with the
+former sorted list.
+
+Cancelled events are not removed from the heap, but marked as dead and
+skipped when they reach the top of the heap (lazy cancellation). An index
+uniqueTag -> entries allows finding the events to cancel without scanning the
+whole queue.
+"""
+
+#============================ imports =========================================
+
+import heapq
+import itertools
+
+#============================ defines =========================================
+
+# indexes in a heap entry
+ASN           = 0
+PRIORITY      = 1
+SEQ           = 2
+CB            = 3
+UNIQUETAG     = 4
+ALIVE         = 5
+
+# rebuild the heap when it holds more dead than alive entries (and at least this many)
+MIN_COMPACT   = 256
+
+#============================ body ============================================
+
+class EventQueue(object):
+
+    def __init__(self):
+
+        # local variables
+        self.heap                 = []   # list of [asn, priority, seq, cb, uniqueTag, alive]
+        self.tags                 = {}   # uniqueTag -> list of alive entries
+        self.seq                  = itertools.count()
+        self.numAlive             = 0
+
+    def __getstate__(self):
+        # a count cannot be pickled, store where it is
+        state = dict(self.__dict__)
+        state['seq'] = next(self.seq)
+        self.seq = itertools.count(state['seq'])
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.seq = itertools.count(state['seq'])
+
+    #======================== public ==========================================
+
+    def push(self, asn, priority, cb, uniqueTag=None):
+        """ add an event, after all events with the same asn and priority """
+
+        entry = [asn, priority, next(self.seq), cb, uniqueTag, True]
+        heapq.heappush(self.heap, entry)
+        if uniqueTag is not None:
+            self.tags.setdefault(uniqueTag, []).append(entry)
+        self.numAlive += 1
+
+    def remove(self, uniqueTag, exceptAsn=None):
+        """
+        cancel all events with this uniqueTag, except the ones scheduled at
+        exceptAsn. Returns the number of cancelled events.
+        """
+
+        entries = self.tags.get(uniqueTag)
+        if not entries:
+            return 0
+
+        kept      = []
+        numRemoved = 0
+        for entry in entries:
+            if exceptAsn is not None and entry[ASN] == exceptAsn:
+                kept += [entry]
+            else:
+                entry[ALIVE]  = False
+                entry[CB]     = None
+                numRemoved   += 1
+
+        if kept:
+            self.tags[uniqueTag] = kept
+        else:
+            del self.tags[uniqueTag]
+        self.numAlive -= numRemoved
+
+        if len(self.heap) > MIN_COMPACT and len(self.heap) > 2*self.numAlive:
+            self._compact()
+
+        return numRemoved
+
+    def peek(self):
+        """ return the next event as (asn, priority, cb, uniqueTag), or None """
+
+        entry = self._top()
+        if entry is None:
+            return None
+        return (entry[ASN], entry[PRIORITY], entry[CB], entry[UNIQUETAG])
+
+    def peekAsn(self):
+        """ return the ASN of the next event, or None """
+
+        entry = self._top()
+        if entry is None:
+            return None
+        return entry[ASN]
+
+    def pop(self, index=0):
+        """ remove and return the next event as (asn, priority, cb, uniqueTag) """
+
+        # only the head of the queue can be popped
+        assert index == 0
+
+        entry = self._top()
+        if entry is None:
+            raise IndexError('pop from empty event queue')
+
+        heapq.heappop(self.heap)
+        entry[ALIVE] = False
+        self.numAlive -= 1
+
+        uniqueTag = entry[UNIQUETAG]
+        if uniqueTag is not None:
+            entries = self.tags[uniqueTag]
+            if len(entries) == 1:
+                del self.tags[uniqueTag]
+            else:
+                entries[:] = [e for e in entries if e is not entry]
+
+        return (entry[ASN], entry[PRIORITY], entry[CB], uniqueTag)
+
+    def clear(self):
+        self.heap     = []
+        self.tags     = {}
+        self.numAlive = 0
+
+    #=== list-like interface, kept for inspection and the unit tests
+
+    def __len__(self):
+        return self.numAlive
+
+    def __nonzero__(self):
+        return self.numAlive > 0
+
+    def __iter__(self):
+        return iter(self._sorted())
+
+    def __getitem__(self, index):
+        if index == 0:
+            event = self.peek()
+            if event is None:
+                raise IndexError('event queue index out of range')
+            return event
+        return self._sorted()[index]
+
+    #======================== private =========================================
+
+    def _top(self):
+        heap = self.heap
+        while heap and not heap[0][ALIVE]:
+            heapq.heappop(heap)
+        if heap:
+            return heap[0]
+        return None
+
+    def _sorted(self):
+        return [
+            (e[ASN], e[PRIORITY], e[CB], e[UNIQUETAG])
+            for e in sorted(e for e in self.heap if e[ALIVE])
+        ]
+
+    def _compact(self):
+        self.heap = [e for e in self.heap if e[ALIVE]]
+        heapq.heapify(self.heap)
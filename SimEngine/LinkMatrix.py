@@ -0,0 +1,194 @@
+#!/usr/bin/python
+"""
+\brief RSSI, PDR and distance between every pair of motes.
+
+The link qualities are kept in NxN NumPy arrays indexed by mote id, so the
+topology can compute them in bulk. Mote.getRSSI() and Mote.getPDR() read
+from these arrays.
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('LinkMatrix')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+import math
+
+import numpy as np
+
+#============================ defines =========================================
+
+PISTER_HACK_LOWER_SHIFT = 40          # dB
+TWO_DOT_FOUR_GHZ        = 2400000000  # Hz
+SPEED_OF_LIGHT          = 299792458   # m/s
+
+#============================ body ============================================
+
+class LinkMatrix(object):
+
+    def __init__(self, numMotes):
+
+        # store params
+        self.numMotes                  = numMotes
+
+        # local variables
+        self.rssi                      = np.full((numMotes, numMotes), np.nan) # dBm, NaN if unknown
+        self.initialRssi               = np.full((numMotes, numMotes), np.nan) # dBm, RSSI at deployment (for mobility)
+        self.pdr                       = np.zeros((numMotes, numMotes))
+        self.hasPdr                    = np.zeros((numMotes, numMotes), dtype=bool)
+        self.distance                  = np.zeros((numMotes, numMotes))        # m
+        self._rxPowerMw                = None                                   # cache, see getRxPowerMw()
+
+    #======================== public ==========================================
+
+    #===== single link
+
+    def setRSSI(self, moteId, neighborId, rssi):
+        self.rssi[moteId, neighborId] = rssi
+        self._rxPowerMw = None
+
+    def getRSSI(self, moteId, neighborId):
+        return float(self.rssi[moteId, neighborId])
+
+    def setPDR(self, moteId, neighborId, pdr):
+        self.pdr[moteId, neighborId]    = pdr
+        self.hasPdr[moteId, neighborId] = True
+
+    def getPDR(self, moteId, neighborId):
+        if not self.hasPdr[moteId, neighborId]:
+            raise KeyError(neighborId)
+        return float(self.pdr[moteId, neighborId])
+
+    def clearLinks(self, moteId):
+        """ forget the RSSI and PDR from this mote to all other motes """
+        self.rssi[moteId]   = np.nan
+        self._rxPowerMw     = None
+        self.pdr[moteId]    = 0.0
+        self.hasPdr[moteId] = False
+
+    def getNeighborIds(self, moteId):
+        """ ids of the motes this mote has a PDR > 0 to """
+        return np.flatnonzero(self.pdr[moteId] > 0).tolist()
+
+    #===== bulk
+
+    def setSymmetricRSSIs(self, moteId, neighborIds, rssis, initial=False):
+        """
+        set the RSSI between a mote and each of the neighbors, in both
+        directions. If initial, also save them as the initial RSSI.
+        """
+
+        self.rssi[moteId, neighborIds] = rssis
+        self.rssi[neighborIds, moteId] = rssis
+        if initial:
+            self.initialRssi[moteId, neighborIds] = rssis
+            self.initialRssi[neighborIds, moteId] = rssis
+        self._rxPowerMw = None
+
+    def setAllLinks(self, rssi, pdr, hasPdr):
+        """ replace the RSSI and PDR of all links """
+
+        self.rssi       = rssi
+        self.pdr        = pdr
+        self.hasPdr     = hasPdr
+        self._rxPowerMw = None
+
+    def getRxPowerMw(self):
+        """
+        received power (mW) of every link, i.e. the RSSI in the linear domain.
+        Computed once and cached until an RSSI changes.
+        """
+
+        if self._rxPowerMw is None:
+            self._rxPowerMw = np.power(10.0, self.rssi / 10.0)
+        return self._rxPowerMw
+
+    def updateDistances(self, xs, ys):
+        """ xs and ys are the locations of the motes (in km), ordered by id """
+
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        dx = xs[:, np.newaxis] - xs[np.newaxis, :]
+        dy = ys[:, np.newaxis] - ys[np.newaxis, :]
+        self.distance = 1000*np.sqrt(dx**2 + dy**2)
+
+    def setPDRFromRSSI(self, rssiToPdr, minRssi):
+        """
+        set the PDR of every link with an RSSI above minRssi, using the
+        vectorized rssiToPdr function.
+        """
+
+        with np.errstate(invalid='ignore'):
+            mask = self.rssi > minRssi # NaN compares False
+        np.fill_diagonal(mask, False)
+        self.pdr         = np.zeros((self.numMotes, self.numMotes))
+        self.pdr[mask]   = rssiToPdr(self.rssi[mask])
+        self.hasPdr      = mask
+
+    def closestNeighborIds(self):
+        """ for each mote, id of the closest other mote (first one in case of a tie) """
+
+        distance = self.distance.copy()
+        np.fill_diagonal(distance, np.inf)
+        return np.argmin(distance, axis=1).tolist()
+
+    #===== views
+
+    def rssiDict(self, moteId):
+        """ RSSI to all known neighbors, indexed by neighbor id """
+        return dict(
+            (j, float(self.rssi[moteId, j])) for j in np.flatnonzero(~np.isnan(self.rssi[moteId]))
+        )
+
+    def pdrDict(self, moteId):
+        """ PDR to all known neighbors, indexed by neighbor id """
+        return dict(
+            (j, float(self.pdr[moteId, j])) for j in np.flatnonzero(self.hasPdr[moteId])
+        )
+
+#============================ helpers =========================================
+
+def pisterHackMeanRssi(distance, txPower=0, txAntennaGain=0, rxAntennaGain=0):
+    """
+    mean RSSI (dBm) of the Pister-hack model for the given distance(s) in m;
+    the actual RSSI is uniformly distributed around this value.
+    """
+
+    # sqrt and inverse of the free space path loss
+    fspl = (SPEED_OF_LIGHT/(4*math.pi*distance*TWO_DOT_FOUR_GHZ))
+
+    # simple friis equation in Pr=Pt+Gt+Gr+20log10(c/4piR)
+    pr = txPower + txAntennaGain + rxAntennaGain + (20 * np.log10(fspl))
+
+    return pr - PISTER_HACK_LOWER_SHIFT / 2
+
+def interpolatedPdr(rssi, rssiPdrTable):
+    """
+    vectorized linear interpolation of an {rssi: pdr} table with 1dB steps;
+    0 below and 1 above the table.
+    """
+
+    rssi    = np.asarray(rssi, dtype=float)
+    minRssi = min(rssiPdrTable.keys())
+    maxRssi = max(rssiPdrTable.keys())
+
+    # table as an array, indexed by rssi-minRssi
+    table   = np.array([rssiPdrTable[r] for r in range(minRssi, maxRssi+1)] + [1.0])
+
+    inRange = (rssi >= minRssi) & (rssi <= maxRssi)
+    floorRssi = np.floor(np.where(inRange, rssi, minRssi))
+    index   = (floorRssi - minRssi).astype(int)
+    pdrLow  = table[index]
+    pdrHigh = table[index+1]
+
+    # same operations as the scalar interpolation, for identical results
+    pdr = (pdrHigh - pdrLow) * (rssi - floorRssi) + pdrLow
+
+    return np.where(rssi < minRssi, 0.0, np.where(rssi > maxRssi, 1.0, pdr))
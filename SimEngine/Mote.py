@@ -34,16 +34,21 @@ log.addHandler(NullHandler())
 # ============================ imports =========================================
 
 import copy
+import collections
+import contextlib
 import random
-import threading
 import math
 
-import SimEngine
-import SimSettings
-import Propagation
+import Simulation
 import Topology
+import Schedule
 import ReSF
 import eLLSF
+import Packet
+import EventLog
+
+# guards of the log calls, see EventLog.py
+logFlags = EventLog.LogFlags(log)
 
 # ============================ defines =========================================
 
@@ -170,14 +175,18 @@ BROADCAST_ADDRESS = 0xffff
 
 class Mote(object):
 
-    def __init__(self, id):
+    def __init__(self, id, sim=None):
         # store params
         self.id = id
+        if sim is None:
+            sim = Simulation.SingletonSimulation()
+        self.sim = sim
         # local variables
-        self.dataLock = threading.RLock()
-
-        self.engine = SimEngine.SimEngine()
-        self.settings = SimSettings.SimSettings()
+        self.engine = sim.engine
+        self.settings = sim.settings
+        self.dataLock = self.engine.newLock(reentrant=True)
+        # [debug] count the interference of the transmissions in the cells
+        self.debugStats = hasattr(self.settings, 'debugStats') and self.settings.debugStats == 1
 
         self.genMSF = random.Random()
         self.genMSF.seed(self.settings.seed + self.id)
@@ -197,7 +206,7 @@ class Mote(object):
 
         # random.seed(self.settings.seed + self.id)
 
-        self.propagation = Propagation.Propagation()
+        self.propagation = sim.propagation
 
         # join process
         self.isJoined = False
@@ -248,7 +257,9 @@ class Mote(object):
         # tsch
         self.txQueue = []
         self.pktToSend = None
-        self.schedule = {}  # indexed by ts, contains cell
+        self.schedule = Schedule.Schedule(occupancy=self.engine.txOccupancy, owner=self)  # indexed by ts, contains cell
+        self.scheduleBatchDepth = 0  # number of nested scheduleBatch()
+        self.scheduleBatchDirty = False  # the next active cell is to be rescheduled at the end of the batch
         self.waitingFor = None
         self.timeCorrectedSlot = None
         self.isSync = False
@@ -263,9 +274,7 @@ class Mote(object):
         self.noisepower = -105  # dBm
         self.drift = self.genEBDIO.uniform(-RADIO_MAXDRIFT, RADIO_MAXDRIFT)
         # wireless
-        self.RSSI = {}  # indexed by neighbor
-        self.PDR = {}  # indexed by neighbor
-        self.initialRSSI = {}
+        self.linkMatrix = self.engine.linkMatrix  # RSSI and PDR to all motes, indexed by mote id
         self.initialPDR = {}
         # location
         # battery
@@ -300,11 +309,11 @@ class Mote(object):
         else:
             self.maxVRBEntryNum = FRAGMENT_FORWARDING_DEFAULT_MAX_VRB_ENTRY_NUM
         # stats
+        self.moteCounters = self.engine.moteCounters  # counters of all motes, indexed by mote id
         self._stats_resetMoteStats()
         self._stats_resetQueueStats()
         self._stats_resetLatencyStats()
         self._stats_resetHopsStats()
-        self._stats_resetRadioStats()
 
         self.arrivedToGen = 0
         self.notGenerated = 0
@@ -413,10 +422,11 @@ class Mote(object):
             self.isJoined = True
             self.joinAsn = self.engine.getAsn()
             # log
-            self._log(
-                INFO,
-                "[join] Mote joined",
-            )
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    "[join] Mote joined",
+                )
 
             # schedule MSF bootstrap of the preferred parent
             if self.resfNoMSF != 'no':
@@ -454,24 +464,25 @@ class Mote(object):
 
         if sourceRoute or not self.dagRoot:
             # create new packet
-            newPacket = {
-                'asn': self.engine.getAsn(),
-                'type': APP_TYPE_JOIN,
-                'code': None,
-                'payload': [token, self.id if not self.dagRoot else None,
+            newPacket = Packet.Packet(
+                asn=self.engine.getAsn(),
+                type=APP_TYPE_JOIN,
+                code=None,
+                payload=[token, self.id if not self.dagRoot else None,
                             self.preferredParent.id if not self.dagRoot else None],
-                'retriesLeft': TSCH_MAXTXRETRIES,
-                'srcIp': self,  # DAG root
-                'dstIp': destination,
-                'sourceRoute': sourceRoute
-            }
+                retriesLeft=TSCH_MAXTXRETRIES,
+                srcIp=self,  # DAG root
+                dstIp=destination,
+                sourceRoute=sourceRoute
+            )
 
             # enqueue packet in TSCH queue
             isEnqueued = self._tsch_enqueue(newPacket)
 
             if isEnqueued:
                 # increment traffic
-                self._log(INFO, "[join] Enqueued join packet for mote {0} with token = {1}", (destination.id, token))
+                if logFlags.info:
+                    self._log(INFO, "[join] Enqueued join packet for mote {0} with token = {1}", (destination.id, token))
             else:
                 # update mote stats
                 self._radio_drop_packet(newPacket, 'droppedFailedEnqueue')
@@ -495,7 +506,8 @@ class Mote(object):
     def join_receiveJoinPacket(self, srcIp, payload, timestamp):
         self.engine.removeEvent((self.id, '_join_action_retransmission'))  # remove the pending retransmission event
 
-        self._log(INFO, "[join] Received join packet from {0} with token {1}", (srcIp.id, payload[0]))
+        if logFlags.info:
+            self._log(INFO, "[join] Received join packet from {0} with token {1}", (srcIp.id, payload[0]))
 
         # this is a hack to allow downward routing of join packets before node has sent a DAO
         if self.dagRoot:
@@ -644,17 +656,17 @@ class Mote(object):
 
                 # send an ACK
                 # create new packet
-                newPacket = {
-                    'asn': self.engine.getAsn(),
-                    'type': APP_TYPE_ACK,
-                    'code': None,
-                    'payload': [],
-                    'retriesLeft': TSCH_MAXTXRETRIES,
-                    'srcIp': self,  # DAG root
-                    'dstIp': destination,
-                    'sourceRoute': sourceRoute
-
-                }
+                newPacket = Packet.Packet(
+                    asn=self.engine.getAsn(),
+                    type=APP_TYPE_ACK,
+                    code=None,
+                    payload=[],
+                    retriesLeft=TSCH_MAXTXRETRIES,
+                    srcIp=self,  # DAG root
+                    dstIp=destination,
+                    sourceRoute=sourceRoute
+
+                )
 
                 # enqueue packet in TSCH queue
                 if not self._tsch_enqueue(newPacket):
@@ -665,11 +677,12 @@ class Mote(object):
 
         assert not self.dagRoot
 
-        self._log(
-            INFO,
-            "[app] Trying to enqueue a DATA packet to {0}.",
-            (self.preferredParent.id,),
-        )
+        if logFlags.info:
+            self._log(
+                INFO,
+                "[app] Trying to enqueue a DATA packet to {0}.",
+                (self.preferredParent.id,),
+            )
 
         if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment:
             self.arrivedToGen += 1  # stat that is not resetted
@@ -686,30 +699,30 @@ class Mote(object):
                 (self.ReSF is not None and ((self.numCellsToNeighbors.get(self.preferredParent, 0) != 0) or self.preferredParent in self.ReSF.txTuples))):
 
             # create new packet
-            newPacket = {
-                'asn': self.engine.getAsn(),
-                'type': APP_TYPE_DATA,
-                'code': None,
-                'payload': [self.id, self.engine.getAsn(), 1],
+            newPacket = Packet.Packet(
+                asn=self.engine.getAsn(),
+                type=APP_TYPE_DATA,
+                code=None,
+                payload=[self.id, self.engine.getAsn(), 1],
             # the payload is used for latency and number of hops calculation
-                'retriesLeft': TSCH_MAXTXRETRIES,
-                'srcIp': self,
-                'dstIp': self.dagRootAddress,
-                'sourceRoute': [],
-            }
+                retriesLeft=TSCH_MAXTXRETRIES,
+                srcIp=self,
+                dstIp=self.dagRootAddress,
+                sourceRoute=[],
+            )
             if self.ReSF is not None:
                 # create new packet
-                newPacket = {
-                    'asn': self.engine.getAsn(),
-                    'type': APP_TYPE_DATA,
-                    'code': None,
-                    'payload': [self.id, self.engine.getAsn(), 1, self.ReSF.tuple['uniqueId']],
+                newPacket = Packet.Packet(
+                    asn=self.engine.getAsn(),
+                    type=APP_TYPE_DATA,
+                    code=None,
+                    payload=[self.id, self.engine.getAsn(), 1, self.ReSF.tuple['uniqueId']],
                     # the payload is used for latency and number of hops calculation
-                    'retriesLeft': TSCH_MAXTXRETRIES,
-                    'srcIp': self,
-                    'dstIp': self.dagRootAddress,
-                    'sourceRoute': [],
-                }
+                    retriesLeft=TSCH_MAXTXRETRIES,
+                    srcIp=self,
+                    dstIp=self.dagRootAddress,
+                    sourceRoute=[],
+                )
 
             # update mote stats
             if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment:
@@ -725,11 +738,12 @@ class Mote(object):
                 # send it as a single frame
                 isEnqueued = self._tsch_enqueue(newPacket)
                 if isEnqueued:
-                    self._log(
-                        INFO,
-                        "[app] DATA packet enqueued (len queue: {0}, shared cells to pref: {1}).",
-                        (len(self.txQueue), len(self.getSharedCells(self.preferredParent))),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[app] DATA packet enqueued (len queue: {0}, shared cells to pref: {1}).",
+                            (len(self.txQueue), len(self.getSharedCells(self.preferredParent))),
+                        )
                     pass
                 else:
                     # update mote stats
@@ -738,11 +752,12 @@ class Mote(object):
                     elif not self.settings.convergeFirst:
                         self.pktDropQueue += 1
                     self._radio_drop_packet(newPacket, 'droppedDataFailedEnqueue')
-                    self._log(
-                        INFO,
-                        "[app] DATA packet dropped. (queue length {0}, {1})",
-                        (len(self.txQueue), str(self.txQueue)),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[app] DATA packet dropped. (queue length {0}, {1})",
+                            (len(self.txQueue), str(self.txQueue)),
+                        )
         else:
             if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment:
                 self.notGenerated += 1  # stat that is not resetted
@@ -754,11 +769,12 @@ class Mote(object):
 
         assert not self.dagRoot
 
-        self._log(
-            INFO,
-            "[app] Trying to enqueue a SPORADIC DATA packet to {0}.",
-            (self.preferredParent.id,),
-        )
+        if logFlags.info:
+            self._log(
+                INFO,
+                "[app] Trying to enqueue a SPORADIC DATA packet to {0}.",
+                (self.preferredParent.id,),
+            )
 
         if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment:
             self.arrivedToGen += 1  # stat that is not resetted
@@ -775,17 +791,17 @@ class Mote(object):
                 (self.ReSF is not None and ((self.numCellsToNeighbors.get(self.preferredParent, 0) != 0) or self.preferredParent in self.ReSF.txTuples))):
 
             # create new packet
-            newPacket = {
-                'asn': self.engine.getAsn(),
-                'type': APP_TYPE_DATA,
-                'code': None,
-                'payload': [self.id, self.engine.getAsn(), 1],
+            newPacket = Packet.Packet(
+                asn=self.engine.getAsn(),
+                type=APP_TYPE_DATA,
+                code=None,
+                payload=[self.id, self.engine.getAsn(), 1],
             # the payload is used for latency and number of hops calculation
-                'retriesLeft': TSCH_MAXTXRETRIES,
-                'srcIp': self,
-                'dstIp': self.dagRootAddress,
-                'sourceRoute': [],
-            }
+                retriesLeft=TSCH_MAXTXRETRIES,
+                srcIp=self,
+                dstIp=self.dagRootAddress,
+                sourceRoute=[],
+            )
 
             # update mote stats
             if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment:
@@ -801,11 +817,12 @@ class Mote(object):
                 # send it as a single frame
                 isEnqueued = self._tsch_enqueue(newPacket)
                 if isEnqueued:
-                    self._log(
-                        INFO,
-                        "[app] SPORADIC DATA packet enqueued (len queue: {0}, shared cells to pref: {1}).",
-                        (len(self.txQueue), len(self.getSharedCells(self.preferredParent))),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[app] SPORADIC DATA packet enqueued (len queue: {0}, shared cells to pref: {1}).",
+                            (len(self.txQueue), len(self.getSharedCells(self.preferredParent))),
+                        )
                     pass
                 else:
                     # update mote stats
@@ -814,11 +831,12 @@ class Mote(object):
                     elif not self.settings.convergeFirst:
                         self.pktDropQueue += 1
                     self._radio_drop_packet(newPacket, 'droppedDataFailedEnqueue')
-                    self._log(
-                        INFO,
-                        "[app] SPORADIC DATA packet dropped. (queue length {0}, {1})",
-                        (len(self.txQueue), str(self.txQueue)),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[app] SPORADIC DATA packet dropped. (queue length {0}, {1})",
+                            (len(self.txQueue), str(self.txQueue)),
+                        )
         else:
             if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment:
                 self.notGenerated += 1  # stat that is not resetted
@@ -828,11 +846,12 @@ class Mote(object):
 
     def _app_is_frag_to_forward(self, frag):
 
-        smac = frag['smac']
-        dstIp = frag['dstIp']
-        size = frag['payload'][3]['datagram_size']
-        itag = frag['payload'][3]['datagram_tag']
-        offset = frag['payload'][3]['datagram_offset']
+        frag = Packet.asPacket(frag)
+        smac = frag.smac
+        dstIp = frag.dstIp
+        size = frag.payload[3]['datagram_size']
+        itag = frag.payload[3]['datagram_tag']
+        offset = frag.payload[3]['datagram_offset']
         entry_lifetime = 60 / self.settings.slotDuration
 
         for mac in self.vrbTable.keys():
@@ -860,7 +879,7 @@ class Mote(object):
             # nexthop is determined at TSCH layer in this simulation.
             if itag in self.vrbTable[smac]:
                 # duplicate first fragment
-                frag['dstIp'] = None  # this frame will be dropped by the caller
+                frag.dstIp = None  # this frame will be dropped by the caller
                 return False
             else:
                 self.vrbTable[smac][itag] = {}
@@ -892,9 +911,9 @@ class Mote(object):
                     self._radio_drop_packet(frag, 'droppedFragMissingFrag')
                     return False
 
-            frag['asn'] = self.engine.getAsn()
-            frag['payload'][2] += 1  # update the number of hops
-            frag['payload'][3]['datagram_tag'] = self.vrbTable[smac][itag]['otag']
+            frag.asn = self.engine.getAsn()
+            frag.payload[2] += 1  # update the number of hops
+            frag.payload[3]['datagram_tag'] = self.vrbTable[smac][itag]['otag']
         else:
             self._radio_drop_packet(frag, 'droppedFragNoVRBEntry')
             return False
@@ -911,17 +930,20 @@ class Mote(object):
 
     def _app_frag_packet(self, packet):
 
+        packet = Packet.asPacket(packet)
+
         # fragment packet into the specified number of pieces
         tag = self.next_datagram_tag
         self.next_datagram_tag = (self.next_datagram_tag + 1) % 65536
         for i in range(0, self.settings.numFragments):
-            frag = copy.copy(packet)
-            frag['type'] = APP_TYPE_FRAG
-            frag['payload'] = copy.deepcopy(packet['payload'])
-            frag['payload'].append({'datagram_size': self.settings.numFragments,
-                                    'datagram_tag': tag,
-                                    'datagram_offset': i})
-            frag['sourceRoute'] = copy.deepcopy(packet['sourceRoute'])
+            frag = packet.copy()
+            frag.type = APP_TYPE_FRAG
+            frag.payload = list(packet.payload)
+            frag.payload.append({'datagram_size': self.settings.numFragments,
+                                 'datagram_tag': tag,
+                                 'datagram_offset': i})
+            if packet.sourceRoute is not None:
+                frag.sourceRoute = list(packet.sourceRoute)
             if not self._tsch_enqueue(frag):
                 # we may want to stop fragmentation here. but just continue it
                 # for simplicity
@@ -945,7 +967,7 @@ class Mote(object):
         if size > self.settings.numFragments:
             # the size of reassQueue is the same number as self.settings.numFragments.
             # larger packet than reassQueue should be dropped.
-            self._radio_drop_packet({'payload': payload}, 'droppedFragTooBigForReassQueue')
+            self._radio_drop_packet(Packet.Packet(payload=payload), 'droppedFragTooBigForReassQueue')
             return False
 
         if (smac not in self.reassQueue) or (tag not in self.reassQueue[smac]):
@@ -955,7 +977,7 @@ class Mote(object):
                     reass_queue_num += len(self.reassQueue[i])
                 if reass_queue_num == self.maxReassQueueNum:
                     # no room for a new entry
-                    self._radio_drop_packet({'payload': payload}, 'droppedFragReassQueueFull')
+                    self._radio_drop_packet(Packet.Packet(payload=payload), 'droppedFragReassQueueFull')
                     return False
             else:
                 pass
@@ -995,16 +1017,16 @@ class Mote(object):
         #         or (self.ReSF is not None and self.preferredParent):
 
             # create new packet
-            newPacket = {
-                'asn': self.engine.getAsn(),
-                'type': TSCH_TYPE_EB,
-                'code': None,
-                'payload': [self.dagRank],  # the payload is the rpl rank
-                'retriesLeft': 1,  # do not retransmit broadcast
-                'srcIp': self,
-                'dstIp': BROADCAST_ADDRESS,
-                'sourceRoute': []
-            }
+            newPacket = Packet.Packet(
+                asn=self.engine.getAsn(),
+                type=TSCH_TYPE_EB,
+                code=None,
+                payload=[self.dagRank],  # the payload is the rpl rank
+                retriesLeft=1,  # do not retransmit broadcast
+                srcIp=self,
+                dstIp=BROADCAST_ADDRESS,
+                sourceRoute=[]
+            )
 
             # enqueue packet in TSCH queue
             if not self._tsch_enqueue(newPacket):
@@ -1064,11 +1086,12 @@ class Mote(object):
         if self.firstEB and not self.isSync:
             assert self.settings.withJoin
             # log
-            self._log(
-                INFO,
-                "[tsch] synced on EB received from mote {0}.",
-                (smac.id,),
-            )
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    "[tsch] synced on EB received from mote {0}.",
+                    (smac.id,),
+                )
             self.firstBeaconAsn = self.engine.getAsn()
             self.firstEB = False
             # declare as synced to the network
@@ -1106,16 +1129,16 @@ class Mote(object):
                 self._stats_incrementMoteStats('rplTxDIO')
 
                 # create new packet
-                newPacket = {
-                    'asn': self.engine.getAsn(),
-                    'type': RPL_TYPE_DIO,
-                    'code': None,
-                    'payload': [self.rank],  # the payload is the rpl rank
-                    'retriesLeft': 1,  # do not retransmit broadcast
-                    'srcIp': self,
-                    'dstIp': BROADCAST_ADDRESS,
-                    'sourceRoute': []
-                }
+                newPacket = Packet.Packet(
+                    asn=self.engine.getAsn(),
+                    type=RPL_TYPE_DIO,
+                    code=None,
+                    payload=[self.rank],  # the payload is the rpl rank
+                    retriesLeft=1,  # do not retransmit broadcast
+                    srcIp=self,
+                    dstIp=BROADCAST_ADDRESS,
+                    sourceRoute=[]
+                )
 
                 # enqueue packet in TSCH queue
                 if not self._tsch_enqueue(newPacket):
@@ -1131,16 +1154,16 @@ class Mote(object):
                 self._stats_incrementMoteStats('rplTxDIO')
 
                 # create new packet
-                newPacket = {
-                    'asn': self.engine.getAsn(),
-                    'type': RPL_TYPE_DIO,
-                    'code': None,
-                    'payload': [self.rank],  # the payload is the rpl rank
-                    'retriesLeft': 1,  # do not retransmit broadcast
-                    'srcIp': self,
-                    'dstIp': BROADCAST_ADDRESS,
-                    'sourceRoute': []
-                }
+                newPacket = Packet.Packet(
+                    asn=self.engine.getAsn(),
+                    type=RPL_TYPE_DIO,
+                    code=None,
+                    payload=[self.rank],  # the payload is the rpl rank
+                    retriesLeft=1,  # do not retransmit broadcast
+                    srcIp=self,
+                    dstIp=BROADCAST_ADDRESS,
+                    sourceRoute=[]
+                )
 
                 # enqueue packet in TSCH queue
                 if not self._tsch_enqueue(newPacket):
@@ -1165,16 +1188,16 @@ class Mote(object):
                 self.initiatedDAO += 1
 
             # create new packet
-            newPacket = {
-                'asn': self.engine.getAsn(),
-                'type': RPL_TYPE_DAO,
-                'code': None,
-                'payload': [self.id, self.preferredParent.id],
-                'retriesLeft': TSCH_MAXTXRETRIES,
-                'srcIp': self,
-                'dstIp': self.dagRootAddress,
-                'sourceRoute': []
-            }
+            newPacket = Packet.Packet(
+                asn=self.engine.getAsn(),
+                type=RPL_TYPE_DAO,
+                code=None,
+                payload=[self.id, self.preferredParent.id],
+                retriesLeft=TSCH_MAXTXRETRIES,
+                srcIp=self,
+                dstIp=self.dagRootAddress,
+                sourceRoute=[]
+            )
 
             # enqueue packet in TSCH queue
             if not self._tsch_enqueue(newPacket):
@@ -1241,7 +1264,8 @@ class Mote(object):
             if not self.isSync:
                 return
 
-            self._log(INFO, "[rpl] Received DIO from mote {0}", (smac.id,))
+            if logFlags.info:
+                self._log(INFO, "[rpl] Received DIO from mote {0}", (smac.id,))
             # if self.preferredParent is not None:
             #     self._log(INFO, "[rpl] My preferred parent is {0}", (self.preferredParent.id,))
             # else:
@@ -1279,10 +1303,11 @@ class Mote(object):
                 self.isConverged = True
                 if all(mote.isConverged == True for mote in
                        self.engine.motes) and self.engine.dedicatedCellConvergence == 99999999:
-                    self._log(
-                        INFO,
-                        'All motes converged: all have a cell to their parent.'
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            'All motes converged: all have a cell to their parent.'
+                        )
                     # for m in self.engine.motes:
                     #     if m.id != 0:
                     #         print 'mote %d: prefparent %d' % (m.id, m.preferredParent.id)
@@ -1300,19 +1325,21 @@ class Mote(object):
                         terminationDelay = simTime + offset + settlingTime
                         self.engine.terminateSimulation(terminationDelay)
                         self.engine.asnInitExperiment = self.engine.asn + offset + settlingTime
-                        self._log(
-                            INFO,
-                            "Start experiment set at ASN {0}, end experiment at ASN {1}.",
-                            (self.engine.asnInitExperiment, self.engine.asnEndExperiment)
-                        )
+                        if logFlags.info:
+                            self._log(
+                                INFO,
+                                "Start experiment set at ASN {0}, end experiment at ASN {1}.",
+                                (self.engine.asnInitExperiment, self.engine.asnEndExperiment)
+                            )
                         self.engine.startSending()
                 else:
                     cvrgd = [mote.id for mote in self.engine.motes if mote.isConverged == True]
-                    self._log(
-                        INFO,
-                        "{0} motes converged with a dedicated cell in rpl housekeeping: {1}.",
-                        (len(cvrgd), str(cvrgd))
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "{0} motes converged with a dedicated cell in rpl housekeeping: {1}.",
+                            (len(cvrgd), str(cvrgd))
+                        )
 
             # update time correction
             if self.preferredParent == sender:
@@ -1333,10 +1360,11 @@ class Mote(object):
 
             self.parents.update({tuple([payload[0]]): [[payload[1]]]})
 
-            self._log(
-                INFO,
-                "Received a DAO!"
-            )
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    "Received a DAO!"
+                )
 
     def _rpl_action_sendDIO(self):
 
@@ -1446,11 +1474,12 @@ class Mote(object):
                 if self.rank and newrank != self.rank:
                     self._stats_incrementMoteStats('rplChurnRank')
                     # log
-                    self._log(
-                        INFO,
-                        "[rpl] churn: rank {0}->{1}",
-                        (self.rank, newrank),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[rpl] churn: rank {0}->{1}",
+                            (self.rank, newrank),
+                        )
                 if self.preferredParent is None and newPreferredParent is not None:
                     if not self.settings.withJoin:
                         # if we selected a parent for the first time, add one cell to it
@@ -1464,11 +1493,12 @@ class Mote(object):
                     self.rplPrefParentChurnToAndASN = (newPreferredParent, self.engine.asn)
 
                     # log
-                    self._log(
-                        INFO,
-                        "[rpl] churn: preferredParent {0}->{1}",
-                        (self.preferredParent.id, newPreferredParent.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[rpl] churn: preferredParent {0}->{1}",
+                            (self.preferredParent.id, newPreferredParent.id),
+                        )
                     # trigger 6P add to the new parent
                     self.oldPreferredParent = self.preferredParent
                     if self.settings.resfNoMSF != 'no':
@@ -1557,29 +1587,29 @@ class Mote(object):
                 sourceRoute += [nextparent]
 
     def _rpl_addNextHop(self, packet):
-        assert self != packet['dstIp']
+        assert self != packet.dstIp
 
         if not (self.preferredParent or self.dagRoot):
             return False
 
         nextHop = None
 
-        if packet['dstIp'] == BROADCAST_ADDRESS:
+        if packet.dstIp == BROADCAST_ADDRESS:
             nextHop = self._myNeighbors() # mobility: OK.
         # 6Top packet. don't send to the parent necessarily. Send it directly to your neighbor (1 hop)
-        elif packet['type'] == IANA_6TOP_TYPE_REQUEST or packet['type'] == IANA_6TOP_TYPE_RESPONSE:
-            nextHop = [packet['dstIp']]
-        elif packet['dstIp'] == self.dagRootAddress:  # upward packet
+        elif packet.type == IANA_6TOP_TYPE_REQUEST or packet.type == IANA_6TOP_TYPE_RESPONSE:
+            nextHop = [packet.dstIp]
+        elif packet.dstIp == self.dagRootAddress:  # upward packet
             nextHop = [self.preferredParent]
-        elif packet['sourceRoute']:  # downward packet with source route info filled correctly
-            nextHopId = packet['sourceRoute'].pop()
+        elif packet.sourceRoute:  # downward packet with source route info filled correctly
+            nextHopId = packet.sourceRoute.pop()
             for nei in self._myNeighbors(): # mobility: OK.
                 if [nei.id] == nextHopId:
                     nextHop = [nei]
-        elif packet['dstIp'] in self._myNeighbors():  # mobility: OK. Used for 1hop packets, such as 6top messages. This has to be the last one, since some neighbours can have very low PDR
-            nextHop = [packet['dstIp']]
+        elif packet.dstIp in self._myNeighbors():  # mobility: OK. Used for 1hop packets, such as 6top messages. This has to be the last one, since some neighbours can have very low PDR
+            nextHop = [packet.dstIp]
 
-        packet['nextHop'] = nextHop
+        packet.nextHop = nextHop
         return True if nextHop else False
 
     # ===== msf
@@ -1619,14 +1649,16 @@ class Mote(object):
                 timeout = self._msf_get_sixtop_timeout(self.preferredParent)
 
                 if self.ReSF is None or (self.ReSF is not None and self.settings.minCellsMSF > 0):
-                    self._log(INFO,
-                              "[msf] triggering 6P ADD of {0} cells, dir {1}, to mote {2}, 6P timeout {3} (parent change)",
-                              (self.settings.msfNumCellsToAddOrRemove, celloptions, self.preferredParent.id, timeout,))
+                    if logFlags.info:
+                        self._log(INFO,
+                                  "[msf] triggering 6P ADD of {0} cells, dir {1}, to mote {2}, 6P timeout {3} (parent change)",
+                                  (self.settings.msfNumCellsToAddOrRemove, celloptions, self.preferredParent.id, timeout,))
 
-                    self._log(INFO,
-                              "[msf] cells to old {0}, cells to new {1}",
-                              (self.numCellsToNeighbors.get(self.oldPreferredParent, 0), self.numCellsToNeighbors.get(
-                                  self.preferredParent, 0)))
+                    if logFlags.info:
+                        self._log(INFO,
+                                  "[msf] cells to old {0}, cells to new {1}",
+                                  (self.numCellsToNeighbors.get(self.oldPreferredParent, 0), self.numCellsToNeighbors.get(
+                                      self.preferredParent, 0)))
 
                     self._sixtop_cell_reservation_request(self.preferredParent,
                                                           self.numCellsToNeighbors.get(self.oldPreferredParent, self.settings.minCellsMSF),
@@ -1637,9 +1669,10 @@ class Mote(object):
                 # meaning that it should not be called when there is no preferred parent yet,
                 # only when there is a parent change
                 if self.ReSF is not None and self.settings.resfChangeParent == 1 and self.oldPreferredParent is not None:
-                    self._log(INFO,
-                              "[resf] Triggering a ReSF parent change from parent {0} to parent {1}",
-                              (self.oldPreferredParent.id, self.preferredParent.id))
+                    if logFlags.info:
+                        self._log(INFO,
+                                  "[resf] Triggering a ReSF parent change from parent {0} to parent {1}",
+                                  (self.oldPreferredParent.id, self.preferredParent.id))
 
                     if self.settings.resfChangeParentPolicy == 'delete' or self.settings.resfChangeParentPolicy == 'combined':
                         # get list of tuples (unique_id, timestamp), do this before sending out new reservations
@@ -1666,9 +1699,10 @@ class Mote(object):
                     self.oldPrefParentRemoval += 1
                     self.currentOldPrefParentRemoval += 1
 
-                    self._log(INFO,
-                              "[msf] triggering 6P REMOVE of {0} cells, dir {1}, to mote {2}, 6P timeout {3} (parent change)",
-                              (self.settings.msfNumCellsToAddOrRemove, celloptions, self.oldPreferredParent.id, timeout,))
+                    if logFlags.info:
+                        self._log(INFO,
+                                  "[msf] triggering 6P REMOVE of {0} cells, dir {1}, to mote {2}, 6P timeout {3} (parent change)",
+                                  (self.settings.msfNumCellsToAddOrRemove, celloptions, self.oldPreferredParent.id, timeout,))
 
                     self._sixtop_removeCells(self.oldPreferredParent,
                                              self.numCellsToNeighbors.get(self.oldPreferredParent, 0), celloptions, timeout)
@@ -1727,10 +1761,11 @@ class Mote(object):
                 self.currentOldPrefParentRemoval = 0
 
                 # remove it
-                self._log(
-                    INFO,
-                    '[6top] Retransmission parent change event is being removed...',
-                )
+                if logFlags.info:
+                    self._log(
+                        INFO,
+                        '[6top] Retransmission parent change event is being removed...',
+                    )
                 self.engine.removeEvent((self.id,
                                          '_msf_action_parent_change'))  # remove the pending retransmission event for MSF
 
@@ -1746,7 +1781,8 @@ class Mote(object):
                     cell['dir'] == DIR_TXRX_SHARED and cell['neighbor'] == neighbor and not cell['resf']):
                 cellPDR.append(self.getCellPDR(cell))
 
-        self._log(INFO, '[sixtop] timeout() cellPDR = {0}', (cellPDR,))
+        if logFlags.info:
+            self._log(INFO, '[sixtop] timeout() cellPDR = {0}', (cellPDR,))
 
         if len(cellPDR) > 0:
             meanPDR = sum(cellPDR) / float(len(cellPDR))
@@ -1768,9 +1804,10 @@ class Mote(object):
         with self.dataLock:
             # MSF: updating numCellsUsed
             if cellOptions == DIR_TXRX_SHARED and neighbor == self.preferredParent and self.settings.resfNoMSF != 'no':
-                self._log(INFO,
-                          '[msf] _msf_signal_cell_used: neighbor {0} direction {1} type {2} preferredParent = {3}',
-                          (neighbor.id, direction, type, self.preferredParent.id))
+                if logFlags.info:
+                    self._log(INFO,
+                              '[msf] _msf_signal_cell_used: neighbor {0} direction {1} type {2} preferredParent = {3}',
+                              (neighbor.id, direction, type, self.preferredParent.id))
                 self.numCellsUsed += 1
 
     def _msf_signal_cell_elapsed(self, neighbor, direction):
@@ -1784,8 +1821,9 @@ class Mote(object):
                 self.numCellsElapsed += 1
 
                 if self.numCellsElapsed == self.settings.msfMaxNumCells and self.settings.resfNoMSF != 'no':
-                    self._log(INFO, '[msf] _msf_signal_cell_elapsed: numCellsElapsed = {0}, numCellsUsed = {1}',
-                              (self.numCellsElapsed, self.numCellsUsed))
+                    if logFlags.info:
+                        self._log(INFO, '[msf] _msf_signal_cell_elapsed: numCellsElapsed = {0}, numCellsUsed = {1}',
+                                  (self.numCellsElapsed, self.numCellsUsed))
 
                     if (self.numCellsUsed > self.settings.msfLimNumCellsUsedHigh and \
                             ((self.ReSF is None) or \
@@ -1819,9 +1857,10 @@ class Mote(object):
         """
         timeout = self._msf_get_sixtop_timeout(self.preferredParent)
         celloptions = DIR_TXRX_SHARED
-        self._log(INFO,
-                  "[msf] triggering 6P ADD of {0} cells, dir {1}, to mote {2}, 6P timeout {3}",
-                  (self.settings.msfNumCellsToAddOrRemove, DIR_TXRX_SHARED, self.preferredParent.id, timeout,))
+        if logFlags.info:
+            self._log(INFO,
+                      "[msf] triggering 6P ADD of {0} cells, dir {1}, to mote {2}, 6P timeout {3}",
+                      (self.settings.msfNumCellsToAddOrRemove, DIR_TXRX_SHARED, self.preferredParent.id, timeout,))
         # # if we use ReSF, check the duration of this newly allocated cell
         self._sixtop_cell_reservation_request(self.preferredParent,
                                               self.settings.msfNumCellsToAddOrRemove,
@@ -1846,9 +1885,10 @@ class Mote(object):
         if self.numCellsToNeighbors.get(self.preferredParent, 0) > self.settings.minCellsMSF and self.settings.resfNoMSF != 'no':
             timeout = self._msf_get_sixtop_timeout(self.preferredParent)
             celloptions = DIR_TXRX_SHARED
-            self._log(INFO,
-                      "[msf] triggering 6P REMOVE of {0} cells, dir {1}, to mote {2}, 6P timeout {3}",
-                      (self.settings.msfNumCellsToAddOrRemove, DIR_TXRX_SHARED, self.preferredParent.id, timeout,))
+            if logFlags.info:
+                self._log(INFO,
+                          "[msf] triggering 6P REMOVE of {0} cells, dir {1}, to mote {2}, 6P timeout {3}",
+                          (self.settings.msfNumCellsToAddOrRemove, DIR_TXRX_SHARED, self.preferredParent.id, timeout,))
 
             # trigger 6p to remove msfNumCellsToAddOrRemove cells
             self._sixtop_removeCells(self.preferredParent,
@@ -1889,11 +1929,12 @@ class Mote(object):
                 del self.sixtopStates[n]['tx']['timer']
                 found = True
                 # log
-                self._log(
-                    INFO,
-                    "[6top] fired timer on mote {0} for neighbor {1}.",
-                    (self.id, n),
-                )
+                if logFlags.info:
+                    self._log(
+                        INFO,
+                        "[6top] fired timer on mote {0} for neighbor {1}.",
+                        (self.id, n),
+                    )
 
                 if self.ReSF is not None:
                     txFound = False
@@ -1903,11 +1944,12 @@ class Mote(object):
                             txFound = True
                             # here the ReSF reservation should first be re added
                             self.ReSF._resf_delayReservation(copy.deepcopy(self.ReSF.txBlockedTuples[moteTmp]), type='add')
-                            self._log(
-                                INFO,
-                                "[6top] fired timer on mote for reservation: {0}.",
-                                (copy.deepcopy(self.ReSF.txBlockedTuples[moteTmp]),),
-                            )
+                            if logFlags.info:
+                                self._log(
+                                    INFO,
+                                    "[6top] fired timer on mote for reservation: {0}.",
+                                    (copy.deepcopy(self.ReSF.txBlockedTuples[moteTmp]),),
+                                )
                             del self.ReSF.txBlockedTuples[moteTmp]
 
                     if not txFound: # then maybe it was a ReSF delete
@@ -1932,10 +1974,11 @@ class Mote(object):
                         (neighbor.id in self.sixtopStates and 'tx' not in self.sixtopStates[neighbor.id] and self.sixtopStates[neighbor.id]['rx']['state'] == SIX_STATE_IDLE) or \
                         (neighbor.id in self.sixtopStates and 'tx' in self.sixtopStates[neighbor.id] and self.sixtopStates[neighbor.id]['tx']['state'] == SIX_STATE_IDLE):
 
-                    self._log(
-                        INFO,
-                        "[6P] sixtop cell reservation.",
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[6P] sixtop cell reservation.",
+                        )
 
                     # if neighbor not yet in states dict, add it
                     if neighbor.id not in self.sixtopStates:
@@ -1974,17 +2017,19 @@ class Mote(object):
                         self._sixtop_enqueue_ADD_REQUEST(neighbor, cellList, numCells, dir,
                                                          self.sixtopStates[neighbor.id]['tx']['seqNum'], backupDuration=backupDuration)
                     elif resf is None and self.eLLSF is not None:
-                        self._log(
-                            DEBUG,
-                            "[6top] numCells {0}, MSF_MIN_NUM_CELLS {1}.",
-                            (numCells, MSF_MIN_NUM_CELLS),
-                        )
+                        if logFlags.debug:
+                            self._log(
+                                DEBUG,
+                                "[6top] numCells {0}, MSF_MIN_NUM_CELLS {1}.",
+                                (numCells, MSF_MIN_NUM_CELLS),
+                            )
                         cellList = self.eLLSF._ellsf_reservation_request(neighbor, numCells * MSF_MIN_NUM_CELLS, dir)
-                        self._log(
-                            DEBUG,
-                            "[6top] {0}.",
-                            (cellList,),
-                        )
+                        if logFlags.debug:
+                            self._log(
+                                DEBUG,
+                                "[6top] {0}.",
+                                (cellList,),
+                            )
                         if cellList != []:  # only send the request if we found (an) appropriate cell(s)
                             self._sixtop_enqueue_ADD_REQUEST(neighbor, cellList, numCells, dir,
                                                              self.sixtopStates[neighbor.id]['tx']['seqNum'], backupDuration=backupDuration)
@@ -1998,17 +2043,19 @@ class Mote(object):
                     # print self.id
                     # print neighbor.id
                     # print self.sixtopStates[neighbor.id]
-                    self._log(
-                        DEBUG,
-                        "[6top] can not send 6top ADD request to {0} because timer still did not fire on mote {1} to mote {2}: {3}",
-                        (neighbor.id, self.id, neighbor.id, self.sixtopStates[neighbor.id]['tx']['timeout']),
-                    )
-                    if resf is not None:
+                    if logFlags.debug:
                         self._log(
                             DEBUG,
-                            "[6top] delayed ReSF request because timer still did not fire on mote {0}.",
-                            (self.id,),
+                            "[6top] can not send 6top ADD request to {0} because timer still did not fire on mote {1} to mote {2}: {3}",
+                            (neighbor.id, self.id, neighbor.id, self.sixtopStates[neighbor.id]['tx']['timeout']),
                         )
+                    if resf is not None:
+                        if logFlags.debug:
+                            self._log(
+                                DEBUG,
+                                "[6top] delayed ReSF request because timer still did not fire on mote {0}.",
+                                (self.id,),
+                            )
                         self.ReSF._resf_delayReservation(resf, type='add')
 
             else:
@@ -2017,11 +2064,12 @@ class Mote(object):
                 cellList = []
                 for (ts, ch) in cells.iteritems():
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] add TX cell ts={0},ch={1} from {2} to {3}',
-                        (ts, ch, self.id, neighbor.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] add TX cell ts={0},ch={1} from {2} to {3}',
+                            (ts, ch, self.id, neighbor.id),
+                        )
                     cellList += [(ts, ch, dir)]
                 self._tsch_addCells(neighbor, cellList)
 
@@ -2044,48 +2092,52 @@ class Mote(object):
 
                 if len(cells) != numCells:
                     # log
-                    self._log(
-                        ERROR,
-                        '[6top] scheduled {0} cells out of {1} required between motes {2} and {3}. cells={4}',
-                        (len(cells), numCells, self.id, neighbor.id, cells),
-                    )
+                    if logFlags.error:
+                        self._log(
+                            ERROR,
+                            '[6top] scheduled {0} cells out of {1} required between motes {2} and {3}. cells={4}',
+                            (len(cells), numCells, self.id, neighbor.id, cells),
+                        )
 
     def _sixtop_enqueue_ADD_REQUEST(self, neighbor, cellList, numCells, dir, seq, resf=None, backupDuration=None):
         """ enqueue a new 6P ADD request """
 
-        self._log(
-            INFO,
-            '[6top] enqueueing a new 6P ADD message (seqNum = {0}) cellList={1}, numCells={2} from {3} to {4}',
-            (seq, cellList, numCells, self.id, neighbor.id),
-        )
-        if resf is not None:
+        if logFlags.info:
             self._log(
                 INFO,
-                '[6top] ReSF contents: {0}',
-                (resf,),
+                '[6top] enqueueing a new 6P ADD message (seqNum = {0}) cellList={1}, numCells={2} from {3} to {4}',
+                (seq, cellList, numCells, self.id, neighbor.id),
             )
+        if resf is not None:
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    '[6top] ReSF contents: {0}',
+                    (resf,),
+                )
 
         # create new packet
-        newPacket = {
-            'asn': self.engine.getAsn(),
-            'type': IANA_6TOP_TYPE_REQUEST,
-            'code': IANA_6TOP_CMD_ADD,
-            'payload': [cellList, numCells, dir, seq, self.engine.getAsn(), resf, backupDuration],
-            'retriesLeft': TSCH_MAXTXRETRIES,
-            'srcIp': self,
-            'dstIp': neighbor,  # currently upstream
-            'sourceRoute': [],
-        }
+        newPacket = Packet.Packet(
+            asn=self.engine.getAsn(),
+            type=IANA_6TOP_TYPE_REQUEST,
+            code=IANA_6TOP_CMD_ADD,
+            payload=[cellList, numCells, dir, seq, self.engine.getAsn(), resf, backupDuration],
+            retriesLeft=TSCH_MAXTXRETRIES,
+            srcIp=self,
+            dstIp=neighbor,  # currently upstream
+            sourceRoute=[],
+        )
 
         # enqueue packet in TSCH queue
         isEnqueued = self._tsch_enqueue(newPacket)
 
         if not isEnqueued:
-            self._log(
-                INFO,
-                '[6top] ADD Request did not get enqueued: {0}',
-                (resf,),
-            )
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    '[6top] ADD Request did not get enqueued: {0}',
+                    (resf,),
+                )
             # update mote stats
             self._radio_drop_packet(newPacket, 'droppedFailedEnqueue')
 
@@ -2093,11 +2145,12 @@ class Mote(object):
                 self.ReSF._resf_delayReservation(copy.deepcopy(resf), type='add')
                 self.ReSF._resf_scheduleDelayedRequest(1000)
         else:
-            self._log(
-                INFO,
-                '[6top] ADD Request got enqueued: {0}',
-                (resf,),
-            )
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    '[6top] ADD Request got enqueued: {0}',
+                    (resf,),
+                )
             # set state to sending request for this neighbor
             self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_SENDING_REQUEST
             self.sixtopStates[neighbor.id]['tx']['blockedCells'] = cellList
@@ -2126,13 +2179,14 @@ class Mote(object):
             if smac.id in self.sixtopStates and 'rx' in self.sixtopStates[smac.id] and self.sixtopStates[smac.id]['rx'][
                 'state'] != SIX_STATE_IDLE:
                 for pkt in self.txQueue:
-                    if pkt['type'] == IANA_6TOP_TYPE_RESPONSE and pkt['dstIp'].id == smac.id:
+                    if pkt.type == IANA_6TOP_TYPE_RESPONSE and pkt.dstIp.id == smac.id:
                         self.txQueue.remove(pkt)
-                        self._log(
-                            INFO,
-                            "[6top] removed a 6TOP_TYPE_RESPONSE packet (seqNum = {0}) in the queue of mote {1} to neighbor {2}, because a new TYPE_REQUEST (add, seqNum = {3}) was received.",
-                            (pkt['payload'][3], self.id, smac.id, seq),
-                        )
+                        if logFlags.info:
+                            self._log(
+                                INFO,
+                                "[6top] removed a 6TOP_TYPE_RESPONSE packet (seqNum = {0}) in the queue of mote {1} to neighbor {2}, because a new TYPE_REQUEST (add, seqNum = {3}) was received.",
+                                (pkt.payload[3], self.id, smac.id, seq),
+                            )
                         # assert False
                 returnCode = IANA_6TOP_RC_RESET  # error, neighbor has to abort transaction
                 if smac.id not in self.sixtopStates:
@@ -2245,11 +2299,12 @@ class Mote(object):
 
             for ts, ch in cells.iteritems():
                 # log
-                self._log(
-                    INFO,
-                    '[6top] add RX cell ts={0},ch={1} from {2} to {3}',
-                    (ts, ch, self.id, neighbor.id),
-                )
+                if logFlags.info:
+                    self._log(
+                        INFO,
+                        '[6top] add RX cell ts={0},ch={1} from {2} to {3}',
+                        (ts, ch, self.id, neighbor.id),
+                    )
                 cellList += [(ts, ch, newDir)]
             self._tsch_addCells(neighbor, cellList)
 
@@ -2275,30 +2330,32 @@ class Mote(object):
     def _sixtop_enqueue_RESPONSE(self, neighbor, cellList, returnCode, dir, seq, resf=None, backupDuration=None):
         """ enqueue a new 6P ADD or DELETE response """
 
-        self._log(
-            INFO,
-            '[6top] enqueueing a new 6P RESPONSE message cellList={0}, numCells={1}, returnCode={2}, seqNum={3} from {4} to {5} (txQueue len: {6})',
-            (cellList, len(cellList), returnCode, seq, self.id, neighbor.id, len(self.txQueue)),
-        )
-
-        if resf is not None:
+        if logFlags.info:
             self._log(
                 INFO,
-                '[6top] ReSF contents: {0}',
-                (resf,),
+                '[6top] enqueueing a new 6P RESPONSE message cellList={0}, numCells={1}, returnCode={2}, seqNum={3} from {4} to {5} (txQueue len: {6})',
+                (cellList, len(cellList), returnCode, seq, self.id, neighbor.id, len(self.txQueue)),
             )
 
+        if resf is not None:
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    '[6top] ReSF contents: {0}',
+                    (resf,),
+                )
+
         # create new packet
-        newPacket = {
-            'asn': self.engine.getAsn(),
-            'type': IANA_6TOP_TYPE_RESPONSE,
-            'code': returnCode,
-            'payload': [cellList, len(cellList), dir, seq, resf, backupDuration],
-            'retriesLeft': TSCH_MAXTXRETRIES,
-            'srcIp': self,
-            'dstIp': neighbor,  # currently upstream
-            'sourceRoute': [],
-        }
+        newPacket = Packet.Packet(
+            asn=self.engine.getAsn(),
+            type=IANA_6TOP_TYPE_RESPONSE,
+            code=returnCode,
+            payload=[cellList, len(cellList), dir, seq, resf, backupDuration],
+            retriesLeft=TSCH_MAXTXRETRIES,
+            srcIp=self,
+            dstIp=neighbor,  # currently upstream
+            sourceRoute=[],
+        )
 
         # enqueue packet in TSCH queue
         isEnqueued = self._tsch_enqueue(newPacket)
@@ -2330,11 +2387,12 @@ class Mote(object):
                 # seqNum mismatch, transaction failed, ignore packet
                 if seq != self.sixtopStates[neighbor.id]['tx']['seqNum']:
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {1} has received a wrong seqNum in a sixtop operation with mote {0}',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {1} has received a wrong seqNum in a sixtop operation with mote {0}',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2347,11 +2405,12 @@ class Mote(object):
                 # transaction is considered as failed since the timeout has already scheduled for this ASN. Too late for removing the event, ignore packet
                 if self.sixtopStates[neighbor.id]['tx']['timer']['asn'] == self.engine.getAsn():
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {1} has received a ADD response from mote {0} too late',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {1} has received a ADD response from mote {0} too late',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2369,11 +2428,12 @@ class Mote(object):
                 uniqueTag = (self.id, uniqueTag)
                 self.engine.removeEvent(uniqueTag=uniqueTag)
 
-                self._log(
-                    INFO,
-                    "[6top] removed timer for mote {0} to neighbor {1} on asn {2}, tag {3}",
-                    (self.id, neighbor.id, self.sixtopStates[neighbor.id]['tx']['timer']['asn'], str(uniqueTag)),
-                )
+                if logFlags.info:
+                    self._log(
+                        INFO,
+                        "[6top] removed timer for mote {0} to neighbor {1} on asn {2}, tag {3}",
+                        (self.id, neighbor.id, self.sixtopStates[neighbor.id]['tx']['timer']['asn'], str(uniqueTag)),
+                    )
                 del self.sixtopStates[neighbor.id]['tx']['timer']
                 if self.ReSF is not None:
                     # schedule a delayed request
@@ -2424,11 +2484,12 @@ class Mote(object):
 
                         for (ts, ch, cellDir) in receivedCellList:
                             # log
-                            self._log(
-                                INFO,
-                                '[6top] add {4} cell ts={0},ch={1} from {2} to {3}',
-                                (ts, ch, self.id, neighbor.id, newDir),
-                            )
+                            if logFlags.info:
+                                self._log(
+                                    INFO,
+                                    '[6top] add {4} cell ts={0},ch={1} from {2} to {3}',
+                                    (ts, ch, self.id, neighbor.id, newDir),
+                                )
                             cellList += [(ts, ch, newDir)]
                         self._tsch_addCells(neighbor, cellList, backupDuration=backupDuration)
 
@@ -2442,10 +2503,11 @@ class Mote(object):
                             self.isConverged = True
                             self.isConvergedASN = self.engine.getAsn()
                             if all(mote.isConverged == True for mote in self.engine.motes):
-                                self._log(
-                                    INFO,
-                                    'All motes converged: all have a cell to their parent.'
-                                )
+                                if logFlags.info:
+                                    self._log(
+                                        INFO,
+                                        'All motes converged: all have a cell to their parent.'
+                                    )
                                 # self.engine._actionPauseSim()
                                 # for m in self.engine.motes:
                                 #     if m.id != 0:
@@ -2464,19 +2526,21 @@ class Mote(object):
                                     terminationDelay = simTime + offset + settlingTime
                                     self.engine.terminateSimulation(terminationDelay)
                                     self.engine.asnInitExperiment = self.engine.asn + offset + settlingTime
-                                    self._log(
-                                        INFO,
-                                        "Start experiment set at ASN {0}, end experiment at ASN {1}.",
-                                        (self.engine.asnInitExperiment, self.engine.asnEndExperiment)
-                                    )
+                                    if logFlags.info:
+                                        self._log(
+                                            INFO,
+                                            "Start experiment set at ASN {0}, end experiment at ASN {1}.",
+                                            (self.engine.asnInitExperiment, self.engine.asnEndExperiment)
+                                        )
                                     self.engine.startSending()
                             else:
                                 cvrgd = [mote.id for mote in self.engine.motes if mote.isConverged == True]
-                                self._log(
-                                    INFO,
-                                    "{0} motes converged with a dedicated cell in response: {1}.",
-                                    (len(cvrgd), str(cvrgd))
-                                )
+                                if logFlags.info:
+                                    self._log(
+                                        INFO,
+                                        "{0} motes converged with a dedicated cell in response: {1}.",
+                                        (len(cvrgd), str(cvrgd))
+                                    )
 
                         # do no count this cell as it will dissappear quite quickly
                         if backupDuration is None or backupDuration == 0:
@@ -2505,11 +2569,12 @@ class Mote(object):
                     return True
                 elif code == IANA_6TOP_RC_NORES:
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {0} do not have available resources to allocate for node {1}',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {0} do not have available resources to allocate for node {1}',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2521,11 +2586,12 @@ class Mote(object):
                 # only when devices are not powerfull enough. Not used in the simulator
                 elif code == IANA_6TOP_RC_BUSY:
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {0} is busy and do not have available resources for perform another 6top add operation with mote {1}',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {0} is busy and do not have available resources for perform another 6top add operation with mote {1}',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2536,11 +2602,12 @@ class Mote(object):
                     # TODO: increase stats of RC_BUSY
                 elif code == IANA_6TOP_RC_RESET:  # should not happen
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {0} has detected an state inconsistency in a 6top add operation with mote {1}',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {0} has detected an state inconsistency in a 6top add operation with mote {1}',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2572,11 +2639,12 @@ class Mote(object):
                 # seqNum mismatch, transaction failed, ignore packet
                 if seq != self.sixtopStates[neighbor.id]['tx']['seqNum']:
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {1} has received a wrong seqNum in a sixtop operation with mote {0}',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {1} has received a wrong seqNum in a sixtop operation with mote {0}',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2587,11 +2655,12 @@ class Mote(object):
                 # transaction is considered as failed since the timeout has already scheduled for this ASN. Too late for removing the event, ignore packet
                 if self.sixtopStates[neighbor.id]['tx']['timer']['asn'] == self.engine.getAsn():
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {1} has received a DELETE response from mote {0} too late',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {1} has received a DELETE response from mote {0} too late',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2604,11 +2673,12 @@ class Mote(object):
                 uniqueTag = (self.id, uniqueTag)
                 self.engine.removeEvent(uniqueTag=uniqueTag)
 
-                self._log(
-                    INFO,
-                    "[6top] removed timer for mote {0} to neighbor {1} on asn {2}, tag {3}",
-                    (self.id, neighbor.id, self.sixtopStates[neighbor.id]['tx']['timer']['asn'], str(uniqueTag)),
-                )
+                if logFlags.info:
+                    self._log(
+                        INFO,
+                        "[6top] removed timer for mote {0} to neighbor {1} on asn {2}, tag {3}",
+                        (self.id, neighbor.id, self.sixtopStates[neighbor.id]['tx']['timer']['asn'], str(uniqueTag)),
+                    )
                 del self.sixtopStates[neighbor.id]['tx']['timer']
                 if self.ReSF is not None:
                     # schedule a delayed request
@@ -2632,11 +2702,12 @@ class Mote(object):
 
                         for ts in receivedCellList:
                             # log
-                            self._log(
-                                INFO,
-                                '[6top] Delete {3} cell ts={0} from {1} to {2}',
-                                (ts, self.id, neighbor.id, newDir),
-                            )
+                            if logFlags.info:
+                                self._log(
+                                    INFO,
+                                    '[6top] Delete {3} cell ts={0} from {1} to {2}',
+                                    (ts, self.id, neighbor.id, newDir),
+                                )
 
                         self._tsch_removeCells(neighbor, receivedCellList)
 
@@ -2662,11 +2733,12 @@ class Mote(object):
                     return True
                 elif code == IANA_6TOP_RC_NORES:
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The resources requested for delete were not available for {1} in {0}',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The resources requested for delete were not available for {1} in {0}',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2678,11 +2750,12 @@ class Mote(object):
                 # only when devices are not powerfull enough. Not used in the simulator
                 elif code == IANA_6TOP_RC_BUSY:
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {0} is busy and has not available resources for perform another 6top deletion operation with mote {1}',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {0} is busy and has not available resources for perform another 6top deletion operation with mote {1}',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2693,11 +2766,12 @@ class Mote(object):
                     # TODO: increase stats of RC_BUSY
                 elif code == IANA_6TOP_RC_RESET:
                     # log
-                    self._log(
-                        INFO,
-                        '[6top] The node {0} has detected an state inconsistency in a 6top deletion operation with mote {1}',
-                        (neighbor.id, self.id),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            '[6top] The node {0} has detected an state inconsistency in a 6top deletion operation with mote {1}',
+                            (neighbor.id, self.id),
+                        )
                     # go back to IDLE, i.e. remove the neighbor form the states
                     self.sixtopStates[neighbor.id]['tx']['state'] = SIX_STATE_IDLE
                     self.sixtopStates[neighbor.id]['tx']['blockedCells'] = []
@@ -2718,17 +2792,17 @@ class Mote(object):
     def _sixtop_receive_RESPONSE_ACK(self, packet):
         with self.dataLock:
 
-            if self.sixtopStates[packet['dstIp'].id]['rx']['state'] == SIX_STATE_WAIT_ADD_RESPONSE_SENDDONE:
+            if self.sixtopStates[packet.dstIp.id]['rx']['state'] == SIX_STATE_WAIT_ADD_RESPONSE_SENDDONE:
 
-                confirmedCellList = packet['payload'][0]
-                receivedDir = packet['payload'][2]
-                neighbor = packet['dstIp']
-                code = packet['code']
-                resf = packet['payload'][4]
+                confirmedCellList = packet.payload[0]
+                receivedDir = packet.payload[2]
+                neighbor = packet.dstIp
+                code = packet.code
+                resf = packet.payload[4]
 
                 backupDuration = None
-                if self.ReSF is not None and resf is None and packet['payload'][5] is not None:
-                    backupDuration = packet['payload'][5]
+                if self.ReSF is not None and resf is None and packet.payload[5] is not None:
+                    backupDuration = packet.payload[5]
 
                 self._stats_logSixTopLatencyStat(self.engine.asn - self.tsSixTopReqRecv[neighbor])
                 self.tsSixTopReqRecv[neighbor] = 0
@@ -2739,11 +2813,12 @@ class Mote(object):
                     else:
                         for (ts, ch, cellDir) in confirmedCellList:
                             # log
-                            self._log(
-                                INFO,
-                                '[6top] add {4} cell ts={0},ch={1} from {2} to {3}',
-                                (ts, ch, self.id, neighbor.id, cellDir),
-                            )
+                            if logFlags.info:
+                                self._log(
+                                    INFO,
+                                    '[6top] add {4} cell ts={0},ch={1} from {2} to {3}',
+                                    (ts, ch, self.id, neighbor.id, cellDir),
+                                )
                         self._tsch_addCells(neighbor, confirmedCellList, backupDuration=backupDuration)
 
                         if backupDuration is not None:
@@ -2777,13 +2852,13 @@ class Mote(object):
                 # if resf is not None:
                 #     del self.ReSF.rxBlockedTuples[neighbor]
 
-            elif self.sixtopStates[packet['dstIp'].id]['rx']['state'] == SIX_STATE_WAIT_DELETE_RESPONSE_SENDDONE:
+            elif self.sixtopStates[packet.dstIp.id]['rx']['state'] == SIX_STATE_WAIT_DELETE_RESPONSE_SENDDONE:
 
-                confirmedCellList = packet['payload'][0]
-                receivedDir = packet['payload'][2]
-                neighbor = packet['dstIp']
-                code = packet['code']
-                resf = packet['payload'][4]
+                confirmedCellList = packet.payload[0]
+                receivedDir = packet.payload[2]
+                neighbor = packet.dstIp
+                code = packet.code
+                resf = packet.payload[4]
 
                 self._stats_logSixTopLatencyStat(self.engine.asn - self.tsSixTopReqRecv[neighbor])
                 self.tsSixTopReqRecv[neighbor] = 0
@@ -2794,11 +2869,12 @@ class Mote(object):
                     else:
                         for ts in confirmedCellList:
                             # log
-                            self._log(
-                                INFO,
-                                '[6top] delete {3} cell ts={0} from {1} to {2}',
-                                (ts, self.id, neighbor.id, receivedDir),
-                            )
+                            if logFlags.info:
+                                self._log(
+                                    INFO,
+                                    '[6top] delete {3} cell ts={0} from {1} to {2}',
+                                    (ts, self.id, neighbor.id, receivedDir),
+                                )
                         self._tsch_removeCells(neighbor, confirmedCellList)
 
                         # update counters
@@ -2844,35 +2920,39 @@ class Mote(object):
                     self.sixtopStates[neighbor.id]['tx']['timeout'] = timeout
 
                     if resf is not None:
-                        self._log(
-                            DEBUG,
-                            "[6top] ReSF contents of future DELETE request: {0}",
-                            (resf,),
-                        )
+                        if logFlags.debug:
+                            self._log(
+                                DEBUG,
+                                "[6top] ReSF contents of future DELETE request: {0}",
+                                (resf,),
+                            )
 
                     self._sixtop_enqueue_DELETE_REQUEST(neighbor, tsList, len(tsList), dir,
                                                         self.sixtopStates[neighbor.id]['tx']['seqNum'], resf=resf)
                 else:
-                    self._log(
-                        DEBUG,
-                        "[6top] can not send 6top DELETE request to {0} because timer still did not fire on mote {1}.",
-                        (neighbor.id, self.id),
-                    )
-                    if resf is not None:
-                        # delay it and be sure to resend it.
-                        self.ReSF._resf_delayReservation(copy.deepcopy(resf), type='delete')
+                    if logFlags.debug:
                         self._log(
                             DEBUG,
-                            "[6top] delayed ReSF delete request on mote {0}.",
-                            (self.id,),
+                            "[6top] can not send 6top DELETE request to {0} because timer still did not fire on mote {1}.",
+                            (neighbor.id, self.id),
                         )
+                    if resf is not None:
+                        # delay it and be sure to resend it.
+                        self.ReSF._resf_delayReservation(copy.deepcopy(resf), type='delete')
+                        if logFlags.debug:
+                            self._log(
+                                DEBUG,
+                                "[6top] delayed ReSF delete request on mote {0}.",
+                                (self.id,),
+                            )
             else:
                 # log
-                self._log(
-                    INFO,
-                    "[6top] remove timeslots={0} with {1}",
-                    (tsList, neighbor.id),
-                )
+                if logFlags.info:
+                    self._log(
+                        INFO,
+                        "[6top] remove timeslots={0} with {1}",
+                        (tsList, neighbor.id),
+                    )
                 self._tsch_removeCells(
                     neighbor=neighbor,
                     tsList=tsList,
@@ -2997,7 +3077,7 @@ class Mote(object):
                     scheduleListByPDR[tscell[3]] = []
                 scheduleListByPDR[tscell[3]] += [tscell]
             rssi = self.getRSSI(neighbor)
-            theoPDR = Topology.Topology.rssiToPdr(rssi)
+            theoPDR = Topology.Topology.rssiToPdr(rssi, self.settings)
             scheduleList = []
             for pdr in sorted(scheduleListByPDR.keys()):
                 if pdr < theoPDR:
@@ -3009,11 +3089,12 @@ class Mote(object):
         tsList = []
         for tscell in scheduleList[:numCellsToRemove]:
             # log
-            self._log(
-                INFO,
-                "[6top] remove cell ts={0} to {1} (pdr={2:.3f})",
-                (tscell[0], neighbor.id, tscell[3]),
-            )
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    "[6top] remove cell ts={0} to {1} (pdr={2:.3f})",
+                    (tscell[0], neighbor.id, tscell[3]),
+                )
             tsList += [tscell[0]]
 
         assert len(tsList) == numCellsToRemove
@@ -3024,30 +3105,32 @@ class Mote(object):
     def _sixtop_enqueue_DELETE_REQUEST(self, neighbor, cellList, numCells, dir, seq, resf=None):
         """ enqueue a new 6P DELETE request """
 
-        self._log(
-            INFO,
-            '[6top] enqueueing a new 6P DEL message cellList={0}, numCells={1} from {2} to {3}',
-            (cellList, numCells, self.id, neighbor.id),
-        )
-
-        if resf is not None:
+        if logFlags.info:
             self._log(
                 INFO,
-                '[6top] 6P DEL ReSF contents: {0}',
-                (resf,),
+                '[6top] enqueueing a new 6P DEL message cellList={0}, numCells={1} from {2} to {3}',
+                (cellList, numCells, self.id, neighbor.id),
             )
 
+        if resf is not None:
+            if logFlags.info:
+                self._log(
+                    INFO,
+                    '[6top] 6P DEL ReSF contents: {0}',
+                    (resf,),
+                )
+
         # create new packet
-        newPacket = {
-            'asn': self.engine.getAsn(),
-            'type': IANA_6TOP_TYPE_REQUEST,
-            'code': IANA_6TOP_CMD_DELETE,
-            'payload': [cellList, numCells, dir, seq, self.engine.getAsn(), resf],
-            'retriesLeft': TSCH_MAXTXRETRIES,
-            'srcIp': self,
-            'dstIp': neighbor,  # currently upstream
-            'sourceRoute': [],
-        }
+        newPacket = Packet.Packet(
+            asn=self.engine.getAsn(),
+            type=IANA_6TOP_TYPE_REQUEST,
+            code=IANA_6TOP_CMD_DELETE,
+            payload=[cellList, numCells, dir, seq, self.engine.getAsn(), resf],
+            retriesLeft=TSCH_MAXTXRETRIES,
+            srcIp=self,
+            dstIp=neighbor,  # currently upstream
+            sourceRoute=[],
+        )
 
         # enqueue packet in TSCH queue
         isEnqueued = self._tsch_enqueue(newPacket)
@@ -3058,11 +3141,12 @@ class Mote(object):
             self._radio_drop_packet(newPacket, 'droppedFailedEnqueue')
 
             if resf is not None:
-                self._log(
-                    INFO,
-                    '[6top] DAMN: {0}',
-                    (resf,),
-                )
+                if logFlags.info:
+                    self._log(
+                        INFO,
+                        '[6top] DAMN: {0}',
+                        (resf,),
+                    )
             if resf is not None:  # if it did not get enqueued, reschedule it
                 self.ReSF._resf_delayReservation(copy.deepcopy(resf), type='delete')
                 self.ReSF._resf_scheduleDelayedRequest(1000)
@@ -3091,13 +3175,14 @@ class Mote(object):
             if smac.id in self.sixtopStates and 'rx' in self.sixtopStates[smac.id] and self.sixtopStates[smac.id]['rx'][
                 'state'] != SIX_STATE_IDLE:
                 for pkt in self.txQueue:
-                    if pkt['type'] == IANA_6TOP_TYPE_RESPONSE and pkt['dstIp'].id == smac.id:
+                    if pkt.type == IANA_6TOP_TYPE_RESPONSE and pkt.dstIp.id == smac.id:
                         self.txQueue.remove(pkt)
-                        self._log(
-                            INFO,
-                            "[6top] removed a 6TOP_TYPE_RESPONSE packet in the queue of mote {0} to neighbor {1}, because a new TYPE_REQUEST (delete) was received.",
-                            (self.id, smac.id),
-                        )
+                        if logFlags.info:
+                            self._log(
+                                INFO,
+                                "[6top] removed a 6TOP_TYPE_RESPONSE packet in the queue of mote {0} to neighbor {1}, because a new TYPE_REQUEST (delete) was received.",
+                                (self.id, smac.id),
+                            )
                         # assert False
                 returnCode = IANA_6TOP_RC_RESET  # error, neighbor has to abort transaction
                 if smac.id not in self.sixtopStates:
@@ -3167,6 +3252,8 @@ class Mote(object):
 
     def _tsch_enqueue(self, packet):
 
+        packet = Packet.asPacket(packet)
+
         if not self._rpl_addNextHop(packet):
             # I don't have a route
 
@@ -3190,10 +3277,9 @@ class Mote(object):
             # This is because if the queues of the nodes are filled with DATA packets, new nodes won't be able to enter properly in the network. So there are exceptions.
 
             # if join is enabled, all nodes will wait until all nodes have at least 1 Tx cell. So it is allowed to enqueue 1 aditional DAO, JOIN or 6P packet
-            if packet['type'] == APP_TYPE_JOIN or packet['type'] == RPL_TYPE_DAO or packet[
-                'type'] == IANA_6TOP_TYPE_REQUEST or packet['type'] == IANA_6TOP_TYPE_RESPONSE:
+            if packet.type == APP_TYPE_JOIN or packet.type == RPL_TYPE_DAO or packet.type == IANA_6TOP_TYPE_REQUEST or packet.type == IANA_6TOP_TYPE_RESPONSE:
                 for p in self.txQueue:
-                    if packet['type'] == p['type']:
+                    if packet.type == p.type:
                         # There is already a DAO, JOIN or 6P in que queue, don't add more
                         self._stats_incrementMoteStats('droppedQueueFull')
                         return False
@@ -3213,8 +3299,34 @@ class Mote(object):
 
             return True
 
+    @contextlib.contextmanager
+    def scheduleBatch(self):
+        """
+        Change the schedule in several steps, e.g.
+            with mote.scheduleBatch():
+                mote._tsch_addCells(...)
+                mote._tsch_removeCells(...)
+        The next active cell is looked up and rescheduled once, at the end of
+        the (outermost) batch, instead of after each step.
+        """
+
+        with self.dataLock:
+            self.scheduleBatchDepth += 1
+            try:
+                yield
+            finally:
+                self.scheduleBatchDepth -= 1
+                if self.scheduleBatchDepth == 0 and self.scheduleBatchDirty:
+                    self.scheduleBatchDirty = False
+                    self._tsch_schedule_activeCell()
+
     def _tsch_schedule_activeCell(self):
 
+        if self.scheduleBatchDepth > 0:
+            # done at the end of the batch
+            self.scheduleBatchDirty = True
+            return
+
         asn = self.engine.getAsn()
         tsCurrent = asn % self.settings.slotframeLength
 
@@ -3225,19 +3337,11 @@ class Mote(object):
                 self.engine.removeEvent(uniqueTag=(self.id, '_tsch_action_activeCell'))
                 return
 
-            tsDiffMin = None
-            for (ts, cell) in self.schedule.items():
-                if ts == tsCurrent:
-                    tsDiff = self.settings.slotframeLength
-                elif ts > tsCurrent:
-                    tsDiff = ts - tsCurrent
-                elif ts < tsCurrent:
-                    tsDiff = (ts + self.settings.slotframeLength) - tsCurrent
-                else:
-                    raise SystemError()
-
-                if (not tsDiffMin) or (tsDiffMin > tsDiff):
-                    tsDiffMin = tsDiff
+            ts = self.schedule.getNextActiveTs(tsCurrent)
+            if ts > tsCurrent:
+                tsDiffMin = ts - tsCurrent
+            else:
+                tsDiffMin = (ts + self.settings.slotframeLength) - tsCurrent
 
         # schedule at that ASN
         self.engine.scheduleAtAsn(
@@ -3287,18 +3391,19 @@ class Mote(object):
                         and self.settings.resfPriority == 1 \
                         and not cell['resf']:
                     pass # do nothing if it is another cell and you have to give priority
-                    self._log(
-                        INFO,
-                        "[tsch] Passing BACKUP cell {0} because we have to give priority to ReSF cells.",
-                        (ts,),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[tsch] Passing BACKUP cell {0} because we have to give priority to ReSF cells.",
+                            (ts,),
+                        )
                 else:
                     # check whether packet to send
                     self.pktToSend = None
                     if self.txQueue:
                         for pkt in self.txQueue:
                             # send the frame if next hop matches the cell destination
-                            if pkt['nextHop'] == [cell['neighbor']]:
+                            if pkt.nextHop == [cell['neighbor']]:
                                 self.pktToSend = pkt
                                 break
 
@@ -3320,14 +3425,14 @@ class Mote(object):
 
                         # Signal to MSF that a cell to a neighbor is used
                         if self._msf_is_enabled() and not cell['resf']:
-                            self._msf_signal_cell_used(cell['neighbor'], cell['dir'], DIR_TX, pkt['type'])
+                            self._msf_signal_cell_used(cell['neighbor'], cell['dir'], DIR_TX, pkt.type)
 
                         # do not increment if it is not a resf cell
                         if not cell['resf']:
-                            cell['numTx'] += 1
+                            self.schedule.incrementNumTx(ts)
 
-                        if pkt['type'] == IANA_6TOP_TYPE_REQUEST:
-                            if pkt['code'] == IANA_6TOP_CMD_ADD:
+                        if pkt.type == IANA_6TOP_TYPE_REQUEST:
+                            if pkt.code == IANA_6TOP_CMD_ADD:
                                 self._stats_incrementMoteStats('6topTxAddReq')
 
                                 if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
@@ -3335,9 +3440,9 @@ class Mote(object):
                                 elif not self.settings.convergeFirst:
                                     self.sixtopTxAddReq += 1
 
-                                self.sixtopStates[self.pktToSend['nextHop'][0].id]['tx'][
+                                self.sixtopStates[self.pktToSend.nextHop[0].id]['tx'][
                                     'state'] = SIX_STATE_WAIT_ADDREQUEST_SENDDONE
-                            elif pkt['code'] == IANA_6TOP_CMD_DELETE:
+                            elif pkt.code == IANA_6TOP_CMD_DELETE:
                                 self._stats_incrementMoteStats('6topTxDelReq')
 
                                 if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
@@ -3345,19 +3450,19 @@ class Mote(object):
                                 elif not self.settings.convergeFirst:
                                     self.sixtopTxDelReq += 1
 
-                                self.sixtopStates[self.pktToSend['nextHop'][0].id]['tx'][
+                                self.sixtopStates[self.pktToSend.nextHop[0].id]['tx'][
                                     'state'] = SIX_STATE_WAIT_DELETEREQUEST_SENDDONE
                             else:
                                 assert False
 
-                        if pkt['type'] == RPL_TYPE_DAO:
+                        if pkt.type == RPL_TYPE_DAO:
                             if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
                                 self.activeDAO += 1
                             elif not self.settings.convergeFirst:
                                 self.activeDAO += 1
 
-                        if pkt['type'] == IANA_6TOP_TYPE_RESPONSE:
-                            if self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                        if pkt.type == IANA_6TOP_TYPE_RESPONSE:
+                            if self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                                 'state'] == SIX_STATE_REQUEST_ADD_RECEIVED:
                                 self._stats_incrementMoteStats('6topTxAddResp')
 
@@ -3366,9 +3471,9 @@ class Mote(object):
                                 elif not self.settings.convergeFirst:
                                     self.sixtopTxAddResp += 1
 
-                                self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                                self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                                     'state'] = SIX_STATE_WAIT_ADD_RESPONSE_SENDDONE
-                            elif self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                            elif self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                                 'state'] == SIX_STATE_REQUEST_DELETE_RECEIVED:
                                 self._stats_incrementMoteStats('6topTxDelResp')
 
@@ -3377,12 +3482,12 @@ class Mote(object):
                                 elif not self.settings.convergeFirst:
                                     self.sixtopTxDelResp += 1
 
-                                self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                                self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                                     'state'] = SIX_STATE_WAIT_DELETE_RESPONSE_SENDDONE
-                            elif self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                            elif self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                                 'state'] == SIX_STATE_WAIT_ADD_RESPONSE_SENDDONE:
                                 pass
-                            elif self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                            elif self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                                 'state'] == SIX_STATE_WAIT_DELETE_RESPONSE_SENDDONE:
                                 pass
                             else:
@@ -3390,14 +3495,9 @@ class Mote(object):
 
                         self.propagation.startTx(
                             channel=cell['ch'],
-                            type=self.pktToSend['type'],
-                            code=self.pktToSend['code'],
                             smac=self,
                             dmac=[cell['neighbor']],
-                            srcIp=self.pktToSend['srcIp'],
-                            dstIp=self.pktToSend['dstIp'],
-                            srcRoute=self.pktToSend['sourceRoute'],
-                            payload=self.pktToSend['payload'],
+                            packet=self.pktToSend,
                         )
 
                         # indicate that we're waiting for the TX operation to finish
@@ -3416,25 +3516,25 @@ class Mote(object):
                     if self.txQueue and self.backoffBroadcast == 0:
                         for pkt in self.txQueue:
                             # send join packets on the shared cell only on first hop
-                            if pkt['type'] == APP_TYPE_JOIN and len(
-                                    self.getTxCells(neighbor=pkt['nextHop'][0], includeReSF=True)) + len(
-                                    self.getSharedCells(neighbor=pkt['nextHop'][0])) == 0:
+                            if pkt.type == APP_TYPE_JOIN and len(
+                                    self.getTxCells(neighbor=pkt.nextHop[0], includeReSF=True)) + len(
+                                    self.getSharedCells(neighbor=pkt.nextHop[0])) == 0:
                                 self.pktToSend = pkt
                                 break
                             # send 6P messages on the shared broadcast cell only if there is no dedicated cells to that neighbor
-                            elif pkt['type'] == IANA_6TOP_TYPE_REQUEST and len(
-                                    self.getTxCells(neighbor=pkt['nextHop'][0], includeReSF=True)) + len(
-                                    self.getSharedCells(neighbor=pkt['nextHop'][0])) == 0:
+                            elif pkt.type == IANA_6TOP_TYPE_REQUEST and len(
+                                    self.getTxCells(neighbor=pkt.nextHop[0], includeReSF=True)) + len(
+                                    self.getSharedCells(neighbor=pkt.nextHop[0])) == 0:
                                 self.pktToSend = pkt
                                 break
                             # send 6P messages on the shared broadcast cell only if there is no dedicated cells to that neighbor
-                            elif pkt['type'] == IANA_6TOP_TYPE_RESPONSE and len(
-                                    self.getTxCells(neighbor=pkt['nextHop'][0], includeReSF=True)) + len(
-                                    self.getSharedCells(neighbor=pkt['nextHop'][0])) == 0:
+                            elif pkt.type == IANA_6TOP_TYPE_RESPONSE and len(
+                                    self.getTxCells(neighbor=pkt.nextHop[0], includeReSF=True)) + len(
+                                    self.getSharedCells(neighbor=pkt.nextHop[0])) == 0:
                                 self.pktToSend = pkt
                                 break
                             # DIOs and EBs always go on the shared broadcast cell
-                            elif pkt['type'] == RPL_TYPE_DIO or pkt['type'] == TSCH_TYPE_EB:
+                            elif pkt.type == RPL_TYPE_DIO or pkt.type == TSCH_TYPE_EB:
                                 self.pktToSend = pkt
                                 break
                             else:
@@ -3446,11 +3546,12 @@ class Mote(object):
                         and self.ReSF.giveReSFPriority \
                         and self.settings.resfPriority == 1 \
                         and not cell['resf']:
-                    self._log(
-                        INFO,
-                        "[tsch] Passing BACKUP cell {0} because we have to give priority to ReSF cells.",
-                        (ts,),
-                    )
+                    if logFlags.info:
+                        self._log(
+                            INFO,
+                            "[tsch] Passing BACKUP cell {0} because we have to give priority to ReSF cells.",
+                            (ts,),
+                        )
                     self.pktToSend = None
                     pass
                 else:
@@ -3460,22 +3561,22 @@ class Mote(object):
                         if self.txQueue and self.backoffPerNeigh[cell['neighbor']] == 0:
                             for pkt in self.txQueue:
                                 # send the frame if next hop matches the cell destination
-                                if pkt['nextHop'] == [cell['neighbor']]:
+                                if pkt.nextHop == [cell['neighbor']]:
                                     self.pktToSend = pkt
                                     break
 
                     if self.pktToSend is None and self.txQueue and self.backoffPerNeigh[cell['neighbor']] > 0:
                         for pkt in self.txQueue:
                             # send the frame if next hop matches the cell destination
-                            if pkt['nextHop'] == [cell['neighbor']]:
-                                self._msf_signal_cell_used(cell['neighbor'], cell['dir'], DIR_TX, pkt['type'])
+                            if pkt.nextHop == [cell['neighbor']]:
+                                self._msf_signal_cell_used(cell['neighbor'], cell['dir'], DIR_TX, pkt.type)
                                 break
 
                     # Decrement backoffPerNeigh
                     if self.backoffPerNeigh[cell['neighbor']] > 0:
                         self.backoffPerNeigh[cell['neighbor']] -= 1
 
-                # if self.pktToSend is not None and self.pktToSend['type'] == RPL_TYPE_DIO:
+                # if self.pktToSend is not None and self.pktToSend.type == RPL_TYPE_DIO:
                 #     self._log(
                 #         INFO,
                 #         "[DIO] send DIO",
@@ -3485,14 +3586,14 @@ class Mote(object):
                 if self.pktToSend:
 
                     if not cell['resf']:
-                        cell['numTx'] += 1
+                        self.schedule.incrementNumTx(ts)
 
                     # Signal to MSF that a cell to a neighbor is used
                     if self._msf_is_enabled() and not cell['resf']:
-                        self._msf_signal_cell_used(cell['neighbor'], cell['dir'], DIR_TX, pkt['type'])
+                        self._msf_signal_cell_used(cell['neighbor'], cell['dir'], DIR_TX, pkt.type)
 
-                    if pkt['type'] == IANA_6TOP_TYPE_REQUEST:
-                        if pkt['code'] == IANA_6TOP_CMD_ADD:
+                    if pkt.type == IANA_6TOP_TYPE_REQUEST:
+                        if pkt.code == IANA_6TOP_CMD_ADD:
                             self._stats_incrementMoteStats('6topTxAddReq')
 
                             if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
@@ -3500,9 +3601,9 @@ class Mote(object):
                             elif not self.settings.convergeFirst:
                                 self.sixtopTxAddReq += 1
 
-                            self.sixtopStates[self.pktToSend['nextHop'][0].id]['tx'][
+                            self.sixtopStates[self.pktToSend.nextHop[0].id]['tx'][
                                 'state'] = SIX_STATE_WAIT_ADDREQUEST_SENDDONE
-                        elif pkt['code'] == IANA_6TOP_CMD_DELETE:
+                        elif pkt.code == IANA_6TOP_CMD_DELETE:
                             self._stats_incrementMoteStats('6topTxDelReq')
 
                             if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
@@ -3510,18 +3611,18 @@ class Mote(object):
                             elif not self.settings.convergeFirst:
                                 self.sixtopTxDelReq += 1
 
-                            self.sixtopStates[self.pktToSend['nextHop'][0].id]['tx'][
+                            self.sixtopStates[self.pktToSend.nextHop[0].id]['tx'][
                                 'state'] = SIX_STATE_WAIT_DELETEREQUEST_SENDDONE
                         else:
                             assert False
 
-                    if pkt['type'] == IANA_6TOP_TYPE_RESPONSE:
-                        # if 'state' not in self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx']:
+                    if pkt.type == IANA_6TOP_TYPE_RESPONSE:
+                        # if 'state' not in self.sixtopStates[self.pktToSend.nextHop[0].id]['rx']:
                         #     print self.id
-                        #     print self.pktToSend['nextHop'][0].id
-                        #     print self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx']
+                        #     print self.pktToSend.nextHop[0].id
+                        #     print self.sixtopStates[self.pktToSend.nextHop[0].id]['rx']
                         #     print self.sixtopStates
-                        if self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx']['state'] == SIX_STATE_REQUEST_ADD_RECEIVED:
+                        if self.sixtopStates[self.pktToSend.nextHop[0].id]['rx']['state'] == SIX_STATE_REQUEST_ADD_RECEIVED:
                             self._stats_incrementMoteStats('6topTxAddResp')
 
                             if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
@@ -3529,9 +3630,9 @@ class Mote(object):
                             elif not self.settings.convergeFirst:
                                 self.sixtopTxAddResp += 1
 
-                            self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                            self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                                 'state'] = SIX_STATE_WAIT_ADD_RESPONSE_SENDDONE
-                        elif self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                        elif self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                             'state'] == SIX_STATE_REQUEST_DELETE_RECEIVED:
                             self._stats_incrementMoteStats('6topTxDelResp')
 
@@ -3540,18 +3641,18 @@ class Mote(object):
                             elif not self.settings.convergeFirst:
                                 self.sixtopTxDelResp += 1
 
-                            self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                            self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                                 'state'] = SIX_STATE_WAIT_DELETE_RESPONSE_SENDDONE
-                        elif self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                        elif self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                             'state'] == SIX_STATE_WAIT_ADD_RESPONSE_SENDDONE:
                             pass
-                        elif self.sixtopStates[self.pktToSend['nextHop'][0].id]['rx'][
+                        elif self.sixtopStates[self.pktToSend.nextHop[0].id]['rx'][
                             'state'] == SIX_STATE_WAIT_DELETE_RESPONSE_SENDDONE:
                             pass
                         else:
                             assert False
 
-                    if pkt['type'] == RPL_TYPE_DAO:
+                    if pkt.type == RPL_TYPE_DAO:
                         if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
                             self.activeDAO += 1
                         elif not self.settings.convergeFirst:
@@ -3559,14 +3660,9 @@ class Mote(object):
 
                     self.propagation.startTx(
                         channel=cell['ch'],
-                        type=self.pktToSend['type'],
-                        code=self.pktToSend['code'],
                         smac=self,
-                        dmac=self.pktToSend['nextHop'],
-                        srcIp=self.pktToSend['srcIp'],
-                        dstIp=self.pktToSend['dstIp'],
-                        srcRoute=self.pktToSend['sourceRoute'],
-                        payload=self.pktToSend['payload'],
+                        dmac=self.pktToSend.nextHop,
+                        packet=self.pktToSend,
                     )
                     # indicate that we're waiting for the TX operation to finish
                     self.waitingFor = DIR_TX
@@ -3583,6 +3679,30 @@ class Mote(object):
             # schedule next active cell
             self._tsch_schedule_activeCell()
 
+    def _tsch_newCell(self, ch, dir, neighbor, resf=False, resfUniqueId=None, backupDuration=None):
+        """ returns a new cell, not used yet """
+
+        return {
+            'ch': ch,
+            'dir': dir,
+            'neighbor': neighbor,
+            'numTx': 0,
+            'numTxAck': 0,
+            'numRx': 0,
+            'history': collections.deque(maxlen=NUM_MAX_HISTORY),  # 1 (ACKed) or 0, for the last tx
+            'sharedCellSuccess': 0,  # indicator of success for shared cells
+            'sharedCellCollision': 0,  # indicator of a collision for shared cells
+            'rxDetectedCollision': False,
+            'debug_canbeInterfered': 0,
+        # [debug] number of tx in a schedule collision that can be interfered with minRssi or larger level
+            'debug_interference': 0,  # [debug] number of tx with an interference packet with minRssi or larger level
+            'debug_lockInterference': 0,  # [debug] number of tx of which the receiver locked on the interference packet
+            'debug_cellCreatedAsn': self.engine.getAsn(),  # [debug]
+            'resf': resf,
+            'resf_unique_id': resfUniqueId,
+            'backupDuration': backupDuration,
+        }
+
     def _tsch_addCells(self, neighbor, cellList, resf=False, resfUniqueId=None, backupDuration=None):
         """ adds cell(s) to the schedule """
 
@@ -3610,26 +3730,7 @@ class Mote(object):
                     #         (cell[0], cell[1], cell[2], neighbor.id if not type(neighbor) == list else self.BROADCAST_ADDRESS),
                     #     )
                 assert cell[0] not in self.schedule.keys()
-                self.schedule[cell[0]] = {
-                    'ch': cell[1],
-                    'dir': cell[2],
-                    'neighbor': neighbor,
-                    'numTx': 0,
-                    'numTxAck': 0,
-                    'numRx': 0,
-                    'history': [],
-                    'sharedCellSuccess': 0,  # indicator of success for shared cells
-                    'sharedCellCollision': 0,  # indicator of a collision for shared cells
-                    'rxDetectedCollision': False,
-                    'debug_canbeInterfered': [],
-                # [debug] shows schedule collision that can be interfered with minRssi or larger level
-                    'debug_interference': [],  # [debug] shows an interference packet with minRssi or larger level
-                    'debug_lockInterference': [],  # [debug] shows locking on the interference packet
-                    'debug_cellCreatedAsn': self.engine.getAsn(),  # [debug]
-                    'resf': resf,
-                    'resf_unique_id': resfUniqueId,
-                    'backupDuration': backupDuration,
-                }
+                self.schedule[cell[0]] = self._tsch_newCell(cell[1], cell[2], neighbor, resf, resfUniqueId, backupDuration)
                 # log
                 # self._log(
                 #     INFO,
@@ -3645,11 +3746,12 @@ class Mote(object):
             for cell in tsList:
                 assert type(cell) == int
                 # log
-                self._log(
-                    INFO,
-                    "[tsch] remove cell=({0}) with {1}",
-                    (cell, neighbor.id if not type(neighbor) == list else BROADCAST_ADDRESS),
-                )
+                if logFlags.info:
+                    self._log(
+                        INFO,
+                        "[tsch] remove cell=({0}) with {1}",
+                        (cell, neighbor.id if not type(neighbor) == list else BROADCAST_ADDRESS),
+                    )
 
                 assert cell in self.schedule.keys()
                 assert self.schedule[cell]['neighbor'] == neighbor
@@ -3672,7 +3774,7 @@ class Mote(object):
 
         with self.dataLock:
             for c in range(0, self.settings.nrMinimalCells):
-                self.schedule[c]['neighbor'] = self._myNeighbors()
+                self.schedule.setNeighbor(c, self._myNeighbors())
                 # log
                 # self._log(
                 #     INFO,
@@ -3712,21 +3814,20 @@ class Mote(object):
         # self._tsch_addCells(self._myNeighbors(), [(0, 0, DIR_TXRX_SHARED)])
         # self._tsch_addCells(self._myNeighbors(), [(40, 8, DIR_TXRX_SHARED)])
         # self._tsch_addCells(self._myNeighbors(), [(80, 15, DIR_TXRX_SHARED)])
-        for c in range(0, self.settings.nrMinimalCells):
-            self._tsch_addCells(self._myNeighbors(), [(c, c, DIR_TXRX_SHARED)])
+        with self.scheduleBatch():
+            for c in range(0, self.settings.nrMinimalCells):
+                self._tsch_addCells(self._myNeighbors(), [(c, c, DIR_TXRX_SHARED)])
 
     # ===== radio
 
     def _radio_drop_packet(self, pkt, reason):
         # remove all the element of pkt so that it won't be processed further
-        for k in pkt.keys():
-            del pkt[k]
-        if reason in self.motestats:
+        pkt.clear()
+        if reason in self.moteCounters.index:
             self._stats_incrementMoteStats(reason)
 
     def radio_isSync(self):
-        with self.dataLock:
-            return self.isSync
+        return self.isSync
 
     def radio_txDone(self, isACKed, isNACKed):
         """end of tx slot"""
@@ -3741,44 +3842,44 @@ class Mote(object):
             assert self.waitingFor == DIR_TX
 
             # for debug
-            ch = self.schedule[ts]['ch']
-            rx = self.schedule[ts]['neighbor']
-            canbeInterfered = 0
-            for mote in self.engine.motes:
-                if mote == self:
-                    continue
-                if ts in mote.schedule and ch == mote.schedule[ts]['ch'] and mote.schedule[ts]['dir'] == DIR_TX:
+            if self.debugStats:
+                ch = self.schedule[ts]['ch']
+                rx = self.schedule[ts]['neighbor']
+                canbeInterfered = 0
+                for (mote, _) in self.engine.txOccupancy.getCells(ts, ch):
+                    if mote == self:
+                        continue
                     if mote.id == rx.id or mote.getRSSI(rx) > rx.minRssi:
                         canbeInterfered = 1
-            self.schedule[ts]['debug_canbeInterfered'] += [canbeInterfered]
+                self.schedule[ts]['debug_canbeInterfered'] += canbeInterfered
 
             if isACKed:
                 # ACK received
                 self._logChargeConsumed(CHARGE_TxDataRxAck_uC)
                 if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
                     self.nrTxDataRxAck += 1
-                    # if self.pktToSend['type'] != APP_TYPE_DATA:
+                    # if self.pktToSend.type != APP_TYPE_DATA:
                     #     assert False
                     # if self.id == 0:
-                    #     print self.pktToSend['type']
+                    #     print self.pktToSend.type
                     #     assert False
 
-                    # if self.id == 1 and self.pktToSend['type'] == APP_TYPE_DATA:
+                    # if self.id == 1 and self.pktToSend.type == APP_TYPE_DATA:
                     #     self.datapkts += 1
                     #     print 'data'
                     #     print self.datapkts
                     #     print self.requestspkts
                     #     print self.responsespkts
-                    # elif self.id == 1 and self.pktToSend['type'] == IANA_6TOP_TYPE_REQUEST:
+                    # elif self.id == 1 and self.pktToSend.type == IANA_6TOP_TYPE_REQUEST:
                     #     self.requestspkts += 1
                     #     print 'requests'
                     #     print self.requestspkts
-                    # elif self.id == 1 and self.pktToSend['type'] == IANA_6TOP_TYPE_RESPONSE:
+                    # elif self.id == 1 and self.pktToSend.type == IANA_6TOP_TYPE_RESPONSE:
                     #     self.responsespkts += 1
                     #     print 'responses'
                     #     print self.responsespkts
                     # elif self.id == 1:
-                    #     self.othertypes.append(self.pktToSend['type'])
+                    #     self.othertypes.append(self.pktToSend.type)
                     #     print self.othertypes
                 elif not self.settings.convergeFirst:
                     self.nrTxDataRxAck += 1
@@ -3788,66 +3889,68 @@ class Mote(object):
                     self.schedule[ts]['numTxAck'] += 1
 
                 # update history
-                self.schedule[ts]['history'] += [1]
+                self.schedule[ts]['history'].append(1)
 
                 # update queue stats
-                self._stats_logQueueDelay(asn - self.pktToSend['asn'])
+                self._stats_logQueueDelay(asn - self.pktToSend.asn)
 
                 # time correction
                 if self.schedule[ts]['neighbor'] == self.preferredParent:
                     self.timeCorrectedSlot = asn
 
                 # received an ACK for the request, change state and increase the sequence number
-                if self.pktToSend['type'] == IANA_6TOP_TYPE_REQUEST:
-                    if self.pktToSend['code'] == IANA_6TOP_CMD_ADD:
+                if self.pktToSend.type == IANA_6TOP_TYPE_REQUEST:
+                    if self.pktToSend.code == IANA_6TOP_CMD_ADD:
 
-                        assert self.sixtopStates[self.pktToSend['dstIp'].id]['tx'][
+                        assert self.sixtopStates[self.pktToSend.dstIp.id]['tx'][
                                    'state'] == SIX_STATE_WAIT_ADDREQUEST_SENDDONE
-                        self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['state'] = SIX_STATE_WAIT_ADDRESPONSE
+                        self.sixtopStates[self.pktToSend.dstIp.id]['tx']['state'] = SIX_STATE_WAIT_ADDRESPONSE
 
                         # calculate the asn at which it should fire
                         fireASN = int(self.engine.getAsn() + (
-                                float(self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timeout']) / float(
+                                float(self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timeout']) / float(
                             self.settings.slotDuration)))
-                        uniqueTag = '_sixtop_timer_fired_dest_%s' % self.pktToSend['dstIp'].id
+                        uniqueTag = '_sixtop_timer_fired_dest_%s' % self.pktToSend.dstIp.id
                         self.engine.scheduleAtAsn(
                             asn=fireASN,
                             cb=self._sixtop_timer_fired,
                             uniqueTag=(self.id, uniqueTag),
                             priority=5,
                         )
-                        self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timer'] = {}
-                        self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timer']['tag'] = (self.id, uniqueTag)
-                        self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timer']['asn'] = fireASN
-                        self._log(
-                            DEBUG,
-                            "[6top] activated a timer for mote {0} to neighbor {1} on asn {2} with tag {3} ( timeout {4} )",
-                            (self.id, self.pktToSend['dstIp'].id, fireASN, str((self.id, uniqueTag)), float(self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timeout'])),
-                        )
-                    elif self.pktToSend['code'] == IANA_6TOP_CMD_DELETE:
-                        assert self.sixtopStates[self.pktToSend['dstIp'].id]['tx'][
+                        self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timer'] = {}
+                        self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timer']['tag'] = (self.id, uniqueTag)
+                        self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timer']['asn'] = fireASN
+                        if logFlags.debug:
+                            self._log(
+                                DEBUG,
+                                "[6top] activated a timer for mote {0} to neighbor {1} on asn {2} with tag {3} ( timeout {4} )",
+                                (self.id, self.pktToSend.dstIp.id, fireASN, str((self.id, uniqueTag)), float(self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timeout'])),
+                            )
+                    elif self.pktToSend.code == IANA_6TOP_CMD_DELETE:
+                        assert self.sixtopStates[self.pktToSend.dstIp.id]['tx'][
                                    'state'] == SIX_STATE_WAIT_DELETEREQUEST_SENDDONE
-                        self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['state'] = SIX_STATE_WAIT_DELETERESPONSE
+                        self.sixtopStates[self.pktToSend.dstIp.id]['tx']['state'] = SIX_STATE_WAIT_DELETERESPONSE
 
                         # calculate the asn at which it should fire
                         fireASN = int(self.engine.getAsn() + (
-                                    float(self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timeout']) / float(
+                                    float(self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timeout']) / float(
                                 self.settings.slotDuration)))
-                        uniqueTag = '_sixtop_timer_fired_dest_%s' % self.pktToSend['dstIp'].id
+                        uniqueTag = '_sixtop_timer_fired_dest_%s' % self.pktToSend.dstIp.id
                         self.engine.scheduleAtAsn(
                             asn=fireASN,
                             cb=self._sixtop_timer_fired,
                             uniqueTag=(self.id, uniqueTag),
                             priority=5,
                         )
-                        self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timer'] = {}
-                        self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timer']['tag'] = (self.id, uniqueTag)
-                        self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['timer']['asn'] = fireASN
-                        self._log(
-                            DEBUG,
-                            "[6top] activated a timer for mote {0} to neighbor {1} on asn {2} with tag {3}",
-                            (self.id, self.pktToSend['dstIp'].id, fireASN, str((self.id, uniqueTag))),
-                        )
+                        self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timer'] = {}
+                        self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timer']['tag'] = (self.id, uniqueTag)
+                        self.sixtopStates[self.pktToSend.dstIp.id]['tx']['timer']['asn'] = fireASN
+                        if logFlags.debug:
+                            self._log(
+                                DEBUG,
+                                "[6top] activated a timer for mote {0} to neighbor {1} on asn {2} with tag {3}",
+                                (self.id, self.pktToSend.dstIp.id, fireASN, str((self.id, uniqueTag))),
+                            )
                     else:
                         assert False
 
@@ -3856,15 +3959,15 @@ class Mote(object):
                 tmpNeighbor = self.schedule[ts]['neighbor']
                 tmpDir = self.schedule[ts]['dir']
 
-                if self.pktToSend[
-                    'type'] == IANA_6TOP_TYPE_RESPONSE:  # received an ACK for the response, handle the schedule
+                if self.pktToSend.type == IANA_6TOP_TYPE_RESPONSE:  # received an ACK for the response, handle the schedule
                     self._sixtop_receive_RESPONSE_ACK(self.pktToSend)
 
-                if self.pktToSend[ 'type'] == APP_TYPE_DATA:  #
-                    self._log(
-                        DEBUG,
-                        "[tsch] Successfully sent DATA packet",
-                    )
+                if self.pktToSend.type == APP_TYPE_DATA:  #
+                    if logFlags.debug:
+                        self._log(
+                            DEBUG,
+                            "[tsch] Successfully sent DATA packet",
+                        )
 
                 # remove packet from queue
                 self.txQueue.remove(self.pktToSend)
@@ -3880,7 +3983,7 @@ class Mote(object):
                 self._logChargeConsumed(CHARGE_TxDataRxAck_uC)
                 if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
                     self.nrTxDataRxAck += 1
-                    # if self.pktToSend['type'] != APP_TYPE_DATA:
+                    # if self.pktToSend.type != APP_TYPE_DATA:
                     #     assert False
                 elif not self.settings.convergeFirst:
                     self.nrTxDataRxAck += 1
@@ -3896,30 +3999,31 @@ class Mote(object):
                     self.schedule[ts]['numTxAck'] += 1
 
                 # update history
-                self.schedule[ts]['history'] += [1]
+                self.schedule[ts]['history'].append(1)
 
                 # time correction
                 if self.schedule[ts]['neighbor'] == self.preferredParent:
                     self.timeCorrectedSlot = asn
 
-                if self.pktToSend['type'] == APP_TYPE_DATA:  #
-                    self._log(
-                        DEBUG,
-                        "[tsch] UNsuccessfully sent DATA packet (NACK)",
-                    )
+                if self.pktToSend.type == APP_TYPE_DATA:  #
+                    if logFlags.debug:
+                        self._log(
+                            DEBUG,
+                            "[tsch] UNsuccessfully sent DATA packet (NACK)",
+                        )
 
                 # decrement 'retriesLeft' counter associated with that packet
                 i = self.txQueue.index(self.pktToSend)
-                if self.txQueue[i]['retriesLeft'] > 0:
-                    self.txQueue[i]['retriesLeft'] -= 1
+                if self.txQueue[i].retriesLeft > 0:
+                    self.txQueue[i].retriesLeft -= 1
 
                 # drop packet if retried too many time
-                if self.txQueue[i]['retriesLeft'] == 0:
+                if self.txQueue[i].retriesLeft == 0:
                     if len(self.txQueue) == TSCH_QUEUE_SIZE:
 
                         # only count drops of DATA packets that are part of the experiment
-                        if self.pktToSend['type'] == APP_TYPE_DATA:
-                            if self.settings.convergeFirst and self.pktToSend['payload'][
+                        if self.pktToSend.type == APP_TYPE_DATA:
+                            if self.settings.convergeFirst and self.pktToSend.payload[
                                 1] >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
                                 self.pktDropMac += 1
                             elif not self.settings.convergeFirst:
@@ -3935,70 +4039,72 @@ class Mote(object):
                         # reset state for this neighbor
                         # go back to IDLE, i.e. remove the neighbor form the states
                         # but, in the case of a response msg, if the node received another, already new request, from the same node (because its timer fired), do not go to IDLE
-                        if self.pktToSend['type'] == IANA_6TOP_TYPE_REQUEST:
-                            self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['state'] = SIX_STATE_IDLE
-                            self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['blockedCells'] = []
-                            if self.ReSF is not None and len(self.pktToSend['payload']) > 5 and \
-                                    self.pktToSend['payload'][5] is not None:  # index 5 for a request
-                                if self.pktToSend['dstIp'] in self.ReSF.txBlockedTuples:
-                                    del self.ReSF.txBlockedTuples[self.pktToSend['dstIp']]
-                                    self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend['payload'][5]),
+                        if self.pktToSend.type == IANA_6TOP_TYPE_REQUEST:
+                            self.sixtopStates[self.pktToSend.dstIp.id]['tx']['state'] = SIX_STATE_IDLE
+                            self.sixtopStates[self.pktToSend.dstIp.id]['tx']['blockedCells'] = []
+                            if self.ReSF is not None and len(self.pktToSend.payload) > 5 and \
+                                    self.pktToSend.payload[5] is not None:  # index 5 for a request
+                                if self.pktToSend.dstIp in self.ReSF.txBlockedTuples:
+                                    del self.ReSF.txBlockedTuples[self.pktToSend.dstIp]
+                                    self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend.payload[5]),
                                                                      type='add')
-                                elif self.pktToSend['dstIp'] in self.ReSF.txDeleteTuples:
-                                    del self.ReSF.txDeleteTuples[self.pktToSend['dstIp']]
-                                    self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend['payload'][5]),
+                                elif self.pktToSend.dstIp in self.ReSF.txDeleteTuples:
+                                    del self.ReSF.txDeleteTuples[self.pktToSend.dstIp]
+                                    self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend.payload[5]),
                                                                      type='delete', cause='badlink')
-                                    self._log(
-                                        DEBUG,
-                                        "[6top] possibly delaying a ReSF DELETE on mote {0}, because of NACK (queue maxed out).",
-                                        (self.id, ),
-                                    )
+                                    if logFlags.debug:
+                                        self._log(
+                                            DEBUG,
+                                            "[6top] possibly delaying a ReSF DELETE on mote {0}, because of NACK (queue maxed out).",
+                                            (self.id, ),
+                                        )
                                 else:
                                     assert False
                                 self.ReSF._resf_scheduleDelayedRequest()
-                        elif self.pktToSend['type'] == IANA_6TOP_TYPE_RESPONSE:
-                            self.sixtopStates[self.pktToSend['dstIp'].id]['rx']['state'] = SIX_STATE_IDLE
-                            self.sixtopStates[self.pktToSend['dstIp'].id]['rx']['blockedCells'] = []
-                            if self.ReSF is not None and len(self.pktToSend['payload']) > 4 and \
-                                    self.pktToSend['payload'][4] is not None:  # index 4 for a request
-                                if self.pktToSend['dstIp'] in self.ReSF.rxBlockedTuples: # check this b/c it is possible it is a delete response
-                                    del self.ReSF.rxBlockedTuples[self.pktToSend['dstIp']]
+                        elif self.pktToSend.type == IANA_6TOP_TYPE_RESPONSE:
+                            self.sixtopStates[self.pktToSend.dstIp.id]['rx']['state'] = SIX_STATE_IDLE
+                            self.sixtopStates[self.pktToSend.dstIp.id]['rx']['blockedCells'] = []
+                            if self.ReSF is not None and len(self.pktToSend.payload) > 4 and \
+                                    self.pktToSend.payload[4] is not None:  # index 4 for a request
+                                if self.pktToSend.dstIp in self.ReSF.rxBlockedTuples: # check this b/c it is possible it is a delete response
+                                    del self.ReSF.rxBlockedTuples[self.pktToSend.dstIp]
                     else:
-                        if self.pktToSend['type'] != APP_TYPE_DATA:
+                        if self.pktToSend.type != APP_TYPE_DATA:
                             # update mote stats
                             self._stats_incrementMoteStats('droppedMacRetries')
 
                             # remove packet from queue
                             self.txQueue.remove(self.pktToSend)
 
-                            if self.pktToSend['type'] == IANA_6TOP_TYPE_REQUEST:
-                                self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['state'] = SIX_STATE_IDLE
-                                self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['blockedCells'] = []
-                                if self.ReSF is not None and len(self.pktToSend['payload']) > 5 and \
-                                        self.pktToSend['payload'][5] is not None:  # index 5 for a request
-                                    if self.pktToSend['dstIp'] in self.ReSF.txBlockedTuples:
-                                        del self.ReSF.txBlockedTuples[self.pktToSend['dstIp']]
-                                        self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend['payload'][5]),
+                            if self.pktToSend.type == IANA_6TOP_TYPE_REQUEST:
+                                self.sixtopStates[self.pktToSend.dstIp.id]['tx']['state'] = SIX_STATE_IDLE
+                                self.sixtopStates[self.pktToSend.dstIp.id]['tx']['blockedCells'] = []
+                                if self.ReSF is not None and len(self.pktToSend.payload) > 5 and \
+                                        self.pktToSend.payload[5] is not None:  # index 5 for a request
+                                    if self.pktToSend.dstIp in self.ReSF.txBlockedTuples:
+                                        del self.ReSF.txBlockedTuples[self.pktToSend.dstIp]
+                                        self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend.payload[5]),
                                                                          type='add')
-                                    elif self.pktToSend['dstIp'] in self.ReSF.txDeleteTuples:
-                                        del self.ReSF.txDeleteTuples[self.pktToSend['dstIp']]
-                                        self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend['payload'][5]),
+                                    elif self.pktToSend.dstIp in self.ReSF.txDeleteTuples:
+                                        del self.ReSF.txDeleteTuples[self.pktToSend.dstIp]
+                                        self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend.payload[5]),
                                                                          type='delete', cause='badlink')
-                                        self._log(
-                                            DEBUG,
-                                            "[6top] possibly delaying a ReSF DELETE on mote {0}, because of NACK.",
-                                            (self.id,),
-                                        )
+                                        if logFlags.debug:
+                                            self._log(
+                                                DEBUG,
+                                                "[6top] possibly delaying a ReSF DELETE on mote {0}, because of NACK.",
+                                                (self.id,),
+                                            )
                                     else:
                                         assert False
                                     self.ReSF._resf_scheduleDelayedRequest()
-                            elif self.pktToSend['type'] == IANA_6TOP_TYPE_RESPONSE:
-                                self.sixtopStates[self.pktToSend['dstIp'].id]['rx']['state'] = SIX_STATE_IDLE
-                                self.sixtopStates[self.pktToSend['dstIp'].id]['rx']['blockedCells'] = []
-                                if self.ReSF is not None and len(self.pktToSend['payload']) > 4 and \
-                                        self.pktToSend['payload'][4] is not None:  # index 4 for a request
-                                    if self.pktToSend['dstIp'] in self.ReSF.rxBlockedTuples:  # check this b/c it is possible it is a delete response
-                                        del self.ReSF.rxBlockedTuples[self.pktToSend['dstIp']]
+                            elif self.pktToSend.type == IANA_6TOP_TYPE_RESPONSE:
+                                self.sixtopStates[self.pktToSend.dstIp.id]['rx']['state'] = SIX_STATE_IDLE
+                                self.sixtopStates[self.pktToSend.dstIp.id]['rx']['blockedCells'] = []
+                                if self.ReSF is not None and len(self.pktToSend.payload) > 4 and \
+                                        self.pktToSend.payload[4] is not None:  # index 4 for a request
+                                    if self.pktToSend.dstIp in self.ReSF.rxBlockedTuples:  # check this b/c it is possible it is a delete response
+                                        del self.ReSF.rxBlockedTuples[self.pktToSend.dstIp]
 
                 # reset backoff in case of shared slot or in case of a tx slot when the queue is empty
                 if self.schedule[ts]['dir'] == DIR_TXRX_SHARED or (
@@ -4008,15 +4114,15 @@ class Mote(object):
                         self._tsch_resetBackoffPerNeigh(self.schedule[ts]['neighbor'])
                     else:
                         self._tsch_resetBroadcastBackoff()
-            elif self.pktToSend['dstIp'] == BROADCAST_ADDRESS:
+            elif self.pktToSend.dstIp == BROADCAST_ADDRESS:
                 # broadcast packet is not acked, remove from queue and update stats
                 self._logChargeConsumed(CHARGE_TxData_uC)
                 if self.settings.convergeFirst and self.engine.asn >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
                     self.nrTxData += 1
                     # if self.id == 1:
                     #     print 'sending a txdata from node 1'
-                    #     print self.pktToSend['type']
-                    # self.broadcastpackets.append(self.pktToSend['type'])
+                    #     print self.pktToSend.type
+                    # self.broadcastpackets.append(self.pktToSend.type)
                     # print self.id
                     # print self.broadcastpackets
                 elif not self.settings.convergeFirst:
@@ -4046,27 +4152,28 @@ class Mote(object):
                                                                                                  self.schedule[ts][
                                                                                                      'neighbor']] - 1)
 
-                if self.pktToSend[ 'type'] == APP_TYPE_DATA:  #
-                    self._log(
-                        DEBUG,
-                        "[tsch] UNsuccessfully sent DATA packet (NO RESPONSE)",
-                    )
+                if self.pktToSend.type == APP_TYPE_DATA:  #
+                    if logFlags.debug:
+                        self._log(
+                            DEBUG,
+                            "[tsch] UNsuccessfully sent DATA packet (NO RESPONSE)",
+                        )
 
                 # update history
-                self.schedule[ts]['history'] += [0]
+                self.schedule[ts]['history'].append(0)
 
                 # decrement 'retriesLeft' counter associated with that packet
                 i = self.txQueue.index(self.pktToSend)
-                if self.txQueue[i]['retriesLeft'] > 0:
-                    self.txQueue[i]['retriesLeft'] -= 1
+                if self.txQueue[i].retriesLeft > 0:
+                    self.txQueue[i].retriesLeft -= 1
 
                 # drop packet if retried too many time
-                if self.txQueue[i]['retriesLeft'] == 0:
+                if self.txQueue[i].retriesLeft == 0:
                     if len(self.txQueue) == TSCH_QUEUE_SIZE:
 
                         # counts drops of DATA packets
-                        if self.pktToSend['type'] == APP_TYPE_DATA:
-                            if self.settings.convergeFirst and self.pktToSend['payload'][
+                        if self.pktToSend.type == APP_TYPE_DATA:
+                            if self.settings.convergeFirst and self.pktToSend.payload[
                                 1] >= self.engine.asnInitExperiment and self.engine.asn <= self.engine.asnEndExperiment:
                                 self.pktDropMac += 1
                             elif not self.settings.convergeFirst:
@@ -4081,37 +4188,37 @@ class Mote(object):
 
                         # reset state for this neighbor
                         # go back to IDLE, i.e. remove the neighbor form the states
-                        if self.pktToSend['type'] == IANA_6TOP_TYPE_REQUEST:
-                            self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['state'] = SIX_STATE_IDLE
-                            self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['blockedCells'] = []
-                            if self.ReSF is not None and len(self.pktToSend['payload']) > 5 and \
-                                    self.pktToSend['payload'][5] is not None:  # index 5 for a request
-                                if self.pktToSend['dstIp'] in self.ReSF.txBlockedTuples:
-                                    del self.ReSF.txBlockedTuples[self.pktToSend['dstIp']]
-                                    self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend['payload'][5]),
+                        if self.pktToSend.type == IANA_6TOP_TYPE_REQUEST:
+                            self.sixtopStates[self.pktToSend.dstIp.id]['tx']['state'] = SIX_STATE_IDLE
+                            self.sixtopStates[self.pktToSend.dstIp.id]['tx']['blockedCells'] = []
+                            if self.ReSF is not None and len(self.pktToSend.payload) > 5 and \
+                                    self.pktToSend.payload[5] is not None:  # index 5 for a request
+                                if self.pktToSend.dstIp in self.ReSF.txBlockedTuples:
+                                    del self.ReSF.txBlockedTuples[self.pktToSend.dstIp]
+                                    self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend.payload[5]),
                                                                      type='add')
-                                elif self.pktToSend['dstIp'] in self.ReSF.txDeleteTuples:
-                                    del self.ReSF.txDeleteTuples[self.pktToSend['dstIp']]
-                                    self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend['payload'][5]),
+                                elif self.pktToSend.dstIp in self.ReSF.txDeleteTuples:
+                                    del self.ReSF.txDeleteTuples[self.pktToSend.dstIp]
+                                    self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend.payload[5]),
                                                                      type='delete', cause='badlink')
-                                    self._log(
-                                        DEBUG,
-                                        "[6top] possibly delaying a ReSF DELETE on mote {0}, because of no ACK (queue maxed out).",
-                                        (self.id,),
-                                    )
+                                    if logFlags.debug:
+                                        self._log(
+                                            DEBUG,
+                                            "[6top] possibly delaying a ReSF DELETE on mote {0}, because of no ACK (queue maxed out).",
+                                            (self.id,),
+                                        )
                                 else:
                                     assert False
                                 self.ReSF._resf_scheduleDelayedRequest()
-                        elif self.pktToSend['type'] == IANA_6TOP_TYPE_RESPONSE:
-                            self.sixtopStates[self.pktToSend['dstIp'].id]['rx']['state'] = SIX_STATE_IDLE
-                            self.sixtopStates[self.pktToSend['dstIp'].id]['rx']['blockedCells'] = []
-                            if self.ReSF is not None and len(self.pktToSend['payload']) > 4 and \
-                                    self.pktToSend['payload'][4] is not None:  # index 4 for a request
-                                if self.pktToSend[
-                                    'dstIp'] in self.ReSF.rxBlockedTuples:  # check this b/c it is possible it is a delete response
-                                    del self.ReSF.rxBlockedTuples[self.pktToSend['dstIp']]
+                        elif self.pktToSend.type == IANA_6TOP_TYPE_RESPONSE:
+                            self.sixtopStates[self.pktToSend.dstIp.id]['rx']['state'] = SIX_STATE_IDLE
+                            self.sixtopStates[self.pktToSend.dstIp.id]['rx']['blockedCells'] = []
+                            if self.ReSF is not None and len(self.pktToSend.payload) > 4 and \
+                                    self.pktToSend.payload[4] is not None:  # index 4 for a request
+                                if self.pktToSend.dstIp in self.ReSF.rxBlockedTuples:  # check this b/c it is possible it is a delete response
+                                    del self.ReSF.rxBlockedTuples[self.pktToSend.dstIp]
                     else:
-                        if self.pktToSend['type'] != APP_TYPE_DATA:
+                        if self.pktToSend.type != APP_TYPE_DATA:
 
                             # update mote stats
                             self._stats_incrementMoteStats('droppedMacRetries')
@@ -4119,35 +4226,35 @@ class Mote(object):
                             # remove packet from queue
                             self.txQueue.remove(self.pktToSend)
 
-                            if self.pktToSend['type'] == IANA_6TOP_TYPE_REQUEST:
-                                self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['state'] = SIX_STATE_IDLE
-                                self.sixtopStates[self.pktToSend['dstIp'].id]['tx']['blockedCells'] = []
-                                if self.ReSF is not None and len(self.pktToSend['payload']) > 5 and \
-                                        self.pktToSend['payload'][5] is not None:  # index 5 for a request
-                                    if self.pktToSend['dstIp'] in self.ReSF.txBlockedTuples:
-                                        del self.ReSF.txBlockedTuples[self.pktToSend['dstIp']]
-                                        self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend['payload'][5]),
+                            if self.pktToSend.type == IANA_6TOP_TYPE_REQUEST:
+                                self.sixtopStates[self.pktToSend.dstIp.id]['tx']['state'] = SIX_STATE_IDLE
+                                self.sixtopStates[self.pktToSend.dstIp.id]['tx']['blockedCells'] = []
+                                if self.ReSF is not None and len(self.pktToSend.payload) > 5 and \
+                                        self.pktToSend.payload[5] is not None:  # index 5 for a request
+                                    if self.pktToSend.dstIp in self.ReSF.txBlockedTuples:
+                                        del self.ReSF.txBlockedTuples[self.pktToSend.dstIp]
+                                        self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend.payload[5]),
                                                                          type='add')
-                                    elif self.pktToSend['dstIp'] in self.ReSF.txDeleteTuples:
-                                        del self.ReSF.txDeleteTuples[self.pktToSend['dstIp']]
-                                        self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend['payload'][5]),
+                                    elif self.pktToSend.dstIp in self.ReSF.txDeleteTuples:
+                                        del self.ReSF.txDeleteTuples[self.pktToSend.dstIp]
+                                        self.ReSF._resf_delayReservation(copy.deepcopy(self.pktToSend.payload[5]),
                                                                          type='delete', cause='badlink')
-                                        self._log(
-                                            DEBUG,
-                                            "[6top] possibly delaying a ReSF DELETE on mote {0}, because of no ACK.",
-                                            (self.id,),
-                                        )
+                                        if logFlags.debug:
+                                            self._log(
+                                                DEBUG,
+                                                "[6top] possibly delaying a ReSF DELETE on mote {0}, because of no ACK.",
+                                                (self.id,),
+                                            )
                                     else:
                                         assert False
                                     self.ReSF._resf_scheduleDelayedRequest()
-                            elif self.pktToSend['type'] == IANA_6TOP_TYPE_RESPONSE:
-                                self.sixtopStates[self.pktToSend['dstIp'].id]['rx']['state'] = SIX_STATE_IDLE
-                                self.sixtopStates[self.pktToSend['dstIp'].id]['rx']['blockedCells'] = []
-                                if self.ReSF is not None and len(self.pktToSend['payload']) > 4 and \
-                                        self.pktToSend['payload'][4] is not None:  # index 4 for a request
-                                    if self.pktToSend[
-                                        'dstIp'] in self.ReSF.rxBlockedTuples:  # check this b/c it is possible it is a delete response
-                                        del self.ReSF.rxBlockedTuples[self.pktToSend['dstIp']]
+                            elif self.pktToSend.type == IANA_6TOP_TYPE_RESPONSE:
+                                self.sixtopStates[self.pktToSend.dstIp.id]['rx']['state'] = SIX_STATE_IDLE
+                                self.sixtopStates[self.pktToSend.dstIp.id]['rx']['blockedCells'] = []
+                                if self.ReSF is not None and len(self.pktToSend.payload) > 4 and \
+                                        self.pktToSend.payload[4] is not None:  # index 4 for a request
+                                    if self.pktToSend.dstIp in self.ReSF.rxBlockedTuples:  # check this b/c it is possible it is a delete response
+                                        del self.ReSF.rxBlockedTuples[self.pktToSend.dstIp]
 
             # end of radio activity, not waiting for anything
             self.waitingFor = None
@@ -4204,14 +4311,16 @@ class Mote(object):
                         self.schedule[ts]['numRx'] += 1
 
                 if type == APP_TYPE_FRAG:
-                    frag = {'type': type,
-                            'code': code,
-                            'retriesLeft': TSCH_MAXTXRETRIES,
-                            'smac': smac,
-                            'srcIp': srcIp,
-                            'dstIp': dstIp}
-                    frag['payload'] = copy.deepcopy(payload)
-                    frag['sourceRoute'] = copy.deepcopy(srcRoute)
+                    frag = Packet.Packet(
+                        type=type,
+                        code=code,
+                        payload=copy.deepcopy(payload),
+                        retriesLeft=TSCH_MAXTXRETRIES,
+                        srcIp=srcIp,
+                        dstIp=dstIp,
+                        sourceRoute=copy.deepcopy(srcRoute),
+                        smac=smac,
+                    )
                     self.waitingFor = None
                     if (hasattr(self.settings, 'enableFragmentForwarding') and
                             self.settings.enableFragmentForwarding):
@@ -4309,16 +4418,16 @@ class Mote(object):
                         newPayload = copy.deepcopy(payload)
 
                     # create packet
-                    relayPacket = {
-                        'asn': asn,
-                        'type': type,
-                        'code': code,
-                        'payload': newPayload,
-                        'retriesLeft': TSCH_MAXTXRETRIES,
-                        'srcIp': srcIp,
-                        'dstIp': dstIp,
-                        'sourceRoute': srcRoute,
-                    }
+                    relayPacket = Packet.Packet(
+                        asn=asn,
+                        type=type,
+                        code=code,
+                        payload=newPayload,
+                        retriesLeft=TSCH_MAXTXRETRIES,
+                        srcIp=srcIp,
+                        dstIp=dstIp,
+                        sourceRoute=srcRoute,
+                    )
 
                     # enqueue packet in TSCH queue
                     if (type == APP_TYPE_DATA and hasattr(self.settings, 'numFragments') and
@@ -4378,22 +4487,32 @@ class Mote(object):
     def setPDR(self, neighbor, pdr):
         """ sets the pdr to that neighbor"""
         with self.dataLock:
-            self.PDR[neighbor] = pdr
+            self.linkMatrix.setPDR(self.id, neighbor.id, pdr)
 
     def getPDR(self, neighbor):
         """ returns the pdr to that neighbor"""
-        with self.dataLock:
-            return self.PDR[neighbor]
+        # a single read, no lock needed
+        return self.linkMatrix.getPDR(self.id, neighbor.id)
 
     def setRSSI(self, neighbor, rssi):
         """ sets the RSSI to that neighbor"""
         with self.dataLock:
-            self.RSSI[neighbor.id] = rssi
+            self.linkMatrix.setRSSI(self.id, neighbor.id, rssi)
 
     def getRSSI(self, neighbor):
         """ returns the RSSI to that neighbor"""
-        with self.dataLock:
-            return self.RSSI[neighbor.id]
+        # a single read, no lock needed
+        return self.linkMatrix.getRSSI(self.id, neighbor.id)
+
+    @property
+    def RSSI(self):
+        """ RSSI to all known neighbors, indexed by neighbor id (read-only view on the link matrix) """
+        return self.linkMatrix.rssiDict(self.id)
+
+    @property
+    def PDR(self):
+        """ PDR to all known neighbors, indexed by neighbor (read-only view on the link matrix) """
+        return dict((self.engine.motes[j], pdr) for (j, pdr) in self.linkMatrix.pdrDict(self.id).items())
 
     def _estimateETX(self, neighbor):
 
@@ -4403,11 +4522,11 @@ class Mote(object):
             numTx = NUM_SUFFICIENT_TX
             numTxAck = math.floor(pdr * numTx)
 
-            for (_, cell) in self.schedule.items():
-                if (cell['neighbor'] == neighbor and cell['dir'] == DIR_TX and not cell['resf']) or (
-                        cell['neighbor'] == neighbor and cell['dir'] == DIR_TXRX_SHARED):
-                    numTx += cell['numTx']
-                    numTxAck += cell['numTxAck']
+            for ts in (self.schedule.getTimeslots(DIR_TX, neighbor=neighbor, resf=False) +
+                       self.schedule.getTimeslots(DIR_TXRX_SHARED, neighbor=neighbor)):
+                cell = self.schedule[ts]
+                numTx += cell['numTx']
+                numTxAck += cell['numTxAck']
 
             # abort if about to divide by 0
             if not numTxAck:
@@ -4419,7 +4538,7 @@ class Mote(object):
             return etx
 
     def _myNeighbors(self):
-        return [n for n in self.PDR.keys() if self.PDR[n] > 0]
+        return [self.engine.motes[j] for j in self.linkMatrix.getNeighborIds(self.id)]
 
     def _isBroadcast(self, neighbor):
         if type(neighbor) is list:
@@ -4745,142 +4864,101 @@ class Mote(object):
 
     def getTxCells(self, neighbor=None, includeReSF=False):
         with self.dataLock:
-            if neighbor is None:
-                if includeReSF:
-                    return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if c['dir'] == DIR_TX]
-                else:
-                    return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if
-                            c['dir'] == DIR_TX and not c['resf']]
-            else:
-                if includeReSF:
-                    return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if
-                            c['dir'] == DIR_TX and c['neighbor'] == neighbor]
-                else:
-                    return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if
-                            c['dir'] == DIR_TX and c['neighbor'] == neighbor and not c['resf']]
+            return self._getCells(DIR_TX, neighbor, None if includeReSF else False)
 
     def getRxCells(self, neighbor=None, includeReSF=False):
         with self.dataLock:
-            if neighbor is None:
-                if includeReSF:
-                    return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if c['dir'] == DIR_RX]
-                else:
-                    return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if
-                            c['dir'] == DIR_RX and not c['resf']]
-            else:
-                if includeReSF:
-                    return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if
-                            c['dir'] == DIR_RX and c['neighbor'] == neighbor]
-                else:
-                    return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if
-                            c['dir'] == DIR_RX and c['neighbor'] == neighbor and not c['resf']]
+            return self._getCells(DIR_RX, neighbor, None if includeReSF else False)
 
     def getSharedCells(self, neighbor=None):
         with self.dataLock:
-            if neighbor is None:
-                return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if
-                        c['dir'] == DIR_TXRX_SHARED]
-            else:
-                return [(ts, c['ch'], c['neighbor']) for (ts, c) in self.schedule.items() if
-                        c['dir'] == DIR_TXRX_SHARED and c['neighbor'] == neighbor]
+            return self._getCells(DIR_TXRX_SHARED, neighbor, None)
+
+    def _getCells(self, dir, neighbor, resf):
+        """ (ts, ch, neighbor) of the cells in that direction, in timeslot order """
+        if type(neighbor) == list:
+            # broadcast cells are not indexed by neighbor
+            return [(ts, c['ch'], c['neighbor']) for (ts, c) in sorted(self.schedule.items()) if
+                    c['dir'] == dir and c['neighbor'] == neighbor and (resf is None or c['resf'] == resf)]
+        return [(ts, self.schedule[ts]['ch'], self.schedule[ts]['neighbor'])
+                for ts in self.schedule.getTimeslots(dir, neighbor=neighbor, resf=resf)]
 
     # ===== stats
 
     # mote state
 
+    @property
+    def motestats(self):
+        """ the counters of the current cycle, as a dict """
+        return self.moteCounters.getRow(self.id)
+
     def getMoteStats(self):
+        """ the counters and the other statistics of the current cycle, which are reset """
 
-        # gather statistics
         with self.dataLock:
-            dataPktQueues = 0
-            for p in self.txQueue:
-                if not self.settings.convergeFirst and p['type'] == APP_TYPE_DATA:
-                    dataPktQueues += 1
-                elif self.settings.convergeFirst and p['type'] == APP_TYPE_DATA and p['payload'][
-                    1] >= self.engine.asnInitExperiment and p['payload'][1] <= self.engine.asnEndExperiment:
-                    dataPktQueues += 1
+            returnVal = self.moteCounters.getRow(self.id)
+            self.moteCounters.resetRow(self.id)
+        returnVal.update(self.getCycleStats())
+        return returnVal
 
-            returnVal = copy.deepcopy(self.motestats)
-            returnVal['numTxCells'] = len(self.getTxCells(includeReSF=False))
-            returnVal['numTxCellsReSF'] = len(self.getTxCells(includeReSF=True)) - len(
-                self.getTxCells(includeReSF=False))
-            returnVal['numRxCells'] = len(self.getRxCells(includeReSF=False))
-            returnVal['numRxCellsReSF'] = len(self.getRxCells(includeReSF=True)) - len(
-                self.getRxCells(includeReSF=False))
-            returnVal['numDedicatedCells'] = len(
-                [(ts, c) for (ts, c) in self.schedule.items() if type(self) == type(c['neighbor']) and not c['resf']])
-            returnVal['numSharedCells'] = len(self.getSharedCells())
-            returnVal['aveQueueDelay'] = self._stats_getAveQueueDelay()
-            returnVal['aveLatency'] = self._stats_getAveLatency()
-            returnVal['aveHops'] = self._stats_getAveHops()
-            returnVal['probableCollisions'] = self._stats_getRadioStats('probableCollisions')
-            returnVal['txQueueFill'] = len(self.txQueue)
-            returnVal['chargeConsumed'] = self.chargeConsumed
-            returnVal['numTx'] = sum(
-                [cell['numTx'] for (_, cell) in self.schedule.items() if not cell['resf']])  # do not count resf cells
-            returnVal['pktReceived'] = self.pktReceived
-            returnVal['pktGen'] = self.pktGen
-            returnVal['pktDropQueue'] = self.pktDropQueue
-            returnVal['pktDropMac'] = self.pktDropMac
-            returnVal['arrivedToGen'] = self.arrivedToGen
-            returnVal['notGenerated'] = self.notGenerated
-            returnVal['dataQueueFill'] = dataPktQueues
-            returnVal['aveSixtopLatency'] = self._stats_getAveSixTopLatency()
+    def getCycleStats(self):
+        """
+        the statistics of the current cycle which are not counters (see
+        MoteCounters), the per-cycle averages are reset
+        """
+
+        # gather statistics
+        with self.dataLock:
+            returnVal = {
+                'numTxCells':                  self.schedule.count(DIR_TX, resf=False),
+                'numTxCellsReSF':              self.schedule.count(DIR_TX, resf=True),
+                'numRxCells':                  self.schedule.count(DIR_RX, resf=False),
+                'numRxCellsReSF':              self.schedule.count(DIR_RX, resf=True),
+                'numDedicatedCells':           self.schedule.numDedicated,
+                'numSharedCells':              self.schedule.count(DIR_TXRX_SHARED),
+                'aveQueueDelay':               self._stats_getAveQueueDelay(),
+                'aveLatency':                  self._stats_getAveLatency(),
+                'aveHops':                     self._stats_getAveHops(),
+                'txQueueFill':                 len(self.txQueue),
+                'chargeConsumed':              self.chargeConsumed,
+                'numTx':                       self.schedule.numTx,  # do not count resf cells
+                'pktReceived':                 self.pktReceived,
+                'pktGen':                      self.pktGen,
+                'pktDropQueue':                self.pktDropQueue,
+                'pktDropMac':                  self.pktDropMac,
+                'arrivedToGen':                self.arrivedToGen,
+                'notGenerated':                self.notGenerated,
+                'dataQueueFill':               self.getDataQueueFill(),
+                'aveSixtopLatency':            self._stats_getAveSixTopLatency(),
+            }
 
         # reset the statistics
-        self._stats_resetMoteStats()
         self._stats_resetQueueStats()
         self._stats_resetLatencyStats()
         self._stats_resetHopsStats()
-        self._stats_resetRadioStats()
         self._stats_resetSixTopLatencyStats()
 
         return returnVal
 
+    def getDataQueueFill(self):
+        """ number of DATA packets in the queue (of the experiment, with convergeFirst) """
+        with self.dataLock:
+            dataPktQueues = 0
+            for p in self.txQueue:
+                if not self.settings.convergeFirst and p.type == APP_TYPE_DATA:
+                    dataPktQueues += 1
+                elif self.settings.convergeFirst and p.type == APP_TYPE_DATA and p.payload[
+                    1] >= self.engine.asnInitExperiment and p.payload[1] <= self.engine.asnEndExperiment:
+                    dataPktQueues += 1
+            return dataPktQueues
+
     def _stats_resetMoteStats(self):
         with self.dataLock:
-            self.motestats = {
-                # app
-                'appGenerated': 0,  # number of packets app layer generated
-                'appRelayed': 0,  # number of packets relayed
-                'appReachesDagroot': 0,  # number of packets received at the DAGroot
-                'droppedFailedEnqueue': 0,  # dropped packets because failed enqueue them
-                'droppedDataFailedEnqueue': 0,  # dropped DATA packets because app failed enqueue them
-                # queue
-                'droppedQueueFull': 0,  # dropped packets because queue is full
-                # rpl
-                'rplTxDIO': 0,  # number of TX'ed DIOs
-                'rplRxDIO': 0,  # number of RX'ed DIOs
-                'rplTxDAO': 0,  # number of TX'ed DAOs
-                'rplRxDAO': 0,  # number of RX'ed DAOs
-                'rplChurnPrefParent': 0,  # number of time the mote changes preferred parent
-                'rplChurnRank': 0,  # number of time the mote changes rank
-                'rplChurnParentSet': 0,  # number of time the mote changes parent set
-                'droppedNoRoute': 0,  # packets dropped because no route (no preferred parent)
-                'droppedNoTxCells': 0,  # packets dropped because no TX cells
-                # 6top
-                '6topTxRelocatedCells': 0,  # number of time tx-triggered 6top relocates a single cell
-                '6topTxRelocatedBundles': 0,  # number of time tx-triggered 6top relocates a bundle
-                '6topRxRelocatedCells': 0,  # number of time rx-triggered 6top relocates a single cell
-                '6topTxAddReq': 0,  # number of 6P Add request transmitted
-                '6topTxAddResp': 0,  # number of 6P Add responses transmitted
-                '6topTxDelReq': 0,  # number of 6P del request transmitted
-                '6topTxDelResp': 0,  # number of 6P del responses transmitted
-                '6topRxAddReq': 0,  # number of 6P Add request received
-                '6topRxAddResp': 0,  # number of 6P Add responses received
-                '6topRxDelReq': 0,  # number of 6P Del request received
-                '6topRxDelResp': 0,  # number of 6P Del responses received
-                # tsch
-                'droppedMacRetries': 0,  # packets dropped because more than TSCH_MAXTXRETRIES MAC retries
-                'droppedDataMacRetries': 0,
-            # packets dropped because more than TSCH_MAXTXRETRIES MAC retries in a DATA packet
-                'tschTxEB': 0,  # number of TX'ed EBs
-                'tschRxEB': 0,  # number of RX'ed EBs
-            }
+            self.moteCounters.resetRow(self.id)
 
     def _stats_incrementMoteStats(self, name):
         with self.dataLock:
-            self.motestats[name] += 1
+            self.moteCounters.increment(self.id, name)
 
     # cell stats
 
@@ -4998,21 +5076,15 @@ class Mote(object):
 
     def stats_incrementRadioStats(self, name):
         with self.dataLock:
-            self.radiostats[name] += 1
-
-    def _stats_getRadioStats(self, name):
-        return self.radiostats[name]
-
-    def _stats_resetRadioStats(self):
-        with self.dataLock:
-            self.radiostats = {
-                'probableCollisions': 0,  # number of packets that can collide with another packets
-            }
+            self.moteCounters.increment(self.id, name)
 
     # ===== log
 
     def _log(self, severity, template, params=()):
 
+        if self.engine.eventLog:
+            self.engine.eventLog.record(self.engine.getAsn(), self.id, severity, template, params)
+
         if severity == DEBUG:
             if not log.isEnabledFor(logging.DEBUG):
                 return
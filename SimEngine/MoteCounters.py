@@ -0,0 +1,104 @@
+#!/usr/bin/python
+"""
+\brief Per-cycle event counters of all motes.
+
+The counters (packets generated, DIOs sent, 6P requests, drops, ...) are kept
+in a NumPy array with one row per mote, indexed by mote id, and one column per
+counter. At the end of each cycle, SimStats takes a snapshot of the array and
+sums its columns, instead of copying and merging a dict per mote.
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('MoteCounters')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+import numpy as np
+
+#============================ defines =========================================
+
+COUNTERS = [
+    # app
+    'appGenerated',              # number of packets app layer generated
+    'appRelayed',                # number of packets relayed
+    'appReachesDagroot',         # number of packets received at the DAGroot
+    'droppedFailedEnqueue',      # dropped packets because failed enqueue them
+    'droppedDataFailedEnqueue',  # dropped DATA packets because app failed enqueue them
+    # queue
+    'droppedQueueFull',          # dropped packets because queue is full
+    # rpl
+    'rplTxDIO',                  # number of TX'ed DIOs
+    'rplRxDIO',                  # number of RX'ed DIOs
+    'rplTxDAO',                  # number of TX'ed DAOs
+    'rplRxDAO',                  # number of RX'ed DAOs
+    'rplChurnPrefParent',        # number of time the mote changes preferred parent
+    'rplChurnRank',              # number of time the mote changes rank
+    'rplChurnParentSet',         # number of time the mote changes parent set
+    'droppedNoRoute',            # packets dropped because no route (no preferred parent)
+    'droppedNoTxCells',          # packets dropped because no TX cells
+    # 6top
+    '6topTxRelocatedCells',      # number of time tx-triggered 6top relocates a single cell
+    '6topTxRelocatedBundles',    # number of time tx-triggered 6top relocates a bundle
+    '6topRxRelocatedCells',      # number of time rx-triggered 6top relocates a single cell
+    '6topTxAddReq',              # number of 6P Add request transmitted
+    '6topTxAddResp',             # number of 6P Add responses transmitted
+    '6topTxDelReq',              # number of 6P del request transmitted
+    '6topTxDelResp',             # number of 6P del responses transmitted
+    '6topRxAddReq',              # number of 6P Add request received
+    '6topRxAddResp',             # number of 6P Add responses received
+    '6topRxDelReq',              # number of 6P Del request received
+    '6topRxDelResp',             # number of 6P Del responses received
+    # tsch
+    'droppedMacRetries',         # packets dropped because more than TSCH_MAXTXRETRIES MAC retries
+    'droppedDataMacRetries',     # packets dropped because more than TSCH_MAXTXRETRIES MAC retries in a DATA packet
+    'tschTxEB',                  # number of TX'ed EBs
+    'tschRxEB',                  # number of RX'ed EBs
+    # radio
+    'probableCollisions',        # number of packets that can collide with another packets
+]
+
+#============================ body ============================================
+
+class MoteCounters(object):
+
+    def __init__(self, numMotes, names=COUNTERS):
+
+        # store params
+        self.numMotes                  = numMotes
+        self.names                     = list(names)
+
+        # local variables
+        self.index                     = dict((name, i) for (i, name) in enumerate(self.names))
+        self.values                    = np.zeros((numMotes, len(self.names)), dtype=np.int64)
+
+    #======================== public ==========================================
+
+    def increment(self, moteId, name):
+        self.values[moteId, self.index[name]] += 1
+
+    def get(self, moteId, name):
+        return int(self.values[moteId, self.index[name]])
+
+    def getRow(self, moteId):
+        """ the counters of a mote, as a dict """
+        return dict(zip(self.names, self.values[moteId].tolist()))
+
+    def resetRow(self, moteId):
+        self.values[moteId] = 0
+
+    def snapshot(self):
+        """ a copy of the counters of all motes, which are reset for the next cycle """
+        values       = self.values.copy()
+        self.values.fill(0)
+        return values
+
+    def sums(self, values):
+        """ the sum of each counter over all motes of a snapshot, as a dict """
+        return dict(zip(self.names, values.sum(axis=0).tolist()))
@@ -0,0 +1,98 @@
+#!/usr/bin/python
+"""
+\brief Packets (and fragments) in the queues of the motes.
+
+A Packet has a slot per field instead of a dict, which makes it smaller and
+cheaper to create and copy. Its fields are read and written as attributes;
+packet['type'] still works, for the code which handles packets as dicts, and
+the motes take packets built as dicts (see asPacket).
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('Packet')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+#============================ defines =========================================
+
+_MISSING = object()
+
+#============================ body ============================================
+
+class Packet(object):
+
+    __slots__ = ['asn', 'type', 'code', 'payload', 'retriesLeft', 'srcIp', 'dstIp', 'sourceRoute', 'nextHop', 'smac']
+
+    def __init__(self, asn=None, type=None, code=None, payload=None, retriesLeft=None, srcIp=None, dstIp=None, sourceRoute=None, nextHop=None, smac=None):
+        self.asn                       = asn
+        self.type                      = type
+        self.code                      = code
+        self.payload                   = payload
+        self.retriesLeft               = retriesLeft
+        self.srcIp                     = srcIp
+        self.dstIp                     = dstIp
+        self.sourceRoute               = sourceRoute
+        self.nextHop                   = nextHop
+        self.smac                      = smac
+
+    #======================== public ==========================================
+
+    def copy(self):
+        """ a shallow copy, the payload and source route are shared """
+        return Packet(self.asn, self.type, self.code, self.payload, self.retriesLeft, self.srcIp, self.dstIp, self.sourceRoute, self.nextHop, self.smac)
+
+    def clear(self):
+        """ remove all the fields, so that the packet cannot be processed further """
+        for field in self.__slots__:
+            if hasattr(self, field):
+                delattr(self, field)
+
+    #=== as a dict
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field)
+
+    def __setitem__(self, field, value):
+        setattr(self, field, value)
+
+    def __len__(self):
+        # as a dict, the number of fields, 0 once cleared
+        return sum(1 for field in self.__slots__ if hasattr(self, field))
+
+    def __eq__(self, other):
+        # as dicts, packets with the same fields are equal (e.g. in txQueue.remove())
+        if not isinstance(other, Packet):
+            return NotImplemented
+        for field in self.__slots__:
+            if not getattr(self, field, _MISSING) == getattr(other, field, _MISSING):
+                return False
+        return True
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{' + ', '.join(
+            '{0!r}: {1!r}'.format(field, getattr(self, field)) for field in self.__slots__ if hasattr(self, field)
+        ) + '}'
+
+def asPacket(packet):
+    """ the packet as a Packet, if it was built as a dict, leaving out the keys which are not fields (e.g. 'dmac') """
+    if isinstance(packet, dict):
+        return Packet(**dict((field, packet[field]) for field in Packet.__slots__ if field in packet))
+    return packet
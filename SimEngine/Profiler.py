@@ -0,0 +1,118 @@
+#!/usr/bin/python
+"""
+\brief Wall time and call counts of the parts of a simulation run.
+
+Enabled with --profile 1. The engine then calls each event through the
+profiler, attributing its time to the name in its uniqueTag (e.g.
+'propagation', '_tsch_action_activeCell', '_actionEndCycle'), and times the
+mobility step, updateTopology and ReSFEngine.action at the start of the
+slotframes. These run inside a callback (_actionSlotframeStart) in
+event-driven mode, so their time is also part of that callback's time.
+
+At the end of the run, the summary table and a JSON dump are written next to
+the output file (output_cpuN_runM.profile.txt and .profile.json).
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('Profiler')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+import json
+import time
+
+#============================ body ============================================
+
+class Profiler(object):
+
+    def __init__(self):
+
+        # local variables
+        self.entries                   = {} # name -> [calls, seconds]
+        self.numEvents                 = 0
+        self.startTime                 = None
+        self.endTime                   = None
+
+    #======================== public ==========================================
+
+    def start(self):
+        self.startTime                 = time.time()
+
+    def stop(self):
+        self.endTime                   = time.time()
+
+    def call(self, name, cb, *args):
+        """ call cb(*args), timed under this name """
+        startTime = time.time()
+        try:
+            return cb(*args)
+        finally:
+            self.add(name, time.time()-startTime)
+
+    def callEvent(self, uniqueTag, cb):
+        """ call the callback of an event, timed under the name in its uniqueTag """
+        self.numEvents += 1
+        if uniqueTag:
+            name = uniqueTag[1]
+        else:
+            name = getattr(cb, '__name__', str(cb))
+        self.call(name, cb)
+
+    def add(self, name, seconds, calls=1):
+        entry = self.entries.get(name)
+        if entry is None:
+            self.entries[name] = [calls, seconds]
+        else:
+            entry[0] += calls
+            entry[1] += seconds
+
+    def getTotalTime(self):
+        if self.startTime is None:
+            return 0.0
+        return (self.endTime if self.endTime is not None else time.time())-self.startTime
+
+    def getSummary(self):
+        """ the entries as a dict, the most time consuming first """
+        totalTime = self.getTotalTime()
+        entries = []
+        for (name, (calls, seconds)) in sorted(self.entries.items(), key=lambda e: (-e[1][1], e[0])):
+            entries += [{
+                'name':        name,
+                'calls':       calls,
+                'seconds':     seconds,
+                'usPerCall':   1e6*seconds/calls,
+                'percent':     100.0*seconds/totalTime if totalTime else 0.0,
+            }]
+        return {
+            'totalSeconds':    totalTime,
+            'numEvents':       self.numEvents,
+            'entries':         entries,
+        }
+
+    def formatTable(self):
+        summary = self.getSummary()
+        output  = []
+        output += ['{0:<40} {1:>10} {2:>10} {3:>12} {4:>7}'.format('name', 'calls', 'seconds', 'us/call', '%')]
+        for e in summary['entries']:
+            output += ['{name:<40} {calls:>10} {seconds:>10.3f} {usPerCall:>12.1f} {percent:>7.1f}'.format(**e)]
+        output += ['{0:<40} {1:>10} {2:>10.3f}'.format('total (run)', '', summary['totalSeconds'])]
+        return '\n'.join(output)
+
+    def write(self, filename, info=None):
+        """ write the summary table to filename.txt and the JSON dump to filename.json """
+        table = self.formatTable()
+        with open(filename+'.txt', 'w') as f:
+            f.write(table+'\n')
+        summary = self.getSummary()
+        if info:
+            summary.update(info)
+        with open(filename+'.json', 'w') as f:
+            json.dump(summary, f, indent=1, sort_keys=True)
+        return table
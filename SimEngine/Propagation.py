@@ -20,18 +20,23 @@ log.addHandler(NullHandler())
 
 #============================ imports =========================================
 
-import threading
 import random
+import collections
 import math
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
+
 import Topology
 import SimSettings
-import SimEngine
+import Simulation
 import Mote
 
 #============================ defines =========================================
 
+# priority of the propagation event, after the active cells of the slot
+PRIORITY_PROPAGATE = 1
+
 #============================ functions =======================================
 
 def _dBmTomW(dBm):
@@ -45,6 +50,17 @@ def _mWTodBm(mW):
 
 #============================ classes =========================================
 
+class Transmission(object):
+    """ a packet sent in the current slot, the packet is referenced, not copied """
+
+    __slots__ = ['channel', 'smac', 'dmac', 'packet']
+
+    def __init__(self, channel, smac, dmac, packet):
+        self.channel                   = channel
+        self.smac                      = smac
+        self.dmac                      = dmac
+        self.packet                    = packet
+
 class Propagation(object):
 
     def __new__(cls, *args, **kwargs):
@@ -53,11 +69,12 @@ class Propagation(object):
         :return: a Propagate class depending on the settings
         :rtype: PropagationFromModel | PropagationFormTrace
         """
-        settings = SimSettings.SimSettings()
+        sim = kwargs.get('sim')
+        settings = sim.settings if sim is not None else SimSettings.SimSettings()
         if hasattr(settings, "scenario"):
-            return PropagationFromTrace()
+            return PropagationFromTrace(*args, **kwargs)
         else:
-            return PropagationFromModel()
+            return PropagationFromModel(*args, **kwargs)
 
 
 class PropagationCreator(object):
@@ -72,12 +89,15 @@ class PropagationCreator(object):
     _init          = False
 
     def __new__(cls, *args, **kwargs):
+        if kwargs.get('sim') is not None:
+            # owned by a Simulation, not the singleton
+            return super(PropagationCreator,cls).__new__(cls)
         if not cls._instance:
             cls._instance = super(PropagationCreator,cls).__new__(cls, *args, **kwargs)
         return cls._instance
     #===== end singleton
 
-    def __init__(self):
+    def __init__(self, sim=None):
         #===== start singleton
         # don't re-initialize an instance (needed because singleton)
         if self._init:
@@ -86,8 +106,10 @@ class PropagationCreator(object):
         #===== end singleton
 
         # store params
-        self.settings                  = SimSettings.SimSettings()
-        self.engine                    = SimEngine.SimEngine()
+        if sim is None:
+            sim                        = Simulation.SingletonSimulation()
+        self.settings                  = sim.settings
+        self.engine                    = sim.engine
 
         # random.seed(self.settings.seed)
 
@@ -95,12 +117,26 @@ class PropagationCreator(object):
         self.genPropagation.seed(self.settings.seed)
 
         # variables
-        self.dataLock                  = threading.Lock()
+        self.dataLock                  = self.engine.newLock()
         self.receivers                 = [] # motes with radios currently listening
+        self.receiversByChannel        = {} # channel -> {mote: receiver}, in the order of the receivers
         self.transmissions             = [] # ongoing transmissions
+        self.transmissionsByChannel    = {} # channel -> [transmission]
+
+        self.rxPowerMw                 = None # received power (mW) of all links, set at each propagation
+        self.noiseMw                   = {}   # noise power (dBm) -> noise power (mW)
+        self.rssiToPdr                 = Topology.Topology.creatorClass(self.settings).rssiToPdr
+
+        # in event-driven mode, propagation is only scheduled in slots where motes start a TX or RX
+        self.eventDriven               = hasattr(self.settings, 'eventDrivenPropagation') and self.settings.eventDrivenPropagation == 1
+        self.propagateScheduled        = False
+
+        # [debug] count the interference in the cells of the transmitters (see Mote._tsch_newCell)
+        self.debugStats                = hasattr(self.settings, 'debugStats') and self.settings.debugStats == 1
 
         # schedule propagation task
-        self._schedule_propagate()
+        if not self.eventDriven:
+            self._schedule_propagate()
 
     def destroy(self):
         self._instance                 = None
@@ -116,25 +152,29 @@ class PropagationCreator(object):
     def startRx(self,mote,channel):
         """ add a mote as listener on a channel"""
         with self.dataLock:
-            self.receivers += [{
+            receiver = {
                 'mote':                mote,
                 'channel':             channel,
-            }]
-
-    def startTx(self,channel,type,code,smac,dmac,srcIp,dstIp,srcRoute, payload):
+                'done':                False,
+            }
+            if channel not in self.receiversByChannel:
+                self.receiversByChannel[channel] = collections.OrderedDict()
+            assert mote not in self.receiversByChannel[channel]
+            self.receivers                            += [receiver]
+            self.receiversByChannel[channel][mote]     = receiver
+        if self.eventDriven:
+            self._schedule_propagate_currentSlot()
+
+    def startTx(self,channel,smac,dmac,packet):
         """ add a mote as using a channel for tx"""
         with self.dataLock:
-            self.transmissions  += [{
-                'channel':             channel,
-                'type':                type,
-                'code':                code,
-                'smac':                smac,
-                'dmac':                dmac,
-                'srcIp':               srcIp,
-                'dstIp':               dstIp,
-                'sourceRoute':         srcRoute,
-                'payload':             payload,
-            }]
+            transmission = Transmission(channel, smac, dmac, packet)
+            if channel not in self.transmissionsByChannel:
+                self.transmissionsByChannel[channel] = []
+            self.transmissions                        += [transmission]
+            self.transmissionsByChannel[channel]      += [transmission]
+        if self.eventDriven:
+            self._schedule_propagate_currentSlot()
 
     @abstractmethod
     def propagate(self):
@@ -149,9 +189,38 @@ class PropagationCreator(object):
                 asn         = self.engine.getAsn()+1,# so propagation happens in next slot
                 cb          = self.propagate,
                 uniqueTag   = (None,'propagation'),
-                priority    = 1,
+                priority    = PRIORITY_PROPAGATE,
             )
 
+    def _receiversOf(self, transmission):
+        """ receivers still listening on the channel of the transmission, that the packet is destined to """
+
+        receivers = self.receiversByChannel.get(transmission.channel)
+        if not receivers:
+            return []
+        return [r for (mote, r) in receivers.items() if mote in transmission.dmac]
+
+    def _stopRx(self, receiver):
+        """ the receiver is done with this slot and stops listening """
+
+        receiver['done'] = True
+        del self.receiversByChannel[receiver['channel']][receiver['mote']]
+
+    def _schedule_propagate_currentSlot(self):
+        with self.dataLock:
+            if self.propagateScheduled:
+                return
+            self.propagateScheduled = True
+            if self.engine.currentPriority > PRIORITY_PROPAGATE:
+                # the propagation of this slot is over, as in the per-slot mode the radio is heard in the next slot
+                self._schedule_propagate()
+            else:
+                self.engine.scheduleAtCurrentAsn(
+                    cb          = self.propagate, # after all the active cells of this slot
+                    uniqueTag   = (None,'propagation'),
+                    priority    = PRIORITY_PROPAGATE,
+                )
+
 # ==================== Propagation From Model =================================
 
 class PropagationFromModel(PropagationCreator):
@@ -163,176 +232,162 @@ class PropagationFromModel(PropagationCreator):
             asn   = self.engine.getAsn()
             ts    = asn % self.settings.slotframeLength
 
+            # received power of all links, in mW (cached in the link matrix until an RSSI changes)
+            self.rxPowerMw = self.engine.linkMatrix.getRxPowerMw()
+
             arrivalTime = {}
 
             # store arrival times of transmitted packets
             for transmission in self.transmissions:
-                arrivalTime[transmission['smac']] = transmission['smac'].clock_getOffsetToDagRoot()
+                arrivalTime[transmission.smac] = transmission.smac.clock_getOffsetToDagRoot()
 
             for transmission in self.transmissions:
 
-                i           = 0 # index of a receiver
                 isACKed     = False
                 isNACKed    = False
 
-                while i<len(self.receivers):
-
-                    if self.receivers[i]['channel']==transmission['channel']:
-                        # this receiver is listening on the right channel
-
-                        if self.receivers[i]['mote'] in transmission['dmac']:
-                            # this packet is destined for this mote
-
-                            if not self.settings.noInterference:
-
-                                #================ with interference ===========
-
-                                # other transmissions on the same channel?
-                                interferers = [t['smac'] for t in self.transmissions if (t!=transmission) and (t['channel']==transmission['channel'])]
-
-                                interferenceFlag = 0
-                                for itfr in interferers:
-                                    if self.receivers[i]['mote'].getRSSI(itfr)>self.receivers[i]['mote'].minRssi:
-                                        interferenceFlag = 1
-
-                                transmission['smac'].schedule[ts]['debug_interference'] += [interferenceFlag] # debug only
-
-                                if interferenceFlag:
-                                    transmission['smac'].stats_incrementRadioStats('probableCollisions')
-                                if transmission['smac'].schedule[ts]['dir'] == Mote.DIR_TXRX_SHARED:
-                                    if interferenceFlag:
-                                        transmission['smac'].stats_sharedCellCollisionSignal()
-                                    else:
-                                        transmission['smac'].stats_sharedCellSuccessSignal()
-
-                                lockOn = transmission['smac']
-                                for itfr in interferers:
-                                    if arrivalTime[itfr] < arrivalTime[lockOn] and self.receivers[i]['mote'].getRSSI(itfr)>self.receivers[i]['mote'].minRssi:
-                                        # lock on interference
-                                        lockOn = itfr
-
-                                if lockOn == transmission['smac']:
-                                    # mote locked in the current signal
-
-                                    transmission['smac'].schedule[ts]['debug_lockInterference'] += [0] # debug only
-
-                                    # calculate pdr, including interference
-                                    sinr  = self._computeSINR(transmission['smac'],self.receivers[i]['mote'],interferers)
-                                    pdr   = self._computePdrFromSINR(sinr, self.receivers[i]['mote'])
-
-                                    # pick a random number
-                                    failure = self.genPropagation.random()
-                                    if pdr>=failure:
-                                        # packet is received correctly
-                                        # this mote is delivered the packet
-                                        # print '---------'
-                                        # print 'ok - pdr %.4f - receiver %d - failure %.4f - smac.id %d' % (pdr, self.receivers[i]['mote'].id, failure, transmission['smac'].id)
-                                        isACKed, isNACKed = self.receivers[i]['mote'].radio_rxDone(
-                                            type       = transmission['type'],
-                                            code       = transmission['code'],
-                                            smac       = transmission['smac'],
-                                            dmac       = transmission['dmac'],
-                                            srcIp      = transmission['srcIp'],
-                                            dstIp      = transmission['dstIp'],
-                                            srcRoute   = transmission['sourceRoute'],
-                                            payload    = transmission['payload']
-                                        )
-                                        # this mote stops listening
-                                        del self.receivers[i]
-
-                                    else:
-                                        # print '---------'
-                                        # print 'not ok - pdr %.4f - receiver %d - failure %.4f - smac.id %d' % (pdr, self.receivers[i]['mote'].id, failure, transmission['smac'].id)
-                                        # packet is NOT received correctly
-                                        self.receivers[i]['mote'].radio_rxDone()
-                                        del self.receivers[i]
-
-                                else:
-                                    # mote locked in an interfering signal
-
-                                    # for debug
-                                    transmission['smac'].schedule[ts]['debug_lockInterference'] += [1]
-
-                                    # receive the interference as if it's a desired packet
-                                    interferers.remove(lockOn)
-                                    pseudo_interferers = interferers + [transmission['smac']]
-
-                                    # calculate SINR where locked interference and other signals are considered S and I+N respectively
-                                    pseudo_sinr  = self._computeSINR(lockOn,self.receivers[i]['mote'],pseudo_interferers)
-                                    pseudo_pdr   = self._computePdrFromSINR(pseudo_sinr, self.receivers[i]['mote'])
-
-                                    # pick a random number
-                                    failure = self.genPropagation.random()
-                                    if pseudo_pdr>=failure and self.receivers[i]['mote'].radio_isSync():
-                                        # success to receive the interference and realize collision
-                                        self.receivers[i]['mote'].schedule[ts]['rxDetectedCollision'] = True
-
-                                    # desired packet is not received
-                                    self.receivers[i]['mote'].radio_rxDone()
-                                    del self.receivers[i]
-
-                            else:
+                # receivers listening on the channel of the transmission, this packet is destined to
+                for receiver in self._receiversOf(transmission):
+                    # this packet is destined for this mote
 
-                                #================ without interference ========
+                    if not self.settings.noInterference:
 
-                                interferers = []
+                        #================ with interference ===========
 
-                                transmission['smac'].schedule[ts]['debug_interference']     += [0] # for debug only
-                                transmission['smac'].schedule[ts]['debug_lockInterference'] += [0] # for debug only
+                        # other transmissions on the same channel?
+                        interferers = [t.smac for t in self.transmissionsByChannel[transmission.channel] if t is not transmission]
 
-                                # calculate pdr with no interference
-                                sinr  = self._computeSINR(transmission['smac'],self.receivers[i]['mote'],interferers)
-                                pdr   = self._computePdrFromSINR(sinr, self.receivers[i]['mote'])
+                        interferenceFlag = 0
+                        for itfr in interferers:
+                            if receiver['mote'].getRSSI(itfr)>receiver['mote'].minRssi:
+                                interferenceFlag = 1
 
-                                # pick a random number
-                                failure = self.genPropagation.random()
+                        if self.debugStats:
+                            transmission.smac.schedule[ts]['debug_interference'] += interferenceFlag
 
-                                if pdr>=failure:
-                                    # packet is received correctly
+                        if interferenceFlag:
+                            transmission.smac.stats_incrementRadioStats('probableCollisions')
+                        if transmission.smac.schedule[ts]['dir'] == Mote.DIR_TXRX_SHARED:
+                            if interferenceFlag:
+                                transmission.smac.stats_sharedCellCollisionSignal()
+                            else:
+                                transmission.smac.stats_sharedCellSuccessSignal()
 
-                                    # this mote is delivered the packet
-                                    isACKed, isNACKed = self.receivers[i]['mote'].radio_rxDone(
-                                        type       = transmission['type'],
-                                        code       = transmission['code'],
-                                        smac       = transmission['smac'],
-                                        dmac       = transmission['dmac'],
-                                        srcIp      = transmission['srcIp'],
-                                        dstIp      = transmission['dstIp'],
-                                        srcRoute   = transmission['sourceRoute'],
-                                        payload    = transmission['payload']
-                                    )
+                        lockOn = transmission.smac
+                        for itfr in interferers:
+                            if arrivalTime[itfr] < arrivalTime[lockOn] and receiver['mote'].getRSSI(itfr)>receiver['mote'].minRssi:
+                                # lock on interference
+                                lockOn = itfr
 
-                                    # this mote stops listening
-                                    del self.receivers[i]
+                        if lockOn == transmission.smac:
+                            # mote locked in the current signal
+
+                            # calculate pdr, including interference
+                            sinr  = self._computeSINR(transmission.smac,receiver['mote'],interferers)
+                            pdr   = self._computePdrFromSINR(sinr, receiver['mote'])
+
+                            # pick a random number
+                            failure = self.genPropagation.random()
+                            if pdr>=failure:
+                                # packet is received correctly
+                                # this mote is delivered the packet
+                                # print '---------'
+                                # print 'ok - pdr %.4f - receiver %d - failure %.4f - smac.id %d' % (pdr, receiver['mote'].id, failure, transmission.smac.id)
+                                isACKed, isNACKed = receiver['mote'].radio_rxDone(
+                                    type       = transmission.packet.type,
+                                    code       = transmission.packet.code,
+                                    smac       = transmission.smac,
+                                    dmac       = transmission.dmac,
+                                    srcIp      = transmission.packet.srcIp,
+                                    dstIp      = transmission.packet.dstIp,
+                                    srcRoute   = transmission.packet.sourceRoute,
+                                    payload    = transmission.packet.payload
+                                )
+                                # this mote stops listening
+                                self._stopRx(receiver)
 
-                                else:
-                                    # packet is NOT received correctly
-                                    self.receivers[i]['mote'].radio_rxDone()
-                                    del self.receivers[i]
+                            else:
+                                # print '---------'
+                                # print 'not ok - pdr %.4f - receiver %d - failure %.4f - smac.id %d' % (pdr, receiver['mote'].id, failure, transmission.smac.id)
+                                # packet is NOT received correctly
+                                receiver['mote'].radio_rxDone()
+                                self._stopRx(receiver)
 
                         else:
-                            # this packet is NOT destined for this mote
+                            # mote locked in an interfering signal
+
+                            # for debug
+                            if self.debugStats:
+                                transmission.smac.schedule[ts]['debug_lockInterference'] += 1
+
+                            # receive the interference as if it's a desired packet
+                            interferers.remove(lockOn)
+                            pseudo_interferers = interferers + [transmission.smac]
 
-                            # move to the next receiver
-                            i += 1
+                            # calculate SINR where locked interference and other signals are considered S and I+N respectively
+                            pseudo_sinr  = self._computeSINR(lockOn,receiver['mote'],pseudo_interferers)
+                            pseudo_pdr   = self._computePdrFromSINR(pseudo_sinr, receiver['mote'])
+
+                            # pick a random number
+                            failure = self.genPropagation.random()
+                            if pseudo_pdr>=failure and receiver['mote'].radio_isSync():
+                                # success to receive the interference and realize collision
+                                receiver['mote'].schedule[ts]['rxDetectedCollision'] = True
+
+                            # desired packet is not received
+                            receiver['mote'].radio_rxDone()
+                            self._stopRx(receiver)
 
                     else:
-                        # this receiver is NOT listening on the right channel
 
-                        # move to the next receiver
-                        i += 1
+                        #================ without interference ========
+
+                        interferers = []
+
+                        # calculate pdr with no interference
+                        sinr  = self._computeSINR(transmission.smac,receiver['mote'],interferers)
+                        pdr   = self._computePdrFromSINR(sinr, receiver['mote'])
+
+                        # pick a random number
+                        failure = self.genPropagation.random()
+
+                        if pdr>=failure:
+                            # packet is received correctly
+
+                            # this mote is delivered the packet
+                            isACKed, isNACKed = receiver['mote'].radio_rxDone(
+                                type       = transmission.packet.type,
+                                code       = transmission.packet.code,
+                                smac       = transmission.smac,
+                                dmac       = transmission.dmac,
+                                srcIp      = transmission.packet.srcIp,
+                                dstIp      = transmission.packet.dstIp,
+                                srcRoute   = transmission.packet.sourceRoute,
+                                payload    = transmission.packet.payload
+                            )
+
+                            # this mote stops listening
+                            self._stopRx(receiver)
+
+                        else:
+                            # packet is NOT received correctly
+                            receiver['mote'].radio_rxDone()
+                            self._stopRx(receiver)
 
                 # indicate to source packet was sent
-                transmission['smac'].radio_txDone(isACKed, isNACKed)
+                transmission.smac.radio_txDone(isACKed, isNACKed)
 
             # remaining receivers that does not receive a desired packet
             for r in self.receivers:
 
+                if r['done']:
+                    continue
+
                 if not self.settings.noInterference:
 
                     #================ with interference ===========
 
-                    interferers = [t['smac'] for t in self.transmissions if t['dmac']!=r['mote'] and t['channel']==r['channel']]
+                    interferers = [t.smac for t in self.transmissionsByChannel.get(r['channel'], []) if t.dmac!=r['mote']]
 
                     lockOn = None
                     for itfr in interferers:
@@ -365,48 +420,59 @@ class PropagationFromModel(PropagationCreator):
 
             # clear all outstanding transmissions
             self.transmissions              = []
+            self.transmissionsByChannel     = {}
             self.receivers                  = []
+            self.receiversByChannel         = {}
+            self.propagateScheduled         = False
 
-        self._schedule_propagate()
+        if not self.eventDriven:
+            self._schedule_propagate()
 
-    # ======================== static =========================================
+    # ======================== private =======================================
 
-    @staticmethod
-    def _computeSINR(source, destination, interferers):
+    def _getNoiseMw(self, noisepower):
+        if noisepower not in self.noiseMw:
+            self.noiseMw[noisepower] = _dBmTomW(noisepower)
+        return self.noiseMw[noisepower]
+
+    def _computeSINR(self, source, destination, interferers):
         """ compute SINR  """
 
-        noise = _dBmTomW(destination.noisepower)
+        noise = self._getNoiseMw(destination.noisepower)
         # S = RSSI - N
-        signal = _dBmTomW(source.getRSSI(destination)) - noise
+        signal = self.rxPowerMw[source.id, destination.id] - noise
         if signal < 0.0:
             # RSSI has not to be below noise level. If this happens, return very low SINR (-10.0dB)
             return -10.0
 
         totalInterference = 0.0
-        for interferer in interferers:
+        if interferers:
             # I = RSSI - N
-            interference = _dBmTomW(interferer.getRSSI(destination)) - noise
-            if interference < 0.0:
-                # RSSI has not to be below noise level. If this happens, set interference 0.0
-                interference = 0.0
-            totalInterference += interference
+            interference = self.rxPowerMw[[interferer.id for interferer in interferers], destination.id] - noise
+            # RSSI has not to be below noise level. If this happens, set interference 0.0
+            interference[interference < 0.0] = 0.0
+            # summed in order, as floats, for the same result as adding one interferer at a time
+            totalInterference = sum(interference.tolist(), 0.0)
 
-        sinr = signal / (totalInterference + noise)
+        sinr = float(signal) / (totalInterference + noise)
 
         return _mWTodBm(sinr)
 
-    @staticmethod
-    def _computePdrFromSINR(sinr, destination):
-        """ compute PDR from SINR """
+    def _computePdrFromSINR(self, sinr, destination):
+        """
+        compute PDR from SINR
+
+        This is not looked up in a table over a SINR grid: the PDR is interpolated on the equivalent RSSI, which is not
+        linear in the SINR, so a grid would round the PDRs and with them change the random outcomes of the receptions
+        (and the golden traces). With interference, the SINRs are hardly ever the same twice, so they are not cached.
+        """
 
         equivalentRSSI = _mWTodBm(
             _dBmTomW(sinr + destination.noisepower) +
-            _dBmTomW(destination.noisepower)
+            self._getNoiseMw(destination.noisepower)
         )
 
-        pdr = Topology.Topology.rssiToPdr(equivalentRSSI)
-
-        return pdr
+        return self.rssiToPdr(equivalentRSSI)
 
 # ==================== Propagation From Trace =================================
 
@@ -22,15 +22,16 @@ import random
 import math
 from fractions import gcd
 
-import SimEngine
-import SimSettings
 import Solver
 import Mote
-import ReSFEngine
+import EventLog
 
 from collections import OrderedDict
 from collections import namedtuple
 
+# guards of the log calls, see EventLog.py
+logFlags = EventLog.LogFlags(log)
+
 IDOriginator = namedtuple("IDOriginator", ["unique_id", "neighbor"])
 
 RESF_PREFPARENT = 'RESF_PREFPARENT'
@@ -61,8 +62,8 @@ class ReSF(object):
         # mote on which this ReSF instance is defined
         self.mote = mote
 
-        self.engine                    = SimEngine.SimEngine()
-        self.settings                  = SimSettings.SimSettings()
+        self.engine                    = mote.engine
+        self.settings                  = mote.settings
         self.genReSF = random.Random()
         self.genReSF.seed(self.settings.seed + self.mote.id)
         random.seed(self.settings.seed + self.mote.id)
@@ -90,11 +91,12 @@ class ReSF(object):
         # keep alive dictionary: mapping the unique id to the usage of the reservation
         self.keepAlive = {}
 
-        self._log(
-            self.INFO,
-            "[ReSF] On mote {0}, initialized a ReSF instance.",
-            (self.mote.id,)
-        )
+        if logFlags.info:
+            self._log(
+                self.INFO,
+                "[ReSF] On mote {0}, initialized a ReSF instance.",
+                (self.mote.id,)
+            )
         
         # ReSF reservation tuple
         self.tuple = {}
@@ -112,17 +114,21 @@ class ReSF(object):
         # number of cells that were actually added to the schedule
         self.haveAllocatedCells = 0
 
+        # counts the collisions between reservations, keeps the solutions per pair of periods
+        self.collisionCounter               = Solver.CollisionCounter()
+
         self.ReSFEngine                     = None
         if self.settings.sf == 'resf':
-            self.ReSFEngine                 = ReSFEngine.ReSFEngine()
+            self.ReSFEngine                 = mote.sim.resfEngine
     
     def _app_action_ReSFReservation(self):
         
-        self._log(
-            self.DEBUG,
-            "[app - ReSF] On mote {0}, preparing a new ReSF reservation.",
-            (self.mote.id,)
-        )
+        if logFlags.debug:
+            self._log(
+                self.DEBUG,
+                "[app - ReSF] On mote {0}, preparing a new ReSF reservation.",
+                (self.mote.id,)
+            )
         
         # check delayed reservation requests, remove the ones which refer to the same uniqueId
         # self.delayed = [reservation for reservation in self.delayed if self.engine.ReSFEngine.tuples[self.mote.id]['uniqueId'] != reservation['uniqueId']]
@@ -185,10 +191,11 @@ class ReSF(object):
             priority=4,
         )
 
-        self._log(
-            self.INFO,
-            '[ReSF] scheduled a new delayed request check'
-        )
+        if logFlags.info:
+            self._log(
+                self.INFO,
+                '[ReSF] scheduled a new delayed request check'
+            )
 
     def _resf_find_uniqueId_timestamp(self, uniqueId, timestamp, dir):
         if dir == Mote.DIR_TX:
@@ -252,8 +259,8 @@ class ReSF(object):
                 start_max = i
         return start_max
 
-    def _resf_calc_request(self, reservation):
-        solver = Solver.CollisionSolver()
+    def _resf_get_reserved(self):
+        """ starts and periods of all the recurrent cells a new reservation should not collide with """
         starts = []
         periods = []
 
@@ -285,8 +292,57 @@ class ReSF(object):
                     starts.append(resv['start'])
                     periods.append(resv['period'])
 
+        return starts, periods
+
+    def _resf_score_reservations(self, reservations, starts, periods):
+        """
+        Scores each of the candidate reservations against the reserved (starts, periods), according to the resfMode.
+        The collisions are counted over one LCM of all periods, starting from the latest start.
+        """
+        counter = self.collisionCounter
+
+        # does not depend on the candidate
+        lcm_periods = self._resf_find_lcm(periods) if periods else 1
+        start_max_periods = self._resf_find_start_max(starts) if starts else None
+
         resv_to_collisions = []
 
+        for r in reservations:
+            # find the LCM
+            lcm = self._resf_find_lcm([r['period'], lcm_periods])
+            # find the maximum start
+            start_max = r['start'] if start_max_periods is None else max(start_max_periods, r['start'])
+            # define the end
+            end = start_max + lcm
+
+            if self.settings.resfMode == 'optimal':
+                resv_to_collisions.append((r, counter.getUniqueCollisions(r['start'], r['period'], starts, periods, start_max, end)))
+            elif self.settings.resfMode == 'random' or self.settings.resfMode == 'minimaldelay':
+                resv_to_collisions.append(r)
+            else:
+                # go over every reseration that has to be checked
+                nrCollsList = [counter.getCollisions(r['start'], r['period'], start, periods[ix], start_max, end) for ix, start in enumerate(starts)]
+                nrCollsList = [nrColls for nrColls in nrCollsList if nrColls is not None]
+                totalNrCollisions = sum(nrCollsList)
+
+                if self.settings.resfMode == 'sum':
+                    resv_to_collisions.append((r, totalNrCollisions))
+                elif self.settings.resfMode == 'average':
+                    if len(nrCollsList) > 0:
+                        resv_to_collisions.append((r, totalNrCollisions / float(len(nrCollsList))))
+                    else:
+                        resv_to_collisions.append((r, 0.0))
+                elif self.settings.resfMode == 'sort':
+                    resv_to_collisions.append((r, max([0] + nrCollsList), totalNrCollisions))
+                else:
+                    assert False
+
+        return resv_to_collisions
+
+    def _resf_calc_request(self, reservation):
+        (starts, periods) = self._resf_get_reserved()
+
+        candidates = []
         for r in range(0, self.MAX_RESERVATIONS):
             tmp_resv = {}
             tmp_resv['uniqueId'] = reservation['uniqueId']
@@ -295,60 +351,9 @@ class ReSF(object):
             tmp_resv['next'] = reservation['next'] + r
             tmp_resv['period'] = reservation['period']
             tmp_resv['timestamp'] = reservation['timestamp']
+            candidates.append(tmp_resv)
 
-            # find the LCM
-            lcm = self._resf_find_lcm([tmp_resv['period']] + periods)
-            # find the maximum start
-            start_max = self._resf_find_start_max([tmp_resv['start']] + starts)
-            # define the end
-            end = start_max + lcm
-
-            uniqueCollisions = set()
-            totalNrCollisions = 0
-            collisionCounter = 0
-            maxValue = 0
-            # go over every reseration that has to be checked
-            for ix, start in enumerate(starts):
-                if self.settings.resfMode == 'optimal':
-                    tmpUniqueCollisions = solver.getCollisions(tmp_resv['start'], tmp_resv['period'], start, periods[ix], start_max, end, unique=True)
-                    if tmpUniqueCollisions != []:
-                        uniqueCollisions = uniqueCollisions.union(set(tmpUniqueCollisions))
-                elif self.settings.resfMode == 'random' or self.settings.resfMode == 'minimaldelay':
-                    pass
-                elif self.settings.resfMode == 'sum':
-                    nrColls = solver.getCollisions(tmp_resv['start'], tmp_resv['period'], start, periods[ix], start_max,
-                                                 end, unique=False)
-                    if nrColls != []:
-                        totalNrCollisions += nrColls
-                elif self.settings.resfMode == 'average':
-                    nrColls = solver.getCollisions(tmp_resv['start'], tmp_resv['period'], start, periods[ix], start_max,
-                                                 end, unique=False)
-                    if nrColls != []:
-                        totalNrCollisions += nrColls
-                        collisionCounter += 1
-                elif self.settings.resfMode == 'sort':
-                    nrColls = solver.getCollisions(tmp_resv['start'], tmp_resv['period'], start, periods[ix], start_max,
-                                                 end, unique=False)
-                    if nrColls != []:
-                        if nrColls > maxValue:
-                            maxValue = nrColls
-                        totalNrCollisions += nrColls
-
-            if self.settings.resfMode == 'optimal':
-                resv_to_collisions.append((copy.deepcopy(tmp_resv), len(uniqueCollisions)))
-            elif self.settings.resfMode == 'sum':
-                resv_to_collisions.append((copy.deepcopy(tmp_resv), totalNrCollisions))
-            elif self.settings.resfMode == 'random' or self.settings.resfMode == 'minimaldelay':
-                resv_to_collisions.append(copy.deepcopy(tmp_resv))
-            elif self.settings.resfMode == 'average':
-                if collisionCounter > 0:
-                    resv_to_collisions.append((copy.deepcopy(tmp_resv), totalNrCollisions / float(collisionCounter)))
-                else:
-                    resv_to_collisions.append((copy.deepcopy(tmp_resv), 0.0))
-            elif self.settings.resfMode == 'sort':
-                resv_to_collisions.append((copy.deepcopy(tmp_resv), maxValue, totalNrCollisions))
-            else:
-                assert False
+        resv_to_collisions = self._resf_score_reservations(candidates, starts, periods)
 
         resv_list = []
         # sort the list, based on the number of collisions
@@ -405,109 +410,9 @@ class ReSF(object):
         # return [newReservation, newReservation1, newReservation2, newReservation3]
 
     def _resf_calc_response(self, received_resv_list):
-        solver = Solver.CollisionSolver()
-        starts = []
-        periods = []
-
-        # only when we restrict the ellsf part of resf to certain locations, add these backup locations
-        if self.settings.ellsfMode == 'restricted' or self.settings.ellsfMode == 'halfrestricted':
-            for ellsf_slot in self.mote.eLLSF.ELLSF_TIMESLOTS:
-                starts.append(ellsf_slot)
-                periods.append(self.mote.eLLSF.ELLSF_PERIOD)
-
-        for n, l_resv in self.txTuples.iteritems():
-            for resv in l_resv:
-                starts.append(resv['start'])
-                periods.append(resv['period'])
-
-        for n, l_resv in self.rxTuples.iteritems():
-            for resv in l_resv:
-                starts.append(resv['start'])
-                periods.append(resv['period'])
-
-        for n, resfObject in self.txBlockedTuples.iteritems():
-            if len(resfObject) > 0:  # txBlockedTuples can only contain one reservationList dict per neighbor, if so: len(dict) > 0
-                for resv in resfObject['reservationList']:
-                    starts.append(resv['start'])
-                    periods.append(resv['period'])
-                    # if resv['period'] == 400:
-                    #     assert False
-
-        for n, resfObject in self.rxBlockedTuples.iteritems():
-            if len(resfObject) > 0:  # rxBlockedTuples can only contain one reservationList dict per neighbor, if so: len(dict) > 0
-                for resv in resfObject['reservationList']:
-                    starts.append(resv['start'])
-                    periods.append(resv['period'])
-                    # if resv['period'] == 400:
-                    #     assert False
-
-        resv_to_collisions = []
-
-        for r in received_resv_list:
-            # find the LCM
-            lcm = self._resf_find_lcm(periods + [r['period']])
-            # find the maximum start
-            start_max = self._resf_find_start_max(starts + [r['start']])
-            # define the end
-            end = start_max + lcm
-
-            uniqueCollisions = set()
-            totalNrCollisions = 0
-            collisionCounter = 0
-            maxValue = 0
-            # go over every reseration that has to be checked
-            for ix, start in enumerate(starts):
-                if self.settings.resfMode == 'optimal':
-                    tmpUniqueCollisions = solver.getCollisions(r['start'], r['period'], start,
-                                                               periods[ix], start_max, end, unique=True)
-                    if tmpUniqueCollisions != []:
-                        # print '**** START ****'
-                        # print 'r[\'start\'] %.4f' % r['start']
-                        # print 'r[\'period\'] %.4f' % r['period']
-                        # print 'start %.4f' % start
-                        # print 'periods[ix] %.4f' % periods[ix]
-                        # print 'start_max %.4f' % start_max
-                        # print 'periods %s' % periods
-                        # print 'lcm %.4f' % lcm
-                        # print 'end %.4f' % end
-                        # print '**** STOP ****'
-                        uniqueCollisions = uniqueCollisions.union(set(tmpUniqueCollisions))
-                elif self.settings.resfMode == 'sum':
-                    nrColls = solver.getCollisions(r['start'], r['period'], start, periods[ix], start_max,
-                                                   end, unique=False)
-                    if nrColls != []:
-                        totalNrCollisions += nrColls
-                elif self.settings.resfMode == 'random' or self.settings.resfMode == 'minimaldelay':
-                    pass
-                elif self.settings.resfMode == 'average':
-                    nrColls = solver.getCollisions(r['start'], r['period'], start, periods[ix], start_max,
-                                                   end, unique=False)
-                    if nrColls != []:
-                        totalNrCollisions += nrColls
-                        collisionCounter += 1
-                elif self.settings.resfMode == 'sort':
-                    nrColls = solver.getCollisions(r['start'], r['period'], start, periods[ix], start_max,
-                                                   end, unique=False)
-                    if nrColls != []:
-                        if nrColls > maxValue:
-                            maxValue = nrColls
-                        totalNrCollisions += nrColls
+        (starts, periods) = self._resf_get_reserved()
 
-            if self.settings.resfMode == 'optimal':
-                resv_to_collisions.append((copy.deepcopy(r), len(uniqueCollisions)))
-            elif self.settings.resfMode == 'sum':
-                resv_to_collisions.append((copy.deepcopy(r), totalNrCollisions))
-            elif self.settings.resfMode == 'random' or self.settings.resfMode == 'minimaldelay':
-                resv_to_collisions.append(copy.deepcopy(r))
-            elif self.settings.resfMode == 'average':
-                if collisionCounter > 0:
-                    resv_to_collisions.append((copy.deepcopy(r), totalNrCollisions / float(collisionCounter)))
-                else:
-                    resv_to_collisions.append((copy.deepcopy(r), 0.0))
-            elif self.settings.resfMode == 'sort':
-                resv_to_collisions.append((copy.deepcopy(r), maxValue, totalNrCollisions))
-            else:
-                assert False
+        resv_to_collisions = self._resf_score_reservations([dict(r) for r in received_resv_list], starts, periods)
 
         # sort the list, based on the number of collisions
         if self.settings.resfMode == 'optimal' or self.settings.resfMode == 'sum' or self.settings.resfMode == 'average':
@@ -577,17 +482,19 @@ class ReSF(object):
         if self._resf_isFound(resf['uniqueId'], Mote.DIR_TX) == self.RESF_FOUND:
             # self._resf_removeTuples(newDir, resf['uniqueId'], neighbor)
             self._resf_removeTuples(newDir, resf['uniqueId'])
-            self._log(
-                self.INFO,
-                '[ReSF] updated ReSF reservation from {0} to {1} (at sender side, {3}):\r\n{2}',
-                (self.mote.id, neighbor.id, str(resf), newDir),
-            )
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    '[ReSF] updated ReSF reservation from {0} to {1} (at sender side, {3}):\r\n{2}',
+                    (self.mote.id, neighbor.id, str(resf), newDir),
+                )
         else:
-            self._log(
-                self.INFO,
-                '[ReSF] add ReSF reservation from {0} to {1} (at sender side, {3}):\r\n{2}',
-                (self.mote.id, neighbor.id, str(resf), newDir),
-            )
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    '[ReSF] add ReSF reservation from {0} to {1} (at sender side, {3}):\r\n{2}',
+                    (self.mote.id, neighbor.id, str(resf), newDir),
+                )
         
         # if the start time already passed, calculate the new 'next' value.
         # this should happen in the reservation, not in a copy of the iteration
@@ -636,17 +543,19 @@ class ReSF(object):
         if self._resf_isFound(resf['uniqueId'], Mote.DIR_RX) == self.RESF_FOUND:
             # self._resf_removeTuples(dir, resf['uniqueId'], neighbor)
             self._resf_removeTuples(dir, resf['uniqueId'])
-            self._log(
-                self.INFO,
-                '[ReSF] updated ReSF reservation from {0} to {1} (at receiver side, {3}):\r\n{2}',
-                (self.mote.id, neighbor.id, str(resf), dir),
-            )
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    '[ReSF] updated ReSF reservation from {0} to {1} (at receiver side, {3}):\r\n{2}',
+                    (self.mote.id, neighbor.id, str(resf), dir),
+                )
         else:
-            self._log(
-                self.INFO,
-                '[ReSF] add ReSF reservation from {0} to {1} (at receiver side, {3}):\r\n{2}',
-                (self.mote.id, neighbor.id, str(resf), dir),
-            )
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    '[ReSF] add ReSF reservation from {0} to {1} (at receiver side, {3}):\r\n{2}',
+                    (self.mote.id, neighbor.id, str(resf), dir),
+                )
 
         # if the start time already passed, calculate the new 'next' value.
         # this should happen in the reservation, not in a copy of the iteration
@@ -672,11 +581,12 @@ class ReSF(object):
         if not self.mote.dagRoot: # forward the request
             self._resf_forward(resf)
         else:
-            self._log(
-                self.INFO,
-                "[ReSF] ReSF reservation {0} arrived at DAG root.",
-                (resf['uniqueId'],)
-            )
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    "[ReSF] ReSF reservation {0} arrived at DAG root.",
+                    (resf['uniqueId'],)
+                )
             # only initial reservations should be considered for resf convergence
             # updates shoud not be considered
             if resf['timestamp'] == 0:
@@ -686,11 +596,12 @@ class ReSF(object):
                 self._resf_converged(orig_mote_id)
 
     def _resf_receive_DELETE_RESPONSE(self, neighbor, receivedDir, resf):
-        self._log(
-            self.INFO,
-            "[ReSF] Received (at sender) ReSF DELETE response from neighbor {0} for ReSF contents: {1}.",
-            (neighbor.id, resf)
-        )
+        if logFlags.info:
+            self._log(
+                self.INFO,
+                "[ReSF] Received (at sender) ReSF DELETE response from neighbor {0} for ReSF contents: {1}.",
+                (neighbor.id, resf)
+            )
 
         # remove all the tuples in TX direction
         for t in resf['tuples']:
@@ -705,11 +616,12 @@ class ReSF(object):
             # self.delayed.append(('delete', resf))
 
     def _resf_receive_DELETE_RESPONSE_ACK(self, neighbor, dir, resf):
-        self._log(
-            self.INFO,
-            "[ReSF] Received (at receiver) ReSF DELETE ACK response from neighbor {0} for ReSF contents: {1}.",
-            (neighbor.id, resf)
-        )
+        if logFlags.info:
+            self._log(
+                self.INFO,
+                "[ReSF] Received (at receiver) ReSF DELETE ACK response from neighbor {0} for ReSF contents: {1}.",
+                (neighbor.id, resf)
+            )
 
         # remove all the tuples in RX direction
         for t in resf['tuples']:
@@ -856,10 +768,18 @@ class ReSF(object):
         backupDuration = self.settings.resfBackupDuration # set the duration of the back up cells to stay alive
         self.mote._sixtop_cell_reservation_request(self.mote.preferredParent, numCells, Mote.DIR_TXRX_SHARED, timeout, backupDuration=backupDuration)
 
-    def _resf_addCells(self, firstASN, lastASN):
+    def _resf_updateCells(self, firstASN, lastASN):
+        """
+        Puts the ReSF cells of the slotframe [firstASN, lastASN] in the schedule, in place of the ones of the previous
+        slotframe. Only the cells that change are removed or added, the ones that stay are kept with their counters.
+        """
         numReSFCells = 0 # number of ReSF cells in next slotframe
         uniqueIDs = []
         self.giveReSFPriority = False # put back to False
+
+        # ReSF cells of this slotframe, ts -> (neighbor, channel, dir, uniqueId), in the order they are added
+        dueCells = OrderedDict()
+
         for neighbor in self.txTuples:
             for txTuple in self.txTuples[neighbor]:
                 while firstASN <= txTuple['next'] <= lastASN:
@@ -869,55 +789,69 @@ class ReSF(object):
                     #     "[ReSF] On mote {0}, adding ReSF TX cell [uniqueId = {1}, period = {2}, next = {3}], firstASN {4}, lastASN {5}.",
                     #     (self.mote.id, txTuple['uniqueId'], txTuple['period'], txTuple['next'], firstASN, lastASN)
                     # )
-                    self.mote._tsch_addCells(neighbor, [(txTuple['next'] % self.settings.slotframeLength, txTuple['channel'], Mote.DIR_TX)], resf=True, resfUniqueId=txTuple['uniqueId'])
+                    self._resf_addDueCell(dueCells, neighbor, txTuple, Mote.DIR_TX)
                     txTuple['next'] += txTuple['period']
 
-        if self.settings.resfAllocateExtra == 1:
-            extraAllocatedCells = 0
-            if self.mote.preferredParent in self.mote.numCellsToNeighbors:
-                extraAllocatedCells = self.mote.numCellsToNeighbors[self.mote.preferredParent]
-            if self.settings.convergeFirst and \
-                self.engine.asn >= self.engine.asnInitExperiment and \
-                self.engine.asn <= self.engine.asnEndExperiment and \
-                not self.mote.dagRoot:
-
-                currentNumCells = (numReSFCells + extraAllocatedCells)
-                reqNumCells = (len(self.mote.txQueue) * (int(math.ceil(self.mote._estimateETX(self.mote.preferredParent)))))
-
-                if currentNumCells < reqNumCells:
-                    # allocating extra cells to clean up packets that are lingering in the queue
-
-                    allocateExtra = reqNumCells - currentNumCells
-
-                    if self.mote.preferredParent.id not in self.allocated or not self.allocated[self.mote.preferredParent.id]:
-                        self._log(
-                            self.INFO,
-                            "[ReSF] Allocating extra cells: {0} ({3} and {4}) < {1}, allocating {2} extra cells.",
-                            (currentNumCells, reqNumCells, allocateExtra, numReSFCells, extraAllocatedCells),
-                        )
-                        # print self.allocateExtra
-                        self._resf_allocateExtraCells(allocateExtra)
-                        self.toAllocateCells += allocateExtra
-                        self.allocated[self.mote.preferredParent.id] = True
-                    else:
-                        self._log(
-                            self.INFO,
-                            "[ReSF] Should allocate extra cells: {0} < {1}, need {2} extra cells. Already allocated extra {3} cells.",
-                            (currentNumCells, reqNumCells, allocateExtra, extraAllocatedCells)
-                        )
-
-        for neighbor in self.rxTuples:
-            for rxTuple in self.rxTuples[neighbor]:
-                while firstASN <= rxTuple['next'] <= lastASN:
-                    # self._log(
-                    #     self.DEBUG,
-                    #     "[ReSF] On mote {0}, adding ReSF RX cell [uniqueId = {1}, period = {2}, next = {3}], firstASN {4}, lastASN {5}.",
-                    #     (self.mote.id, rxTuple['uniqueId'], rxTuple['period'], rxTuple['next'], firstASN, lastASN)
-                    # )
-                    uniqueIDs.append(rxTuple['uniqueId'])
-                    self.mote._tsch_addCells(neighbor, [(rxTuple['next'] % self.settings.slotframeLength, rxTuple['channel'], Mote.DIR_RX)], resf=True, resfUniqueId=rxTuple['uniqueId'])
-                    rxTuple['next'] += rxTuple['period']
-        expectedReSFpackets = len(list(set(uniqueIDs)))
+        # the cells are rescheduled once, at the end of the batch
+        with self.mote.scheduleBatch():
+            if self.settings.resfAllocateExtra == 1:
+                # the extra cells are chosen with only the ReSF TX cells in the schedule
+                self._resf_applyDueCells(dueCells)
+                if numReSFCells > 0:
+                    self.mote._tsch_schedule_activeCell()
+
+                extraAllocatedCells = 0
+                if self.mote.preferredParent in self.mote.numCellsToNeighbors:
+                    extraAllocatedCells = self.mote.numCellsToNeighbors[self.mote.preferredParent]
+                if self.settings.convergeFirst and \
+                    self.engine.asn >= self.engine.asnInitExperiment and \
+                    self.engine.asn <= self.engine.asnEndExperiment and \
+                    not self.mote.dagRoot:
+
+                    currentNumCells = (numReSFCells + extraAllocatedCells)
+                    reqNumCells = (len(self.mote.txQueue) * (int(math.ceil(self.mote._estimateETX(self.mote.preferredParent)))))
+
+                    if currentNumCells < reqNumCells:
+                        # allocating extra cells to clean up packets that are lingering in the queue
+
+                        allocateExtra = reqNumCells - currentNumCells
+
+                        if self.mote.preferredParent.id not in self.allocated or not self.allocated[self.mote.preferredParent.id]:
+                            if logFlags.info:
+                                self._log(
+                                    self.INFO,
+                                    "[ReSF] Allocating extra cells: {0} ({3} and {4}) < {1}, allocating {2} extra cells.",
+                                    (currentNumCells, reqNumCells, allocateExtra, numReSFCells, extraAllocatedCells),
+                                )
+                            # print self.allocateExtra
+                            self._resf_allocateExtraCells(allocateExtra)
+                            self.toAllocateCells += allocateExtra
+                            self.allocated[self.mote.preferredParent.id] = True
+                        else:
+                            if logFlags.info:
+                                self._log(
+                                    self.INFO,
+                                    "[ReSF] Should allocate extra cells: {0} < {1}, need {2} extra cells. Already allocated extra {3} cells.",
+                                    (currentNumCells, reqNumCells, allocateExtra, extraAllocatedCells)
+                                )
+
+            for neighbor in self.rxTuples:
+                for rxTuple in self.rxTuples[neighbor]:
+                    while firstASN <= rxTuple['next'] <= lastASN:
+                        # self._log(
+                        #     self.DEBUG,
+                        #     "[ReSF] On mote {0}, adding ReSF RX cell [uniqueId = {1}, period = {2}, next = {3}], firstASN {4}, lastASN {5}.",
+                        #     (self.mote.id, rxTuple['uniqueId'], rxTuple['period'], rxTuple['next'], firstASN, lastASN)
+                        # )
+                        uniqueIDs.append(rxTuple['uniqueId'])
+                        self._resf_addDueCell(dueCells, neighbor, rxTuple, Mote.DIR_RX)
+                        rxTuple['next'] += rxTuple['period']
+            expectedReSFpackets = len(list(set(uniqueIDs)))
+
+            self._resf_applyDueCells(dueCells)
+            if (self.settings.resfAllocateExtra == 1 and uniqueIDs) or (self.settings.resfAllocateExtra != 1 and (numReSFCells > 0 or uniqueIDs)):
+                # the next active cell may have changed
+                self.mote._tsch_schedule_activeCell()
 
         if self.settings.resfPriority == 1:
             extraAllocatedCells = 0
@@ -964,28 +898,54 @@ class ReSF(object):
     #                 uniqueIDs.append(rxTuple['uniqueId'])
     #     expectedReSFpackets = len(list(set(uniqueIDs)))
 
-    def _resf_removeCells(self):
+    def _resf_addDueCell(self, dueCells, neighbor, resfTuple, dir):
+        """ adds the next cell of the tuple to the cells of this slotframe, unless its timeslot is already taken """
+        ts = resfTuple['next'] % self.settings.slotframeLength
+
+        # do not overwrite an already existing cell and give preference to eLLSF cells
+        # in the second case, only do not add it if it is the restricted mode of eLLSF
+        if ts in dueCells or (ts in self.mote.schedule and not self.mote.schedule[ts]['resf']):
+            return
+        if self.settings.ellsfMode == 'restricted' and ts in self.mote.eLLSF.ELLSF_TIMESLOTS:
+            return
+
+        dueCells[ts] = (neighbor, resfTuple['channel'], dir, resfTuple['uniqueId'])
+
+    def _resf_applyDueCells(self, dueCells):
+        """ makes the ReSF cells in the schedule the ones of this slotframe, keeping the ones which do not change """
+        schedule = self.mote.schedule
+        with self.mote.dataLock:
+            # remove the ReSF cells which are not due anymore, or due with another neighbor, channel, direction or tuple
+            for ts in schedule.getTimeslots(Mote.DIR_TX, resf=True) + schedule.getTimeslots(Mote.DIR_RX, resf=True):
+                cell = schedule[ts]
+                if dueCells.get(ts) != (cell['neighbor'], cell['ch'], cell['dir'], cell['resf_unique_id']):
+                    del schedule[ts]
+
+            # add the new ones (the due cells are never on the timeslot of a non-ReSF cell)
+            for ts, (neighbor, channel, dir, uniqueId) in dueCells.items():
+                if ts not in schedule:
+                    schedule[ts] = self.mote._tsch_newCell(channel, dir, neighbor, resf=True, resfUniqueId=uniqueId)
+
+    def _resf_updateBackupCells(self):
         for ts, cell in self.mote.schedule.items():
             if cell['resf']:
-                # self._log(
-                #     self.DEBUG,
-                #     "[ReSF] On mote {0}, removing RESF {2} cell {1}.",
-                #     (self.mote.id, ts, cell['dir'])
-                # )
-                del self.mote.schedule[ts]
+                # the ReSF cells are updated in _resf_updateCells
+                continue
             elif cell['backupDuration'] > 0: # if there are tempory backup cells, decrement them
-                self._log(
-                    self.DEBUG,
-                    "[ReSF - backup] On mote {0}, decrementing backup cell {1} from {2} to {3}.",
-                    (self.mote.id, ts, cell['backupDuration'], (cell['backupDuration'] - 1))
-                )
+                if logFlags.debug:
+                    self._log(
+                        self.DEBUG,
+                        "[ReSF - backup] On mote {0}, decrementing backup cell {1} from {2} to {3}.",
+                        (self.mote.id, ts, cell['backupDuration'], (cell['backupDuration'] - 1))
+                    )
                 self.mote.schedule[ts]['backupDuration'] -= 1
             elif cell['backupDuration'] == 0: # if there is a temporary backup cell that needs to be removed
-                self._log(
-                    self.DEBUG,
-                    "[ReSF - backup] On mote {0}, removing backup cell {1} with backupDuration {2}.",
-                    (self.mote.id, ts, cell['backupDuration'])
-                )
+                if logFlags.debug:
+                    self._log(
+                        self.DEBUG,
+                        "[ReSF - backup] On mote {0}, removing backup cell {1} with backupDuration {2}.",
+                        (self.mote.id, ts, cell['backupDuration'])
+                    )
                 if cell['neighbor'].id in self.allocated:
                     self.allocated[cell['neighbor'].id] = False
                 del self.mote.schedule[ts]
@@ -1011,10 +971,11 @@ class ReSF(object):
                     id = resf['parent_id']
 
                 if self.MAX_BADLINK_DELETES == 0:
-                    self._log(
-                        self.INFO,
-                        "[ReSF] Not trying to resend the ReSF DELETE because MAX_BADLINK_DELETES == 0.",
-                    )
+                    if logFlags.info:
+                        self._log(
+                            self.INFO,
+                            "[ReSF] Not trying to resend the ReSF DELETE because MAX_BADLINK_DELETES == 0.",
+                        )
                 elif id not in self.badLinkDeletes:
                     self.badLinkDeletes[id] = 1
                     self.delayed.append(('delete', resf))
@@ -1101,22 +1062,24 @@ class ReSF(object):
         period = int(float(self.mote.pkPeriod)/float(self.settings.slotDuration))
         uniqueId = '%d_%d_%d' % (self.mote.id, start, period)
         self.tuple = {'start': start,  'period': period, 'next': start, 'uniqueId': uniqueId, 'timestamp': 0}
-        self._log(
-            self.INFO,
-            "[ReSF] Tuple calculation for {0}: dedicated cell convergence = {1}, offset = {2}, startApp = {3}",
-            (self.mote.id, self.engine.getAsn(), offset, self.mote.startApp)
+        if logFlags.info:
+            self._log(
+                self.INFO,
+                "[ReSF] Tuple calculation for {0}: dedicated cell convergence = {1}, offset = {2}, startApp = {3}",
+                (self.mote.id, self.engine.getAsn(), offset, self.mote.startApp)
 
-        )
+            )
 
         sendRequestIndex = self.genReSF.randrange(len(self.ReSFEngine.sendReSFRequestTimes))
         sendRequestTime = self.ReSFEngine.sendReSFRequestTimes[sendRequestIndex]
         del self.ReSFEngine.sendReSFRequestTimes[sendRequestIndex]
 
-        self._log(
-            self.INFO,
-            "[ReSF] Tuple for {0}: {1}, sending request at ASN {2} after this ASN {3}.",
-            (self.mote.id, self.tuple, sendRequestTime, self.engine.getAsn())
-        )
+        if logFlags.info:
+            self._log(
+                self.INFO,
+                "[ReSF] Tuple for {0}: {1}, sending request at ASN {2} after this ASN {3}.",
+                (self.mote.id, self.tuple, sendRequestTime, self.engine.getAsn())
+            )
 
         self.engine.scheduleAtAsn(
             # asn         = self.engine.getAsn() + self.genReSF.randint(1, 6000), # schedule the reservation within the minute
@@ -1144,35 +1107,40 @@ class ReSF(object):
                     terminationDelay = simTime + offset + settlingTime
                     self.engine.terminateSimulation(terminationDelay)
                     self.engine.asnInitExperiment = self.engine.asn + offset + settlingTime
-                    self._log(
-                        self.INFO,
-                        "[ReSF] All ReSF reservations arrived at DAG root.",
-                    )
-                    self._log(
-                        self.INFO,
-                        "Start experiment set at ASN {0}, end experiment at ASN {1}.",
-                        (self.engine.asnInitExperiment, self.engine.asnEndExperiment)
-                    )
+                    if logFlags.info:
+                        self._log(
+                            self.INFO,
+                            "[ReSF] All ReSF reservations arrived at DAG root.",
+                        )
+                    if logFlags.info:
+                        self._log(
+                            self.INFO,
+                            "Start experiment set at ASN {0}, end experiment at ASN {1}.",
+                            (self.engine.asnInitExperiment, self.engine.asnEndExperiment)
+                        )
                     # start enabling the transmissions
                     self.engine.startSending()
                 else:
                     expected_motes = range(1, self.settings.numMotes)
                     missing_motes = [mote for mote in expected_motes if mote not in self.resf_converged]
-                    self._log(
-                        self.INFO,
-                        "[ReSF] {0} ReSF reservations arrived at DAG root: {1}.",
-                        (len(self.resf_converged), self.resf_converged)
-                    )
-                    self._log(
-                        self.INFO,
-                        "[ReSF] missing motes: {0}",
-                        (missing_motes,)
-                    )
-                    self._log(
-                        self.INFO,
-                        "[ReSF] expected motes: {0}",
-                        (expected_motes,)
-                    )
+                    if logFlags.info:
+                        self._log(
+                            self.INFO,
+                            "[ReSF] {0} ReSF reservations arrived at DAG root: {1}.",
+                            (len(self.resf_converged), self.resf_converged)
+                        )
+                    if logFlags.info:
+                        self._log(
+                            self.INFO,
+                            "[ReSF] missing motes: {0}",
+                            (missing_motes,)
+                        )
+                    if logFlags.info:
+                        self._log(
+                            self.INFO,
+                            "[ReSF] expected motes: {0}",
+                            (expected_motes,)
+                        )
             else:
                 assert False # mote can only be added once to ReSF converged motes
         else:
@@ -1199,11 +1167,12 @@ class ReSF(object):
         # print reservation_tuple_dict
 
         for uniqueId, reservation in reservation_tuple_dict.iteritems():
-            self._log(
-                self.INFO,
-                "[ReSF] Trying to send out an existing ReSF reservation (unique id {0}, old pref parent {1}) to a new preferred parent {2}.",
-                (uniqueId, oldPreferredParent.id, self.mote.preferredParent.id)
-            )
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    "[ReSF] Trying to send out an existing ReSF reservation (unique id {0}, old pref parent {1}) to a new preferred parent {2}.",
+                    (uniqueId, oldPreferredParent.id, self.mote.preferredParent.id)
+                )
 
             req_nr_cells = self._resf_calcReqNrCells()
             # print req_nr_cells
@@ -1260,11 +1229,12 @@ class ReSF(object):
 
         # 2) clean up
         for (originator, neighbor, uniqueId) in clean:
-            self._log(
-                self.INFO,
-                "[ReSF] Cleaning up old TX/RX reservations on this mote for reservation {0} coming from neighbor {1}.",
-                (str(uniqueId), neighbor)
-            )
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    "[ReSF] Cleaning up old TX/RX reservations on this mote for reservation {0} coming from neighbor {1}.",
+                    (str(uniqueId), neighbor)
+                )
             # self._log(
             #     self.INFO,
             #     "[ReSF] before::: rxTuples {0}, txTuples {1}.",
@@ -1317,11 +1287,12 @@ class ReSF(object):
             intReqCells = int(math.ceil(reqCells))
 
         nowCells = self.mote.numCellsToNeighbors.get(self.mote.preferredParent, 0)
-        self._log(
-            self.INFO,
-            "[ReSF] Performing ReSF housekeeping for average of the queue = {0} * ETX = {1} = {2} to int {3}, cells to pref parent = {4}",
-            (avg, etxval, reqCells, intReqCells, nowCells)
-        )
+        if logFlags.info:
+            self._log(
+                self.INFO,
+                "[ReSF] Performing ReSF housekeeping for average of the queue = {0} * ETX = {1} = {2} to int {3}, cells to pref parent = {4}",
+                (avg, etxval, reqCells, intReqCells, nowCells)
+            )
 
         cellsToAdd = 0
         if nowCells == 0 or nowCells < intReqCells:
@@ -1409,6 +1380,9 @@ class ReSF(object):
 
     def _log(self,severity,template,params=()):
         
+        if self.engine.eventLog:
+            self.engine.eventLog.record(self.engine.getAsn(),self.mote.id,severity,template,params)
+        
         if severity==self.DEBUG:
             if not log.isEnabledFor(logging.DEBUG):
                 return
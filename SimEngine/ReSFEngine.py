@@ -17,11 +17,14 @@ log.addHandler(NullHandler())
 
 #============================ imports =========================================
 
-import SimEngine
-import SimSettings
+import Simulation
+import EventLog
 
 from collections import OrderedDict
 
+# guards of the log calls, see EventLog.py
+logFlags = EventLog.LogFlags(log)
+
 class ReSFEngine(object):
     
     DEBUG                              = 'DEBUG'
@@ -34,12 +37,15 @@ class ReSFEngine(object):
     _init          = False
     
     def __new__(cls, *args, **kwargs):
+        if kwargs.get('sim') is not None:
+            # owned by a Simulation, not the singleton
+            return super(ReSFEngine,cls).__new__(cls)
         if not cls._instance:
             cls._instance = super(ReSFEngine,cls).__new__(cls, *args, **kwargs)
         return cls._instance
     #===== end singleton
     
-    def __init__(self,failIfNotInit=False):
+    def __init__(self,failIfNotInit=False,sim=None):
         
         if failIfNotInit and not self._init:
             raise EnvironmentError('ReSF singleton not initialized.')
@@ -50,8 +56,10 @@ class ReSFEngine(object):
         self._init = True
         #===== end singleton
         
-        self.engine                    = SimEngine.SimEngine()
-        self.settings                  = SimSettings.SimSettings()
+        if sim is None:
+            sim                        = Simulation.SingletonSimulation()
+        self.engine                    = sim.engine
+        self.settings                  = sim.settings
 
         self.didupdate = False
         self.didupdate2 = False
@@ -61,17 +69,23 @@ class ReSFEngine(object):
         self.reservationSpread = 1000
         self.sendReSFRequestTimes = range(self.reservationSpread, self.reservationSpread * self.settings.numMotes + self.reservationSpread, self.reservationSpread)
         
-        self._log(
-            self.INFO,
-            "[ReSFEngine] Initialized the ReSF engine singleton."
-        )
-
-        for m, resv in self.tuples.iteritems():
+        if logFlags.info:
             self._log(
                 self.INFO,
-                "[ReSFEngine] Mote {0} = (start = {1} period = {2})",
-                (m, resv['start'], resv['period'])
+                "[ReSFEngine] Initialized the ReSF engine singleton."
             )
+
+        for m, resv in self.tuples.iteritems():
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    "[ReSFEngine] Mote {0} = (start = {1} period = {2})",
+                    (m, resv['start'], resv['period'])
+                )
+
+    def destroy(self):
+        self._instance                 = None
+        self._init                     = False
     
     def converged(self):
         for m in self.engine.motes:
@@ -174,10 +188,11 @@ class ReSFEngine(object):
         # if we are in the asn at the beginning of a cycle
         if self.engine.asn % self.settings.slotframeLength == 0:
 
-            self._log(
-                self.INFO,
-                "[ReSFEngine] ---- START SLOTFRAME ----"
-            )
+            if logFlags.info:
+                self._log(
+                    self.INFO,
+                    "[ReSFEngine] ---- START SLOTFRAME ----"
+                )
 
             if self.settings.resfChangeParent == 1 and self.settings.resfChangeParentPolicy == 'keepalive' or self.settings.resfChangeParentPolicy == 'combined':
                 # go through all the keep alive dictionaries and remove reservations if necessary
@@ -185,12 +200,15 @@ class ReSFEngine(object):
                     mote.ReSF._resf_keep_alive_housekeeping()
 
             for mote in self.engine.motes:
-                mote.ReSF._resf_removeCells()
-                mote.ReSF._resf_addCells(self.engine.asn, self.engine.asn + self.settings.slotframeLength - 1)
+                mote.ReSF._resf_updateBackupCells()
+                mote.ReSF._resf_updateCells(self.engine.asn, self.engine.asn + self.settings.slotframeLength - 1)
                 # mote.ReSF._resf_countMSFCells(self.engine.asn, self.engine.asn + self.settings.slotframeLength - 1)
 
     def _log(self,severity,template,params=()):
         
+        if self.engine.eventLog:
+            self.engine.eventLog.record(self.engine.getAsn(),None,severity,template,params)
+        
         if severity==self.DEBUG:
             if not log.isEnabledFor(logging.DEBUG):
                 return
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+"""
+\brief Columnar results of a simulation run, saved as a NumPy .npz file.
+
+The statistics collected at the end of each cycle are kept as one column per
+statistic, the values written at the end of the run as one array per tag,
+indexed by mote id (NaN for motes without a value). The file is loaded with
+numpy.load(), without any parsing:
+
+    results = np.load('output_cpu0_run0.npz')
+    results['cycle.cycle'], results['mote.hopcount'], results['total.PktGen']
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('ResultsWriter')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+import json
+
+import numpy as np
+
+#============================ body ============================================
+
+class ResultsWriter(object):
+
+    def __init__(self, numMotes):
+
+        # store params
+        self.numMotes                  = numMotes
+
+        # local variables
+        self.cycles                    = {} # statistic -> [value per cycle]
+        self.arrays                    = {} # name in the file -> array
+
+    #======================== public ==========================================
+
+    def setSettings(self, settings):
+        """ settings is a dict, stored as a JSON string """
+        self.arrays['settings'] = np.array(json.dumps(settings, sort_keys=True, default=str))
+
+    def addCycle(self, stats):
+        """ the statistics of one cycle, as a dict """
+        for (k, v) in stats.items():
+            if k not in self.cycles:
+                self.cycles[k] = []
+            self.cycles[k] += [v]
+
+    def addMoteValues(self, tag, values, total=None):
+        """ values are (mote id, value) pairs, value None if the mote has none; ids can be strings """
+        array = np.full(self.numMotes, np.nan)
+        for (moteId, value) in values:
+            if value is not None:
+                array[int(moteId)] = value
+        self.arrays['mote.'+tag] = array
+        if total is not None:
+            self.arrays['total.'+tag] = np.array(total)
+
+    def addArray(self, name, values):
+        self.arrays[name] = np.asarray(values)
+
+    def save(self, filename):
+        arrays = dict(self.arrays)
+        for (k, values) in self.cycles.items():
+            if None in values:
+                values = [np.nan if v is None else v for v in values]
+            arrays['cycle.'+k] = np.array(values)
+        with open(filename, 'wb') as f:
+            np.savez(f, **arrays)
@@ -0,0 +1,227 @@
+#!/usr/bin/python
+"""
+\brief TSCH schedule of a mote.
+
+The schedule is a dict indexed by timeslot, containing the cells, as it
+always was. On top of that, it keeps the timeslots in a sorted list and the
+timeslots of the cells indexed by (direction, resf flag) and by (neighbor,
+direction, resf flag). The indexes are updated incrementally when cells are
+added or removed, so finding the next active slot takes O(log n) and the
+per-neighbor cell queries do not scan the whole schedule. It also counts the
+dedicated cells and the transmissions in the non-ReSF cells, for the
+statistics.
+
+The schedules of all motes also register their TX cells in a network-wide
+Occupancy, indexed by (timeslot, channel), to find the other motes
+transmitting in a cell without scanning all the schedules.
+
+Iterating over the schedule gives the cells in the same order as a plain dict
+would, as the schedule is a dict.
+"""
+
+#============================ imports =========================================
+
+import bisect
+
+#============================ body ============================================
+
+class Schedule(dict):
+
+    def __init__(self, cells=None, occupancy=None, owner=None):
+        dict.__init__(self)
+
+        # store params
+        self.occupancy            = occupancy  # Occupancy of the network, or None
+        self.owner                = owner      # the mote of this schedule, as registered in the occupancy
+
+        # local variables
+        self.timeslots            = []   # sorted timeslots of all cells
+        self.byDir                = {}   # (dir, resf) -> set of timeslots
+        self.byNeighbor           = {}   # (neighbor, dir, resf) -> set of timeslots, for unicast cells only
+        self.numDedicated         = 0    # number of unicast non-ReSF cells
+        self.numTx                = 0    # sum of numTx of the non-ReSF cells
+
+        if cells is not None:
+            self.update(cells)
+
+    #======================== dict interface ==================================
+
+    def __setitem__(self, ts, cell):
+        if ts in self:
+            self._unindex(ts, dict.__getitem__(self, ts))
+        dict.__setitem__(self, ts, cell)
+        self._index(ts, cell)
+
+    def __delitem__(self, ts):
+        self._unindex(ts, dict.__getitem__(self, ts))
+        dict.__delitem__(self, ts)
+
+    def pop(self, ts, *default):
+        if ts not in self:
+            return dict.pop(self, ts, *default)
+        cell = dict.__getitem__(self, ts)
+        del self[ts]
+        return cell
+
+    def popitem(self):
+        (ts, cell) = dict.popitem(self)
+        self._unindex(ts, cell)
+        return (ts, cell)
+
+    def setdefault(self, ts, cell=None):
+        if ts not in self:
+            self[ts] = cell
+        return dict.__getitem__(self, ts)
+
+    def update(self, *args, **kwargs):
+        for (ts, cell) in dict(*args, **kwargs).items():
+            self[ts] = cell
+
+    def clear(self):
+        if self.occupancy is not None:
+            for (ts, cell) in self.items():
+                self.occupancy.remove(self.owner, ts, cell)
+        dict.clear(self)
+        self.timeslots            = []
+        self.byDir                = {}
+        self.byNeighbor           = {}
+        self.numDedicated         = 0
+        self.numTx                = 0
+
+    def __reduce__(self):
+        # copy/pickle the cells only, the indexes are rebuilt (the occupancy is pickled with its cells)
+        return (self.__class__, (dict(self),), {'occupancy': self.occupancy, 'owner': self.owner})
+
+    #======================== public ==========================================
+
+    def setNeighbor(self, ts, neighbor):
+        """ change the neighbor of the cell at ts, keeping the indexes up to date """
+
+        cell = dict.__getitem__(self, ts)
+        self._unindex(ts, cell)
+        cell['neighbor'] = neighbor
+        self._index(ts, cell)
+
+    def incrementNumTx(self, ts):
+        """ count a transmission in the cell at ts """
+
+        cell = dict.__getitem__(self, ts)
+        cell['numTx'] += 1
+        if not cell['resf']:
+            self.numTx += 1
+
+    def count(self, dir, resf=None):
+        """ number of cells with that direction, and that resf flag if given """
+
+        resfs = [False, True] if resf is None else [bool(resf)]
+        return sum(len(self.byDir.get((dir, r), ())) for r in resfs)
+
+    def getNextActiveTs(self, tsCurrent):
+        """
+        the timeslot of the next active cell after tsCurrent, wrapping around
+        the slotframe (tsCurrent itself comes last). None if the schedule is
+        empty.
+        """
+
+        if not self.timeslots:
+            return None
+        i = bisect.bisect_right(self.timeslots, tsCurrent)
+        if i < len(self.timeslots):
+            return self.timeslots[i]
+        return self.timeslots[0]
+
+    def getTimeslots(self, dir, neighbor=None, resf=None):
+        """
+        sorted timeslots of the cells with that direction. If given, only the
+        cells to that (unicast) neighbor and/or with that resf flag.
+        """
+
+        resfs = [False, True] if resf is None else [bool(resf)]
+        timeslots = []
+        for r in resfs:
+            if neighbor is None:
+                timeslots += self.byDir.get((dir, r), [])
+            else:
+                timeslots += self.byNeighbor.get((neighbor, dir, r), [])
+        return sorted(timeslots)
+
+    #======================== private =========================================
+
+    def _index(self, ts, cell):
+        if self.occupancy is not None:
+            self.occupancy.add(self.owner, ts, cell)
+        bisect.insort(self.timeslots, ts)
+        self.byDir.setdefault((cell['dir'], bool(cell['resf'])), set()).add(ts)
+        if type(cell['neighbor']) != list:
+            self.byNeighbor.setdefault((cell['neighbor'], cell['dir'], bool(cell['resf'])), set()).add(ts)
+        if not cell['resf']:
+            if type(cell['neighbor']) != list:
+                self.numDedicated += 1
+            self.numTx           += cell['numTx']
+
+    def _unindex(self, ts, cell):
+        if self.occupancy is not None:
+            self.occupancy.remove(self.owner, ts, cell)
+        del self.timeslots[bisect.bisect_left(self.timeslots, ts)]
+        self._discard(self.byDir, (cell['dir'], bool(cell['resf'])), ts)
+        if type(cell['neighbor']) != list:
+            self._discard(self.byNeighbor, (cell['neighbor'], cell['dir'], bool(cell['resf'])), ts)
+        if not cell['resf']:
+            if type(cell['neighbor']) != list:
+                self.numDedicated -= 1
+            self.numTx           -= cell['numTx']
+
+    @staticmethod
+    def _discard(index, key, ts):
+        timeslots = index[key]
+        timeslots.discard(ts)
+        if not timeslots:
+            del index[key]
+
+class Occupancy(object):
+    """
+    The cells of one direction (e.g. TX) of all the schedules of the network,
+    indexed by (timeslot, channel), in the order they were added.
+    """
+
+    def __init__(self, dir):
+
+        # store params
+        self.dir                  = dir
+
+        # local variables
+        self.cells                = {}   # (ts, ch) -> [(mote, cell)]
+
+    #======================== public ==========================================
+
+    def add(self, mote, ts, cell):
+        if cell['dir'] == self.dir:
+            self.cells.setdefault((ts, cell['ch']), []).append((mote, cell))
+
+    def remove(self, mote, ts, cell):
+        if cell['dir'] == self.dir:
+            entries = self.cells[(ts, cell['ch'])]
+            for (i, (m, c)) in enumerate(entries):
+                if m is mote and c is cell:
+                    del entries[i]
+                    break
+            if not entries:
+                del self.cells[(ts, cell['ch'])]
+
+    def getCells(self, ts, ch, resf=None):
+        """ [(mote, cell)] of the cells at (ts, ch), only with that resf flag if given """
+
+        entries = self.cells.get((ts, ch), [])
+        if resf is None:
+            return list(entries)
+        return [(mote, cell) for (mote, cell) in entries if bool(cell['resf']) == bool(resf)]
+
+    def getCollisions(self, resf=None):
+        """ {(ts, ch): [(mote, cell)]} of the (ts, ch) used by at least two motes, only the cells with that resf flag if given """
+
+        returnVal = {}
+        for (ts, ch) in self.cells:
+            entries = self.getCells(ts, ch, resf)
+            if len(entries) >= 2:
+                returnVal[(ts, ch)] = entries
+        return returnVal
@@ -28,12 +28,38 @@ import Topology
 import Mote
 import SimSettings
 import ReSFEngine
+import EventQueue
+import LinkMatrix
+import MoteCounters
+import Schedule
+import Profiler
+import Trace
+import EventLog
+import Checkpoint
+import Simulation
 import numpy as np
 import math
 import copy
 
 #============================ defines =========================================
 
+#============================ helpers =========================================
+
+class NoLock(object):
+    """ a lock which does nothing, for the components of a headless simulation """
+
+    def acquire(self, blocking=True):
+        return True
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
 #============================ body ============================================
 
 class SimEngine(threading.Thread):
@@ -43,12 +69,15 @@ class SimEngine(threading.Thread):
     _init          = False
 
     def __new__(cls, *args, **kwargs):
+        if kwargs.get('sim') is not None:
+            # owned by a Simulation, not the singleton
+            return super(SimEngine,cls).__new__(cls)
         if not cls._instance:
             cls._instance = super(SimEngine,cls).__new__(cls, *args, **kwargs)
         return cls._instance
     #===== end singleton
 
-    def __init__(self, cpuID=None, runNum=None, failIfNotInit=False):
+    def __init__(self, cpuID=None, runNum=None, failIfNotInit=False, sim=None):
 
         if failIfNotInit and not self._init:
             raise EnvironmentError('SimEngine singleton not initialized.')
@@ -62,6 +91,11 @@ class SimEngine(threading.Thread):
         # store params
         self.cpuID                          = cpuID
         self.runNum                         = runNum
+        if sim is None:
+            sim                             = Simulation.SingletonSimulation()
+        else:
+            sim.engine                      = self
+        self.sim                            = sim
 
         self.rect1 = (0.0, 0.9, 3.0, 1.1)
         self.rect2 = (2.0, 1.9, 5.0, 2.1)
@@ -86,25 +120,48 @@ class SimEngine(threading.Thread):
         self.goalDistanceFromTarget = 0.01
 
         # local variables
-        self.dataLock                       = threading.RLock()
         self.pauseSem                       = threading.Semaphore(0)
         self.simPaused                      = False
         self.goOn                           = True
         self.asn                            = 0
         self.startCb                        = []
         self.endCb                          = []
-        self.events                         = []
-        self.settings                       = SimSettings.SimSettings()
+        self.events                         = EventQueue.EventQueue()
+        self.settings                       = sim.settings
+        # without the GUI, only the engine thread touches the simulation and the locks do nothing (see newLock())
+        self.headless                       = not (hasattr(self.settings, 'gui') and self.settings.gui)
+        self.dataLock                       = self.newLock(reentrant=True)
+        self.eventDrivenPropagation         = hasattr(self.settings, 'eventDrivenPropagation') and self.settings.eventDrivenPropagation == 1
+        self.currentPriority                = 0 # priority of the event being executed
+        self.profiler                       = None
+        if hasattr(self.settings, 'profile') and self.settings.profile == 1:
+            self.profiler                   = Profiler.Profiler()
+        self.tracer                         = None
+        if hasattr(self.settings, 'goldenTrace') and self.settings.goldenTrace == 1:
+            self.tracer                     = Trace.TraceRecorder(sim)
+        self.eventLog                       = None
+        if hasattr(self.settings, 'eventLog') and self.settings.eventLog == 1:
+            self.eventLog                   = EventLog.EventLogRecorder()
+        # the log guards follow the logging configuration, all calls are made for the event log
+        EventLog.refresh(force=self.eventLog is not None)
+        self.started                        = False # True once the start of the run is done, also in a checkpoint
+        self.checkpointAsn                  = None
+        self.checkpointFile                 = None
+        if hasattr(self.settings, 'checkpointAsn') and self.settings.checkpointAsn is not None:
+            self.checkpointAsn              = self.settings.checkpointAsn
         random.seed(self.settings.seed)
         np.random.seed(self.settings.seed)
         self.genMobility = random.Random()
         self.genMobility.seed(self.settings.seed)
-        self.propagation                    = Propagation.Propagation()
+        self.propagation                    = Propagation.Propagation(sim=sim)
         self.ReSFEngine                     = None
         if self.settings.sf == 'resf':
-            self.ReSFEngine                 = ReSFEngine.ReSFEngine()
-        self.motes                          = [Mote.Mote(id) for id in range(self.settings.numMotes)]
-        self.topology                       = Topology.Topology(self.motes)
+            self.ReSFEngine                 = ReSFEngine.ReSFEngine(sim=sim)
+        self.linkMatrix                     = LinkMatrix.LinkMatrix(self.settings.numMotes)
+        self.moteCounters                   = MoteCounters.MoteCounters(self.settings.numMotes)
+        self.txOccupancy                    = Schedule.Occupancy(Mote.DIR_TX)  # TX cells of all motes, by (ts, ch)
+        self.motes                          = [Mote.Mote(id, sim=sim) for id in range(self.settings.numMotes)]
+        self.topology                       = Topology.Topology(self.motes, sim=sim)
         self.topology.createTopology()
 
         # Not valid values. Will be set by the last mote that converged.
@@ -119,6 +176,10 @@ class SimEngine(threading.Thread):
 
         self.motes[0].boot()
 
+        # in event-driven mode, the engine only wakes up at the beginning of the slotframes and when there are events
+        if self.eventDrivenPropagation:
+            self._scheduleSlotframeStart()
+
         # initialize parent class
         threading.Thread.__init__(self)
         self.name                           = 'SimEngine'
@@ -127,10 +188,23 @@ class SimEngine(threading.Thread):
         # destroy the propagation singleton
         self.propagation.destroy()
 
+        # destroy the ReSF engine singleton
+        if self.ReSFEngine is not None:
+            self.ReSFEngine.destroy()
+
         # destroy my own instance
         self._instance                      = None
         self._init                          = False
 
+    def __getstate__(self):
+        # the state of the thread is not part of a checkpoint
+        return dict((k, v) for (k, v) in self.__dict__.items() if not k.startswith('_Thread__'))
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        threading.Thread.__init__(self)
+        self.name                           = 'SimEngine'
+
     #======================== thread ==========================================
 
     def getTrafficPeriod(self):
@@ -151,6 +225,82 @@ class SimEngine(threading.Thread):
         # log
         log.info("thread {0} starting".format(self.name))
 
+        profiler = self.profiler
+        if profiler:
+            profiler.start()
+        tracer = self.tracer
+
+        # a run restored from a checkpoint continues where it was
+        if not self.started:
+            self._startRun()
+            self.started = True
+
+        # consume events until self.goOn is False
+        while self.goOn:
+
+            with self.dataLock:
+
+                # abort simulation when no more events
+                if not self.events:
+                    log.info("end of simulation at ASN={0}".format(self.asn))
+                    break
+
+                # make sure we are in the future
+                (a, b, cb, c) = self.events.peek()
+                if c[1] != '_actionPauseSim':
+                    assert a >= self.asn
+
+                # save the checkpoint between two ASNs, so the resumed run continues with this ASN
+                if self.checkpointAsn is not None and a >= self.checkpointAsn:
+                    self._writeCheckpoint(a)
+
+                # update the current ASN
+                self.asn = a
+
+                # if self.asn == 10000:
+                #     self._actionPauseSim()
+
+                # in event-driven mode, the per-slot work is done by _actionSlotframeStart
+                if not self.eventDrivenPropagation:
+                    self._slotHooks()
+
+                # call callbacks at this ASN
+                while True:
+                    if self.events.peekAsn()!=self.asn:
+                        break
+                    (_,priority,cb,uniqueTag) = self.events.pop()
+                    self.currentPriority = priority
+                    if tracer:
+                        tracer.event(self.asn, priority, uniqueTag, cb)
+                    if profiler:
+                        profiler.callEvent(uniqueTag, cb)
+                    else:
+                        cb()
+
+        # the trace covers the events, not the end callbacks
+        if tracer:
+            tracer.end()
+            self._writeTrace()
+        if self.eventLog:
+            self._writeEventLog()
+
+        # call the end callbacks
+        for cb in self.endCb:
+            if profiler:
+                profiler.call(cb.__name__, cb)
+            else:
+                cb()
+
+        if profiler:
+            profiler.stop()
+            self._writeProfile()
+
+        # log
+        log.info("thread {0} ends".format(self.name))
+
+    def _startRun(self):
+        """ schedule the end of the simulation, pick the traffic of the motes and call the start callbacks """
+
         # schedule the endOfSimulation event if we are not simulating the join process
         if not self.settings.withJoin:
             if not self.settings.convergeFirst:
@@ -219,69 +369,6 @@ class SimEngine(threading.Thread):
         #         "[topology] shortest mote to {0} is {1}.".format(m.id, m.closestNeighbor.id),
         #     )
 
-        # consume events until self.goOn is False
-        while self.goOn:
-
-            with self.dataLock:
-
-                # abort simulation when no more events
-                if not self.events:
-                    log.info("end of simulation at ASN={0}".format(self.asn))
-                    break
-
-                # make sure we are in the future
-                (a, b, cb, c) = self.events[0]
-                if c[1] != '_actionPauseSim':
-                    assert self.events[0][0] >= self.asn
-
-                # update the current ASN
-                self.asn = self.events[0][0]
-
-                # if self.asn == 10000:
-                #     self._actionPauseSim()
-
-                interval = 4
-                newCycle = int(self.getAsn() / self.settings.slotframeLength)
-                index = newCycle / interval
-                if newCycle % interval == 0 and index < len(self.motes) and self.motes[index].isJoined == False:
-                    self.motes[index].boot()
-                    log.info("Booting node {0}".format(index))
-
-                if self.asn % self.settings.slotframeLength == 0:
-                    # rdm = self.propagation.print_random()
-                    # log.info("topology random={0}".format(rdm))
-                    log.info("[6top] ----------- SLOTFRAME BEGIN -----------")
-
-                # only start moving when the experiment started, there is a mobility model and do it at the beginning of every cycle
-                if self.asn > self.asnInitExperiment and self.settings.mobilityModel != 'none' and self.asn % self.settings.slotframeLength == 0:
-                    if self.settings.mobilityModel == 'RWM': # random walk model
-                        for m in self.motes:
-                            if m.id != 0:
-                                m.updateLocation()
-                    elif self.settings.mobilityModel == 'RPGM':
-                        for m in self.motes:
-                            m.updateLocation()
-                    self.topology.updateTopology()
-                    for m in self.motes:
-                        m._tsch_updateMinimalCells() # update the neighbors of the minimal cells
-
-                if self.settings.sf == 'resf':
-                    self.ReSFEngine.action()
-
-                # call callbacks at this ASN
-                while True:
-                    if self.events[0][0]!=self.asn:
-                        break
-                    (_,_,cb,_) = self.events.pop(0)
-                    cb()
-
-        # call the end callbacks
-        for cb in self.endCb:
-            cb()
-
-        # log
-        log.info("thread {0} ends".format(self.name))
-
     #======================== public ==========================================
 
     # called when there is dedicated cell or ReSF convergence
@@ -407,32 +494,32 @@ class SimEngine(threading.Thread):
 
         with self.dataLock:
 
-            # find correct index in schedule
-            i = 0
-            while i<len(self.events) and (self.events[i][0]<asn or (self.events[i][0]==asn and self.events[i][1]<=priority)):
-                i +=1
+            # add to schedule, after the events with the same asn and priority
+            self.events.push(asn,priority,cb,uniqueTag)
 
-            # add to schedule
-            self.events.insert(i,(asn,priority,cb,uniqueTag))
+    def scheduleAtCurrentAsn(self,cb,uniqueTag=None,priority=0):
+        """ schedule an event later in the current ASN, only call this from a callback of the current ASN """
+
+        with self.dataLock:
+            self.events.push(self.asn,priority,cb,uniqueTag)
 
     def removeEvent(self,uniqueTag,exceptCurrentASN=True):
         with self.dataLock:
-            i = 0
-            while i<len(self.events):
-                if self.events[i][3]==uniqueTag and not (exceptCurrentASN and self.events[i][0]==self.asn):
-                    self.events.pop(i)
-                    if uniqueTag[0] == 3 and uniqueTag[1] == '_msf_action_parent_change_retransmission':
-                        self.motes[3]._log(
-                            Mote.INFO,
-                            '[6top] Actual retransmission event is being removed...',
-                        )
-                    if uniqueTag[0] == 3 and uniqueTag[1] == '_msf_action_parent_change_removal':
-                        self.motes[3]._log(
-                            Mote.INFO,
-                            '[6top] Actual removal event is being removed...',
-                        )
-                else:
-                    i += 1
+            if exceptCurrentASN:
+                numRemoved = self.events.remove(uniqueTag,exceptAsn=self.asn)
+            else:
+                numRemoved = self.events.remove(uniqueTag)
+            for _ in range(numRemoved):
+                if uniqueTag[0] == 3 and uniqueTag[1] == '_msf_action_parent_change_retransmission':
+                    self.motes[3]._log(
+                        Mote.INFO,
+                        '[6top] Actual retransmission event is being removed...',
+                    )
+                if uniqueTag[0] == 3 and uniqueTag[1] == '_msf_action_parent_change_removal':
+                    self.motes[3]._log(
+                        Mote.INFO,
+                        '[6top] Actual removal event is being removed...',
+                    )
 
     def scheduleAtEnd(self,cb):
         with self.dataLock:
@@ -454,6 +541,11 @@ class SimEngine(threading.Thread):
     def play(self):
         self._actionResumeSim()
 
+    def checkpointAt(self,asn,filename=None):
+        """ save a checkpoint before the events of the first ASN at or after asn, see Checkpoint.py """
+        self.checkpointAsn  = asn
+        self.checkpointFile = filename
+
     def pauseAtAsn(self,asn):
         if not self.simPaused:
             self.scheduleAtAsn(
@@ -467,8 +559,109 @@ class SimEngine(threading.Thread):
     def getAsn(self):
         return self.asn
 
+    def newLock(self, reentrant=False):
+        """ a lock for a component of this simulation, a NoLock when headless """
+        if self.headless:
+            return NoLock()
+        if reentrant:
+            return threading.RLock()
+        return threading.Lock()
+
     #======================== private =========================================
 
+    def _slotHooks(self):
+        """ work done by the engine at the beginning of a slot, before the callbacks of that ASN """
+
+        self._bootHook()
+
+        if self.asn % self.settings.slotframeLength == 0:
+            # rdm = self.propagation.print_random()
+            # log.info("topology random={0}".format(rdm))
+            log.info("[6top] ----------- SLOTFRAME BEGIN -----------")
+
+        # only start moving when the experiment started, there is a mobility model and do it at the beginning of every cycle
+        if self.asn > self.asnInitExperiment and self.settings.mobilityModel != 'none' and self.asn % self.settings.slotframeLength == 0:
+            self._profiled('mobility', self._moveMotes)
+            self._profiled('updateTopology', self.topology.updateTopology)
+            for m in self.motes:
+                m._tsch_updateMinimalCells() # update the neighbors of the minimal cells
+
+        if self.settings.sf == 'resf':
+            self._profiled('ReSFEngine.action', self.ReSFEngine.action)
+
+    def _bootHook(self):
+        """ boots the mote of this cycle, again at every slot of the cycle until it has joined """
+
+        interval = 4
+        newCycle = int(self.getAsn() / self.settings.slotframeLength)
+        index = newCycle / interval
+        if newCycle % interval == 0 and index < len(self.motes) and self.motes[index].isJoined == False:
+            self.motes[index].boot()
+            log.info("Booting node {0}".format(index))
+
+            # in event-driven mode, wake up at the next slot of the cycle to retry, as the per-slot mode does
+            if self.eventDrivenPropagation and (self.asn + 1) % self.settings.slotframeLength != 0:
+                self.scheduleAtAsn(
+                    asn         = self.asn + 1,
+                    cb          = self._bootHook,
+                    uniqueTag   = (None,'_bootHook'),
+                    priority    = -1,
+                )
+
+    def _moveMotes(self):
+        if self.settings.mobilityModel == 'RWM': # random walk model
+            for m in self.motes:
+                if m.id != 0:
+                    m.updateLocation()
+        elif self.settings.mobilityModel == 'RPGM':
+            for m in self.motes:
+                m.updateLocation()
+
+    def _profiled(self, name, cb):
+        """ call cb, timed under this name if profiling """
+        if self.profiler:
+            self.profiler.call(name, cb)
+        else:
+            cb()
+
+    def _writeProfile(self):
+        table = self.profiler.write(
+            self.settings.getOutputFile('profile'),
+            info = {'cpuID': self.cpuID, 'runNum': self.runNum, 'asn': self.asn},
+        )
+        log.info("profile of run {0}:\n{1}".format(self.runNum, table))
+
+    def _writeTrace(self):
+        filename = self.settings.getOutputFile('trace')
+        digest = self.tracer.write(filename)
+        log.info("trace of run {0} written to {1}, digest {2}".format(self.runNum, filename, digest))
+
+    def _writeEventLog(self):
+        filename = self.settings.getOutputFile('events')
+        self.eventLog.write(filename)
+        log.info("event log of run {0} written to {1}".format(self.runNum, filename))
+
+    def _writeCheckpoint(self, asn):
+        # only once, also not again when the checkpoint is resumed
+        self.checkpointAsn = None
+        filename = self.checkpointFile or self.settings.getOutputFile('checkpoint')
+        self.checkpointFile = None
+        Checkpoint.save(self.sim, filename)
+        log.info("checkpoint of run {0} at ASN {1} written to {2}".format(self.runNum, asn, filename))
+
+    def _actionSlotframeStart(self):
+        """ event-driven mode: called at the first ASN of every slotframe, before all other events """
+        self._slotHooks()
+        self._scheduleSlotframeStart()
+
+    def _scheduleSlotframeStart(self):
+        self.scheduleAtAsn(
+            asn         = (self.asn/self.settings.slotframeLength+1)*self.settings.slotframeLength,
+            cb          = self._actionSlotframeStart,
+            uniqueTag   = (None,'_actionSlotframeStart'),
+            priority    = -1,
+        )
+
     def _actionPauseSim(self):
         if not self.simPaused:
             self.simPaused = True
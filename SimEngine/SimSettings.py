@@ -33,12 +33,15 @@ class SimSettings(object):
     _init          = False
 
     def __new__(cls, *args, **kwargs):
+        if kwargs.get('sim') is not None:
+            # owned by a Simulation, not the singleton
+            return super(SimSettings,cls).__new__(cls)
         if not cls._instance:
             cls._instance = super(SimSettings,cls).__new__(cls, *args, **kwargs)
         return cls._instance
     #===== end singleton
 
-    def __init__(self, cpuID=None, runNum=None, failIfNotInit=False, **kwargs):
+    def __init__(self, cpuID=None, runNum=None, failIfNotInit=False, sim=None, **kwargs):
 
         if failIfNotInit and not self._init:
             raise EnvironmentError('SimSettings singleton not initialized.')
@@ -52,6 +55,7 @@ class SimSettings(object):
         # store params
         self.cpuID                          = cpuID
         self.runNum                         = runNum
+        self._outputDir                     = None # created on the first call to getOutputFile()
 
         self.__dict__.update(kwargs)
 
@@ -60,25 +64,48 @@ class SimSettings(object):
 
     def setCombinationKeys(self,combinationKeys):
         self.combinationKeys = combinationKeys
-
-    def getOutputFile(self):
-        # directory
-        dirname   = os.path.join(
-            self.simDataDir,
-            '_'.join(['{0}_{1}'.format(k,getattr(self,k)) for k in self.combinationKeys]),
-        )
-        if not os.path.exists(dirname):
-            os.makedirs(dirname)
+        self._outputDir      = None
+
+    def getOutputFile(self,extension='dat'):
+        # directory, created once, naming it does not count as a read of the settings (see watchSettings)
+        if self._outputDir is None:
+            dirname   = os.path.join(
+                self.simDataDir,
+                '_'.join(['{0}_{1}'.format(k,self.__dict__[k]) for k in self.combinationKeys]),
+            )
+            try:
+                os.makedirs(dirname)
+            except OSError:
+                # already created, possibly by another run of the same combination
+                if not os.path.isdir(dirname):
+                    raise
+            self._outputDir  = dirname
 
         # file
         if self.cpuID==None:
-            tempname         = 'output.dat'
+            tempname         = 'output'
         else:
-            tempname         = 'output_cpu{0}.dat'.format(self.cpuID)
-        datafilename         = os.path.join(dirname,tempname)
+            tempname         = 'output_cpu{0}'.format(self.cpuID)
+        if extension!='dat':
+            # one file per run
+            tempname        += '_run{0}'.format(self.runNum)
+        datafilename         = os.path.join(self._outputDir,'{0}.{1}'.format(tempname,extension))
 
         return datafilename
 
+    def watchSettings(self,keys,cb):
+        """ call cb(key) the first time one of these settings is read, cb may change the settings before they are read """
+        cls                  = type(self)
+        def read(self,key):
+            self.__class__   = cls
+            cb(key)
+            return getattr(self,key)
+        self.__class__       = type(
+            'Watched'+cls.__name__,
+            (cls,),
+            dict((k,property(lambda self,k=k: read(self,k))) for k in keys),
+        )
+
     def destroy(self):
         self._instance       = None
         self._init           = False
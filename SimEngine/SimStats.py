@@ -20,9 +20,11 @@ log.addHandler(NullHandler())
 
 #============================ imports =========================================
 
-import SimEngine
-import SimSettings
+from collections import OrderedDict
+
+import Simulation
 import Mote
+import ResultsWriter
 
 #============================ defines =========================================
 
@@ -35,12 +37,15 @@ class SimStats(object):
     _init          = False
 
     def __new__(cls, *args, **kwargs):
+        if kwargs.get('sim') is not None:
+            # owned by a Simulation, not the singleton
+            return super(SimStats,cls).__new__(cls)
         if not cls._instance:
             cls._instance = super(SimStats,cls).__new__(cls, *args, **kwargs)
         return cls._instance
     #===== end singleton
 
-    def __init__(self, cpuID, runNum, verbose):
+    def __init__(self, cpuID, runNum, verbose, outputBuffer=None, sim=None):
 
         #===== start singleton
         if self._init:
@@ -52,10 +57,13 @@ class SimStats(object):
         self.cpuID                          = cpuID
         self.runNum                         = runNum
         self.verbose                        = verbose
+        self.outputBuffer                   = outputBuffer # if a list, the output is appended to it instead of written to the output file
 
         # local variables
-        self.engine                         = SimEngine.SimEngine()
-        self.settings                       = SimSettings.SimSettings()
+        if sim is None:
+            sim                             = Simulation.SingletonSimulation()
+        self.engine                         = sim.engine
+        self.settings                       = sim.settings
 
         # stats
         self.stats                          = {}
@@ -65,6 +73,15 @@ class SimStats(object):
         # schedule bootstrap complete
         self.scheduleBootstrapped           = False
 
+        # output, as text (.dat) and/or columnar (.npz, see ResultsWriter)
+        outputFormat                        = self.settings.outputFormat if hasattr(self.settings,'outputFormat') else 'dat'
+        self.writeDat                       = outputFormat in ['dat','both']
+        self.outputFile                     = None # .dat file, open during the run
+        self.results                        = None
+        if outputFormat in ['npz','both']:
+            self.results                    = ResultsWriter.ResultsWriter(self.settings.numMotes)
+            self.results.setSettings(dict((k,v) for (k,v) in self.settings.__dict__.items() if not k.startswith('_')))
+
         # start file
         if self.runNum==0:
             self._fileWriteHeader()
@@ -84,10 +101,28 @@ class SimStats(object):
         )
 
     def destroy(self):
+        self._fileClose()
+
         # destroy my own instance
         self._instance                      = None
         self._init                          = False
 
+    def settingsChanged(self):
+        """ the settings were changed during the run (see runSim.py --forkSweep), write them again """
+        if self.results is not None:
+            self.results.setSettings(dict((k,v) for (k,v) in self.settings.__dict__.items() if not k.startswith('_')))
+        if self.runNum==0 and self.writeDat:
+            assert self.outputBuffer is not None
+            lines = self.outputBuffer[1:]
+            self._fileWriteHeader()
+            self.outputBuffer.extend(lines)
+
+    def __getstate__(self):
+        # the output file is opened again, to append, after a checkpoint is resumed
+        state = dict(self.__dict__)
+        state['outputFile'] = None
+        return state
+
     #======================== private =========================================
 
     def _actionStart(self):
@@ -269,19 +304,28 @@ class SimStats(object):
 
         self.numCycles = int(self.engine.getAsn()/self.settings.slotframeLength)
         self._fileWriteTopology()
+        self._fileClose()
+        if self.results is not None:
+            self.results.save(self.settings.getOutputFile('npz'))
 
     #=== collecting statistics
 
     def _collectSumMoteStats(self):
-        returnVal = {}
 
+        # the counters of all motes are summed per column, and reset
+        moteCounters     = self.engine.moteCounters
+        returnVal        = moteCounters.sums(moteCounters.snapshot())
+
+        # the other statistics are summed in the order of the motes
+        cycleStats       = {}
         for mote in self.engine.motes:
-            moteStats        = mote.getMoteStats()
-            if not returnVal:
-                returnVal    = moteStats
+            moteStats        = mote.getCycleStats()
+            if not cycleStats:
+                cycleStats   = moteStats
             else:
-                for k in returnVal.keys():
-                    returnVal[k] += moteStats[k]
+                for k in cycleStats.keys():
+                    cycleStats[k] += moteStats[k]
+        returnVal.update(cycleStats)
 
         return returnVal
 
@@ -293,43 +337,25 @@ class SimStats(object):
         numBootstrappedMotes = 0
         dagRoot = None
         for mote in self.engine.motes:
-            if len(mote.getTxCells()) > 0:
+            if mote.schedule.count(Mote.DIR_TX, resf=False) > 0:
                 numBootstrappedMotes += 1
             if mote.dagRoot is True:
                 dagRoot = mote
 
         if numBootstrappedMotes == len(self.engine.motes) - 1 and self.scheduleBootstrapped is False:
-            dagRoot._log(dagRoot.INFO, "[bootstrap] complete, all motes have at least one TX cell.")
+            dagRoot._log(Mote.INFO, "[bootstrap] complete, all motes have at least one TX cell.")
             self.scheduleBootstrapped = True
 
         # compute the number of schedule collisions
 
         # Note that this cannot count past schedule collisions which have been relocated by 6top
         # as this is called at the end of cycle
-        scheduleCollisions = 0
-        txCells = []
-        for mote in self.engine.motes:
-            for (ts,cell) in mote.schedule.items():
-                (ts,ch) = (ts,cell['ch'])
-                if cell['dir'] == Mote.DIR_TX and not cell['resf']:
-                    if (ts,ch) in txCells:
-                        scheduleCollisions += 1
-                    else:
-                        txCells += [(ts,ch)]
+        # the TX cells of all motes are indexed by (ts,ch) in the occupancy of the engine
+        collisions = self.engine.txOccupancy.getCollisions(resf=False)
+        scheduleCollisions = sum([len(cells)-1 for cells in collisions.values()])
 
         # collect collided links
-        txLinks = {}
-        for mote in self.engine.motes:
-            for (ts,cell) in mote.schedule.items():
-                if cell['dir'] == Mote.DIR_TX and not cell['resf']:
-                    (ts,ch) = (ts,cell['ch'])
-                    (tx,rx) = (mote,cell['neighbor'])
-                    if (ts,ch) in txLinks:
-                        txLinks[(ts,ch)] += [(tx,rx)]
-                    else:
-                        txLinks[(ts,ch)]  = [(tx,rx)]
-
-        collidedLinks = [txLinks[(ts,ch)] for (ts,ch) in txLinks if len(txLinks[(ts,ch)])>=2]
+        collidedLinks = [[(tx,cell['neighbor']) for (tx,cell) in cells] for cells in collisions.values()]
 
         # compute the number of Tx in schedule collision cells
         collidedTxs = 0
@@ -371,10 +397,16 @@ class SimStats(object):
         output         += ['\n']
         output          = '\n'.join(output)
 
-        with open(self.settings.getOutputFile(),'w') as f:
-            f.write(output)
+        self._fileWrite(output,'w')
 
     def _fileWriteStats(self,stats):
+        if self.engine.tracer:
+            self.engine.tracer.cycle(stats)
+        if self.results is not None:
+            self.results.addCycle(stats)
+        if not self.writeDat:
+            return
+
         output          = []
 
         # columnNames
@@ -396,8 +428,39 @@ class SimStats(object):
         output += ['  '+formatString.format(*tuple(vals))]
 
         # write to file
-        with open(self.settings.getOutputFile(),'a') as f:
-            f.write('\n'.join(output))
+        self._fileWrite('\n'.join(output),'a')
+
+    def _fileWrite(self,output,mode):
+        if not self.writeDat:
+            return
+        if self.outputBuffer is None:
+            # keep the file open for the whole run
+            if self.outputFile is None or mode=='w':
+                self._fileClose()
+                self.outputFile = open(self.settings.getOutputFile(),mode)
+            self.outputFile.write(output)
+        else:
+            if mode=='w':
+                del self.outputBuffer[:]
+            self.outputBuffer.append(output)
+
+    def _fileClose(self):
+        if self.outputFile is not None:
+            self.outputFile.close()
+            self.outputFile = None
+
+    def _moteValuesLine(self,tag,values,fmt='{0}@{1}',total=None):
+        """ the '#tag runNum=N id@value ...' line for these (mote id, value) pairs, also added to the columnar results """
+        if self.results is not None:
+            self.results.addMoteValues(tag,values,total)
+        line  = '#{0} runNum={1} {2}'.format(
+            tag,
+            self.runNum,
+            ' '.join([fmt.format(moteId,value) for (moteId,value) in values])
+        )
+        if total is not None:
+            line += ' {0}'.format(total)
+        return line
 
     def _fileWriteTopology(self):
         output  = []
@@ -407,7 +470,12 @@ class SimStats(object):
                 ' '.join(['{0}@({1:.5f},{2:.5f})@{3}'.format(mote.id,mote.x,mote.y,mote.rank) for mote in self.engine.motes])
             )
         ]
-        links = {}
+        if self.results is not None:
+            self.results.addMoteValues('x',    [(mote.id,mote.x) for mote in self.engine.motes])
+            self.results.addMoteValues('y',    [(mote.id,mote.y) for mote in self.engine.motes])
+            self.results.addMoteValues('rank', [(mote.id,mote.rank) for mote in self.engine.motes])
+        # in mote order, so the output does not depend on where the motes sit in memory
+        links = OrderedDict()
         for m in self.engine.motes:
             for n in self.engine.motes:
                 if m==n:
@@ -424,15 +492,15 @@ class SimStats(object):
                 ' '.join(['{0}-{1}@{2:.0f}dBm@{3:.3f}'.format(moteA.id,moteB.id,rssi,pdr) for ((moteA,moteB),(rssi,pdr)) in links.items()])
             )
         ]
+        if self.results is not None:
+            self.results.addArray('link.moteA', [moteA.id for (moteA,moteB) in links.keys()])
+            self.results.addArray('link.moteB', [moteB.id for (moteA,moteB) in links.keys()])
+            self.results.addArray('link.rssi',  [rssi for (rssi,pdr) in links.values()])
+            self.results.addArray('link.pdr',   [pdr for (rssi,pdr) in links.values()])
         cycles = self.numCycles
         if self.settings.convergeFirst:
             cycles = int((self.engine.asnEndExperiment - self.engine.asnInitExperiment) / self.settings.slotframeLength)
-        output += [
-            '#aveChargePerCycle runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1:.2f}'.format(mote.id,mote.getMoteStats()['chargeConsumed']/float(cycles)) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('aveChargePerCycle', [(mote.id,mote.chargeConsumed/float(cycles)) for mote in self.engine.motes], fmt='{0}@{1:.2f}')]
 
         hopcnt = {}
         for mote in self.engine.motes:
@@ -444,12 +512,7 @@ class SimStats(object):
             while m.preferredParent.id != 0:
                 hopcnt[mote.id] += 1
                 m = m.preferredParent
-        output += [
-            '#hopcount runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id,hopcnt[mote.id]) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('hopcount', [(mote.id, hopcnt[mote.id]) for mote in self.engine.motes])]
 
         pp = {}
         for mote in self.engine.motes:
@@ -457,12 +520,7 @@ class SimStats(object):
                 pp[mote.id] = None
                 continue
             pp[mote.id] = mote.preferredParent.id
-        output += [
-            '#prefParent runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id,pp[mote.id]) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('prefParent', [(mote.id, pp[mote.id]) for mote in self.engine.motes])]
 
         children = {}
         for mote in self.engine.motes:
@@ -470,123 +528,83 @@ class SimStats(object):
         for mote in self.engine.motes:
             if mote.preferredParent != None:
                 children[mote.preferredParent.id] += 1
-        output += [
-            '#children runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, children[mote.id]) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('children', [(mote.id, children[mote.id]) for mote in self.engine.motes])]
 
         parrivedToGen = 0
         for mote in self.engine.motes:
-            parrivedToGen = parrivedToGen + mote.getMoteStats()['arrivedToGen']
+            parrivedToGen = parrivedToGen + mote.arrivedToGen
         parrivedToGenDict = {}
         for mote in self.engine.motes:
             if mote.id == 0:
                 parrivedToGenDict[mote] = None
             else:
-                parrivedToGenDict[mote] = mote.getMoteStats()['arrivedToGen']
-        output += [
-            '#PktArrivedToGen runNum={0} {1} {2}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, parrivedToGenDict[mote]) for mote in self.engine.motes]),parrivedToGen
-            )
-        ]
+                parrivedToGenDict[mote] = mote.arrivedToGen
+        output += [self._moteValuesLine('PktArrivedToGen', [(mote.id, parrivedToGenDict[mote]) for mote in self.engine.motes], total=parrivedToGen)]
 
         pnotGenerated = 0
         for mote in self.engine.motes:
-            pnotGenerated = pnotGenerated + mote.getMoteStats()['notGenerated']
+            pnotGenerated = pnotGenerated + mote.notGenerated
         pnotGeneratedDict = {}
         for mote in self.engine.motes:
             if mote.id == 0:
                 pnotGeneratedDict[mote] = None
             else:
-                pnotGeneratedDict[mote] = mote.getMoteStats()['notGenerated']
-        output += [
-            '#PktNotGenerated runNum={0} {1} {2}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, pnotGeneratedDict[mote]) for mote in self.engine.motes]),pnotGenerated
-            )
-        ]
+                pnotGeneratedDict[mote] = mote.notGenerated
+        output += [self._moteValuesLine('PktNotGenerated', [(mote.id, pnotGeneratedDict[mote]) for mote in self.engine.motes], total=pnotGenerated)]
 
         pgen = 0
         for mote in self.engine.motes:
-            pgen = pgen + mote.getMoteStats()['pktGen']
+            pgen = pgen + mote.pktGen
         pgenDict = {}
         for mote in self.engine.motes:
             if mote.id == 0:
                 pgenDict[mote] = None
             else:
-                pgenDict[mote] = mote.getMoteStats()['pktGen']
-        output += [
-            '#PktGen runNum={0} {1} {2}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, pgenDict[mote]) for mote in self.engine.motes]),pgen
-            )
-        ]
+                pgenDict[mote] = mote.pktGen
+        output += [self._moteValuesLine('PktGen', [(mote.id, pgenDict[mote]) for mote in self.engine.motes], total=pgen)]
 
         prec = 0
         for mote in self.engine.motes:
-            prec = prec + mote.getMoteStats()['pktReceived']
+            prec = prec + mote.pktReceived
         precDict = {}
         for mote in self.engine.motes:
             if mote.id != 0:
                 precDict[mote] = None
             else:
-                precDict[mote] = mote.getMoteStats()['pktReceived']
-        output += [
-            '#PktReceived runNum={0} {1} {2}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, precDict[mote]) for mote in self.engine.motes]),prec
-            )
-        ]
+                precDict[mote] = mote.pktReceived
+        output += [self._moteValuesLine('PktReceived', [(mote.id, precDict[mote]) for mote in self.engine.motes], total=prec)]
 
         pqueued = 0
         for mote in self.engine.motes:
-            pqueued = pqueued + mote.getMoteStats()['dataQueueFill']
+            pqueued = pqueued + mote.getDataQueueFill()
         pqueuedDict = {}
         for mote in self.engine.motes:
             if mote.id == 0:
                 pqueuedDict[mote] = None
             else:
-                pqueuedDict[mote] = mote.getMoteStats()['dataQueueFill']
-        output += [
-            '#PktInQueue runNum={0} {1} {2}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, pqueuedDict[mote]) for mote in self.engine.motes]),pqueued
-            )
-        ]
+                pqueuedDict[mote] = mote.getDataQueueFill()
+        output += [self._moteValuesLine('PktInQueue', [(mote.id, pqueuedDict[mote]) for mote in self.engine.motes], total=pqueued)]
 
         pdropqueue = 0
         for mote in self.engine.motes:
-            pdropqueue = pdropqueue + mote.getMoteStats()['pktDropQueue']
+            pdropqueue = pdropqueue + mote.pktDropQueue
         pdropqueueDict = {}
         for mote in self.engine.motes:
             if mote.id == 0:
                 pdropqueueDict[mote] = None
             else:
-                pdropqueueDict[mote] = mote.getMoteStats()['pktDropQueue']
-        output += [
-            '#PktDropsQueue runNum={0} {1} {2}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, pdropqueueDict[mote]) for mote in self.engine.motes]),pdropqueue
-            )
-        ]
+                pdropqueueDict[mote] = mote.pktDropQueue
+        output += [self._moteValuesLine('PktDropsQueue', [(mote.id, pdropqueueDict[mote]) for mote in self.engine.motes], total=pdropqueue)]
         pdropmac = 0
         for mote in self.engine.motes:
-            pdropmac = pdropmac + mote.getMoteStats()['pktDropMac']
+            pdropmac = pdropmac + mote.pktDropMac
         pdropmacDict = {}
         for mote in self.engine.motes:
             if mote.id == 0:
                 pdropmacDict[mote] = None
             else:
-                pdropmacDict[mote] = mote.getMoteStats()['pktDropMac']
-        output += [
-            '#PktDropsMac runNum={0} {1} {2}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, pdropmacDict[mote]) for mote in self.engine.motes]),pdropmac
-            )
-        ]
+                pdropmacDict[mote] = mote.pktDropMac
+        output += [self._moteValuesLine('PktDropsMac', [(mote.id, pdropmacDict[mote]) for mote in self.engine.motes], total=pdropmac)]
 
         print 'parrived'
         print parrivedToGen
@@ -620,132 +638,37 @@ class SimStats(object):
         #     d = self.engine.motes[0].pktLatencies[mote]
         #     avgLatencies[mote] = float(sum(d)) / float(len(d)) if len(d) > 0 else None
         # avgLatencies[0] = None # set it to zero for stats
-        output += [
-            '#PktLatencies runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote, avgLatencies[mote]) for mote in avgLatencies])
-            )
-        ]
+        output += [self._moteValuesLine('PktLatencies', [(mote, avgLatencies[mote]) for mote in avgLatencies])]
 
-        output += [
-            '#nrSleep runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalSleep) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('nrSleep', [(mote.id, mote.totalSleep) for mote in self.engine.motes])]
 
-        output += [
-            '#nrIdle runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalIdle) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#nrIdleNotSync runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalIdleNotSync) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#nrTxDataRxAck runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalTxDataRxAck) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#nrTxDataRxNack runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalTxDataRxNack) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#nrTxData runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalTxData) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#nrTxDataNoAck runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalTxDataNoAck) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#nrRxDataTxAck runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalRxDataTxAck) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#nrRxData runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.totalRxData) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('nrIdle', [(mote.id, mote.totalIdle) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('nrIdleNotSync', [(mote.id, mote.totalIdleNotSync) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('nrTxDataRxAck', [(mote.id, mote.totalTxDataRxAck) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('nrTxDataRxNack', [(mote.id, mote.totalTxDataRxNack) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('nrTxData', [(mote.id, mote.totalTxData) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('nrTxDataNoAck', [(mote.id, mote.totalTxDataNoAck) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('nrRxDataTxAck', [(mote.id, mote.totalRxDataTxAck) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('nrRxData', [(mote.id, mote.totalRxData) for mote in self.engine.motes])]
 
-        output += [
-            '#pkPeriod runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.pkPeriod) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('pkPeriod', [(mote.id, mote.pkPeriod) for mote in self.engine.motes])]
 
-        output += [
-            '#resfCellsTotal runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.resfCellsTotal) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('resfCellsTotal', [(mote.id, mote.resfCellsTotal) for mote in self.engine.motes])]
 
-        output += [
-            '#resfCellsTx runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.resfCellsTx) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('resfCellsTx', [(mote.id, mote.resfCellsTx) for mote in self.engine.motes])]
 
-        output += [
-            '#resfCellsNoTx runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.resfCellsNoTx) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('resfCellsNoTx', [(mote.id, mote.resfCellsNoTx) for mote in self.engine.motes])]
 
-        output += [
-            '#activeDAO runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.activeDAO) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('activeDAO', [(mote.id, mote.activeDAO) for mote in self.engine.motes])]
 
-        output += [
-            '#initiatedDAO runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.initiatedDAO) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('initiatedDAO', [(mote.id, mote.initiatedDAO) for mote in self.engine.motes])]
 
-        output += [
-            '#receivedDAO runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.receivedDAO) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('receivedDAO', [(mote.id, mote.receivedDAO) for mote in self.engine.motes])]
 
         if self.settings.sf == 'resf':
-            output += [
-                '#toAllocateCells runNum={0} {1}'.format(
-                    self.runNum,
-                    ' '.join(['{0}@{1}'.format(mote.id, mote.ReSF.toAllocateCells) for mote in self.engine.motes])
-                )
-            ]
-
-            output += [
-                '#haveAllocatedCells runNum={0} {1}'.format(
-                    self.runNum,
-                    ' '.join(['{0}@{1}'.format(mote.id, mote.ReSF.haveAllocatedCells) for mote in self.engine.motes])
-                )
-            ]
+            output += [self._moteValuesLine('toAllocateCells', [(mote.id, mote.ReSF.toAllocateCells) for mote in self.engine.motes])]
+
+            output += [self._moteValuesLine('haveAllocatedCells', [(mote.id, mote.ReSF.haveAllocatedCells) for mote in self.engine.motes])]
 
         if not all(mote.isConverged == True for mote in self.engine.motes):
             converged = len([mote.id for mote in self.engine.motes if mote.isConverged == True])
@@ -753,12 +676,7 @@ class SimStats(object):
             msg = 'Not all nodes have a dedicated cell converged. Only %d out of %d nodes have a cell.' % (converged, total)
             raise ValueError(msg)
 
-        output += [
-            '#dedicatedCellConvergence runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.isConvergedASN) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('dedicatedCellConvergence', [(mote.id, mote.isConvergedASN) for mote in self.engine.motes])]
 
         if self.settings.sf == 'resf':
             if len(self.engine.motes[0].ReSF.resfReachedRoot) < (len(self.engine.motes) - 1):
@@ -767,19 +685,9 @@ class SimStats(object):
                 msg = 'Not all nodes ReSF converged. Only %d out of %d nodes converged in time.' % (converged, total)
                 raise ValueError(msg)
 
-            output += [
-                '#resfConvergence runNum={0} {1}'.format(
-                    self.runNum,
-                    ' '.join(['{0}@{1}'.format(mote, self.engine.motes[0].ReSF.resfReachedRoot[mote]) for mote in self.engine.motes[0].ReSF.resfReachedRoot])
-                )
-            ]
+            output += [self._moteValuesLine('resfConvergence', [(mote, self.engine.motes[0].ReSF.resfReachedRoot[mote]) for mote in self.engine.motes[0].ReSF.resfReachedRoot])]
 
-        output += [
-            '#rplPrefParentChurn runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.rplPrefParentChurns) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('rplPrefParentChurn', [(mote.id, mote.rplPrefParentChurns) for mote in self.engine.motes])]
 
         numberActualParentChanges = {}
         avgDurationParentChange = {}
@@ -787,66 +695,20 @@ class SimStats(object):
             numberActualParentChanges[mote.id] = len(mote.rplPrefParentASNDiffs)
             avgDurationParentChange[mote.id] = float(sum(mote.rplPrefParentASNDiffs)) / float(len(mote.rplPrefParentASNDiffs)) if len(mote.rplPrefParentASNDiffs) > 0 else None
 
-        output += [
-            '#numberActualParentChanges runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, numberActualParentChanges[mote.id]) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#avgDurationParentChange runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, avgDurationParentChange[mote.id]) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('numberActualParentChanges', [(mote.id, numberActualParentChanges[mote.id]) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('avgDurationParentChange', [(mote.id, avgDurationParentChange[mote.id]) for mote in self.engine.motes])]
 
-        output += [
-            '#oldPrefParentRemoval runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.oldPrefParentRemoval) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('oldPrefParentRemoval', [(mote.id, mote.oldPrefParentRemoval) for mote in self.engine.motes])]
 
         # sixtop stats
-        output += [
-            '#sixtopTxAddReq runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.sixtopTxAddReq) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#sixtopTxAddResp runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.sixtopTxAddResp) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#sixtopTxDelReq runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.sixtopTxDelReq) for mote in self.engine.motes])
-            )
-        ]
-        output += [
-            '#sixtopTxDelResp runNum={0} {1}'.format(
-                self.runNum,
-                ' '.join(['{0}@{1}'.format(mote.id, mote.sixtopTxDelResp) for mote in self.engine.motes])
-            )
-        ]
+        output += [self._moteValuesLine('sixtopTxAddReq', [(mote.id, mote.sixtopTxAddReq) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('sixtopTxAddResp', [(mote.id, mote.sixtopTxAddResp) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('sixtopTxDelReq', [(mote.id, mote.sixtopTxDelReq) for mote in self.engine.motes])]
+        output += [self._moteValuesLine('sixtopTxDelResp', [(mote.id, mote.sixtopTxDelResp) for mote in self.engine.motes])]
 
         if self.settings.withJoin:
-            output += [
-                '#join runNum={0} {1}'.format(
-                    self.runNum,
-                    ' '.join(['{0}@{1}'.format(mote.id, mote.joinAsn) for mote in self.engine.motes])
-                )
-            ]
-            output += [
-                '#firstBeacon runNum={0} {1}'.format(
-                    self.runNum,
-                    ' '.join(['{0}@{1}'.format(mote.id, mote.firstBeaconAsn) for mote in self.engine.motes])
-                )
-            ]
+            output += [self._moteValuesLine('join', [(mote.id, mote.joinAsn) for mote in self.engine.motes])]
+            output += [self._moteValuesLine('firstBeacon', [(mote.id, mote.firstBeaconAsn) for mote in self.engine.motes])]
         output  = '\n'.join(output)
 
-        with open(self.settings.getOutputFile(),'a') as f:
-            f.write(output)
+        self._fileWrite(output,'a')
@@ -0,0 +1,95 @@
+#!/usr/bin/python
+"""
+\brief A simulation run and its components.
+
+A Simulation owns the settings, engine, statistics, propagation and ReSF
+engine of a run. The motes, topology and scheduling functions reach the other
+components through the Simulation they belong to, not through the singletons,
+so independent runs can be created one after the other in the same process.
+
+Creating SimSettings and SimEngine directly (as the tests do) still gives the
+process-wide singletons; their components then see a SingletonSimulation.
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('Simulation')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+import SimSettings
+import SimEngine
+import SimStats
+
+#============================ body ============================================
+
+class Simulation(object):
+
+    def __init__(self, cpuID=None, runNum=None, verbose=False, outputBuffer=None, startTime=None, combinationKeys=None, watchSettings=None, **kwargs):
+
+        # store params
+        self.cpuID                     = cpuID
+        self.runNum                    = runNum
+
+        # create the components, in the order of their dependencies
+        self.engine                    = None
+        self.stats                     = None
+        self.settings                  = SimSettings.SimSettings(cpuID=cpuID, runNum=runNum, sim=self, **kwargs)
+        if startTime is not None:
+            self.settings.setStartTime(startTime)
+        if combinationKeys is not None:
+            self.settings.setCombinationKeys(combinationKeys)
+        if watchSettings is not None:
+            # (keys, cb), cb(sim, key) is called on the first read, which can be before the engine and stats exist
+            (keys, cb) = watchSettings
+            self.settings.watchSettings(keys, lambda key: cb(self, key))
+        self.engine                    = SimEngine.SimEngine(cpuID=cpuID, runNum=runNum, sim=self)
+        self.stats                     = SimStats.SimStats(cpuID=cpuID, runNum=runNum, verbose=verbose, outputBuffer=outputBuffer, sim=self)
+
+    #======================== public ==========================================
+
+    @property
+    def propagation(self):
+        return self.engine.propagation
+
+    @property
+    def resfEngine(self):
+        return self.engine.ReSFEngine
+
+    def run(self):
+        """ run the simulation until it ends """
+        self.engine.start()
+        self.engine.join()
+
+    def destroy(self):
+        self.stats.destroy()
+        self.engine.destroy()
+        self.settings.destroy()
+
+class SingletonSimulation(object):
+    """
+    The process-wide SimSettings and SimEngine singletons, seen as a Simulation.
+    They are looked up when used, as the settings exist before the engine.
+    """
+
+    @property
+    def settings(self):
+        return SimSettings.SimSettings()
+
+    @property
+    def engine(self):
+        return SimEngine.SimEngine()
+
+    @property
+    def propagation(self):
+        return self.engine.propagation
+
+    @property
+    def resfEngine(self):
+        return self.engine.ReSFEngine
@@ -57,6 +57,118 @@ class CollisionSolver:
             collisions = [start_one + interval_one * (x_zero + n * quotientB) for n in range(n_end_int, n_start_int + 1)]
             return collisions
 
+class CollisionCounter:
+    """
+    Counts the collisions between recurrent reservations (start, period)
+    arithmetically, without building the list of colliding ASNs.
+
+    Two reservations collide at the ASNs t with t = start_one (mod period_one)
+    and t = start_two (mod period_two). By the Chinese remainder theorem these
+    ASNs are either none, or all t = residue (mod lcm). The coefficients of
+    that solution only depend on the pair of periods and are memoized, so
+    each collision count is a few integer operations.
+
+    The counts are the same as CollisionSolver.getCollisions over the window
+    [start_max, end].
+    """
+
+    # above this number of inclusion-exclusion terms, the unique collisions are enumerated
+    MAX_UNION_TERMS = 1 << 16
+
+    def __init__(self):
+        self.crtCache = {}   # (period_one, period_two) -> (gcd, lcm, inverse of period_one/gcd mod period_two/gcd)
+
+    def intersect(self, start_one, interval_one, start_two, interval_two):
+        """ the (residue, modulus) of the ASNs in both sequences, or None if they never collide """
+
+        key = (interval_one, interval_two)
+        if key not in self.crtCache:
+            gcd_val = gcd(interval_one, interval_two)
+            self.crtCache[key] = (gcd_val, interval_one / gcd_val * interval_two, _modInverse(interval_one / gcd_val, interval_two / gcd_val))
+        (gcd_val, lcm, inverse) = self.crtCache[key]
+
+        diff = start_two - start_one
+        if diff % gcd_val != 0:
+            return None
+        k = (diff / gcd_val * inverse) % (interval_two / gcd_val)
+        return ((start_one + interval_one * k) % lcm, lcm)
+
+    @staticmethod
+    def countInWindow(residue, modulus, start_max, end):
+        """ number of t = residue (mod modulus) with start_max <= t <= end """
+        return (end - residue) // modulus - (start_max - 1 - residue) // modulus
+
+    def getCollisions(self, start_one, interval_one, start_two, interval_two, start_max, end):
+        """ number of collisions in [start_max, end], or None if the reservations never collide """
+
+        sol = self.intersect(start_one, interval_one, start_two, interval_two)
+        if sol is None:
+            return None
+        return self.countInWindow(sol[0], sol[1], start_max, end)
+
+    def getUniqueCollisions(self, start, interval, starts, intervals, start_max, end):
+        """
+        number of distinct ASNs in [start_max, end] at which the reservation
+        (start, interval) collides with at least one of the others.
+        """
+
+        # the colliding ASNs with each of the others, without duplicates
+        classes = set()
+        for (start_two, interval_two) in zip(starts, intervals):
+            sol = self.intersect(start, interval, start_two, interval_two)
+            if sol is not None:
+                classes.add(sol)
+
+        # classes with the same modulus and a different residue never overlap,
+        # so at most one of each group is part of an intersection
+        groups = {}
+        for (residue, modulus) in classes:
+            groups.setdefault(modulus, []).append(residue)
+
+        numTerms = 1
+        for residues in groups.values():
+            numTerms *= len(residues) + 1
+        if numTerms > self.MAX_UNION_TERMS:
+            return self._enumerateUniqueCollisions(classes, start_max, end)
+
+        # inclusion-exclusion over all non-empty intersections of classes
+        terms = [(start % interval, interval, 0)]
+        for (modulus, residues) in sorted(groups.items()):
+            newTerms = []
+            for (termResidue, termModulus, size) in terms:
+                for residue in residues:
+                    sol = self.intersect(termResidue, termModulus, residue, modulus)
+                    if sol is not None:
+                        newTerms.append((sol[0], sol[1], size + 1))
+            terms += newTerms
+
+        nrCollisions = 0
+        for (residue, modulus, size) in terms:
+            if size == 0:
+                continue
+            count = self.countInWindow(residue, modulus, start_max, end)
+            nrCollisions += count if size % 2 == 1 else -count
+        return nrCollisions
+
+    def _enumerateUniqueCollisions(self, classes, start_max, end):
+        collisions = set()
+        for (residue, modulus) in classes:
+            first = start_max + (residue - start_max) % modulus
+            collisions.update(xrange(first, end + 1, modulus))
+        return len(collisions)
+
+
+def _modInverse(a, m):
+    """ x with a*x = 1 (mod m), for coprime a and m """
+
+    (old_r, r) = (a % m, m)
+    (old_x, x) = (1, 0)
+    while r != 0:
+        q = old_r / r
+        (old_r, r) = (r, old_r - q * r)
+        (old_x, x) = (x, old_x - q * x)
+    return old_x % m
+
 #
 # solver = CollisionSolver()
 # print solver.getCollisions(1, 25, 2, 5, 25, 5)
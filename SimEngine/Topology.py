@@ -13,9 +13,10 @@ import math
 import random
 import numpy as np
 
-import SimEngine
+import Simulation
 import SimSettings
 import Mote
+import LinkMatrix
 
 
 class NullHandler(logging.Handler):
@@ -30,30 +31,29 @@ log.addHandler(NullHandler())
 
 class Topology(object):
 
-    def __new__(cls, motes):
-        settings = SimSettings.SimSettings()
-        if hasattr(settings, 'topology'):
-            if settings.topology == 'linear':
-                return LinearTopology(motes)
-            elif settings.topology == 'twoBranch':
-                return TwoBranchTopology(motes)
-            elif settings.topology == 'grid':
-                return GridTopology(motes)
-        if not hasattr(settings, 'topology') or settings.topology == 'random':
-            return RandomTopology(motes)
+    def __new__(cls, motes, sim=None):
+        if sim is None:
+            sim = Simulation.SingletonSimulation()
+        return cls.creatorClass(sim.settings)(motes, sim)
 
     @classmethod
-    def rssiToPdr(cls, rssi):
-        settings = SimSettings.SimSettings()
+    def creatorClass(cls, settings=None):
+        """ the TopologyCreator class to use given the simulator settings """
+        if settings is None:
+            settings = SimSettings.SimSettings()
         if hasattr(settings, 'topology'):
             if settings.topology == 'linear':
-                return LinearTopology.rssiToPdr(rssi)
+                return LinearTopology
             elif settings.topology == 'twoBranch':
-                return TwoBranchTopology.rssiToPdr(rssi)
+                return TwoBranchTopology
             elif settings.topology == 'grid':
-                return GridTopology.rssiToPdr(rssi)
+                return GridTopology
         if not hasattr(settings, 'topology') or settings.topology == 'random':
-            return RandomTopology.rssiToPdr(rssi)
+            return RandomTopology
+
+    @classmethod
+    def rssiToPdr(cls, rssi, settings=None):
+        return cls.creatorClass(settings).rssiToPdr(rssi)
 
 
 class TopologyCreator:
@@ -64,8 +64,33 @@ class TopologyCreator:
     TWO_DOT_FOUR_GHZ = 2400000000  # Hz
     SPEED_OF_LIGHT = 299792458     # m/s
 
+    # rssi and pdr relationship obtained by experiment below
+    # http://wsn.eecs.berkeley.edu/connectivity/?dataset=dust
+    RSSI_PDR_TABLE = {
+        -97:    0.0000,  # this value is not from experiment
+        -96:    0.1494,
+        -95:    0.2340,
+        -94:    0.4071,
+        # <-- 50% PDR is here, at RSSI=-93.6
+        -93:    0.6359,
+        -92:    0.6866,
+        -91:    0.7476,
+        -90:    0.8603,
+        -89:    0.8702,
+        -88:    0.9324,
+        -87:    0.9427,
+        -86:    0.9562,
+        -85:    0.9611,
+        -84:    0.9739,
+        -83:    0.9745,
+        -82:    0.9844,
+        -81:    0.9854,
+        -80:    0.9903,
+        -79:    1.0000,  # this value is not from experiment
+    }
+
     @abstractmethod
-    def __init__(self, motes):
+    def __init__(self, motes, sim=None):
         pass
 
     @abstractmethod
@@ -76,6 +101,11 @@ class TopologyCreator:
     def rssiToPdr(cls, rssi):
         pass
 
+    @classmethod
+    def rssiToPdrArray(cls, rssi):
+        """ vectorized rssiToPdr, for an array of RSSI values """
+        return LinkMatrix.interpolatedPdr(rssi, cls.RSSI_PDR_TABLE)
+
     def _computeRSSI(self, mote, neighbor):
         """
         computes RSSI between any two nodes (not only neighbors)
@@ -104,14 +134,106 @@ class TopologyCreator:
 
         return rssi
 
+    def _computeRSSIs(self, mote, neighbors):
+        """
+        vectorized _computeRSSI from mote to each of the neighbors. The random
+        variations are drawn in the order of the neighbors, as calling
+        _computeRSSI for each neighbor would.
+        """
+
+        xs = np.array([neighbor.x for neighbor in neighbors])
+        ys = np.array([neighbor.y for neighbor in neighbors])
+
+        # distance in m
+        distance = 1000*np.sqrt((mote.x - xs)**2 + (mote.y - ys)**2)
+
+        mu = LinkMatrix.pisterHackMeanRssi(
+            distance,
+            txPower       = mote.txPower,
+            txAntennaGain = mote.antennaGain,
+            rxAntennaGain = np.array([neighbor.antennaGain for neighbor in neighbors]),
+        )
+
+        variation = np.array([
+            random.uniform(-self.PISTER_HACK_LOWER_SHIFT/2, self.PISTER_HACK_LOWER_SHIFT/2)
+            for _ in neighbors
+        ])
+
+        return mu + variation
+
     def _computeRSSI_mobility(self, mote, neighbor):
         ''' computes RSSI between any two nodes (not only neighbors) for mobility scenarios applying a 12dB uniform variation'''
 
-        mu = mote.initialRSSI[neighbor]
+        mu = self._getLinkMatrix().initialRssi[mote.id, neighbor.id]
         rssi = random.uniform(-6, 6) + mu
 
         return rssi
 
+    def _getLinkMatrix(self):
+        return self.sim.engine.linkMatrix
+
+    def _placeAndCountStableNeighbors(self, mote, connectedMotes):
+        """
+        compute the RSSI between a newly placed mote and the already connected
+        motes, and return the number of links above STABLE_RSSI.
+        """
+
+        linkMatrix = self._getLinkMatrix()
+        connectedIds = [cm.id for cm in connectedMotes]
+
+        rssi = self._computeRSSIs(mote, connectedMotes)
+
+        # save the intial RSSI values for future use in the mobility models
+        linkMatrix.setSymmetricRSSIs(mote.id, connectedIds, rssi, initial=True)
+
+        return int(np.count_nonzero(rssi > self.STABLE_RSSI))
+
+    def _computeLinks(self):
+        """ compute the PDR and distance between all motes, from their RSSI and location """
+
+        linkMatrix = self._getLinkMatrix()
+        minRssi = np.array([[mote.minRssi] for mote in self.motes])
+        linkMatrix.setPDRFromRSSI(self.rssiToPdrArray, minRssi)
+        linkMatrix.updateDistances(
+            [mote.x for mote in self.motes],
+            [mote.y for mote in self.motes],
+        )
+
+    def _updateLinks_mobility(self):
+        """
+        re-calculate the RSSI and PDR of all links for mobility scenarios, in
+        one go. The result is the same as calling _computeRSSI_mobility for
+        each pair of motes (mote1, mote2), in mote order, and storing the RSSI
+        in both directions.
+        """
+
+        linkMatrix = self._getLinkMatrix()
+        numMotes = len(self.motes)
+        offDiagonal = ~np.eye(numMotes, dtype=bool)
+
+        # the random variations, drawn in the order of the pairs
+        variation = np.zeros((numMotes, numMotes))
+        variation[offDiagonal] = [random.uniform(-6, 6) for _ in xrange(numMotes*(numMotes-1))]
+        rssi = variation + linkMatrix.initialRssi
+
+        # the pair (mote2, mote1) comes after (mote1, mote2) when mote2 > mote1, and overwrites it
+        lower = np.tril(rssi, -1)
+        rssi = lower + lower.T
+        np.fill_diagonal(rssi, np.nan)
+
+        # the PDR is set if the RSSI is above the minRssi of the mote of the pair that came last
+        minRssi = np.tril(np.repeat([[mote.minRssi] for mote in self.motes], numMotes, axis=1), -1)
+        minRssi = minRssi + minRssi.T
+        with np.errstate(invalid='ignore'):
+            pdr = np.where(rssi > minRssi, self.rssiToPdrArray(rssi), 0.0)
+
+        linkMatrix.setAllLinks(rssi, pdr, offDiagonal)
+
+        linkMatrix.updateDistances(
+            [mote.x for mote in self.motes],
+            [mote.y for mote in self.motes],
+        )
+
     def _computePDR(self, mote, neighbor):
         """computes pdr to neighbor according to RSSI"""
 
@@ -139,12 +261,15 @@ class GridTopology(TopologyCreator):
     DISTANCE = 0.1
     # DISTANCE = 0.230
 
-    def __init__(self, motes):
+    def __init__(self, motes, sim=None):
         # store params
         self.motes = motes
+        if sim is None:
+            sim = Simulation.SingletonSimulation()
+        self.sim = sim
 
         # local variables
-        self.settings = SimSettings.SimSettings()
+        self.settings = sim.settings
         random.seed(self.settings.seed)
         np.random.seed(int(self.settings.seed))
 
@@ -268,22 +393,8 @@ class GridTopology(TopologyCreator):
                 #     y = allCoordinates[countMote][1]
                 # )
 
-                numStableNeighbors = 0
-
                 # count number of neighbors with sufficient RSSI
-                for cm in connectedMotes:
-
-                    rssi = self._computeRSSI(mote, cm)
-                    mote.setRSSI(cm, rssi)
-                    cm.setRSSI(mote, rssi)
-
-                    # save the intial RSSI values for future use in the mobility models
-                    mote.initialRSSI[cm] = rssi
-                    cm.initialRSSI[mote] = rssi
-
-                    if rssi > self.STABLE_RSSI:
-                        # print rssi
-                        numStableNeighbors += 1
+                numStableNeighbors = self._placeAndCountStableNeighbors(mote, connectedMotes)
 
                 # make sure it is connected to at least STABLE_NEIGHBORS motes
                 # or connected to all the currently deployed motes when the number of deployed motes
@@ -295,40 +406,19 @@ class GridTopology(TopologyCreator):
             countMote += 1
 
         # for each mote, compute PDR to each neighbors
-        for mote in self.motes:
-            shortestDistance = None
-            for m in self.motes:
-                if mote == m:
-                    continue
-                if mote.getRSSI(m) > mote.minRssi:
-                    pdr = self._computePDR(mote, m)
-                    mote.setPDR(m, pdr)
-                    m.setPDR(mote, pdr)
-                # closest distance
-                dist = self._computeDistance(mote, m)
-                if shortestDistance == None or dist < shortestDistance:
-                    mote.closestNeighbor = m
-                    shortestDistance = dist
+        self._computeLinks()
+
+        # closest distance
+        for (mote, closestId) in zip(self.motes, self._getLinkMatrix().closestNeighborIds()):
+            mote.closestNeighbor = self.motes[closestId]
 
     def updateTopology(self):
         '''
         update topology: re-calculate RSSI values. For scenarios != static
         '''
 
-        for mote1 in self.motes:
-            for mote2 in self.motes:
-                if mote1.id != mote2.id:
-                    rssi = self._computeRSSI_mobility(mote1, mote2)  # the RSSI is calculated with applying a random variation
-                    mote1.setRSSI(mote2, rssi)
-                    mote2.setRSSI(mote1, rssi)
-                    if rssi > mote1.minRssi:
-                        pdr = self.rssiToPdr(rssi)
-                        mote1.setPDR(mote2, pdr)
-                        mote2.setPDR(mote1, pdr)
-                    else:
-                        pdr = 0
-                        mote1.setPDR(mote2, pdr)
-                        mote2.setPDR(mote1, pdr)
+        # the RSSI is calculated with applying a random variation
+        self._updateLinks_mobility()
 
     @classmethod
     def rssiToPdr(cls, rssi):
@@ -337,28 +427,7 @@ class GridTopology(TopologyCreator):
         http://wsn.eecs.berkeley.edu/connectivity/?dataset=dust
         """
 
-        rssiPdrTable = {
-            -97:    0.0000,  # this value is not from experiment
-            -96:    0.1494,
-            -95:    0.2340,
-            -94:    0.4071,
-            # <-- 50% PDR is here, at RSSI=-93.6
-            -93:    0.6359,
-            -92:    0.6866,
-            -91:    0.7476,
-            -90:    0.8603,
-            -89:    0.8702,
-            -88:    0.9324,
-            -87:    0.9427,
-            -86:    0.9562,
-            -85:    0.9611,
-            -84:    0.9739,
-            -83:    0.9745,
-            -82:    0.9844,
-            -81:    0.9854,
-            -80:    0.9903,
-            -79:    1.0000,  # this value is not from experiment
-        }
+        rssiPdrTable = cls.RSSI_PDR_TABLE
 
         # rssiPdrTable = {
         #     -97:    1.0000,  # this value is not from experiment
@@ -412,12 +481,15 @@ class RandomTopology(TopologyCreator):
     # (hack) small value to speed up the construction of fully-meshed topology
     FULLY_MESHED_SQUARE_SIDE = 0.005
 
-    def __init__(self, motes):
+    def __init__(self, motes, sim=None):
         # store params
         self.motes = motes
+        if sim is None:
+            sim = Simulation.SingletonSimulation()
+        self.sim = sim
 
         # local variables
-        self.settings = SimSettings.SimSettings()
+        self.settings = sim.settings
         random.seed(self.settings.seed)
 
         # if fullyMeshed is enabled, create a topology where each node has N-1
@@ -472,8 +544,8 @@ class RandomTopology(TopologyCreator):
 
         if self.settings.mobilityModel == 'RPGM':
             # put DAG root at center of area
-            dagRoot.setLocation(x=SimEngine.SimEngine().targets[0][0],
-                                y=SimEngine.SimEngine().targets[0][1])
+            dagRoot.setLocation(x=self.sim.engine.targets[0][0],
+                                y=self.sim.engine.targets[0][1])
         else:
             # put DAG root at center of area
             dagRoot.setLocation(x=self.squareSide/2,
@@ -520,29 +592,16 @@ class RandomTopology(TopologyCreator):
                     y=self.settings.squareSide * random.random()
                 )
 
-                numStableNeighbors = 0
-
                 # count number of neighbors with sufficient RSSI
-                for cm in connectedMotes:
-
-                    rssi = self._computeRSSI(mote, cm)
-                    mote.setRSSI(cm, rssi)
-                    cm.setRSSI(mote, rssi)
-
-                    # save the intial RSSI values for future use in the mobility models
-                    mote.initialRSSI[cm] = rssi
-                    cm.initialRSSI[mote] = rssi
-
-                    if rssi > self.STABLE_RSSI:
-                        numStableNeighbors += 1
+                numStableNeighbors = self._placeAndCountStableNeighbors(mote, connectedMotes)
 
                 # make sure it is connected to at least stable_neighbors motes
                 # or connected to all the currently deployed motes when the
                 # number of deployed motes are smaller than stable_neighbors
                 if (numStableNeighbors >= self.stable_neighbors or
                    numStableNeighbors == len(connectedMotes)):
-                    print 'moteid %d, mote x %.4f, mote y %.4f: valid %s' % (mote.id, mote.x, mote.y , SimEngine.SimEngine().checkValidPosition(mote.x, mote.y, countSquare=True, placement=True))
-                    if self.settings.mobilityModel == 'RPGM' and SimEngine.SimEngine().checkValidPosition(mote.x, mote.y, countSquare=True, placement=True):
+                    print 'moteid %d, mote x %.4f, mote y %.4f: valid %s' % (mote.id, mote.x, mote.y , self.sim.engine.checkValidPosition(mote.x, mote.y, countSquare=True, placement=True))
+                    if self.settings.mobilityModel == 'RPGM' and self.sim.engine.checkValidPosition(mote.x, mote.y, countSquare=True, placement=True):
                         connected = True
                     elif self.settings.mobilityModel != 'RPGM':
                         connected = True
@@ -553,34 +612,15 @@ class RandomTopology(TopologyCreator):
         # self.motes[0].setRSSI(self.motes[3], -96)
 
         # for each mote, compute PDR to each neighbors
-        for mote in self.motes:
-            for m in self.motes:
-                if mote == m:
-                    continue
-                if mote.getRSSI(m) > mote.minRssi:
-                    pdr = self._computePDR(mote, m)
-                    mote.setPDR(m, pdr)
-                    m.setPDR(mote, pdr)
+        self._computeLinks()
 
     def updateTopology(self):
         '''
         update topology: re-calculate RSSI values. For scenarios != static
         '''
 
-        for mote1 in self.motes:
-            for mote2 in self.motes:
-                if mote1.id != mote2.id:
-                    rssi = self._computeRSSI_mobility(mote1, mote2)  # the RSSI is calculated with applying a random variation
-                    mote1.setRSSI(mote2, rssi)
-                    mote2.setRSSI(mote1, rssi)
-                    if rssi > mote1.minRssi:
-                        pdr = self.rssiToPdr(rssi)
-                        mote1.setPDR(mote2, pdr)
-                        mote2.setPDR(mote1, pdr)
-                    else:
-                        pdr = 0
-                        mote1.setPDR(mote2, pdr)
-                        mote2.setPDR(mote1, pdr)
+        # the RSSI is calculated with applying a random variation
+        self._updateLinks_mobility()
 
     @classmethod
     def rssiToPdr(cls, rssi):
@@ -589,28 +629,7 @@ class RandomTopology(TopologyCreator):
         http://wsn.eecs.berkeley.edu/connectivity/?dataset=dust
         """
 
-        rssiPdrTable = {
-            -97:    0.0000,  # this value is not from experiment
-            -96:    0.1494,
-            -95:    0.2340,
-            -94:    0.4071,
-            # <-- 50% PDR is here, at RSSI=-93.6
-            -93:    0.6359,
-            -92:    0.6866,
-            -91:    0.7476,
-            -90:    0.8603,
-            -89:    0.8702,
-            -88:    0.9324,
-            -87:    0.9427,
-            -86:    0.9562,
-            -85:    0.9611,
-            -84:    0.9739,
-            -83:    0.9745,
-            -82:    0.9844,
-            -81:    0.9854,
-            -80:    0.9903,
-            -79:    1.0000,  # this value is not from experiment
-        }
+        rssiPdrTable = cls.RSSI_PDR_TABLE
 
         # rssiPdrTable = {
         #     -97:    1.0000,  # this value is not from experiment
@@ -659,10 +678,13 @@ class LinearTopology(TopologyCreator):
 
     COMM_RANGE_RADIUS = 50
 
-    def __init__(self, motes):
+    def __init__(self, motes, sim=None):
 
         self.motes = motes
-        self.settings = SimSettings.SimSettings()
+        if sim is None:
+            sim = Simulation.SingletonSimulation()
+        self.sim = sim
+        self.settings = sim.settings
 
     def createTopology(self):
 
@@ -677,10 +699,8 @@ class LinearTopology(TopologyCreator):
 
         for mote in self.motes:
 
-            # clear RSSI and PDR table; we may need clearRSSI and clear PDR
-            # methods
-            mote.RSSI = {}
-            mote.PDR = {}
+            # clear RSSI and PDR table
+            self._getLinkMatrix().clearLinks(mote.id)
 
             for neighbor in self.motes:
                 if mote == neighbor:
@@ -804,9 +824,12 @@ class TwoBranchTopology(TopologyCreator):
 
     COMM_RANGE_RADIUS = 50
 
-    def __init__(self, motes):
+    def __init__(self, motes, sim=None):
         self.motes = motes
-        self.settings = SimSettings.SimSettings()
+        if sim is None:
+            sim = Simulation.SingletonSimulation()
+        self.sim = sim
+        self.settings = sim.settings
         self.depth = int(math.ceil((float(len(self.motes)) - 2) / 2) + 1)
         if len(self.motes) < 2:
             self.switch_to_right_branch = 2
@@ -835,9 +858,8 @@ class TwoBranchTopology(TopologyCreator):
                 m.y = 0.03
 
         for mote in self.motes:
-            # clear RSSI and PDR table; we may need clearRSSI and clearPDR methods
-            mote.RSSI = {}
-            mote.PDR = {}
+            # clear RSSI and PDR table
+            self._getLinkMatrix().clearLinks(mote.id)
 
             for neighbor in self.motes:
                 if mote == neighbor:
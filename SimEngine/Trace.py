@@ -0,0 +1,207 @@
+#!/usr/bin/python
+"""
+\brief Golden traces of simulation runs, to check that a change of the engine
+does not change the results.
+
+Enabled with --goldenTrace 1. The engine then records every event it executes
+as (asn, priority, mote, callback), and at the end of each cycle the digests
+of the events of the cycle, of its row of statistics and of the state of all
+random streams (random, numpy.random and the random.Random of the engine,
+propagation, motes and ReSF instances). At the end of the run, the trace is
+written next to the output file (output_cpuN_runM.trace, gzipped JSON).
+
+compare() finds the first difference between two traces: the first cycle of
+which a digest differs, and in it the first event which differs. See
+bin/compareTraces.py.
+"""
+
+#============================ logging =========================================
+
+import logging
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+log = logging.getLogger('Trace')
+log.setLevel(logging.ERROR)
+log.addHandler(NullHandler())
+
+#============================ imports =========================================
+
+import gzip
+import json
+import zlib
+import random
+import hashlib
+
+import numpy as np
+
+#============================ defines =========================================
+
+VERSION = 1
+
+# settings which do not change the simulation
+IGNORED_SETTINGS = ['simDataDir', 'startTime', 'combinationKeys', 'numCores', 'numRuns', 'gui', 'json', 'profile', 'goldenTrace', 'checkpointAsn', 'forkSweep', 'debugStats', 'eventLog']
+
+#============================ helpers =========================================
+
+def _digest(value):
+    return hashlib.sha1(repr(value)).hexdigest()[:16]
+
+def _randomStates(sim):
+    """ a summary of the state of all random streams of a simulation """
+    owners = [sim.engine, sim.propagation]
+    for mote in sim.engine.motes:
+        owners += [mote]
+        if getattr(mote, 'ReSF', None) is not None:
+            owners += [mote.ReSF]
+    # (hash(None) differs between processes, it is not hashed)
+    gens    = [random]
+    for owner in owners:
+        gens += [gen for (name, gen) in sorted(vars(owner).items()) if isinstance(gen, random.Random)]
+    states  = [(hash(state[1]), state[2]) for state in [gen.getstate() for gen in gens]]
+    states += [zlib.crc32(np.random.get_state()[1].tostring())]
+    return states
+
+#============================ body ============================================
+
+class TraceRecorder(object):
+
+    def __init__(self, sim):
+
+        # store params
+        self.sim                       = sim
+
+        # local variables
+        self.names                     = [] # callback names
+        self.nameIndex                 = {} # callback name -> index in names
+        self.events                    = [] # [asn, priority, mote, index of the name]
+        self.cycles                    = []
+        self.cycleStart                = 0 # index in events of the first event of the current cycle
+
+    #======================== public ==========================================
+
+    def event(self, asn, priority, uniqueTag, cb):
+        """ record an event, before it is executed """
+        if uniqueTag:
+            (owner, name) = uniqueTag[0], uniqueTag[1]
+        else:
+            (owner, name) = None, getattr(cb, '__name__', str(cb))
+        index = self.nameIndex.get(name)
+        if index is None:
+            index = self.nameIndex[name] = len(self.names)
+            self.names.append(name)
+        event = [asn, priority, owner, index]
+        self.events.append(event)
+
+    def cycle(self, stats):
+        """ record the end of a cycle, with its row of statistics """
+        self._endCycle(_digest(sorted(stats.items())))
+
+    def end(self):
+        """ record the events after the last cycle """
+        if len(self.events) > self.cycleStart:
+            self._endCycle(None)
+
+    def getTrace(self):
+        settings = dict(
+            (k, v) for (k, v) in vars(self.sim.settings).items()
+            if not k.startswith('_') and k not in IGNORED_SETTINGS and isinstance(v, (int, long, float, str, unicode, type(None)))
+        )
+        return {
+            'version':     VERSION,
+            'settings':    settings,
+            'names':       self.names,
+            'events':      self.events,
+            'cycles':      self.cycles,
+            'digest':      _digest([c['digest'] for c in self.cycles]),
+        }
+
+    def write(self, filename):
+        """ write the trace to filename, returns its digest """
+        trace = self.getTrace()
+        f = gzip.open(filename, 'wb')
+        try:
+            json.dump(trace, f, separators=(',', ':'), sort_keys=True)
+        finally:
+            f.close()
+        return trace['digest']
+
+    #======================== private =========================================
+
+    def _eventsDigest(self, events):
+        return hashlib.sha1(''.join(
+            repr((asn, priority, owner, self.names[index])) for (asn, priority, owner, index) in events
+        )).hexdigest()[:16]
+
+    def _endCycle(self, statsDigest):
+        cycle = {
+            'asn':         self.sim.engine.getAsn(),
+            'numEvents':   len(self.events)-self.cycleStart,
+            'events':      self._eventsDigest(self.events[self.cycleStart:]),
+            'stats':       statsDigest,
+            'random':      _digest(_randomStates(self.sim)),
+        }
+        cycle['digest'] = _digest([cycle['events'], cycle['stats'], cycle['random']])
+        self.cycles.append(cycle)
+        self.cycleStart  = len(self.events)
+
+#============================ reading and comparing ===========================
+
+def read(filename):
+    f = gzip.open(filename, 'rb')
+    try:
+        return json.load(f)
+    finally:
+        f.close()
+
+def _event(trace, index):
+    """ the event at this index of a trace, as a dict """
+    if index >= len(trace['events']):
+        return None
+    (asn, priority, owner, name) = trace['events'][index]
+    return {'asn': asn, 'priority': priority, 'mote': owner, 'callback': trace['names'][name]}
+
+def compare(golden, trace):
+    """
+    Find the first difference between two traces.
+    :return: None if they are the same, else a dict with the cycle, the ASN and
+             what differs ('events', 'stats' or 'random'), and for events the
+             first event which differs in both traces
+    :rtype: dict
+    """
+    numEvents = 0
+    for (cycleNum, (a, b)) in enumerate(zip(golden['cycles'], trace['cycles'])):
+        if a['digest'] != b['digest']:
+            if a['events'] != b['events'] or a['numEvents'] != b['numEvents']:
+                index = numEvents
+                while (index < numEvents+max(a['numEvents'], b['numEvents']) and
+                        _event(golden, index) == _event(trace, index)):
+                    index += 1
+                (goldenEvent, traceEvent) = (_event(golden, index), _event(trace, index))
+                asn = min([e['asn'] for e in [goldenEvent, traceEvent] if e is not None] or [a['asn']])
+                return {'cycle': cycleNum, 'asn': asn, 'what': 'events', 'golden': goldenEvent, 'trace': traceEvent}
+            what = 'stats' if a['stats'] != b['stats'] else 'random'
+            return {'cycle': cycleNum, 'asn': a['asn'], 'what': what}
+        numEvents += a['numEvents']
+    if len(golden['cycles']) != len(trace['cycles']):
+        cycleNum = min(len(golden['cycles']), len(trace['cycles']))
+        (goldenEvent, traceEvent) = (_event(golden, numEvents), _event(trace, numEvents))
+        asn = min([e['asn'] for e in [goldenEvent, traceEvent] if e is not None] or [(golden['cycles'] or trace['cycles'])[-1]['asn']])
+        return {'cycle': cycleNum, 'asn': asn, 'what': 'events', 'golden': goldenEvent, 'trace': traceEvent}
+    return None
+
+def formatDivergence(divergence):
+    if divergence is None:
+        return 'the traces are the same'
+    if divergence['what'] == 'events':
+        output  = ['first divergent event in cycle {cycle}, at ASN {asn}:'.format(**divergence)]
+        for k in ['golden', 'trace']:
+            e = divergence[k]
+            if e is None:
+                output += ['  {0:<7} no more events'.format(k)]
+            else:
+                output += ['  {0:<7} ASN {asn} priority {priority} mote {mote} {callback}'.format(k, **e)]
+        return '\n'.join(output)
+    if divergence['what'] == 'stats':
+        return 'the statistics of cycle {cycle} (ASN {asn}) differ, with the same events'.format(**divergence)
+    return 'the random streams diverged during cycle {cycle} (before ASN {asn}), with the same events and statistics'.format(**divergence)
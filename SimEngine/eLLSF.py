@@ -20,8 +20,6 @@ log.addHandler(NullHandler())
 import random
 import math
 
-import SimEngine
-import SimSettings
 import Mote
 
 from collections import OrderedDict
@@ -39,8 +37,8 @@ class eLLSF(object):
 
     def __init__(self, mote):
         
-        self.engine                    = SimEngine.SimEngine()
-        self.settings                  = SimSettings.SimSettings()
+        self.engine                    = mote.engine
+        self.settings                  = mote.settings
 
         self.geneLLSF = random.Random()
         self.geneLLSF.seed(self.settings.seed + mote.id)
@@ -23,9 +23,6 @@ log.addHandler(NullHandler())
 import Tkinter
 import threading
 
-from SimEngine import SimEngine, \
-                      SimSettings
-
 #============================ defines =========================================
 
 #============================ body ============================================
@@ -62,11 +59,11 @@ class PlayPauseFrame(Tkinter.Frame):
 
     @property
     def engine(self):
-        return SimEngine.SimEngine(failIfNotInit=True)
+        return self.guiParent.getSimulation().engine
 
     @property
     def settings(self):
-        return SimSettings.SimSettings(failIfNotInit=True)
+        return self.guiParent.getSimulation().settings
 
     #======================== private =========================================
 
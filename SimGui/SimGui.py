@@ -46,6 +46,7 @@ class SimGui(Tkinter.Tk):
         self._selectedCell   = None
         self._selectedMote   = None
         self._selectedLink   = None
+        self._simulation     = None
 
         # initialize parent class
         Tkinter.Tk.__init__(self)
@@ -77,6 +78,17 @@ class SimGui(Tkinter.Tk):
         self.statsFrame.close()
         self.destroy()
 
+    def getSimulation(self):
+        """ the simulation shown, raises EnvironmentError between runs """
+        with self.dataLock:
+            if self._simulation is None:
+                raise EnvironmentError('No simulation running.')
+            return self._simulation
+
+    def setSimulation(self, sim):
+        with self.dataLock:
+            self._simulation = sim
+
     @property
     def selectedCell(self):
         with self.dataLock:
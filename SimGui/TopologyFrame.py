@@ -22,9 +22,6 @@ log.addHandler(NullHandler())
 
 import Tkinter
 
-from SimEngine import SimEngine, \
-                      SimSettings
-
 #============================ defines =========================================
 
 #============================ body ============================================
@@ -72,11 +69,11 @@ class TopologyFrame(Tkinter.Frame):
 
     @property
     def engine(self):
-        return SimEngine.SimEngine(failIfNotInit=True)
+        return self.guiParent.getSimulation().engine
 
     @property
     def settings(self):
-        return SimSettings.SimSettings(failIfNotInit=True)
+        return self.guiParent.getSimulation().settings
 
     #======================== private =========================================
 
@@ -0,0 +1,382 @@
+#!/usr/bin/python
+"""
+\brief Performance benchmarks of the simulator on canonical scenarios.
+
+Every scenario is a single fixed-seed run, named
+<topology>_<numMotes>_<sf>_<interference>_<mobility>, e.g.
+grid_50_resf_interf_static. The matrix covers the linear, grid and random
+topologies (those of runSim.py) with 20/50/100/200 motes, MSF, ReSF and eLLSF,
+with and without interference and, for the topologies which support it (grid
+and random), with and without random walk mobility. Each scenario runs until
+its experiment ends, after the convergence of its SF.
+
+Each scenario runs in a new process, with the engine profiler on, and gives
+(the best of --repeat runs):
+- slotsPerSecond: the simulated slots (ASN at the end) per second of wall time
+- numEvents: the number of events processed by the engine
+- peakRssKb: the peak resident set size of the process
+- propagateSeconds: the time spent in PropagationFromModel.propagate
+- resfCalcRequestSeconds: the time spent in ReSF._resf_calc_request
+
+The results are compared to a baseline (benchmarks/baseline.json by default).
+A scenario regresses if it is slower or uses more memory than its baseline by
+more than the tolerance; a different number of events, or an error the
+baseline does not have, means the simulation itself changed (the number of
+events is not compared for scenarios of which the runs do not all process the
+same number of events). Runs which fail are measured up to their error, which
+is kept in the results, but never stored as a baseline. The baseline depends on
+the machine, update it (--update) before comparing the results of a change on
+another machine.
+
+Usage, from the root of the repository:
+    python benchmarks/bench.py --scenarios 'grid_20_*' 'random_50_resf_*'
+    python benchmarks/bench.py --quick --update
+"""
+
+#============================ adjust path =====================================
+
+import os
+import sys
+
+if __name__=='__main__':
+    here = sys.path[0]
+    sys.path.insert(0, os.path.join(here, '..'))
+
+#============================ imports =========================================
+
+import json
+import shutil
+import fnmatch
+import argparse
+import resource
+import tempfile
+import itertools
+import multiprocessing
+
+from SimEngine     import Simulation
+from SimEngine     import Propagation
+from SimEngine     import ReSF
+from bin           import runSim
+
+#============================ defines =========================================
+
+BASELINE_FILE         = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+TOPOLOGIES            = ['linear', 'grid', 'random']
+NUM_MOTES             = [20, 50, 100, 200]
+SFS                   = ['msf', 'resf', 'ellsf']
+INTERFERENCE          = ['interf', 'nointerf']
+MOBILITY              = ['static', 'rwm']
+MOBILE_TOPOLOGIES     = ['grid', 'random'] # the topologies with an updateTopology
+
+# the scenarios of --quick
+QUICK_SCENARIOS       = ['*_20_*_interf_static', 'random_50_*_interf_static', 'grid_20_resf_*_rwm']
+
+# the settings of all scenarios, on top of the defaults of runSim.py
+# ReSF only converges once all reservations, spread over 1000 slots per mote, reached the root
+COMMON_SETTINGS       = {
+    'seed':               1,
+    'numCyclesPerRun':    30,
+    'convergeFirst':      1,
+    'maxToConverge':      3000,
+    'settlingTime':       20,
+    'mobilitySpeed':      2,
+}
+
+# the settings of each SF, on top of COMMON_SETTINGS
+# - MSF and eLLSF only reserve cells to their parent (and converge) with resfNoMSF
+# - ReSF in the default 'optimal' mode runs out of memory on the longer runs
+SF_SETTINGS           = {
+    'msf':                {'resfNoMSF': 'unlimited'},
+    'ellsf':              {'resfNoMSF': 'unlimited'},
+    'resf':               {'resfMode': 'sum'},
+}
+
+# the metrics compared to the baseline, with the direction of a regression and
+# the baseline value below which they are too small to compare
+METRICS               = [
+    ('slotsPerSecond',          -1,     0),
+    ('peakRssKb',               +1,     0),
+    ('propagateSeconds',        +1,     0.1),
+    ('resfCalcRequestSeconds',  +1,     0.1),
+]
+
+# the runs shorter than this (in seconds) are too short to compare their speed
+MIN_SECONDS           = 1.0
+
+# the methods timed by the profiler, besides the events
+TIMED_METHODS         = [
+    ('propagateSeconds',        Propagation.PropagationFromModel, 'propagate'),
+    ('resfCalcRequestSeconds',  ReSF.ReSF,                        '_resf_calc_request'),
+]
+
+#============================ scenarios =======================================
+
+def getScenarios():
+    """ the names of all scenarios, in the order they are run """
+    scenarios = []
+    for (topology, numMotes, sf, interference, mobility) in itertools.product(TOPOLOGIES, NUM_MOTES, SFS, INTERFERENCE, MOBILITY):
+        if mobility != 'static' and topology not in MOBILE_TOPOLOGIES:
+            continue
+        scenarios += ['_'.join([topology, str(numMotes), sf, interference, mobility])]
+    return scenarios
+
+def selectScenarios(patterns):
+    """ the scenarios matching any of the (fnmatch) patterns """
+    return [s for s in getScenarios() if any(fnmatch.fnmatchcase(s, p) for p in patterns)]
+
+def getSettings(scenario):
+    """ the simulation settings of a scenario """
+    (topology, numMotes, sf, interference, mobility) = scenario.split('_')
+
+    settings = runSim.parseCliOptions([])
+    for (k, v) in settings.items():
+        if type(v) == list:
+            settings[k] = v[0]
+    settings.update(COMMON_SETTINGS)
+    settings.update(SF_SETTINGS[sf])
+    settings.update({
+        'topology':           topology,
+        'numMotes':           int(numMotes),
+        'sf':                 sf,
+        'noInterference':     1 if interference == 'nointerf' else 0,
+        'mobilityModel':      'RWM' if mobility == 'rwm' else 'none',
+        'profile':            1,
+    })
+    return settings
+
+#============================ running =========================================
+
+def _timeMethod(profiler, cls, methodName, name):
+    """ time the calls of cls.methodName under this name, returns the original method """
+    method = cls.__dict__[methodName]
+    def timed(self, *args):
+        return profiler.call(name, method, self, *args)
+    setattr(cls, methodName, timed)
+    return method
+
+def _runSimulation(settings):
+    """ run a simulation in this process, returns its metrics """
+
+    sim = Simulation.Simulation(cpuID=0, runNum=0, outputBuffer=[], combinationKeys=[], **settings)
+    profiler = sim.engine.profiler
+    originals = []
+    try:
+        for (name, cls, methodName) in TIMED_METHODS:
+            originals += [(cls, methodName, _timeMethod(profiler, cls, methodName, name))]
+
+        # in this thread (see Simulation.run), to catch the exceptions of the run
+        error = None
+        try:
+            sim.engine.run()
+        except Exception as err:
+            error = '{0}: {1}'.format(type(err).__name__, err)
+
+        summary   = profiler.getSummary()
+        seconds   = dict((e['name'], e['seconds']) for e in summary['entries'])
+        result    = {
+            'asn':                sim.engine.getAsn(),
+            'seconds':            summary['totalSeconds'],
+            'slotsPerSecond':     sim.engine.getAsn()/summary['totalSeconds'],
+            'numEvents':          summary['numEvents'],
+            'peakRssKb':          resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+        for (name, cls, methodName) in TIMED_METHODS:
+            result[name] = seconds.get(name, 0.0)
+        if error:
+            result['error'] = error
+        return result
+    finally:
+        for (cls, methodName, method) in originals:
+            setattr(cls, methodName, method)
+        sim.destroy()
+
+def runScenario(scenario):
+    """ run a scenario in this process, without the prints of the simulator, returns its metrics """
+
+    settings = getSettings(scenario)
+    settings['simDataDir'] = tempfile.mkdtemp(prefix='bench_')
+    stdout = sys.stdout
+    try:
+        sys.stdout = open(os.devnull, 'w')
+        return _runSimulation(settings)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+        shutil.rmtree(settings['simDataDir'], ignore_errors=True)
+
+def bestResult(results):
+    """ the fastest of the runs of a scenario, with the lowest time and memory of all runs """
+    best = dict(max(results, key=lambda r: r['slotsPerSecond']))
+    for metric in ['peakRssKb'] + [name for (name, cls, methodName) in TIMED_METHODS]:
+        best[metric] = min(r[metric] for r in results)
+    best['repeat'] = len(results)
+    best['deterministic'] = len(set(r['numEvents'] for r in results)) == 1
+    return best
+
+def runScenarios(scenarios, repeat=1):
+    """ run each scenario repeat times, each in a new process (for its peak RSS), returns scenario -> metrics """
+    results = {}
+    for scenario in scenarios:
+        runs = []
+        for _ in range(repeat):
+            pool = multiprocessing.Pool(1)
+            try:
+                runs += [pool.apply(runScenario, (scenario,))]
+            finally:
+                pool.close()
+                pool.join()
+        results[scenario] = bestResult(runs)
+        printResult(scenario, results[scenario])
+    return results
+
+#============================ baseline ========================================
+
+def readBaseline(filename):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+def writeBaseline(filename, results):
+    baseline = readBaseline(filename)
+    baseline.update(results)
+    with open(filename, 'w') as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+def compare(results, baseline, tolerance):
+    """
+    Compare the results to the baseline.
+    :return: a list of (scenario, message), one per regression or change
+    """
+    problems = []
+    for (scenario, result) in sorted(results.items()):
+        if scenario not in baseline:
+            continue
+        base = baseline[scenario]
+        if result.get('error') != base.get('error'):
+            problems += [(scenario, 'error changed: {0} -> {1}'.format(base.get('error'), result.get('error')))]
+        if result['numEvents'] != base['numEvents'] and result.get('deterministic', True) and base.get('deterministic', True):
+            problems += [(scenario, 'numEvents changed: {0} -> {1}'.format(base['numEvents'], result['numEvents']))]
+        for (metric, direction, minimum) in METRICS:
+            if not base[metric] or base[metric] < minimum:
+                continue
+            if metric == 'slotsPerSecond' and base['seconds'] < MIN_SECONDS:
+                continue # too short to time
+            change = (result[metric]-base[metric])/float(base[metric])
+            if direction*change > tolerance:
+                problems += [(scenario, '{0} regressed: {1:.4g} -> {2:.4g} ({3:+.1f}%)'.format(metric, base[metric], result[metric], 100*change))]
+    return problems
+
+#============================ output ==========================================
+
+def printResult(scenario, result):
+    print '{0:<36} {1:>10.1f} slots/s {2:>9} events {3:>8} kB  propagate {4:>7.3f}s  resf calc {5:>7.3f}s'.format(
+        scenario,
+        result['slotsPerSecond'],
+        result['numEvents'],
+        result['peakRssKb'],
+        result['propagateSeconds'],
+        result['resfCalcRequestSeconds'],
+    )
+    if not result['deterministic']:
+        print '{0:<36} the runs processed different numbers of events'.format('')
+    if 'error' in result:
+        print '{0:<36} failed with {1}'.format('', result['error'])
+
+#============================ main ============================================
+
+def parseCliOptions(argv=None):
+
+    parser = argparse.ArgumentParser(description='Benchmarks of the simulator on canonical scenarios.')
+    parser.add_argument('--scenarios',
+                        dest='scenarios',
+                        nargs='+',
+                        default=['*'],
+                        help='The scenarios to run, as fnmatch patterns on their names.',
+                        )
+    parser.add_argument('--quick',
+                        dest='quick',
+                        action='store_true',
+                        default=False,
+                        help='Only run a small set of scenarios.',
+                        )
+    parser.add_argument('--list',
+                        dest='list',
+                        action='store_true',
+                        default=False,
+                        help='List the selected scenarios, without running them.',
+                        )
+    parser.add_argument('--repeat',
+                        dest='repeat',
+                        type=int,
+                        default=3,
+                        help='The number of runs of each scenario, the best one is kept.',
+                        )
+    parser.add_argument('--baseline',
+                        dest='baseline',
+                        type=str,
+                        default=BASELINE_FILE,
+                        help='The baseline JSON file.',
+                        )
+    parser.add_argument('--update',
+                        dest='update',
+                        action='store_true',
+                        default=False,
+                        help='Store the results as the baseline of their scenarios.',
+                        )
+    parser.add_argument('--tolerance',
+                        dest='tolerance',
+                        type=float,
+                        default=0.2,
+                        help='The relative change of a metric above which it is a regression.',
+                        )
+    parser.add_argument('--output',
+                        dest='output',
+                        type=str,
+                        default=None,
+                        help='Write the results to this JSON file.',
+                        )
+
+    options = parser.parse_args(argv)
+    return options.__dict__
+
+def main():
+    options = parseCliOptions()
+
+    scenarios = selectScenarios(QUICK_SCENARIOS if options['quick'] else options['scenarios'])
+    if options['list']:
+        print '\n'.join(scenarios)
+        return 0
+
+    results = runScenarios(scenarios, options['repeat'])
+
+    if options['output']:
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if options['update']:
+        failed = [s for s in scenarios if 'error' in results[s]]
+        if failed:
+            print 'baseline not updated, {0} scenarios failed: {1}'.format(len(failed), ' '.join(failed))
+            return 1
+        writeBaseline(options['baseline'], results)
+        print 'baseline of {0} scenarios updated in {1}'.format(len(results), options['baseline'])
+        return 0
+
+    baseline = readBaseline(options['baseline'])
+    missing  = [s for s in scenarios if s not in baseline]
+    if missing:
+        print 'no baseline for {0} scenarios'.format(len(missing))
+
+    problems = compare(results, baseline, options['tolerance'])
+    for (scenario, message) in problems:
+        print 'REGRESSION {0}: {1}'.format(scenario, message)
+    if problems:
+        return 1
+    print 'no regressions in {0} scenarios'.format(len(scenarios)-len(missing))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
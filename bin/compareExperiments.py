@@ -7,6 +7,8 @@ import collections
 import datetime
 import re
 
+import simdata
+
 metrics = {'received': 'Received packets at root', \
            'arrivedToGenerate': 'Total number of packets that were allowed to be generated', \
            'generated': 'Total number of packets generated', \
@@ -19,35 +21,10 @@ metrics = {'received': 'Received packets at root', \
 
 # modes = ['same-axis', 'diff-axis']
 
-def validate(exp_dir):
-    """ Validate the experiment to be really successful."""
-    error_log = '%s/error.log' % exp_dir  # should be empty
-    runSim_log = '%s/runSim.log' % exp_dir  # should be there, should not be empty
-    output_data = '%s/output_cpu0.dat' % exp_dir  # should be there, should not be empty
-    id_pattern = '*.id.txt'  # should only be one file with this id_pattern
-
-    import os
-    if not os.path.exists(error_log) or os.path.getsize(error_log) > 0:
-        print exp_dir
-        raise 'Error log not there or not zero.'
-    if not os.path.exists(runSim_log) or os.path.getsize(runSim_log) == 0:
-        print exp_dir
-        raise 'No runSim log or runSim log is empty.'
-    if not os.path.exists(output_data) or os.path.getsize(output_data) == 0:
-        print exp_dir
-        raise 'No output data or output data is zero.'
-    import fnmatch
-    count_workers = fnmatch.filter(os.listdir(exp_dir), id_pattern)
-    if len(count_workers) > 1:
-        print exp_dir
-        raise 'Multiple workers worked on this.'
-
-
-def getNrMotes(datafile):
-    with open(datafile) as f:
-        for line in f:
-            if '## numMotes =' in line:
-                return int(line.split('=')[1].strip())  # num motes
+# name in the parsed data -> tag in the output file
+moteTags = {'pktReceived': 'PktReceived', 'pktArrivedToGen': 'PktArrivedToGen', 'pktGen': 'PktGen',
+            'pktLatencies': 'PktLatencies', 'pktInQueue': 'PktInQueue', 'pktDropsQueue': 'PktDropsQueue',
+            'pktDropsMac': 'PktDropsMac', 'hopcount': 'hopcount'}
 
 
 def get_set_rgx(experiments, rgx=''):
@@ -63,114 +40,18 @@ def get_set_rgx(experiments, rgx=''):
 
 
 def detectInName(search_parameter, exp_dir):
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(exp_dir, search_parameter)
-    listFiles = os.popen(cmd).read().split("\n")[
-                :-1]  # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(exp_dir, search_parameter)
     rgx = '[_\/]+%s_([A-Za-z0-9]+)_' % search_parameter
     candidates = get_set_rgx(listFiles, rgx)
     return candidates
 
 
-def parseresults(dataDir, parameter, data):
-    print data
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(dataDir, parameter)
-    listFiles = os.popen(cmd).read().split("\n")[:-1]  # for some reason, there is a trailing whitespace in the list, remove it
+def parseresults(dataDir, parameter, numCores=None):
+    listFiles = simdata.find_output_files(dataDir, parameter)
     print "Processing %d file(s) in %s." % (len(listFiles), str(dataDir))
-    for datafile in listFiles:
-        validate(os.path.dirname(datafile))
-
-        pktReceived = {}
-        pktArrivedToGen = {}
-        pktGen = {}
-        pktLatencies = {}
-        pktInQueue = {}
-        pktDropsMac = {}
-        pktDropsQueue = {}
-        hopcount = {}
-
-        # get all the data
-        with open(datafile, 'r') as inF:
-            for line in inF:
-                if '#PktReceived' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktReceived[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktReceived[int(mote.split("@")[0])] = None
-                if '#PktArrivedToGen' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktArrivedToGen[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktArrivedToGen[int(mote.split("@")[0])] = None
-                if '#PktGen' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktGen[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktGen[int(mote.split("@")[0])] = None
-                if '#PktLatencies' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktLatencies[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktLatencies[int(mote.split("@")[0])] = None
-                if '#PktInQueue' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktInQueue[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktInQueue[int(mote.split("@")[0])] = None
-                if '#PktDropsMac' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktDropsMac[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktDropsMac[int(mote.split("@")[0])] = None
-                if '#PktDropsQueue' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktDropsQueue[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktDropsQueue[int(mote.split("@")[0])] = None
-                if '#hopcount' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        hopcount[int(mote.split("@")[0])] = int(mote.split("@")[1])
-
-        if datafile not in data:
-            data[datafile] = []  # make a list of (id, hopcount, consumption) per node per datafile
-
-        numMotes = getNrMotes(datafile)
-
-        # summarize the data
-        for mote in range(0, numMotes):
-            data[datafile].append({'mote': mote, \
-                                   'pktReceived': pktReceived[mote], \
-                                   'pktArrivedToGen': pktArrivedToGen[mote], \
-                                   'pktGen': pktGen[mote], \
-                                   'pktLatencies': pktLatencies[mote], \
-                                   'pktInQueue': pktInQueue[mote], \
-                                   'pktDropsQueue': pktDropsQueue[mote], \
-                                   'pktDropsMac': pktDropsMac[mote], \
-                                   'hopcount': hopcount[mote]})
-
-        if data[datafile][0]['mote'] != 0:  # should be root node
-            assert False
+
+    # one DataFrame with a row per mote per datafile, the experiments are loaded in parallel
+    data = simdata.load_mote_tables(listFiles, moteTags, numCores=numCores, check=True)
 
     cycles = float(list(detectInName('cycles', listFiles[0]))[0])
     for df in listFiles:
@@ -179,96 +60,36 @@ def parseresults(dataDir, parameter, data):
             print '%.4f vs %.4f' % (c, cycles)
             raise 'Different cycles!'
 
-    return cycles, listFiles
+    return data, cycles, listFiles
 
-def calculateReceived(data):
-    outputDictionary = {}
-    for iteration in data:
-        nrReceived = 0
-        for moteList in data[iteration]:
-            if moteList['mote'] == 0:
-                nrReceived += moteList['pktReceived']
-                break
-        outputDictionary[iteration] = nrReceived
+# the sum of the values per iteration (datafile), leaving out the missing ones
+def perIteration(values, data):
+    return dict(values.groupby(data['datafile'], sort=False).sum().items())
 
-    return outputDictionary
+def calculateReceived(data):
+    root = data[data['mote'] == 0]
+    return dict(zip(root['datafile'], root['pktReceived']))
 
 def calculateArrivedToGenerate(data):
-    outputDictionary = {}
-    for iteration in data:
-        nrGenerated = 0
-        for moteList in data[iteration]:
-            if moteList['mote'] != 0:
-                nrGenerated += moteList['pktArrivedToGen']
-        outputDictionary[iteration] = nrGenerated
-
-    return outputDictionary
+    return perIteration(data['pktArrivedToGen'].where(data['mote'] != 0, 0), data)
 
 def calculateGenerate(data):
-    outputDictionary = {}
-    for iteration in data:
-        nrGenerated = 0
-        for moteList in data[iteration]:
-            if moteList['mote'] != 0:
-                nrGenerated += moteList['pktGen']
-        outputDictionary[iteration] = nrGenerated
-
-    return outputDictionary
+    return perIteration(data['pktGen'].where(data['mote'] != 0, 0), data)
 
 def calculateInQueue(data):
-    outputDictionary = {}
-    for iteration in data:
-        inQueue = 0
-        for moteList in data[iteration]:
-            if moteList['pktInQueue'] is not None:
-                inQueue += moteList['pktInQueue']
-        outputDictionary[iteration] = inQueue
-
-    return outputDictionary
+    return perIteration(data['pktInQueue'], data)
 
 def calculateDropsQueue(data):
-    outputDictionary = {}
-    for iteration in data:
-        dropsQueue = 0
-        for moteList in data[iteration]:
-            if moteList['pktDropsQueue'] is not None:
-                dropsQueue += moteList['pktDropsQueue']
-        outputDictionary[iteration] = dropsQueue
-
-    return outputDictionary
+    return perIteration(data['pktDropsQueue'], data)
 
 def calculateDropsMac(data):
-    outputDictionary = {}
-    for iteration in data:
-        dropsMac = 0
-        for moteList in data[iteration]:
-            if moteList['pktDropsMac'] is not None:
-                dropsMac += moteList['pktDropsMac']
-        outputDictionary[iteration] = dropsMac
-
-    return outputDictionary
+    return perIteration(data['pktDropsMac'], data)
 
 def calculateLatency(data):
-    outputDictionary = {}
-    for iteration in data:
-        latencies = []
-        for moteList in data[iteration]:
-            if moteList['pktLatencies'] is not None:
-                latencies.append(moteList['pktLatencies'])
-        outputDictionary[iteration] = np.mean(latencies)
-
-    return outputDictionary
+    return dict(data['pktLatencies'].groupby(data['datafile'], sort=False).mean().items())
 
 def calculateHops(data):
-    outputDictionary = {}
-    for iteration in data:
-        hopcount = 0
-        for moteList in data[iteration]:
-            if moteList['hopcount'] is not None:
-                hopcount += moteList['hopcount']
-        outputDictionary[iteration] = hopcount
-
-    return outputDictionary
+    return perIteration(data['hopcount'], data)
 
 def plotIt(xData, data, metric, outputDirectory):
     # the experiment iteration files
@@ -323,8 +144,7 @@ if __name__ == '__main__':
 
     for ix in range(2, len(sys.argv)):
         # prepare the data
-        data[sys.argv[ix]] = {}
-        calculatedData['cycles'][sys.argv[ix]], calculatedData['iterations'][sys.argv[ix]] = parseresults(dataDirectory, sys.argv[ix], data[sys.argv[ix]])
+        data[sys.argv[ix]], calculatedData['cycles'][sys.argv[ix]], calculatedData['iterations'][sys.argv[ix]] = parseresults(dataDirectory, sys.argv[ix])
         calculatedData['received'][sys.argv[ix]] = calculateReceived(data[sys.argv[ix]])
         calculatedData['arrivedToGenerate'][sys.argv[ix]] = calculateArrivedToGenerate(data[sys.argv[ix]])
         calculatedData['generated'][sys.argv[ix]] = calculateGenerate(data[sys.argv[ix]])
@@ -7,40 +7,15 @@ import collections
 import datetime
 import re
 
+import simdata
+
 translate = {'received': 'Received packets at root', 'arrivedToGenerate': 'Total number of packet generated', \
              'latency': 'Average latency per network'}
 
 modes = ['same-axis', 'diff-axis']
 
-def validate(exp_dir):
-    """ Validate the experiment to be really successful."""
-    error_log = '%s/error.log' % exp_dir  # should be empty
-    runSim_log = '%s/runSim.log' % exp_dir  # should be there, should not be empty
-    output_data = '%s/output_cpu0.dat' % exp_dir  # should be there, should not be empty
-    id_pattern = '*.id.txt'  # should only be one file with this id_pattern
-
-    import os
-    if not os.path.exists(error_log) or os.path.getsize(error_log) > 0:
-        print exp_dir
-        raise 'Error log not there or not zero.'
-    if not os.path.exists(runSim_log) or os.path.getsize(runSim_log) == 0:
-        print exp_dir
-        raise 'No runSim log or runSim log is empty.'
-    if not os.path.exists(output_data) or os.path.getsize(output_data) == 0:
-        print exp_dir
-        raise 'No output data or output data is zero.'
-    import fnmatch
-    count_workers = fnmatch.filter(os.listdir(exp_dir), id_pattern)
-    if len(count_workers) > 1:
-        print exp_dir
-        raise 'Multiple workers worked on this.'
-
-
-def getNrMotes(datafile):
-    with open(datafile) as f:
-        for line in f:
-            if '## numMotes =' in line:
-                return int(line.split('=')[1].strip())  # num motes
+# name in the parsed data -> tag in the output file
+moteTags = {'pktReceived': 'PktReceived', 'pktArrivedToGen': 'PktArrivedToGen', 'pktLatencies': 'PktLatencies'}
 
 
 def get_set_rgx(experiments, rgx=''):
@@ -56,9 +31,7 @@ def get_set_rgx(experiments, rgx=''):
 
 
 def detectInName(search_parameter, exp_dir):
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(exp_dir, search_parameter)
-    listFiles = os.popen(cmd).read().split("\n")[
-                :-1]  # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(exp_dir, search_parameter)
     rgx = '[_\/]+%s_([A-Za-z0-9]+)_' % search_parameter
     candidates = get_set_rgx(listFiles, rgx)
     return candidates
@@ -66,52 +39,16 @@ def detectInName(search_parameter, exp_dir):
 
 def parseresults(dataDir, parameter, data):
     print data
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(dataDir, parameter)
-    listFiles = os.popen(cmd).read().split("\n")[:-1]  # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(dataDir, parameter)
     print "Processing %d file(s) in %s." % (len(listFiles), str(dataDir))
     for datafile in listFiles:
-        validate(os.path.dirname(datafile))
-
-        pktReceived = {}
-        pktArrivedToGen = {}
-        pktLatencies = {}
-
-        # get all the data
-        with open(datafile, 'r') as inF:
-            for line in inF:
-                if '#PktReceived' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktReceived[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktReceived[int(mote.split("@")[0])] = None
-                if '#PktArrivedToGen' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktArrivedToGen[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktArrivedToGen[int(mote.split("@")[0])] = None
-                if '#PktLatencies' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktLatencies[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktLatencies[int(mote.split("@")[0])] = None
+        simdata.validate(os.path.dirname(datafile))
 
         if datafile not in data:
             data[datafile] = []  # make a list of (id, hopcount, consumption) per node per datafile
 
-        numMotes = getNrMotes(datafile)
-
-        # summarize the data
-        for mote in range(0, numMotes):
-            data[datafile].append({'mote': mote, 'pktReceived': pktReceived[mote], 'pktArrivedToGen': pktArrivedToGen[mote], 'pktLatencies': pktLatencies[mote]})
+        # get all the data
+        data[datafile] += simdata.mote_records(simdata.load_file(datafile), moteTags)
 
         if data[datafile][0]['mote'] != 0:  # should be root node
             assert False
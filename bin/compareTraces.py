@@ -0,0 +1,52 @@
+#!/usr/bin/python
+"""
+\brief Compare a golden trace of a run (recorded with --goldenTrace 1) to the
+trace of the same run with another version of the simulator.
+
+Usage:
+    python compareTraces.py golden.trace output_cpu0_run0.trace
+
+Prints the first difference, the ASN and callback of the first event which
+differs, and exits with 1 if the traces differ.
+"""
+
+#============================ adjust path =====================================
+
+import os
+import sys
+
+if __name__=='__main__':
+    here = sys.path[0]
+    sys.path.insert(0, os.path.join(here, '..'))
+
+#============================ imports =========================================
+
+from SimEngine     import Trace
+
+#============================ main ============================================
+
+def main():
+    if len(sys.argv) != 3:
+        print 'Usage: {0} golden.trace trace'.format(sys.argv[0])
+        return 2
+
+    golden = Trace.read(sys.argv[1])
+    trace  = Trace.read(sys.argv[2])
+
+    # traces of different settings are not comparable
+    settings = sorted(
+        k for k in set(golden['settings']) | set(trace['settings'])
+        if golden['settings'].get(k) != trace['settings'].get(k)
+    )
+    for k in settings:
+        print 'setting {0} differs: {1} vs {2}'.format(k, golden['settings'].get(k), trace['settings'].get(k))
+
+    divergence = Trace.compare(golden, trace)
+    print Trace.formatDivergence(divergence)
+    if divergence is None:
+        print '{0} cycles, {1} events, digest {2}'.format(len(trace['cycles']), len(trace['events']), trace['digest'])
+        return 0
+    return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
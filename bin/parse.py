@@ -7,6 +7,8 @@ import datetime
 import re
 import math
 
+import simdata
+
 # TODO SHOULD ADD A LAST _ FOR CORRECT FILTERING!
 # ALERT! THIS LAST _ IS VERY IMPORTANT FOR FILTERING THE CORRECT EXPERIMENTS
 
@@ -20,31 +22,13 @@ metrics = ['hopcount', 'aveChargePerCycle', 'PktArrivedToGen', 'PktNotGenerated'
            'PktDropsQueue', 'PktDropsMac', 'PktLatencies', 'pkPeriod', 'dedicatedCellConvergence', 'rplPrefParentChurn',
            'oldPrefParentRemoval', 'numberActualParentChanges', 'avgDurationParentChange', 'lifetime', 'allChildren',
            'maxLevel']
+# tags read from the output files
+moteTags = ['hopcount', 'aveChargePerCycle', 'prefParent', 'PktArrivedToGen', 'PktNotGenerated', 'PktGen',
+            'PktReceived', 'PktInQueue', 'PktDropsMac', 'PktDropsQueue', 'PktLatencies', 'pkPeriod',
+            'dedicatedCellConvergence', 'children', 'rplPrefParentChurn', 'oldPrefParentRemoval',
+            'numberActualParentChanges', 'avgDurationParentChange']
 colors = ['red', 'green', 'blue', 'orange', 'yellow', 'black']
 
-def validate(exp_dir):
-    """ Validate the experiment to be really successful."""
-    error_log = '%s/error.log' % exp_dir # should be empty
-    runSim_log = '%s/runSim.log' % exp_dir # should be there, should not be empty
-    output_data = '%s/output_cpu0.dat' % exp_dir # should be there, should not be empty
-    id_pattern = '*.id.txt' # should only be one file with this id_pattern
-
-    import os
-    if not os.path.exists(error_log) or os.path.getsize(error_log) > 0:
-        print exp_dir
-        raise 'Error log not there or not zero.'
-    if not os.path.exists(runSim_log) or os.path.getsize(runSim_log) == 0:
-        print exp_dir
-        raise 'No runSim log or runSim log is empty.'
-    if not os.path.exists(output_data) or os.path.getsize(output_data) == 0:
-        print exp_dir
-        raise 'No output data or output data is zero.'
-    import fnmatch
-    count_workers = fnmatch.filter(os.listdir(exp_dir), id_pattern)
-    if len(count_workers) > 1:
-        print exp_dir
-        raise 'Multiple workers worked on this.'
-
 def get_set_rgx(experiments, rgx = ''):
     candidates = set()
     for exp in experiments:
@@ -56,18 +40,11 @@ def get_set_rgx(experiments, rgx = ''):
     return candidates
 
 def detectInName(search_parameter, exp_dir):
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(exp_dir, search_parameter)
-    listFiles = os.popen(cmd).read().split("\n")[:-1] # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(exp_dir, search_parameter)
     rgx = '[_\/]+%s_([A-Za-z0-9]+)_' % search_parameter
     candidates = get_set_rgx(listFiles, rgx)
     return candidates
 
-def getNrMotes(datafile):
-    with open(datafile) as f:
-        for line in f:
-            if '## numMotes =' in line:
-                return int(line.split('=')[1].strip()) # num motes
-
 def getLifetime(microCoulomb):
     mAh = float(microCoulomb) / 3600000.0 # to mAh
     numCycles = 2000.0 / mAh
@@ -104,195 +81,36 @@ def getMaxLevel(mote, childrenPerNode):
     return maxlvl + 1
 
 def parseresults(dataDir, parameter, data):
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(dataDir, parameter)
-    listFiles = os.popen(cmd).read().split("\n")[:-1] # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(dataDir, parameter)
     print "Processing %d file(s) in %s." % (len(listFiles), str(dataDir))
     for datafile in listFiles:
-        validate(os.path.dirname(datafile))
-
-        charge = {}
-        hopcnt = {}
-        children = {} # direct children
-        prefParents = {} # preferredParents
-        pktArrivedToGen = {}
-        pktNotGenerated = {}
-        pktGen = {}
-        pktReceived = {}
-        pktInQueue = {}
-        pktLatencies = {}
-        pktDropsMac = {}
-        pktDropsQueue = {}
-        pkPeriod = {}
-        convergence = {}
-        rplPrefParentChurn = {}
-        oldPrefParentRemoval = {}
-        numberActualParentChanges = {}
-        avgDurationParentChange = {}
+        simdata.validate(os.path.dirname(datafile))
 
         # get all the data
-        with open(datafile, 'r') as inF:
-            for line in inF:
-                if '#aveChargePerCycle' in line:
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        charge[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                    # print 'Got charge.'
-                if '#hopcount' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        hopcnt[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                    # print 'Got hopcount.'
-                if '#prefParent' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                prefParents[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                            else:
-                                prefParents[int(mote.split("@")[0])] = None
-                    # print 'Got pref parent.'
-                if '#PktArrivedToGen' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktArrivedToGen[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktArrivedToGen[int(mote.split("@")[0])] = None
-                if '#PktNotGenerated' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktNotGenerated[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktNotGenerated[int(mote.split("@")[0])] = None
-                if '#PktGen' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktGen[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktGen[int(mote.split("@")[0])] = None
-                if '#PktReceived' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktReceived[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktReceived[int(mote.split("@")[0])] = None
-                if '#PktInQueue' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktInQueue[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktInQueue[int(mote.split("@")[0])] = None
-                if '#PktDropsMac' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktDropsMac[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktDropsMac[int(mote.split("@")[0])] = None
-                if '#PktDropsQueue' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktDropsQueue[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktDropsQueue[int(mote.split("@")[0])] = None
-                if '#PktLatencies' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktLatencies[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktLatencies[int(mote.split("@")[0])] = None
-                if '#pkPeriod' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pkPeriod[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pkPeriod[int(mote.split("@")[0])] = None
-                if '#dedicatedCellConvergence' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                convergence[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                            else:
-                                convergence[int(mote.split("@")[0])] = None
-                if '#children' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        children[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                    # print 'Got children.'
-                if '#rplPrefParentChurn' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        rplPrefParentChurn[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#oldPrefParentRemoval' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        oldPrefParentRemoval[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#numberActualParentChanges' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        numberActualParentChanges[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#avgDurationParentChange' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                avgDurationParentChange[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                avgDurationParentChange[int(mote.split("@")[0])] = None
-                    # print 'Got children.'
+        records = simdata.mote_records(simdata.load_file(datafile), moteTags)
 
+        prefParents = {} # preferredParents
+        for moteValues in records:
+            parent = moteValues.pop('prefParent')
+            prefParents[moteValues['mote']] = int(parent) if parent is not None else None
         childrenPerNode = getChildrenPerNode(prefParents)
         # print childrenPerNode
 
         if datafile not in data:
             data[datafile] = [] # make a list of (id, hopcount, consumption) per node per datafile
 
-        numMotes = getNrMotes(datafile)
-
-        totalGenerated = 0
         # summarize the data
-        for mote in range(0, numMotes):
+        for moteValues in records:
+            mote = moteValues['mote']
             if mote == 0:
-                pktLatencies[mote] = None
-                convergence[mote] = None
-            if mote not in pktLatencies:
-                pktLatencies[mote] = None
-            if pktGen[mote] != None and pktGen[mote] > 0:
-                totalGenerated += pktGen[mote]
-            # data[datafile].append((mote, hopcnt[mote], charge[mote], children[mote], getLifetime(charge[mote]), getAllChildren(mote, childrenPerNode, firstCall=True), getMaxLevel(mote, childrenPerNode)-1))
-            data[datafile].append({'mote': mote, 'hopcount': hopcnt[mote],
-                                   'aveChargePerCycle': charge[mote], 'PktGen': pktGen[mote],
-                                   'PktArrivedToGen': pktArrivedToGen[mote], 'PktNotGenerated': pktNotGenerated[mote],
-                                   'PktReceived': pktReceived[mote], 'PktInQueue': pktInQueue[mote],
-                                   'PktDropsMac': pktDropsMac[mote], 'PktDropsQueue': pktDropsQueue[mote],
-                                   'PktLatencies': pktLatencies[mote], 'pkPeriod': pkPeriod[mote],
-                                   'dedicatedCellConvergence': convergence[mote], 'children': children[mote],
-                                   'rplPrefParentChurn': rplPrefParentChurn[mote],
-                                   'oldPrefParentRemoval': oldPrefParentRemoval[mote],
-                                   'numberActualParentChanges': numberActualParentChanges[mote],
-                                   'avgDurationParentChange': avgDurationParentChange[mote],
-                                   'lifetime': getLifetime(charge[mote]),
-                                   'allChildren': getAllChildren(mote, childrenPerNode, firstCall=True),
-                                   'maxLevel': getMaxLevel(mote, childrenPerNode) - 1,
-                                   'throughput': None,
-                                   })
+                moteValues['PktLatencies'] = None
+                moteValues['dedicatedCellConvergence'] = None
+            moteValues.update({'lifetime': getLifetime(moteValues['aveChargePerCycle']),
+                               'allChildren': getAllChildren(mote, childrenPerNode, firstCall=True),
+                               'maxLevel': getMaxLevel(mote, childrenPerNode) - 1,
+                               'throughput': None,
+                               })
+            data[datafile].append(moteValues)
 
         # RECALCULATE THROUGHPUT
         if data[datafile][0]['mote'] != 0: # should be root node
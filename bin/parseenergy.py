@@ -6,10 +6,11 @@ import pandas as pd
 import collections
 import datetime
 import re
-import copy
 import math
 import seaborn as sns
 
+import simdata
+
 # ALERT! THIS LAST _ IS VERY IMPORTANT FOR FILTERING THE CORRECT EXPERIMENTS
 
 fileTranslate = {'m_1_p_10_': 'numMotes = 1,\nperiod = 10', \
@@ -154,38 +155,38 @@ J_TXDATANOACK_CONSUMPTION_OPENMOTEB = (uC_TXDATANOACK_CONSUMPTION_OPENMOTEB / 10
 J_RXDATATXACK_CONSUMPTION_OPENMOTEB = (uC_RXDATATXACK_CONSUMPTION_OPENMOTEB / 1000000.0) * VOLTS_RADIO_OPENMOTEB
 J_RXDATA_CONSUMPTION_OPENMOTEB = (uC_RXDATA_CONSUMPTION_OPENMOTEB / 1000000.0) * VOLTS_RADIO_OPENMOTEB
 
+# per mote type, the consumption of each state, in the order they are summed
+uC_CONSUMPTION = {'OpenMoteCC2538': [('nrIdle', uC_IDLE_CONSUMPTION), ('nrIdleNotSync', uC_IDLE_NOT_SYNC_CONSUMPTION),
+                                     ('nrSleep', uC_SLEEP_CONSUMPTION), ('nrTxDataRxAck', uC_TXDATARXACK_CONSUMPTION),
+                                     ('nrTxData', uC_TXDATA_CONSUMPTION), ('nrTxDataNoAck', uC_TXDATANOACK_CONSUMPTION),
+                                     ('nrRxDataTxAck', uC_RXDATATXACK_CONSUMPTION), ('nrRxData', uC_RXDATA_CONSUMPTION)],
+                  'OpenMoteB': [('nrIdle', uC_IDLE_CONSUMPTION_OPENMOTEB), ('nrIdleNotSync', uC_IDLE_NOT_SYNC_CONSUMPTION_OPENMOTEB),
+                                ('nrSleep', uC_SLEEP_CONSUMPTION_OPENMOTEB), ('nrTxDataRxAck', uC_TXDATARXACK_CONSUMPTION_OPENMOTEB),
+                                ('nrTxData', uC_TXDATA_CONSUMPTION_OPENMOTEB), ('nrTxDataNoAck', uC_TXDATANOACK_CONSUMPTION_OPENMOTEB),
+                                ('nrRxDataTxAck', uC_RXDATATXACK_CONSUMPTION_OPENMOTEB), ('nrRxData', uC_RXDATA_CONSUMPTION_OPENMOTEB)]}
+J_CONSUMPTION = {'OpenMoteCC2538': [('nrIdle', J_IDLE_CONSUMPTION), ('nrIdleNotSync', J_IDLE_NOT_SYNC_CONSUMPTION),
+                                    ('nrSleep', J_SLEEP_CONSUMPTION), ('nrTxDataRxAck', J_TXDATARXACK_CONSUMPTION),
+                                    ('nrTxData', J_TXDATA_CONSUMPTION), ('nrTxDataNoAck', J_TXDATANOACK_CONSUMPTION),
+                                    ('nrRxDataTxAck', J_RXDATATXACK_CONSUMPTION), ('nrRxData', J_RXDATA_CONSUMPTION)],
+                 'OpenMoteB': [('nrIdle', J_IDLE_CONSUMPTION_OPENMOTEB), ('nrIdleNotSync', J_IDLE_NOT_SYNC_CONSUMPTION_OPENMOTEB),
+                               ('nrSleep', J_SLEEP_CONSUMPTION_OPENMOTEB), ('nrTxDataRxAck', J_TXDATARXACK_CONSUMPTION_OPENMOTEB),
+                               ('nrTxData', J_TXDATA_CONSUMPTION_OPENMOTEB), ('nrTxDataNoAck', J_TXDATANOACK_CONSUMPTION_OPENMOTEB),
+                               ('nrRxDataTxAck', J_RXDATATXACK_CONSUMPTION_OPENMOTEB), ('nrRxData', J_RXDATA_CONSUMPTION_OPENMOTEB)]}
+
 SLOTDURATION = 0.015 # ms
 SLOTFRAME_LENGTH = 101 # slots
 APPLICATION_SIZE_BITS = 104 * 8 # bits
 
-def validate(exp_dir):
-    """ Validate the experiment to be really successful."""
-    error_log = '%s/error.log' % exp_dir # should be empty
-    runSim_log = '%s/runSim.log' % exp_dir # should be there, should not be empty
-    output_data = '%s/output_cpu0.dat' % exp_dir # should be there, should not be empty
-    id_pattern = '*.id.txt' # should only be one file with this id_pattern
-
-    import os
-    if not os.path.exists(error_log) or os.path.getsize(error_log) > 0:
-        print exp_dir
-        raise 'Error log not there or not zero.'
-    if not os.path.exists(runSim_log) or os.path.getsize(runSim_log) == 0:
-        print exp_dir
-        raise 'No runSim log or runSim log is empty.'
-    if not os.path.exists(output_data) or os.path.getsize(output_data) == 0:
-        print exp_dir
-        raise 'No output data or output data is zero.'
-    import fnmatch
-    count_workers = fnmatch.filter(os.listdir(exp_dir), id_pattern)
-    if len(count_workers) > 1:
-        print exp_dir
-        raise 'Multiple workers worked on this.'
-
-def getNrMotes(datafile):
-    with open(datafile) as f:
-        for line in f:
-            if '## numMotes =' in line:
-                return int(line.split('=')[1].strip()) # num motes
+# name in the parsed data -> tag in the output file
+moteTags = {'nrIdle': 'nrIdle', 'nrIdleNotSync': 'nrIdleNotSync', 'nrSleep': 'nrSleep',
+            'nrTxDataRxAck': 'nrTxDataRxAck', 'nrTxDataNoAck': 'nrTxDataNoAck', 'nrTxDataRxNack': 'nrTxDataRxNack',
+            'nrTxData': 'nrTxData', 'nrRxDataTxAck': 'nrRxDataTxAck', 'nrRxData': 'nrRxData',
+            'pktReceived': 'PktReceived', 'pktLatencies': 'PktLatencies',
+            'sixtopTxAddReq': 'sixtopTxAddReq', 'sixtopTxAddResp': 'sixtopTxAddResp',
+            'sixtopTxDelReq': 'sixtopTxDelReq', 'sixtopTxDelResp': 'sixtopTxDelResp',
+            'activeDAO': 'activeDAO', 'initiatedDAO': 'initiatedDAO', 'receivedDAO': 'receivedDAO',
+            'pktDropsMac': 'PktDropsMac', 'pktDropsQueue': 'PktDropsQueue', 'pktGen': 'PktGen',
+            'pktArrivedToGen': 'PktArrivedToGen'}
 
 def get_set_rgx(experiments, rgx = ''):
     candidates = set()
@@ -199,8 +200,7 @@ def get_set_rgx(experiments, rgx = ''):
     return candidates
 
 def detectInName(search_parameter, exp_dir):
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(exp_dir, search_parameter)
-    listFiles = os.popen(cmd).read().split("\n")[:-1] # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(exp_dir, search_parameter)
     rgx = '[_\/]+%s_([A-Za-z0-9]+)_' % search_parameter
     candidates = get_set_rgx(listFiles, rgx)
     return candidates
@@ -215,192 +215,14 @@ def getLabelName(name):
         return translate[name]
     return name
 
-def parseresults(dataDir, parameter, data):
+def parseresults(dataDir, parameter, numCores=None):
     resfConvergenceDatafiles = []
-    print data
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(dataDir, parameter)
-    listFiles = os.popen(cmd).read().split("\n")[:-1] # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(dataDir, parameter)
     print "Processing %d file(s) in %s." % (len(listFiles), str(dataDir))
-    for datafile in listFiles:
-        validate(os.path.dirname(datafile))
-
-        nrIdle = {}
-        nrIdleNotSync = {}
-        nrSleep = {}
-        nrTxDataRxAck = {}
-        nrTxData = {}
-        nrTxDataNoAck = {}
-        nrTxDataRxNack = {}
-        nrRxDataTxAck = {}
-        nrRxData = {}
-        pktReceived = {}
-        pktLatencies = {}
-        pktDropsMac = {}
-        pktDropsQueue = {}
-        pktGen = {}
-        pktArrivedToGen = {}
-        sixtopTxAddReq = {}
-        sixtopTxAddResp = {}
-        sixtopTxDelReq = {}
-        sixtopTxDelResp = {}
-        activeDAO = {}
-        initiatedDAO = {}
-        receivedDAO = {}
-        resfConvergence = {}
-        # get all the data
-        with open(datafile, 'r') as inF:
-            for line in inF:
-                if '#nrIdle' in line and not '#nrIdleNotSync' in line:
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        nrIdle[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                    # print 'Got charge.'
-                if '#nrIdleNotSync' in line:
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        nrIdleNotSync[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                    # print 'Got charge.'
-                if '#nrSleep' in line:
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        nrSleep[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                    # print 'Got charge.'
-                if '#nrTxDataRxAck' in line:
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        nrTxDataRxAck[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                    # print 'Got charge.'
-                if '#nrTxData' in line and not '#nrTxDataNoAck' in line and not '#nrTxDataRxAck' in line and not '#nrTxDataRxNack' in line:
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        nrTxData[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                    # print 'Got charge.'
-                if '#nrTxDataNoAck' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        nrTxDataNoAck[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                    # print 'Got charge.'
-                if '#nrTxDataRxNack' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        nrTxDataRxNack[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                if '#nrRxDataTxAck' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        nrRxDataTxAck[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                if '#nrRxData' in line.strip() and not '#nrRxDataTxAck' in line:
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        nrRxData[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                if '#PktReceived' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktReceived[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktReceived[int(mote.split("@")[0])] = None
-                    # print 'Got hopcount.'
-                if '#sixtopTxAddReq' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        sixtopTxAddReq[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#sixtopTxAddResp' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        sixtopTxAddResp[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#sixtopTxDelReq' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        sixtopTxDelReq[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#sixtopTxDelResp' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        sixtopTxDelResp[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#activeDAO' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        activeDAO[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#initiatedDAO' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        initiatedDAO[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#receivedDAO' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        receivedDAO[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                if '#PktLatencies' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if mote.split("@")[1] != 'None':
-                            pktLatencies[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                        else:
-                            pktLatencies[int(mote.split("@")[0])] = None
-                if '#PktDropsMac' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktDropsMac[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktDropsMac[int(mote.split("@")[0])] = None
-                if '#PktDropsQueue' in line.strip():
-                    lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktDropsQueue[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktDropsQueue[int(mote.split("@")[0])] = None
-                if '#PktGen' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktGen[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktGen[int(mote.split("@")[0])] = None
-                if '#PktArrivedToGen' in line.strip():
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if '@' in mote:
-                            if mote.split("@")[1] != 'None':
-                                pktArrivedToGen[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                            else:
-                                pktArrivedToGen[int(mote.split("@")[0])] = None
-                # if '#resfConvergence' in line.strip():
-                #     lineList = line.strip().split(' ')[2:]  # first two are information, drop them
-                #     for mote in lineList:
-                #         resfConvergence[int(mote.split("@")[0])] = int(mote.split("@")[1])
-                        # if resfConvergence[int(mote.split("@")[0])] > 500000:
-                        #     resfConvergenceDatafiles.append(datafile)
-                        #     resfConvergenceDatafiles = list(set(resfConvergenceDatafiles))
-
-        if datafile not in data:
-            data[datafile] = [] # make a list of (id, hopcount, consumption) per node per datafile
-
-        numMotes = getNrMotes(datafile)
-
-        # summarize the data
-        for mote in range(0, numMotes):
-            # if mote not in resfConvergence: # if it does not have resf convergence, put to -1, this will be not included in the calculations
-            #     resfConvergence[mote] = -1
-            data[datafile].append({'mote': mote, 'nrIdle': nrIdle[mote],
-                                   'nrIdleNotSync': nrIdleNotSync[mote], 'nrSleep': nrSleep[mote],
-                                   'nrTxDataRxAck': nrTxDataRxAck[mote], 'nrTxDataNoAck': nrTxDataNoAck[mote],
-                                   'nrTxDataRxNack': nrTxDataRxNack[mote],
-                                   'nrTxData': nrTxData[mote], 'nrRxDataTxAck': nrRxDataTxAck[mote],
-                                   'nrRxData': nrRxData[mote], 'pktReceived': pktReceived[mote], 'pktLatencies': pktLatencies[mote],
-                                   'sixtopTxAddReq': sixtopTxAddReq[mote], 'sixtopTxAddResp': sixtopTxAddResp[mote],
-                                   'sixtopTxDelReq': sixtopTxDelReq[mote], 'sixtopTxDelResp': sixtopTxDelResp[mote],
-                                   'activeDAO': activeDAO[mote], 'initiatedDAO': initiatedDAO[mote], 'receivedDAO': receivedDAO[mote],
-                                   'pktDropsMac': pktDropsMac[mote], 'pktDropsQueue': pktDropsQueue[mote], 'pktGen': pktGen[mote],
-                                   'pktArrivedToGen': pktArrivedToGen[mote]})
-                                   # 'resfConvergence': resfConvergence[mote]})
-
-        if data[datafile][0]['mote'] != 0: # should be root node
-            assert False
-        # print datafile
+
+    # one DataFrame with a row per mote per datafile, the experiments are loaded in parallel
+    data = simdata.load_mote_tables(listFiles, moteTags, numCores=numCores, check=True)
+    data = data.rename(columns={'datafile': 'iteration'})
 
     # period = float(list(detectInName('p', listFiles[0]))[0])
     print listFiles
@@ -416,229 +238,112 @@ def parseresults(dataDir, parameter, data):
     # print len(resfConvergenceDatafiles)
     # print resfConvergenceDatafiles
 
-    return cycles
+    return data, cycles
+
+# The results of a calculation as a DataFrame, one row per value.
+def getResults(exp, val, **columns):
+    results = pd.DataFrame({'val': np.asarray(val)})
+    results['exp'] = getExperimentName(exp)
+    for (column, values) in columns.items():
+        results[column] = values.values if isinstance(values, pd.Series) else values
+    return results
+
+# The sum of a column per iteration, over the source nodes (root=False), the root (root=True) or all motes.
+def sumPerIteration(data, column, root=None):
+    values = data[column]
+    if root is not None:
+        values = values.where((data['mote'] == 0) == root, 0)
+    return values.groupby(data['iteration'], sort=False).sum()
 
 # Calculate the bits per Joule per iteration.
 def calculateBitsPerJoulePerIteration(data, moteType, exp):
-    results = []
-    for iteration in data:
-        nrIdle = 0
-        nrIdleNotSync = 0
-        nrSleep = 0
-        nrTxDataRxAck = 0
-        nrTxDataNoAck = 0
-        nrTxData = 0
-        nrRxDataTxAck = 0
-        nrRxData = 0
-        nrReceived = 0
-
-        for moteList in data[iteration]:
-            if moteList['mote'] != 0:
-                nrIdle += moteList['nrIdle']
-                nrIdleNotSync += moteList['nrIdleNotSync']
-                nrSleep += moteList['nrSleep']
-                nrTxDataRxAck += moteList['nrTxDataRxAck']
-                nrTxData += moteList['nrTxData']
-                nrTxDataNoAck += moteList['nrTxDataNoAck']
-                nrRxDataTxAck += moteList['nrRxDataTxAck']
-                nrRxData += moteList['nrRxData']
-            if moteList['mote'] == 0:
-                nrReceived += moteList['pktReceived']
-
-        totalConsumption = 0.0
-        if moteType == 'OpenMoteCC2538':
-            totalConsumption += nrIdle * J_IDLE_CONSUMPTION
-            totalConsumption += nrIdleNotSync * J_IDLE_NOT_SYNC_CONSUMPTION
-            totalConsumption += nrSleep * J_SLEEP_CONSUMPTION
-            totalConsumption += nrTxDataRxAck * J_TXDATARXACK_CONSUMPTION
-            totalConsumption += nrTxData * J_TXDATA_CONSUMPTION
-            totalConsumption += nrTxDataNoAck * J_TXDATANOACK_CONSUMPTION
-            totalConsumption += nrRxDataTxAck * J_RXDATATXACK_CONSUMPTION
-            totalConsumption += nrRxData * J_RXDATA_CONSUMPTION
-        elif moteType == 'OpenMoteB':
-            totalConsumption += nrIdle * J_IDLE_CONSUMPTION_OPENMOTEB
-            totalConsumption += nrIdleNotSync * J_IDLE_NOT_SYNC_CONSUMPTION_OPENMOTEB
-            totalConsumption += nrSleep * J_SLEEP_CONSUMPTION_OPENMOTEB
-            totalConsumption += nrTxDataRxAck * J_TXDATARXACK_CONSUMPTION_OPENMOTEB
-            totalConsumption += nrTxData * J_TXDATA_CONSUMPTION_OPENMOTEB
-            totalConsumption += nrTxDataNoAck * J_TXDATANOACK_CONSUMPTION_OPENMOTEB
-            totalConsumption += nrRxDataTxAck * J_RXDATATXACK_CONSUMPTION_OPENMOTEB
-            totalConsumption += nrRxData * J_RXDATA_CONSUMPTION_OPENMOTEB
-
-        # to kbit
-        results.append({'exp': getExperimentName(exp), 'val': (((APPLICATION_SIZE_BITS * (nrReceived)) / (float(totalConsumption))) / 1000.0), 'iteration': iteration})
+    nrReceived = sumPerIteration(data, 'pktReceived', root=True)
+    totalConsumption = pd.Series(0.0, index=nrReceived.index)
+    for (state, consumption) in J_CONSUMPTION.get(moteType, []):
+        totalConsumption += sumPerIteration(data, state, root=False) * consumption
 
-    return results
+    # to kbit
+    return getResults(exp, ((APPLICATION_SIZE_BITS * nrReceived) / totalConsumption) / 1000.0, iteration=nrReceived.index)
 
 # Get all the numbers of received packets per iteration.
 def calculateReceived(data, exp, nrMotes=None, sfMode=None, freq=None):
-    results = []
-    for iteration in data:
-        result = {'exp': getExperimentName(exp), 'val': None, 'iteration': iteration, 'motes': translateMotes[nrMotes], 'sfMode': translateReSF[sfMode], 'freq': translateTraffic[freq]}
-        nrReceived = 0
-        for moteList in data[iteration]:
-            if moteList['mote'] == 0:
-                nrReceived += moteList['pktReceived']
-                break
-        result['val'] = nrReceived
-        results.append(copy.deepcopy(result))
-    return results
+    root = data[data['mote'] == 0]
+    return getResults(exp, root['pktReceived'], iteration=root['iteration'], motes=translateMotes[nrMotes], sfMode=translateReSF[sfMode], freq=translateTraffic[freq])
 
 def calculatePktGen(data, exp, nrMotes=None, sfMode=None, freq=None):
-    results = []
-    for iteration in data:
-        result = {'exp': getExperimentName(exp), 'val': None, 'iteration': iteration, 'motes': translateMotes[nrMotes], 'sfMode': translateReSF[sfMode], 'freq': translateTraffic[freq]}
-        nrPktGen = 0
-        for moteList in data[iteration]:
-            if moteList['mote'] != 0 and moteList['pktGen'] is not None:
-                nrPktGen += moteList['pktGen']
-        result['val'] = nrPktGen
-        results.append(copy.deepcopy(result))
-    return results
+    nrPktGen = sumPerIteration(data, 'pktGen', root=False)
+    return getResults(exp, nrPktGen, iteration=nrPktGen.index, motes=translateMotes[nrMotes], sfMode=translateReSF[sfMode], freq=translateTraffic[freq])
 
 def calculatePktArrivedToGen(data, exp, nrMotes=None, sfMode=None, freq=None):
-    results = []
-    for iteration in data:
-        result = {'exp': getExperimentName(exp), 'val': None, 'iteration': iteration, 'motes': translateMotes[nrMotes], 'sfMode': translateReSF[sfMode], 'freq': translateTraffic[freq]}
-        nrPktArrivedToGen = 0
-        for moteList in data[iteration]:
-            if moteList['mote'] != 0 and moteList['pktArrivedToGen'] is not None:
-                nrPktArrivedToGen += moteList['pktArrivedToGen']
-        result['val'] = nrPktArrivedToGen
-        results.append(copy.deepcopy(result))
-    return results
+    nrPktArrivedToGen = sumPerIteration(data, 'pktArrivedToGen', root=False)
+    return getResults(exp, nrPktArrivedToGen, iteration=nrPktArrivedToGen.index, motes=translateMotes[nrMotes], sfMode=translateReSF[sfMode], freq=translateTraffic[freq])
 
 # Get all charges of all motes.
 def calculateChargePerMote(data, moteType, exp, freq=None, sfMode=None):
-    results = []
-    for iteration in data:
-        for moteList in data[iteration]:
-            # do not do this for root, only for source nodes
-            if moteList['mote'] != 0:
-                totalCharge = 0
-                if moteType == 'OpenMoteCC2538':
-                    totalCharge += moteList['nrIdle'] * uC_IDLE_CONSUMPTION
-                    totalCharge += moteList['nrIdleNotSync'] * uC_IDLE_NOT_SYNC_CONSUMPTION
-                    totalCharge += moteList['nrSleep'] * uC_SLEEP_CONSUMPTION
-                    totalCharge += moteList['nrTxDataRxAck'] * uC_TXDATARXACK_CONSUMPTION
-                    totalCharge += moteList['nrTxData'] * uC_TXDATA_CONSUMPTION
-                    totalCharge += moteList['nrTxDataNoAck'] * uC_TXDATANOACK_CONSUMPTION
-                    totalCharge += moteList['nrRxDataTxAck'] * uC_RXDATATXACK_CONSUMPTION
-                    totalCharge += moteList['nrRxData'] * uC_RXDATA_CONSUMPTION
-                elif moteType == 'OpenMoteB':
-                    totalCharge += moteList['nrIdle'] * uC_IDLE_CONSUMPTION_OPENMOTEB
-                    totalCharge += moteList['nrIdleNotSync'] * uC_IDLE_NOT_SYNC_CONSUMPTION_OPENMOTEB
-                    totalCharge += moteList['nrSleep'] * uC_SLEEP_CONSUMPTION_OPENMOTEB
-                    totalCharge += moteList['nrTxDataRxAck'] * uC_TXDATARXACK_CONSUMPTION_OPENMOTEB
-                    totalCharge += moteList['nrTxData'] * uC_TXDATA_CONSUMPTION_OPENMOTEB
-                    totalCharge += moteList['nrTxDataNoAck'] * uC_TXDATANOACK_CONSUMPTION_OPENMOTEB
-                    totalCharge += moteList['nrRxDataTxAck'] * uC_RXDATATXACK_CONSUMPTION_OPENMOTEB
-                    totalCharge += moteList['nrRxData'] * uC_RXDATA_CONSUMPTION_OPENMOTEB
-                # this is the total charge for the whole length of the experiment
-                results.append({'exp': getExperimentName(exp), 'val': totalCharge, 'iteration': iteration, 'mote': moteList['mote'], 'sfMode': translateReSF[sfMode], 'freq': translateTraffic[freq]})
-    return results
+    # do not do this for root, only for source nodes
+    motes = data[data['mote'] != 0]
+    totalCharge = pd.Series(0.0, index=motes.index)
+    for (state, charge) in uC_CONSUMPTION.get(moteType, []):
+        totalCharge += motes[state] * charge
+    # this is the total charge for the whole length of the experiment
+    return getResults(exp, totalCharge, iteration=motes['iteration'], mote=motes['mote'], sfMode=translateReSF[sfMode], freq=translateTraffic[freq])
 
 # Calculate the lifetimes of all charges of all motes in all iterations.
 def calculateLifetime(chargePerMoteDF, batterySize, cycles, exp, freq=None, sfMode=None):
-    results = []
-    for index, row in chargePerMoteDF.iterrows():
-        # total mAh of whole experimetn
-        mAh = (row['val']) / 3600000.0  # uC / 3600000 = mAh
-        # get length experiment:
-        numCycles = cycles
-        # convert numCycles to seconds
-        lengthSeconds = (numCycles) * SLOTDURATION * SLOTFRAME_LENGTH
-        # number of seconds you could do with this battery
-        batterySeconds = float(batterySize) / (mAh / float(lengthSeconds))
-        # convert to days
-        days = batterySeconds / 3600.0 / 24.0
-        # days = moteCharge
-        results.append({'exp': getExperimentName(exp), 'val': days, 'iteration': row['iteration'], 'mote': row['mote'], 'sfMode': row['sfMode'], 'freq': row['freq']})
-    return results
+    if chargePerMoteDF.empty:
+        return getResults(exp, [])
+    # total mAh of whole experimetn
+    mAh = chargePerMoteDF['val'] / 3600000.0  # uC / 3600000 = mAh
+    # get length experiment:
+    numCycles = cycles
+    # convert numCycles to seconds
+    lengthSeconds = (numCycles) * SLOTDURATION * SLOTFRAME_LENGTH
+    # number of seconds you could do with this battery
+    batterySeconds = float(batterySize) / (mAh / float(lengthSeconds))
+    # convert to days
+    days = batterySeconds / 3600.0 / 24.0
+    return getResults(exp, days, iteration=chargePerMoteDF['iteration'], mote=chargePerMoteDF['mote'], sfMode=chargePerMoteDF['sfMode'], freq=chargePerMoteDF['freq'])
 
 # Calculate the sum per state of all motes.
 def calculateStateFrequency(data, exp):
-    results = []
-    for iteration in data:
-        for moteList in data[iteration]:
-            if moteList['mote'] != 0:
-                totalFrequency = 0
-                # do not do this for root, only for source nodes
-                results.append({'exp': getExperimentName(exp), 'val': moteList['nrIdle'], 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrIdle'})
-                totalFrequency += moteList['nrIdle']
-                # print 'nrIdle %d' % moteList['nrIdle']
-                results.append({'exp': getExperimentName(exp), 'val': moteList['nrIdleNotSync'], 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrIdleNotSync'})
-                totalFrequency += moteList['nrIdleNotSync']
-                # print 'nrIdleNotSync %d' % moteList['nrIdleNotSync']
-                results.append({'exp': getExperimentName(exp), 'val': moteList['nrSleep'], 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrSleep'})
-                totalFrequency += moteList['nrSleep']
-                # print 'nrSleep %d' % moteList['nrSleep']
-                results.append({'exp': getExperimentName(exp), 'val': (moteList['nrTxDataRxAck'] - moteList['nrTxDataRxNack']), 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrTxDataRxAck'})
-                totalFrequency += (moteList['nrTxDataRxAck'] - moteList['nrTxDataRxNack'])
-                # print 'nrTxDataRxAck %d' % (moteList['nrTxDataRxAck'] - moteList['nrTxDataRxNack'])
-                results.append({'exp': getExperimentName(exp), 'val': moteList['nrTxDataRxNack'], 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrTxDataRxNack'})
-                totalFrequency += moteList['nrTxDataRxNack']
-                # print 'nrTxDataRxNack %d' % moteList['nrTxDataRxNack']
-                results.append({'exp': getExperimentName(exp), 'val': moteList['nrTxDataNoAck'], 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrTxDataNoAck'})
-                totalFrequency += moteList['nrTxDataNoAck']
-                # print 'nrTxDataNoAck %d' % moteList['nrTxDataNoAck']
-                results.append({'exp': getExperimentName(exp), 'val': moteList['nrRxDataTxAck'], 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrRxDataTxAck'})
-                totalFrequency += moteList['nrRxDataTxAck']
-                # print 'nrRxDataTxAck %d' % moteList['nrRxDataTxAck']
-                results.append({'exp': getExperimentName(exp), 'val': moteList['nrTxData'], 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrTxData'})
-                totalFrequency += moteList['nrTxData']
-                # print 'nrTxData %d' % moteList['nrTxData']
-                results.append({'exp': getExperimentName(exp), 'val': moteList['nrRxData'], 'iteration': iteration, 'mote': moteList['mote'], 'state': 'nrRxData'})
-                totalFrequency += moteList['nrRxData']
-                # print 'nrRxData %d' % moteList['nrRxData']
-                # print 'Mote %d, total number of time slots: %d' % (moteList['mote'], totalFrequency)
-
-    return results
+    # do not do this for root, only for source nodes
+    motes = data[data['mote'] != 0]
+    frequencies = pd.DataFrame(collections.OrderedDict([
+        ('nrIdle',         motes['nrIdle']),
+        ('nrIdleNotSync',  motes['nrIdleNotSync']),
+        ('nrSleep',        motes['nrSleep']),
+        ('nrTxDataRxAck',  motes['nrTxDataRxAck'] - motes['nrTxDataRxNack']),
+        ('nrTxDataRxNack', motes['nrTxDataRxNack']),
+        ('nrTxDataNoAck',  motes['nrTxDataNoAck']),
+        ('nrRxDataTxAck',  motes['nrRxDataTxAck']),
+        ('nrTxData',       motes['nrTxData']),
+        ('nrRxData',       motes['nrRxData']),
+    ]))
+    # one row per mote and state, the states of a mote in the order above
+    numStates = len(frequencies.columns)
+    frequencies = frequencies.stack(dropna=False)
+    return getResults(exp, frequencies, iteration=np.repeat(motes['iteration'].values, numStates), mote=np.repeat(motes['mote'].values, numStates), state=frequencies.index.get_level_values(1))
 
 # Get all charges of all motes.
 def calculateLatency(data, exp, frequency=None, mode=None, sfMode=None):
-    results = []
-    for iteration in data:
-        for moteList in data[iteration]:
-            # do not do this for root, only for source nodes
-            if moteList['mote'] != 0 and moteList['pktLatencies'] != None:
-                results.append({'exp': getExperimentName(exp), 'val': moteList['pktLatencies'] * SLOTDURATION, 'iteration': iteration, 'mote': moteList['mote'], 'freq': translateTraffic[frequency], 'modeC': translateModes[mode], 'sfMode': translateReSF[sfMode]})
-    return results
+    # do not do this for root, only for source nodes
+    motes = data[(data['mote'] != 0) & data['pktLatencies'].notnull()]
+    return getResults(exp, motes['pktLatencies'] * SLOTDURATION, iteration=motes['iteration'], mote=motes['mote'], freq=translateTraffic[frequency], modeC=translateModes[mode], sfMode=translateReSF[sfMode])
 
 def calculateMACDrops(data, exp, frequency=None, mode=None):
-    results = []
-    for iteration in data:
-        for moteList in data[iteration]:
-            # do not do this for root, only for source nodes
-            if moteList['mote'] != 0 and moteList['pktDropsMac'] != None:
-                results.append({'exp': getExperimentName(exp), 'val': moteList['pktDropsMac'], 'iteration': iteration, 'mote': moteList['mote'], 'freq': translateTraffic[frequency], 'modeC': translateModes[mode]})
-    return results
+    # do not do this for root, only for source nodes
+    motes = data[(data['mote'] != 0) & data['pktDropsMac'].notnull()]
+    return getResults(exp, motes['pktDropsMac'], iteration=motes['iteration'], mote=motes['mote'], freq=translateTraffic[frequency], modeC=translateModes[mode])
 
 def calculateQueueDrops(data, exp, frequency=None, mode=None):
-    results = []
-    for iteration in data:
-        for moteList in data[iteration]:
-            # do not do this for root, only for source nodes
-            if moteList['mote'] != 0 and moteList['pktDropsQueue'] != None:
-                results.append({'exp': getExperimentName(exp), 'val': moteList['pktDropsQueue'], 'iteration': iteration, 'mote': moteList['mote'], 'freq': translateTraffic[frequency], 'modeC': translateModes[mode]})
-    return results
+    # do not do this for root, only for source nodes
+    motes = data[(data['mote'] != 0) & data['pktDropsQueue'].notnull()]
+    return getResults(exp, motes['pktDropsQueue'], iteration=motes['iteration'], mote=motes['mote'], freq=translateTraffic[frequency], modeC=translateModes[mode])
 
 def calculateAllDrops(data, exp, frequency=None, mode=None, sfMode=None):
-    results = []
-    for iteration in data:
-        allDrops = 0
-        for moteList in data[iteration]:
-            # do not do this for root, only for source nodes
-            if moteList['mote'] != 0:
-                qDrops = moteList['pktDropsQueue']
-                if qDrops is None:
-                    qDrops = 0
-                qMAC = moteList['pktDropsMac']
-                if qMAC is None:
-                    qMAC = 0
-                allDrops += (qDrops + qMAC)
-        results.append({'exp': getExperimentName(exp), 'val': allDrops, 'iteration': iteration, 'freq': translateTraffic[frequency], 'modeC': translateModes[mode], 'sfMode': translateReSF[sfMode]})
-    return results
+    # do not do this for root, only for source nodes, a missing value counts as no drops
+    allDrops = sumPerIteration(data, 'pktDropsQueue', root=False) + sumPerIteration(data, 'pktDropsMac', root=False)
+    return getResults(exp, allDrops, iteration=allDrops.index, freq=translateTraffic[frequency], modeC=translateModes[mode], sfMode=translateReSF[sfMode])
 
 # def calculateDAOPerNetwork(data):
 #     output = {}
@@ -682,36 +387,17 @@ def calculateAllDrops(data, exp, frequency=None, mode=None, sfMode=None):
 #     return outputMeanFinal
 
 def calculateDAO(data, exp):
-    results = []
-    for iteration in data:
-        # reset for this experiment
-        for moteList in data[iteration]:
-            if moteList['mote'] != 0:
-                # do not do this for root, only for source nodes
-                results.append({'exp': getExperimentName(exp), 'val': moteList['activeDAO'], 'iteration': iteration, 'mote': moteList['mote'], 'type': 'activeDAO'})
-                results.append({'exp': getExperimentName(exp), 'val': moteList['initiatedDAO'], 'iteration': iteration, 'mote': moteList['mote'], 'type': 'initiatedDAO'})
-    return results
+    # do not do this for root, only for source nodes
+    motes = data[data['mote'] != 0]
+    return pd.concat([getResults(exp, motes[daoType], iteration=motes['iteration'], mote=motes['mote'], type=daoType) for daoType in ['activeDAO', 'initiatedDAO']], ignore_index=True)
 
 def calculateDAOReceived(data, exp):
-    results = []
-    for iteration in data:
-        # reset for this experiment
-        for moteList in data[iteration]:
-            if moteList['mote'] == 0:
-                results.append({'exp': getExperimentName(exp), 'val': moteList['receivedDAO'], 'iteration': iteration, 'type': 'receivedDAO'})
-    return results
+    root = data[data['mote'] == 0]
+    return getResults(exp, root['receivedDAO'], iteration=root['iteration'], type='receivedDAO')
 
 def calculateSixTopMessaging(data, exp):
-    results = []
-    for iteration in data:
-        for moteList in data[iteration]:
-            if moteList['mote'] != 0:
-                results.append({'exp': getExperimentName(exp), 'val': moteList['sixtopTxAddReq'], 'iteration': iteration, 'mote': moteList['mote'], 'type': 'sixtopTxAddReq'})
-                results.append({'exp': getExperimentName(exp), 'val': moteList['sixtopTxAddResp'], 'iteration': iteration, 'mote': moteList['mote'], 'type': 'sixtopTxAddResp'})
-                results.append({'exp': getExperimentName(exp), 'val': moteList['sixtopTxDelReq'], 'iteration': iteration, 'mote': moteList['mote'], 'type': 'sixtopTxDelReq'})
-                results.append({'exp': getExperimentName(exp), 'val': moteList['sixtopTxDelResp'], 'iteration': iteration, 'mote': moteList['mote'], 'type': 'sixtopTxDelResp'})
-    return results
-
+    motes = data[data['mote'] != 0]
+    return pd.concat([getResults(exp, motes[messageType], iteration=motes['iteration'], mote=motes['mote'], type=messageType) for messageType in ['sixtopTxAddReq', 'sixtopTxAddResp', 'sixtopTxDelReq', 'sixtopTxDelResp']], ignore_index=True)
 
 # def calculateReSFConvergence(data):
 #     resfConvergence = []
@@ -1023,8 +709,7 @@ if __name__ == '__main__':
         sorter.append(getExperimentName(sys.argv[ix]))
         # if translateModes[mode] not in sorterMode:
         #     sorterMode.append(translateModes[mode])
-        data[sys.argv[ix]] = {}
-        cycles = parseresults(dataDir, sys.argv[ix], data[sys.argv[ix]])
+        data[sys.argv[ix]], cycles = parseresults(dataDir, sys.argv[ix])
 
         # aggregated over all motes
         chargePerMoteOpenMoteCC2538 = chargePerMoteOpenMoteCC2538.append((calculateChargePerMote(data[sys.argv[ix]], 'OpenMoteCC2538', sys.argv[ix], freq=freq, sfMode=sfMode)))
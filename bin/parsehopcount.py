@@ -8,6 +8,8 @@ import datetime
 import re
 import math
 
+import simdata
+
 # ALERT! THIS LAST _ IS VERY IMPORTANT FOR FILTERING THE CORRECT EXPERIMENTS
 
 fileTranslate = {'m_1_p_10_': 'numMotes = 1,\nperiod = 10', \
@@ -62,35 +64,6 @@ translate = {'lifetime_250mAh': 'Lifetime for 250 mAh battery (days)', \
 metrics = ['bitperjoule', 'lifetime']
 colors = ['red', 'green', 'blue', 'orange', 'yellow', 'black']
 
-def validate(exp_dir):
-    """ Validate the experiment to be really successful."""
-    error_log = '%s/error.log' % exp_dir # should be empty
-    runSim_log = '%s/runSim.log' % exp_dir # should be there, should not be empty
-    output_data = '%s/output_cpu0.dat' % exp_dir # should be there, should not be empty
-    id_pattern = '*.id.txt' # should only be one file with this id_pattern
-
-    import os
-    if not os.path.exists(error_log) or os.path.getsize(error_log) > 0:
-        print exp_dir
-        raise 'Error log not there or not zero.'
-    if not os.path.exists(runSim_log) or os.path.getsize(runSim_log) == 0:
-        print exp_dir
-        raise 'No runSim log or runSim log is empty.'
-    if not os.path.exists(output_data) or os.path.getsize(output_data) == 0:
-        print exp_dir
-        raise 'No output data or output data is zero.'
-    import fnmatch
-    count_workers = fnmatch.filter(os.listdir(exp_dir), id_pattern)
-    if len(count_workers) > 1:
-        print exp_dir
-        raise 'Multiple workers worked on this.'
-
-def getNrMotes(datafile):
-    with open(datafile) as f:
-        for line in f:
-            if '## numMotes =' in line:
-                return int(line.split('=')[1].strip()) # num motes
-
 def get_set_rgx(experiments, rgx = ''):
     candidates = set()
     for exp in experiments:
@@ -103,41 +76,26 @@ def get_set_rgx(experiments, rgx = ''):
     return candidates
 
 def detectInName(search_parameter, exp_dir):
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(exp_dir, search_parameter)
-    listFiles = os.popen(cmd).read().split("\n")[:-1] # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(exp_dir, search_parameter)
     rgx = '[_\/]+%s_([A-Za-z0-9]+)_' % search_parameter
     candidates = get_set_rgx(listFiles, rgx)
     return candidates
 
 def parseresults(dataDir, parameter, data):
-    cmd = "find {0} -ipath *{1}*/output_cpu0.dat".format(dataDir, parameter)
-    listFiles = os.popen(cmd).read().split("\n")[:-1] # for some reason, there is a trailing whitespace in the list, remove it
+    listFiles = simdata.find_output_files(dataDir, parameter)
     print "Processing %d file(s) in %s." % (len(listFiles), str(dataDir))
     for datafile in listFiles:
-        validate(os.path.dirname(datafile))
-
-        prefParent = {}
+        simdata.validate(os.path.dirname(datafile))
 
         # get all the data
-        with open(datafile, 'r') as inF:
-            for line in inF:
-                if '#prefParent' in line:
-                    lineList = line.strip().split(' ')[2:] # first two are information, drop them
-                    for mote in lineList:
-                        if int(mote.split("@")[0]) != 0:
-                            prefParent[int(mote.split("@")[0])] = float(mote.split("@")[1])
-                        else:
-                            prefParent[int(mote.split("@")[0])] = -1
-                    # print 'Got charge.'
+        records = simdata.mote_records(simdata.load_file(datafile), ['prefParent'])
+        records[0]['prefParent'] = -1 # the root
 
         if datafile not in data:
             data[datafile] = [] # make a list of (id, hopcount, consumption) per node per datafile
 
-        numMotes = getNrMotes(datafile)
-
         # summarize the data
-        for mote in range(0, numMotes):
-            data[datafile].append({'mote': mote, 'prefParent': prefParent[mote]})
+        data[datafile] += records
 
         if data[datafile][0]['mote'] != 0: # should be root node
             assert False
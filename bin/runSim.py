@@ -32,18 +32,18 @@ import time
 import itertools
 import logging.config
 import threading
-import math
 import multiprocessing
 import argparse
+import collections
+import traceback
 
-from SimEngine     import SimEngine,   \
-                          SimSettings, \
-                          SimStats
+from SimEngine     import Simulation
 from SimGui        import SimGui
 
 #============================ helpers =========================================
 
-def parseCliOptions():
+# the options of the command line (or of argv, a list of arguments)
+def parseCliOptions(argv=None):
 
     parser = argparse.ArgumentParser()
 
@@ -64,7 +64,14 @@ def parseCliOptions():
                       dest='numRuns',
                       type=int,
                       default=2,
-                      help='[sim] Minimum number of simulation runs. Parallelized over NUMCORES CPU cores.',
+                      help='[sim] Number of simulation runs per combination of parameters. Parallelized over NUMCORES CPU cores.',
+                      )
+    parser.add_argument('--forkSweep',
+                      dest='forkSweep',
+                      nargs='+',
+                      type=str,
+                      default=None,
+                      help='[sim] Run the combinations of parameters which only differ in these settings as one run, forked into one process per combination when one of these settings is first read. Up to NUMCORES processes run at the same time.',
                       )
     parser.add_argument('--numCyclesPerRun',
                       dest='numCyclesPerRun',
@@ -78,6 +85,43 @@ def parseCliOptions():
                       default='simData',
                       help='[simulation] Simulation log directory.',
                       )
+    parser.add_argument('--outputFormat',
+                      dest='outputFormat',
+                      type=str,
+                      choices=['dat','npz','both'],
+                      default='dat',
+                      help='[simulation] Format of the results: text (output_cpuN.dat), columnar NumPy arrays (output_cpuN_runM.npz, see SimEngine/ResultsWriter.py) or both.',
+                      )
+    parser.add_argument('--profile',
+                      dest='profile',
+                      type=int,
+                      default=0,
+                      help='[simulation] Time the event callbacks and engine steps of each run, written to output_cpuN_runM.profile.txt/.json (see SimEngine/Profiler.py).',
+                      )
+    parser.add_argument('--goldenTrace',
+                      dest='goldenTrace',
+                      type=int,
+                      default=0,
+                      help='[simulation] Record the events, statistics and random streams of each run to output_cpuN_runM.trace, to compare with bin/compareTraces.py (see SimEngine/Trace.py).',
+                      )
+    parser.add_argument('--eventLog',
+                      dest='eventLog',
+                      type=int,
+                      default=0,
+                      help='[simulation] Record the log calls of the motes, ReSF and ReSFEngine of each run as binary records to output_cpuN_runM.events, whatever the log levels (see SimEngine/EventLog.py).',
+                      )
+    parser.add_argument('--checkpointAsn',
+                      dest='checkpointAsn',
+                      type=int,
+                      default=None,
+                      help='[simulation] Save a checkpoint of each run at this ASN to output_cpuN_runM.checkpoint, to resume it with SimEngine.Checkpoint.load() (see SimEngine/Checkpoint.py).',
+                      )
+    parser.add_argument('--debugStats',
+                      dest='debugStats',
+                      type=int,
+                      default=0,
+                      help='[simulation] Count, in each cell, the transmissions which could be interfered, were interfered or of which the receiver locked on the interference (slow, for debugging).',
+                      )
     # topology
     parser.add_argument('--topology',
                       dest='topology',
@@ -325,6 +369,12 @@ def parseCliOptions():
                       default=0,
                       help='[phy] Disable interference model.',
                       )
+    parser.add_argument('--eventDrivenPropagation',
+                      dest='eventDrivenPropagation',
+                      type=int,
+                      default=0,
+                      help='[phy] Only run the propagation model in slots where motes transmit or listen, skipping idle slots.',
+                      )
     # linear-topology specific
     parser.add_argument('--linearTopologyStaticScheduling',
                       dest='linearTopologyStaticScheduling',
@@ -467,6 +517,7 @@ def parseCliOptions():
                         )
     parser.add_argument('--resfAllocateExtra',
                         dest='resfAllocateExtra',
+                        nargs='+',
                         type=int,
                         default=0,
                         help='Let ReSF allocate extra cells for a backupDuration time.',
@@ -491,6 +542,7 @@ def parseCliOptions():
                         )
     parser.add_argument('--trafficFrequency',
                         dest='trafficFrequency',
+                        nargs='+',
                         type=str,
                         default='long',
                         help='Different types of possible traffic types [short/medium/long].',
@@ -509,6 +561,7 @@ def parseCliOptions():
                         )
     parser.add_argument('--sporadicTraffic',
                         dest='sporadicTraffic',
+                        nargs='+',
                         type=int,
                         default=0,
                         help='Introduce sporadic traffic or not.',
@@ -527,7 +580,7 @@ def parseCliOptions():
                         )
 
 
-    options        = parser.parse_args()
+    options        = parser.parse_args(argv)
     return options.__dict__
 
 def printOrLog(cpuID, output, verbose):
@@ -539,15 +592,9 @@ def printOrLog(cpuID, output, verbose):
     if verbose:
         print output
 
-# runs simulations sequentially on all combinations of input parameters
-def runSimsSequentially(params):
+# all the combinations of the list-valued options, one dict of settings per combination
+def getSimParams(options):
 
-    (cpuID, numRuns, options, verbose) = params
-
-    # record simulation start time
-    simStartTime   = time.time()
-
-    # compute all the simulation parameter combinations
     combinationKeys     = sorted([k for (k,v) in options.items() if type(v)==list])
     simParams           = []
     for p in itertools.product(*[options[k] for k in combinationKeys]):
@@ -559,6 +606,45 @@ def runSimsSequentially(params):
                 simParam[k] = v
         simParams      += [simParam]
 
+    return (combinationKeys, simParams)
+
+# runs one simulation run; if outputBuffer is a list, its output goes there instead of to the output file
+def runSim(simParam, combinationKeys, cpuID, runNum, runStartTime, verbose, outputBuffer=None, gui=None):
+
+    # create the simulation
+    sim              = Simulation.Simulation(
+        cpuID            = cpuID,
+        runNum           = runNum,
+        verbose          = verbose,
+        outputBuffer     = outputBuffer,
+        startTime        = runStartTime,
+        combinationKeys  = combinationKeys,
+        **simParam
+    )
+    outputFile       = sim.settings.getOutputFile()
+
+    # run it, showing it in the GUI if any
+    if gui:
+        gui.setSimulation(sim)
+    sim.run()
+    if gui:
+        gui.setSimulation(None)
+
+    sim.destroy()
+
+    return outputFile
+
+# runs simulations sequentially on all combinations of input parameters
+def runSimsSequentially(params, gui=None):
+
+    (cpuID, numRuns, options, verbose) = params
+
+    # record simulation start time
+    simStartTime   = time.time()
+
+    # compute all the simulation parameter combinations
+    (combinationKeys, simParams) = getSimParams(options)
+
     # run a simulation for each set of simParams
     for (simParamNum,simParam) in enumerate(simParams):
 
@@ -577,45 +663,213 @@ def runSimsSequentially(params):
             )
             printOrLog(cpuID, output, verbose)
 
-            # create singletons
-            settings         = SimSettings.SimSettings(cpuID=cpuID, runNum=runNum, **simParam)
-            settings.setStartTime(runStartTime)
-            settings.setCombinationKeys(combinationKeys)
-            simengine        = SimEngine.SimEngine(cpuID=cpuID, runNum=runNum)
-            simstats         = SimStats.SimStats(cpuID=cpuID, runNum=runNum, verbose=verbose)
-
-            # start simulation run
-            simengine.start()
-
-            # wait for simulation run to end
-            simengine.join()
-
-            # destroy singletons
-            simstats.destroy()
-            simengine.destroy()
-            settings.destroy()
+            runSim(simParam, combinationKeys, cpuID, runNum, runStartTime, verbose, gui=gui)
 
         # print
         output  = 'simulation ended after {0:.0f}s.'.format(time.time()-simStartTime)
         printOrLog(cpuID, output, verbose)
 
-def printProgress(cpuIDs):
+#===== parallel
+
+# runs a single (parameter combination, run) task in a worker of the pool
+def runSimTask(task):
+
+    (simParamNum, numSimParams, simParam, combinationKeys, runNum, numRuns, progressQueue) = task
+
+    progressQueue.put((
+        multiprocessing.current_process().name,
+        'parameters {0}/{1}, run {2}/{3}'.format(simParamNum+1, numSimParams, runNum+1, numRuns),
+    ))
+
+    # the output is sent back to the parent, which writes it to the output file
+    outputBuffer = []
+    outputFile   = runSim(simParam, combinationKeys, 0, runNum, time.time(), False, outputBuffer)
+
+    return (simParamNum, runNum, outputFile, ''.join(outputBuffer))
+
+def printProgress(progressQueue, numTasks, numTasksDone):
+    status = {}
     while True:
-        time.sleep(1)
-        output     = []
-        for cpuID in cpuIDs:
-            with open('cpu{0}.templog'.format(cpuID),'r') as f:
-                output += ['[cpu {0}] {1}'.format(cpuID,f.read())]
-        allDone = True
-        for line in output:
-            if line.count('ended')==0:
-                allDone = False
-        output = '\n'.join(output)
+        msg = progressQueue.get()
+        if msg is None:
+            break
+        (worker, line) = msg
+        status[worker] = line
+        output  = ['[{0}] {1}'.format(w, status[w]) for w in sorted(status.keys())]
+        output += ['{0}/{1} runs done'.format(numTasksDone[0], numTasks)]
         os.system('cls' if os.name == 'nt' else 'clear')
+        print '\n'.join(output)
+
+# runs all (parameter combination, run) tasks on a pool of processes. Tasks
+# are handed out one at a time, so a core that finishes early takes the next
+# task. The output of each run comes back to the parent, which writes the runs
+# of each combination to its output file in order, as with a single core.
+def runSimsInParallel(numCores, numRuns, options):
+
+    # record simulation start time
+    simStartTime   = time.time()
+
+    (combinationKeys, simParams) = getSimParams(options)
+
+    manager        = multiprocessing.Manager()
+    progressQueue  = manager.Queue()
+
+    tasks = [
+        (simParamNum, len(simParams), simParam, combinationKeys, runNum, numRuns, progressQueue)
+        for (simParamNum, simParam) in enumerate(simParams)
+        for runNum in xrange(numRuns)
+    ]
+
+    # print progress (in separate thread)
+    numTasksDone   = [0]
+    printThread    = threading.Thread(target=printProgress, args=(progressQueue, len(tasks), numTasksDone))
+    printThread.start()
+
+    pool           = multiprocessing.Pool(numCores)
+    pending        = dict((simParamNum, {}) for simParamNum in xrange(len(simParams)))
+    nextRunNum     = dict((simParamNum, 0) for simParamNum in xrange(len(simParams)))
+    try:
+        for (simParamNum, runNum, outputFile, output) in pool.imap_unordered(runSimTask, tasks, chunksize=1):
+            numTasksDone[0] += 1
+
+            # write the runs which are next in line (no output if only writing .npz files)
+            pending[simParamNum][runNum] = (outputFile, output)
+            while nextRunNum[simParamNum] in pending[simParamNum]:
+                (outputFile, output) = pending[simParamNum].pop(nextRunNum[simParamNum])
+                if output:
+                    with open(outputFile, 'w' if nextRunNum[simParamNum]==0 else 'a') as f:
+                        f.write(output)
+                nextRunNum[simParamNum] += 1
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        progressQueue.put(None)
+        printThread.join()
+        manager.shutdown()
+
+    print 'simulation ended after {0:.0f}s.'.format(time.time()-simStartTime)
+
+#===== forked
+
+# runs one simulation run for each of the combinations of parameters in
+# simParams, which only differ in the forkKeys settings. The run starts with
+# the first combination. When one of the forkKeys settings is first read, the
+# process forks: each child process continues the run with the settings of one
+# of the other combinations, the parent with the first one. Until then, the
+# combinations share the run, e.g. the convergence of the network when the
+# settings are only read once the experiment starts. The settings are watched
+# from their creation on, so a setting read while the engine and the motes are
+# built forks before anything is built from it.
+def runSimForked(simParams, forkKeys, combinationKeys, runNum, numCores):
+
+    outputBuffer     = []
+    children         = []
+    isChild          = [False]
+    forked           = [False]
+
+    def waitChild():
+        (pid, status) = os.wait()
+        children.remove(pid)
+        if status != 0:
+            raise RuntimeError('forked run {0} failed with status {1}'.format(pid, status))
+
+    def fork(sim, key):
+        # the engine and the stats may not be built yet
+        forked[0] = True
+        log.info('run {0} forked on {1} at ASN {2}'.format(runNum, key, sim.engine.getAsn() if sim.engine else None))
+        sys.stdout.flush()
+        for simParam in simParams[1:]:
+            while len(children) >= max(numCores-1, 1):
+                waitChild()
+            pid = os.fork()
+            if pid == 0:
+                # the child continues the run with its combination of parameters
+                isChild[0] = True
+                del children[:]
+                sim.settings.__dict__.update(simParam)
+                sim.settings.setCombinationKeys(combinationKeys)
+                if sim.stats is not None:
+                    sim.stats.settingsChanged()
+                return
+            children.append(pid)
+
+    # the engine runs in this thread, the thread which forks
+    try:
+        sim          = Simulation.Simulation(
+            cpuID            = 0,
+            runNum           = runNum,
+            outputBuffer     = outputBuffer,
+            startTime        = time.time(),
+            combinationKeys  = combinationKeys,
+            watchSettings    = (forkKeys, fork),
+            **simParams[0]
+        )
+        try:
+            sim.engine.run()
+        except Exception:
+            # as when the engine runs in its thread, an error ends the run, not the batch
+            traceback.print_exc()
+        with open(sim.settings.getOutputFile(), 'w' if runNum==0 else 'a') as f:
+            f.write(''.join(outputBuffer))
+        sim.destroy()
+    except:
+        if not isChild[0]:
+            raise
+        traceback.print_exc()
+        os._exit(1)
+    if isChild[0]:
+        # never back to the loop of the parent
+        sys.stdout.flush()
+        os._exit(0)
+
+    while children:
+        waitChild()
+
+    # none of the settings was read, so the run never forked: the other
+    # combinations run from the start
+    if not forked[0] and len(simParams) > 1:
+        output = 'run {0} never read {1}, running its {2} other combinations from the start'.format(
+            runNum,
+            ', '.join(forkKeys),
+            len(simParams)-1,
+        )
+        log.warning(output)
         print output
-        if allDone:
-            break
+        for simParam in simParams[1:]:
+            runSimForked([simParam], forkKeys, combinationKeys, runNum, numCores)
+
+# runs all combinations of parameters, sharing the runs of the combinations
+# which only differ in the forkSweep settings (see runSimForked)
+def runSimsForked(numCores, numRuns, options):
+
+    # record simulation start time
+    simStartTime   = time.time()
+
+    forkKeys       = options['forkSweep']
+    (combinationKeys, simParams) = getSimParams(dict(options, forkSweep=None))
+
+    # the combinations which share a run
+    groups         = collections.OrderedDict()
+    for simParam in simParams:
+        groups.setdefault(tuple(simParam[k] for k in combinationKeys if k not in forkKeys), []).append(simParam)
+
+    for runNum in xrange(numRuns):
+        for (groupNum, groupParams) in enumerate(groups.values()):
+            output  = 'run {0}/{1}, parameters {2}/{3} ({4} combinations)'.format(
+               runNum+1,
+               numRuns,
+               groupNum+1,
+               len(groups),
+               len(groupParams),
+            )
+            printOrLog(0, output, True)
+
+            runSimForked(groupParams, forkKeys, combinationKeys, runNum, numCores)
 
+    print 'simulation ended after {0:.0f}s.'.format(time.time()-simStartTime)
 
 def readOptions(jsonf, options):
     # TODO: what if it does not exist
@@ -660,7 +914,7 @@ def main():
         gui        = SimGui.SimGui()
 
         # run simulations (in separate thread)
-        simThread  = threading.Thread(target=runSimsSequentially, args=((0, options['numRuns'], options, True),))
+        simThread  = threading.Thread(target=runSimsSequentially, args=((0, options['numRuns'], options, True), gui))
         simThread.start()
 
         # Glenn, otherwise the GUI tries to draw while the topology is not yet built
@@ -668,18 +922,17 @@ def main():
 
         # start GUI's mainloop (in main thread)
         gui.mainloop()
+    elif options['forkSweep']:
+        runSimsForked(num_cores_to_use, options['numRuns'], options)
     elif num_cores_to_use == 1:
         runSimsSequentially((0, options['numRuns'], options, True))
     else:
         # parallelize
-        runsPerCore = int(math.ceil(float(options['numRuns']) / float(num_cores_to_use)))
-        pool = multiprocessing.Pool(num_cores_to_use)
-        pool.map_async(runSimsSequentially,[(i, runsPerCore, options, False) for i in range(num_cores_to_use)])
-        printProgress([i for i in range(num_cores_to_use)])
+        runSimsInParallel(num_cores_to_use, options['numRuns'], options)
         raw_input("Done. Press Enter to close.")
+        return
 
-    for i in range(num_cores_to_use):
-        os.remove('cpu{0}.templog'.format(i))
+    os.remove('cpu0.templog')
 
 if __name__ == '__main__':
     main()
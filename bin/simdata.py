@@ -0,0 +1,318 @@
+"""
+Loader for the output files of runSim.py, shared by the parse and compare scripts.
+
+Each output_cpu*.dat file is read once, in a single pass: every line is handed
+to the handler of its first token (see LINE_HANDLERS). The result is a set of
+tidy pandas DataFrames, one row per (run, mote, tag) or per (run, cycle), with
+the experiment parameters as columns.
+
+Parsing a file is cached in a pickle next to it, which is reused as long as the
+size and modification time of the file are unchanged.
+"""
+
+import os
+import ast
+import fnmatch
+import multiprocessing
+import cPickle as pickle
+
+import numpy as np
+import pandas as pd
+
+OUTPUT_FILE = 'output_cpu0.dat'
+CACHE_SUFFIX = '.simdata.pkl'
+CACHE_VERSION = 1
+
+#============================ finding files ===================================
+
+def find_output_files(data_dir, parameter='', filename=OUTPUT_FILE):
+    """
+    Find the output files of the experiments under a directory, as
+    "find data_dir -ipath *parameter*/filename" does.
+    :param string data_dir: a directory, or an output file to match
+    :param string parameter: only keep the experiments with this in their path
+    :param string filename:
+    :return: the sorted list of output files
+    :rtype: list
+    """
+    pattern = '*{0}*'.format(parameter.lower())
+    if os.path.isfile(data_dir):
+        (dirpath, name) = os.path.split(data_dir)
+        return [data_dir] if name == filename and fnmatch.fnmatchcase(dirpath.lower(), pattern) else []
+    output_files = []
+    for (dirpath, dirnames, filenames) in os.walk(data_dir):
+        if filename in filenames and fnmatch.fnmatchcase(dirpath.lower(), pattern):
+            output_files.append(os.path.join(dirpath, filename))
+    return sorted(output_files)
+
+def validate(exp_dir, filename=OUTPUT_FILE):
+    """ Validate the experiment to be really successful."""
+    error_log = os.path.join(exp_dir, 'error.log') # should be empty
+    runSim_log = os.path.join(exp_dir, 'runSim.log') # should be there, should not be empty
+    output_data = os.path.join(exp_dir, filename) # should be there, should not be empty
+
+    if not os.path.exists(error_log) or os.path.getsize(error_log) > 0:
+        raise ValueError('Error log not there or not zero: {0}'.format(exp_dir))
+    if not os.path.exists(runSim_log) or os.path.getsize(runSim_log) == 0:
+        raise ValueError('No runSim log or runSim log is empty: {0}'.format(exp_dir))
+    if not os.path.exists(output_data) or os.path.getsize(output_data) == 0:
+        raise ValueError('No output data or output data is zero: {0}'.format(exp_dir))
+    if len(fnmatch.filter(os.listdir(exp_dir), '*.id.txt')) > 1:
+        raise ValueError('Multiple workers worked on this: {0}'.format(exp_dir))
+
+#============================ parsing =========================================
+
+def _to_value(text):
+    """ a value of the output file, NaN for None """
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+def _parse_setting(state, tokens):
+    # "## key = value", the settings of a run come before its statistics
+    if state['settings'] is None:
+        state['settings'] = {}
+        state['runs'].append(state['settings'])
+    (key, _, value) = ' '.join(tokens[1:]).partition(' = ')
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    state['settings'][key] = value
+
+def _parse_cycle_header(state, tokens):
+    # "# name name ...", the first line of a run after its settings
+    state['settings'] = None
+    state['columns'] = tokens[1:]
+
+def _parse_mote_values(state, tokens):
+    # "#tag runNum=N mote@value ... [total]"
+    tag = tokens[0][1:]
+    runNum = int(tokens[1].split('=')[1])
+    for token in tokens[2:]:
+        (mote, sep, value) = token.partition('@')
+        if sep:
+            state['motes'].append((runNum, int(mote), tag, _to_value(value)))
+        else:
+            state['totals'].append((runNum, tag, _to_value(token)))
+
+def _parse_pos(state, tokens):
+    # "#pos runNum=N mote@(x,y)@rank ..."
+    runNum = int(tokens[1].split('=')[1])
+    for token in tokens[2:]:
+        (mote, pos, rank) = token.split('@')
+        (x, y) = pos[1:-1].split(',')
+        state['pos'].append((runNum, int(mote), float(x), float(y), _to_value(rank)))
+
+def _parse_links(state, tokens):
+    # "#links runNum=N moteA-moteB@rssidBm@pdr ..."
+    runNum = int(tokens[1].split('=')[1])
+    for token in tokens[2:]:
+        (motes, rssi, pdr) = token.split('@')
+        (moteA, moteB) = motes.split('-')
+        state['links'].append((runNum, int(moteA), int(moteB), float(rssi[:-3]), float(pdr)))
+
+def _parse_cycle(state, tokens):
+    # a line of cycle statistics (runNum is one of them), under the last "#" header
+    state['cycles'].append([_to_value(t) for t in tokens])
+    state['cycleColumns'] = state['columns']
+
+# first token of a line -> handler, anything else starting with "#" is a "#tag" line
+LINE_HANDLERS = {
+    '##':         _parse_setting,
+    '#':          _parse_cycle_header,
+    '#pos':       _parse_pos,
+    '#links':     _parse_links,
+}
+
+def parse_file(datafile):
+    """
+    Parse an output file in a single pass.
+    :param string datafile:
+    :return: a dict of DataFrames: 'settings' (one row per run), 'cycles',
+             'motes' (runNum, mote, tag, value), 'totals' (runNum, tag, value),
+             'pos' and 'links'
+    :rtype: dict
+    """
+    state = {
+        'settings':     None,  # the settings being read
+        'runs':         [],    # the settings of each run
+        'columns':      [],
+        'cycleColumns': [],
+        'cycles':       [],
+        'motes':        [],
+        'totals':       [],
+        'pos':          [],
+        'links':        [],
+    }
+
+    with open(datafile, 'r') as f:
+        for line in f:
+            tokens = line.split()
+            if not tokens:
+                continue
+            handler = LINE_HANDLERS.get(tokens[0])
+            if handler is None:
+                handler = _parse_mote_values if tokens[0][0] == '#' else _parse_cycle
+            handler(state, tokens)
+
+    return {
+        'settings': pd.DataFrame(state['runs']),
+        'cycles':   pd.DataFrame(state['cycles'], columns=state['cycleColumns'] or ['runNum']),
+        'motes':    pd.DataFrame(state['motes'], columns=['runNum', 'mote', 'tag', 'value']),
+        'totals':   pd.DataFrame(state['totals'], columns=['runNum', 'tag', 'value']),
+        'pos':      pd.DataFrame(state['pos'], columns=['runNum', 'mote', 'x', 'y', 'rank']),
+        'links':    pd.DataFrame(state['links'], columns=['runNum', 'moteA', 'moteB', 'rssi', 'pdr']),
+    }
+
+#============================ loading =========================================
+
+def load_file(datafile, cache=True):
+    """
+    Parse an output file, or take it from its cache if the file did not change.
+    :param string datafile:
+    :param bool cache: use and update the cache next to the file
+    :return: the DataFrames of parse_file()
+    :rtype: dict
+    """
+    stat = os.stat(datafile)
+    key = (CACHE_VERSION, stat.st_size, stat.st_mtime)
+    cachefile = datafile + CACHE_SUFFIX
+
+    if cache and os.path.exists(cachefile):
+        try:
+            with open(cachefile, 'rb') as f:
+                (cachedKey, parsed) = pickle.load(f)
+            if cachedKey == key:
+                return parsed
+        except (IOError, EOFError, ValueError, pickle.UnpicklingError):
+            pass # parse the file again
+
+    parsed = parse_file(datafile)
+
+    if cache:
+        # written aside and renamed, for scripts loading the same files at once
+        tmpfile = '{0}.{1}'.format(cachefile, os.getpid())
+        try:
+            with open(tmpfile, 'wb') as f:
+                pickle.dump((key, parsed), f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmpfile, cachefile)
+        except (IOError, OSError):
+            pass # e.g. a read-only data directory
+
+    return parsed
+
+def load(data_dir, parameter='', keys=None, cache=True):
+    """
+    Load all the experiments under a directory into tidy DataFrames.
+    Every row gets the output file it comes from ('datafile') and the value of
+    the experiment parameters of its run as columns.
+    :param string data_dir:
+    :param string parameter: only keep the experiments with this in their path
+    :param list keys: the experiment parameters, by default the combinationKeys of each run
+    :param bool cache:
+    :return: a dict of DataFrames, as parse_file()
+    :rtype: dict
+    """
+    tables = {}
+    for datafile in find_output_files(data_dir, parameter):
+        parsed = load_file(datafile, cache=cache)
+        settings = parsed['settings']
+        if settings.empty:
+            continue
+
+        runKeys = keys
+        if runKeys is None:
+            runKeys = sorted(set(k for ks in settings.get('combinationKeys', []) for k in ks))
+        params = settings[['runNum'] + [k for k in runKeys if k != 'runNum']].copy()
+        params['datafile'] = datafile
+
+        for (name, table) in parsed.items():
+            if name == 'settings':
+                table = table.copy()
+                table['datafile'] = datafile
+            else:
+                table = params.merge(table, on='runNum', how='right')
+            tables.setdefault(name, []).append(table)
+
+    return dict((name, pd.concat(t, ignore_index=True, sort=False)) for (name, t) in tables.items())
+
+def mote_table(parsed, tags):
+    """
+    The per-mote values of the last run of a parsed file, one row per mote.
+    :param dict parsed: the DataFrames of parse_file()
+    :param tags: the tags, or a dict column name -> tag in the output file
+    :return: a DataFrame with a 'mote' column and a column per tag, NaN where
+             the mote has no value
+    :rtype: pandas.DataFrame
+    """
+    if not isinstance(tags, dict):
+        tags = dict((tag, tag) for tag in tags)
+    motes = parsed['motes']
+    motes = motes[motes['runNum'] == motes['runNum'].max()]
+    numMotes = int(parsed['settings']['numMotes'].iloc[-1])
+    values = motes[motes['tag'].isin(tags.values())].pivot(index='mote', columns='tag', values='value')
+    values = values.reindex(index=range(numMotes), columns=sorted(set(tags.values())))
+
+    table = pd.DataFrame({'mote': range(numMotes)})
+    for (name, tag) in sorted(tags.items()):
+        table[name] = values[tag].values
+    return table
+
+def mote_records(parsed, tags):
+    """
+    The per-mote values of the last run of a parsed file, in the format of the
+    parse scripts: one dict per mote, None where the mote has no value.
+    :param dict parsed: the DataFrames of parse_file()
+    :param tags: the tags, or a dict name in the records -> tag in the output file
+    :return: the records, ordered by mote id
+    :rtype: list
+    """
+    table = mote_table(parsed, tags)
+    records = []
+    for row in table.to_dict('records'):
+        record = {'mote': int(row.pop('mote'))}
+        for (name, value) in row.items():
+            record[name] = None if np.isnan(value) else float(value)
+        records.append(record)
+    return records
+
+def _load_mote_table(task):
+    (datafile, tags, check, cache) = task
+    if check:
+        validate(os.path.dirname(datafile))
+    table = mote_table(load_file(datafile, cache=cache), tags)
+    table['datafile'] = datafile
+    return table
+
+def load_mote_tables(datafiles, tags, numCores=None, check=False, cache=True):
+    """
+    The per-mote values of many experiments, loaded on a process pool (one
+    task per experiment) and merged into a single DataFrame.
+    :param list datafiles:
+    :param tags: as for mote_table()
+    :param int numCores: the size of the pool, by default the number of CPUs
+    :param bool check: validate() each experiment directory
+    :param bool cache:
+    :return: the mote_table() of each file, with a 'datafile' column, in the order of datafiles
+    :rtype: pandas.DataFrame
+    """
+    tasks = [(datafile, tags, check, cache) for datafile in datafiles]
+    if not tasks:
+        return pd.DataFrame(columns=['mote', 'datafile'] + sorted(tags))
+
+    if numCores is None:
+        numCores = multiprocessing.cpu_count()
+    numCores = min(numCores, len(tasks))
+    if numCores > 1:
+        pool = multiprocessing.Pool(numCores)
+        try:
+            tables = pool.map(_load_mote_table, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        tables = [_load_mote_table(task) for task in tasks]
+
+    return pd.concat(tables, ignore_index=True)
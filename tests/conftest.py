@@ -6,3 +6,5 @@ import pytest
 from tests.fixtures.motes import motes
 from tests.fixtures.sim import sim
 from tests.fixtures.settings import settings
+from tests.fixtures.options import options
+from tests.fixtures.simulation import simulation
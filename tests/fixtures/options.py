@@ -0,0 +1,51 @@
+"""
+\brief fixture returning the default options of runSim.py, one value per setting
+"""
+
+import sys
+
+import pytest
+
+
+# a short ReSF run, the one of the golden trace
+GOLDEN_SETTINGS = {
+    'numMotes': 5,
+    'numCyclesPerRun': 10,
+    'maxToConverge': 300,
+    'convergeFirst': 1,
+    'settlingTime': 10,
+    'sf': 'resf',
+    'resfMode': 'sum',
+    'seed': 2,
+}
+
+
+def default_options():
+    argv = sys.argv
+    sys.argv = [argv[0]]
+    try:
+        import bin.runSim as runSim
+        options = runSim.parseCliOptions()
+    finally:
+        sys.argv = argv
+
+    # one value per setting
+    for (k, v) in options.items():
+        if type(v) == list:
+            options[k] = v[0]
+    return options
+
+
+@pytest.fixture(scope="function")
+def options():
+
+    def create_options(**kwargs):
+
+        params = default_options()
+
+        if kwargs:
+            params.update(kwargs)
+
+        return params
+
+    return create_options
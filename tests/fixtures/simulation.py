@@ -0,0 +1,38 @@
+"""
+\brief fixture returning a Simulation instance, the short run of the golden
+trace unless other settings are given
+"""
+
+import pytest
+
+import SimEngine.Simulation as Simulation
+
+from tests.fixtures.options import default_options, GOLDEN_SETTINGS
+
+
+@pytest.fixture(scope="function")
+def simulation(request, tmpdir):
+
+    def create_simulation(outputBuffer=None, **kwargs):
+
+        params = default_options()
+        params.update(GOLDEN_SETTINGS)
+        params['simDataDir'] = tmpdir
+
+        if kwargs:
+            params.update(kwargs)
+        params['simDataDir'] = str(params['simDataDir'])
+
+        sim = Simulation.Simulation(
+            cpuID=0,
+            runNum=0,
+            outputBuffer=[] if outputBuffer is None else outputBuffer,
+            combinationKeys=[],
+            **params
+        )
+
+        request.addfinalizer(sim.destroy)
+
+        return sim
+
+    return create_simulation
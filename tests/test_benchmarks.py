@@ -0,0 +1,77 @@
+"""
+\brief Tests for the benchmark suite
+"""
+
+import benchmarks.bench as bench
+
+
+def test_scenarios():
+    scenarios = bench.getScenarios()
+
+    # mobility only for grid and random
+    assert len(scenarios) == 1*4*3*2 + 2*4*3*2*2
+    assert 'linear_200_ellsf_nointerf_static' in scenarios
+    assert 'linear_20_msf_interf_rwm' not in scenarios
+    assert bench.selectScenarios(['grid_20_resf_*_rwm']) == ['grid_20_resf_interf_rwm', 'grid_20_resf_nointerf_rwm']
+
+    settings = bench.getSettings('grid_50_ellsf_nointerf_rwm')
+    assert settings['topology'] == 'grid'
+    assert settings['numMotes'] == 50
+    assert settings['sf'] == 'ellsf'
+    assert settings['noInterference'] == 1
+    assert settings['mobilityModel'] == 'RWM'
+    assert settings['seed'] == bench.COMMON_SETTINGS['seed']
+    assert settings['resfNoMSF'] == 'unlimited'
+
+
+def test_compare():
+    base = {
+        'numEvents':                1000,
+        'seconds':                  10.0,
+        'slotsPerSecond':           5000.0,
+        'peakRssKb':                30000,
+        'propagateSeconds':         1.0,
+        'resfCalcRequestSeconds':   0.01,
+    }
+    baseline = {'a': base, 'b': base, 'c': base}
+    results = {
+        'a': dict(base, slotsPerSecond=4500.0, resfCalcRequestSeconds=0.05),
+        'b': dict(base, slotsPerSecond=3000.0, numEvents=1001),
+        'c': dict(base, error='AssertionError: '),
+        'd': base,
+    }
+
+    # 'a' within the tolerance, resfCalcRequestSeconds is too small to compare
+    assert bench.compare(results, baseline, 0.2) == [
+        ('b', 'numEvents changed: 1000 -> 1001'),
+        ('b', 'slotsPerSecond regressed: 5000 -> 3000 (-40.0%)'),
+        ('c', 'error changed: None -> AssertionError: '),
+    ]
+
+
+def test_update_refuses_failed_runs(tmpdir, monkeypatch):
+    baseline = tmpdir.join('baseline.json')
+    results = {
+        'grid_20_msf_interf_static':  {'numEvents': 1000},
+        'grid_20_resf_interf_static': {'numEvents': 1000, 'error': 'AssertionError: '},
+    }
+    monkeypatch.setattr(bench, 'runScenarios', lambda scenarios, repeat: results)
+    monkeypatch.setattr('sys.argv', ['bench.py', '--scenarios', 'grid_20_msf_interf_static', 'grid_20_resf_interf_static', '--update', '--baseline', str(baseline)])
+
+    assert bench.main() == 1
+    assert not baseline.check()
+
+    del results['grid_20_resf_interf_static']['error']
+    assert bench.main() == 0
+    assert sorted(bench.readBaseline(str(baseline))) == sorted(results)
+
+
+def test_run_scenario():
+    result = bench.runScenario('random_20_resf_interf_static')
+
+    assert 'error' not in result
+    assert result['asn'] > 0 and result['numEvents'] > result['asn']
+    assert result['slotsPerSecond'] > 0
+    assert result['peakRssKb'] > 0
+    assert 0 < result['propagateSeconds'] < result['seconds']
+    assert 0 < result['resfCalcRequestSeconds'] < result['seconds']
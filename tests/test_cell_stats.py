@@ -0,0 +1,57 @@
+"""
+\brief Tests for the history and debug statistics of the cells
+"""
+
+import SimEngine.Mote as Mote
+
+
+def run_and_get_cells(sim):
+    sim.run()
+    return [dict(mote.schedule) for mote in sim.engine.motes]
+
+
+def test_history_bounded(simulation):
+    schedules = run_and_get_cells(simulation())
+    cells = [cell for schedule in schedules for cell in schedule.values()]
+
+    # only the last tx are kept
+    for cell in cells:
+        assert cell['history'].maxlen == Mote.NUM_MAX_HISTORY
+        cell['history'].extend([1] * (Mote.NUM_MAX_HISTORY + 1))
+        assert len(cell['history']) == Mote.NUM_MAX_HISTORY
+
+    # no debug statistics by default
+    for cell in cells:
+        assert cell['debug_canbeInterfered'] == 0
+        assert cell['debug_interference'] == 0
+        assert cell['debug_lockInterference'] == 0
+
+
+def test_debug_stats(simulation, tmpdir):
+    schedules = run_and_get_cells(simulation(simDataDir=tmpdir.mkdir('default')))
+    debugSchedules = run_and_get_cells(simulation(simDataDir=tmpdir.mkdir('debug'), debugStats=1))
+
+    # the debug statistics do not change the run
+    def key(schedules):
+        return [sorted((ts, cell['ch'], cell['dir'], cell['numTx'], cell['numTxAck'], cell['numRx'])
+                       for (ts, cell) in schedule.items()) for schedule in schedules]
+    assert key(schedules) == key(debugSchedules)
+
+    cells = [cell for schedule in debugSchedules for cell in schedule.values()]
+    assert sum(cell['debug_interference'] for cell in cells) > 0
+    for cell in cells:
+        assert cell['debug_lockInterference'] <= cell['debug_interference']
+
+
+def test_tx_occupancy_same_as_scanning(simulation):
+    sim = simulation()
+    sim.run()
+    txCells = {}
+    for mote in sim.engine.motes:
+        for (ts, cell) in mote.schedule.items():
+            if cell['dir'] == Mote.DIR_TX:
+                txCells.setdefault((ts, cell['ch']), set()).add(mote.id)
+    occupancy = sim.engine.txOccupancy
+    assert sorted(occupancy.cells.keys()) == sorted(txCells.keys())
+    for ((ts, ch), moteIds) in txCells.items():
+        assert set(mote.id for (mote, _) in occupancy.getCells(ts, ch)) == moteIds
@@ -0,0 +1,70 @@
+"""
+\brief Tests for the checkpoints of a running simulation
+"""
+
+import SimEngine.SimEngine as SimEngine
+import SimEngine.Checkpoint as Checkpoint
+import SimEngine.Trace as Trace
+
+CHECKPOINT_ASN = 3000
+
+
+def run(sim):
+    sim.run()
+    return Trace.read(sim.settings.getOutputFile('trace'))
+
+
+def stats_lines(outputBuffer):
+    # the settings in the header differ, the links are listed in the order of a dict keyed on the motes
+    lines = []
+    for line in '\n'.join(outputBuffer).split('\n'):
+        if line.startswith('##'):
+            continue
+        if line.startswith('#links'):
+            line = ' '.join(sorted(line.split(' ')))
+        lines += [line]
+    return lines
+
+
+def test_resume(simulation, tmpdir, request):
+    output = []
+    golden = run(simulation(outputBuffer=output, simDataDir=tmpdir.mkdir('golden'), goldenTrace=1))
+
+    # the run with the checkpoint is not changed by it
+    outputBeforeCheckpoint = []
+    sim = simulation(outputBuffer=outputBeforeCheckpoint, simDataDir=tmpdir.mkdir('checkpoint'), goldenTrace=1,
+                     checkpointAsn=CHECKPOINT_ASN)
+    assert Trace.compare(golden, run(sim)) is None
+    checkpoint = sim.settings.getOutputFile('checkpoint')
+
+    # resumed twice in the same process
+    for name in ['resumed1', 'resumed2']:
+        outputAfterCheckpoint = []
+        resumed = Checkpoint.load(checkpoint, outputBuffer=outputAfterCheckpoint, simDataDir=str(tmpdir.mkdir(name)))
+        request.addfinalizer(resumed.destroy)
+        assert resumed.engine.getAsn() < CHECKPOINT_ASN
+        assert resumed.engine.checkpointAsn is None
+        assert resumed.engine is not SimEngine.SimEngine._instance
+
+        trace = run(resumed)
+        assert Trace.compare(golden, trace) is None
+        assert trace['digest'] == golden['digest']
+        numLines = len(stats_lines(outputAfterCheckpoint))
+        assert numLines > 0
+        assert stats_lines(outputAfterCheckpoint) == stats_lines(output)[-numLines:]
+
+
+def test_fork(simulation, tmpdir, request):
+    sim = simulation(simDataDir=tmpdir.mkdir('checkpoint'), goldenTrace=1, settlingTime=20)
+    checkpoint = str(tmpdir.join('converged.checkpoint'))
+    sim.engine.checkpointAt(CHECKPOINT_ASN, checkpoint)
+    golden = run(sim)
+
+    # the run continues with the new settings
+    forked = Checkpoint.load(checkpoint, outputBuffer=[], simDataDir=str(tmpdir.mkdir('forked')), settlingTime=10)
+    request.addfinalizer(forked.destroy)
+    assert forked.settings.settlingTime == 10
+    trace = run(forked)
+    assert trace['settings']['settlingTime'] == 10
+    divergence = Trace.compare(golden, trace)
+    assert divergence is not None and divergence['asn'] >= CHECKPOINT_ASN
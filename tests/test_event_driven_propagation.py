@@ -0,0 +1,73 @@
+"""
+\brief Tests for the event-driven propagation mode of the SimEngine
+"""
+
+import SimEngine.Simulation as Simulation
+
+
+def run_and_snapshot(options, endCallbacks=True, **kwargs):
+    params = options(**kwargs)
+
+    sim = Simulation.Simulation(cpuID=0, runNum=0, outputBuffer=[], **params)
+    engine = sim.engine
+    if not endCallbacks:
+        # the statistics of the experiment can only be written once it is over
+        engine.endCb = []
+    try:
+        engine.scheduleAtAsn(
+            asn=sim.settings.slotframeLength * sim.settings.numCyclesPerRun,
+            cb=engine._actionEndSim,
+            uniqueTag=(None, '_actionEndSim'),
+        )
+        engine.run()
+
+        return {
+            'asn': engine.getAsn(),
+            'random': engine.propagation.genPropagation.getstate(),
+            'joined': [m.isJoined for m in engine.motes],
+            'parents': [m.preferredParent.id if m.preferredParent else None for m in engine.motes],
+            'schedules': [sorted((ts, c['ch'], c['dir'], c['numTx'], c['numTxAck'], c['numRx']) for (ts, c) in m.schedule.items()) for m in engine.motes],
+            'stats': [sorted(m.motestats.items()) for m in engine.motes],
+        }
+    finally:
+        sim.destroy()
+
+
+def test_event_driven_propagation_same_results(options):
+    kwargs = {
+        'numMotes': 6,
+        'numCyclesPerRun': 10,
+        'maxToConverge': 300,
+        'convergeFirst': 1,
+        'settlingTime': 10,
+        'sf': 'resf',
+        'resfMode': 'sum',
+        'seed': 1,
+    }
+
+    perSlot = run_and_snapshot(options, eventDrivenPropagation=0, **kwargs)
+    eventDriven = run_and_snapshot(options, eventDrivenPropagation=1, **kwargs)
+
+    assert perSlot == eventDriven
+
+
+def test_event_driven_propagation_same_results_with_join(options):
+    # the booting motes listen for EBs from a priority 3 event, after the propagation of the slot
+    kwargs = {
+        'numMotes': 6,
+        'numCyclesPerRun': 40,
+        'maxToConverge': 300,
+        'convergeFirst': 1,
+        'settlingTime': 10,
+        'sf': 'resf',
+        'resfMode': 'sum',
+        'withJoin': 1,
+        'seed': 1,
+    }
+
+    perSlot = run_and_snapshot(options, endCallbacks=False, eventDrivenPropagation=0, **kwargs)
+    eventDriven = run_and_snapshot(options, endCallbacks=False, eventDrivenPropagation=1, **kwargs)
+
+    # motes synchronized on EBs and chose a parent
+    assert [parent for parent in perSlot['parents'][1:] if parent is not None]
+    assert perSlot == eventDriven
@@ -0,0 +1,53 @@
+"""
+\brief Tests for the log guards and the binary event log
+"""
+
+import logging
+
+import SimEngine.EventLog as EventLog
+import SimEngine.Mote as Mote
+
+
+def test_flags():
+    logger = logging.getLogger('test_event_log')
+    logger.setLevel(logging.WARNING)
+    flags = EventLog.LogFlags(logger)
+    assert (flags.debug, flags.info, flags.warning, flags.error) == (False, False, True, True)
+
+    EventLog.refresh(force=True)
+    assert flags.debug and flags.info
+
+    logger.setLevel(logging.DEBUG)
+    EventLog.refresh()
+    assert flags.debug and flags.info
+
+
+def test_disabled_logging_skips_calls(simulation, monkeypatch):
+    calls = []
+    _log = Mote.Mote._log
+
+    def countingLog(self, severity, template, params=()):
+        calls.append(severity)
+        _log(self, severity, template, params)
+    monkeypatch.setattr(Mote.Mote, '_log', countingLog)
+    monkeypatch.setattr(Mote.log, 'level', logging.ERROR)
+
+    simulation().run()
+    assert set(calls) <= set([Mote.WARNING, Mote.ERROR])
+
+
+def test_event_log(simulation):
+    sim = simulation(eventLog=1)
+    sim.run()
+    numMotes = len(sim.engine.motes)
+    records = EventLog.read(sim.settings.getOutputFile('events'))
+
+    assert records
+    asns = [asn for (asn, _, _, _, _) in records]
+    assert asns == sorted(asns)
+    for record in records:
+        (asn, moteId, severity, template, params) = record
+        assert moteId is None or 0 <= moteId < numMotes
+        assert severity in EventLog.SEVERITIES
+        assert EventLog.formatRecord(record).startswith('[ASN={0:>6}'.format(asn))
+    assert '[6top] ADD Request got enqueued: {0}' in set(template for (_, _, _, template, _) in records)
@@ -0,0 +1,76 @@
+"""
+\brief Tests for the EventQueue of the SimEngine
+"""
+
+import pytest
+
+import SimEngine.EventQueue as EventQueue
+
+
+def _drain(queue):
+    events = []
+    while queue:
+        events += [queue.pop(0)]
+    return events
+
+
+def test_order_asn_priority_fifo():
+    queue = EventQueue.EventQueue()
+    queue.push(10, 0, 'a', (1, 'a'))
+    queue.push(5, 2, 'b', (1, 'b'))
+    queue.push(5, 1, 'c', (1, 'c'))
+    queue.push(5, 2, 'd', (1, 'd'))
+    queue.push(10, 0, 'e', None)
+
+    assert len(queue) == 5
+    assert queue[0] == (5, 1, 'c', (1, 'c'))
+    assert [cb for (_, _, cb, _) in queue] == ['c', 'b', 'd', 'a', 'e']
+    assert [cb for (_, _, cb, _) in _drain(queue)] == ['c', 'b', 'd', 'a', 'e']
+    assert not queue
+
+
+def test_remove_lazy():
+    queue = EventQueue.EventQueue()
+    queue.push(3, 0, 'a', (1, 'tag'))
+    queue.push(4, 0, 'b', (2, 'tag'))
+    queue.push(5, 0, 'c', (1, 'tag'))
+
+    assert queue.remove((1, 'tag')) == 2
+    assert queue.remove((1, 'tag')) == 0
+    assert len(queue) == 1
+    assert queue.peekAsn() == 4
+    assert _drain(queue) == [(4, 0, 'b', (2, 'tag'))]
+
+
+def test_remove_except_asn():
+    queue = EventQueue.EventQueue()
+    queue.push(3, 0, 'a', (1, 'tag'))
+    queue.push(7, 0, 'b', (1, 'tag'))
+
+    # the event at the current ASN is kept
+    assert queue.remove((1, 'tag'), exceptAsn=3) == 1
+    assert _drain(queue) == [(3, 0, 'a', (1, 'tag'))]
+
+
+def test_pop_empty():
+    queue = EventQueue.EventQueue()
+    assert queue.peek() is None
+    assert queue.peekAsn() is None
+    with pytest.raises(IndexError):
+        queue.pop(0)
+
+
+def test_compact():
+    queue = EventQueue.EventQueue()
+    for i in range(EventQueue.MIN_COMPACT * 2):
+        queue.push(i, 0, i, (i, 'tag'))
+    for i in range(0, EventQueue.MIN_COMPACT * 2, 4):
+        queue.push(i + 1000, 0, i, (i, 'tag'))
+
+    # cancel everything but the events with tag 0
+    for i in range(1, EventQueue.MIN_COMPACT * 2):
+        queue.remove((i, 'tag'))
+    assert len(queue) == 2
+    assert len(queue.heap) <= EventQueue.MIN_COMPACT
+
+    assert [asn for (asn, _, _, _) in _drain(queue)] == [0, 1000]
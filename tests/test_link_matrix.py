@@ -0,0 +1,54 @@
+"""
+\brief Tests for the LinkMatrix holding the RSSI and PDR between motes
+"""
+
+import numpy as np
+
+import SimEngine.LinkMatrix as LinkMatrix
+import SimEngine.Topology as Topology
+
+
+def test_interpolated_pdr_same_as_scalar():
+    rssis = [-120.0, -97.0, -96.5, -93.6, -90.25, -79.5, -79.0, -60.0]
+    pdrs = LinkMatrix.interpolatedPdr(rssis, Topology.TopologyCreator.RSSI_PDR_TABLE)
+    for (rssi, pdr) in zip(rssis, pdrs):
+        if rssi == -79.0:
+            continue  # the scalar version does not handle the upper bound of the table
+        assert pdr == Topology.RandomTopology.rssiToPdr(rssi)
+
+
+def test_pdr_from_rssi():
+    linkMatrix = LinkMatrix.LinkMatrix(3)
+    linkMatrix.setRSSI(0, 1, -70)
+    linkMatrix.setRSSI(1, 0, -70)
+    linkMatrix.setRSSI(0, 2, -100)
+
+    linkMatrix.setPDRFromRSSI(Topology.RandomTopology.rssiToPdrArray, -97)
+
+    assert linkMatrix.getPDR(0, 1) == 1.0
+    assert linkMatrix.getPDR(1, 0) == 1.0
+    assert linkMatrix.pdrDict(0) == {1: 1.0}
+    assert linkMatrix.getNeighborIds(0) == [1]
+    assert linkMatrix.getNeighborIds(2) == []
+
+    linkMatrix.clearLinks(0)
+    assert linkMatrix.pdrDict(0) == {}
+    assert np.isnan(linkMatrix.getRSSI(0, 1))
+
+
+def test_closest_neighbor():
+    linkMatrix = LinkMatrix.LinkMatrix(3)
+    linkMatrix.updateDistances([0.0, 0.1, 0.3], [0.0, 0.0, 0.0])
+
+    assert linkMatrix.distance[0, 2] == 300.0
+    assert linkMatrix.closestNeighborIds() == [1, 0, 1]
+
+
+def test_rx_power_cache():
+    linkMatrix = LinkMatrix.LinkMatrix(2)
+    linkMatrix.setSymmetricRSSIs(0, [1], [-90.0])
+    assert linkMatrix.getRxPowerMw()[1, 0] == 10 ** -9.0
+
+    linkMatrix.setRSSI(1, 0, -80.0)
+    assert linkMatrix.getRxPowerMw()[1, 0] == 10 ** -8.0
+    assert linkMatrix.getRxPowerMw()[0, 1] == 10 ** -9.0
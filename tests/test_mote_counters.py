@@ -0,0 +1,39 @@
+"""
+\brief Tests for the per-mote counters and the statistics collected per cycle
+"""
+
+import SimEngine.MoteCounters as MoteCounters
+
+
+def test_snapshot():
+    counters = MoteCounters.MoteCounters(3)
+    counters.increment(0, 'rplTxDIO')
+    counters.increment(2, 'rplTxDIO')
+    counters.increment(2, 'tschRxEB')
+    assert counters.get(2, 'rplTxDIO') == 1
+    assert counters.getRow(2)['tschRxEB'] == 1
+
+    sums = counters.sums(counters.snapshot())
+    assert sums['rplTxDIO'] == 2
+    assert sums['tschRxEB'] == 1
+    assert sums['appGenerated'] == 0
+    assert sorted(sums.keys()) == sorted(MoteCounters.COUNTERS)
+
+    # the counters are reset for the next cycle
+    assert counters.values.sum() == 0
+
+
+def test_schedule_stats_same_as_scanning(simulation):
+    sim = simulation()
+    sim.run()
+    assert sum(mote.schedule.numTx for mote in sim.engine.motes) > 0
+    for mote in sim.engine.motes:
+        stats = mote.getCycleStats()
+        cells = mote.schedule.items()
+        assert stats['numTxCells'] == len(mote.getTxCells())
+        assert stats['numTxCellsReSF'] == len(mote.getTxCells(includeReSF=True)) - len(mote.getTxCells())
+        assert stats['numRxCells'] == len(mote.getRxCells())
+        assert stats['numRxCellsReSF'] == len(mote.getRxCells(includeReSF=True)) - len(mote.getRxCells())
+        assert stats['numSharedCells'] == len(mote.getSharedCells())
+        assert stats['numDedicatedCells'] == len([c for (_, c) in cells if type(c['neighbor']) != list and not c['resf']])
+        assert stats['numTx'] == sum([c['numTx'] for (_, c) in cells if not c['resf']])
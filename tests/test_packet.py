@@ -0,0 +1,60 @@
+"""
+\brief Tests for the packets in the queues of the motes
+"""
+
+import cPickle as pickle
+
+import pytest
+
+import SimEngine.Packet as Packet
+
+
+def test_fields():
+    packet = Packet.Packet(type=1, dstIp='root', payload=[1, 0, 1])
+    assert packet.type == 1
+    assert packet['dstIp'] == 'root'
+    assert packet.code is None
+    packet['smac'] = 'node'
+    assert packet.smac == 'node'
+    with pytest.raises(AttributeError):
+        packet.unknown = 1
+
+
+def test_copy():
+    packet = Packet.Packet(type=1, payload=[1, 0, 1])
+    copy = packet.copy()
+    assert copy == packet and copy is not packet
+    copy.type = 2
+    assert packet.type == 1 and copy != packet
+    # shallow
+    assert copy.payload is packet.payload
+
+
+def test_equal_as_dicts():
+    # txQueue.remove() removes the first packet with the same fields
+    queue = [Packet.Packet(type=1, asn=10), Packet.Packet(type=1, asn=20)]
+    queue.remove(Packet.Packet(type=1, asn=20))
+    assert queue == [Packet.Packet(type=1, asn=10)]
+
+
+def test_clear():
+    packet = Packet.Packet(type=1)
+    assert len(packet) == len(Packet.Packet.__slots__)
+    packet.clear()
+    assert len(packet) == 0
+    with pytest.raises(KeyError):
+        packet['type']
+    assert packet != Packet.Packet()
+    assert repr(packet) == '{}'
+
+
+def test_as_packet():
+    # packets built as dicts, without the keys which are not fields
+    packet = Packet.asPacket({'type': 1, 'dstIp': 'root', 'dmac': 'node', 'payload': [1, 0, 1]})
+    assert packet == Packet.Packet(type=1, dstIp='root', payload=[1, 0, 1])
+    assert Packet.asPacket(packet) is packet
+
+
+def test_pickle():
+    packet = Packet.Packet(type=1, payload=[1, 0, 1])
+    assert pickle.loads(pickle.dumps(packet, pickle.HIGHEST_PROTOCOL)) == packet
@@ -0,0 +1,66 @@
+"""
+\brief Tests for the per-callback profiler of the SimEngine
+"""
+
+import json
+import os
+
+import SimEngine.Profiler as Profiler
+import SimEngine.Simulation as Simulation
+
+
+def test_profiler_entries(tmpdir):
+    profiler = Profiler.Profiler()
+    profiler.start()
+
+    def cb():
+        pass
+    profiler.callEvent((1, '_tsch_action_activeCell'), cb)
+    profiler.callEvent((2, '_tsch_action_activeCell'), cb)
+    profiler.callEvent(None, cb)
+    assert profiler.call('ReSFEngine.action', lambda x: x + 1, 1) == 2
+    profiler.stop()
+
+    summary = profiler.getSummary()
+    assert summary['numEvents'] == 3
+    assert dict((e['name'], e['calls']) for e in summary['entries']) == {
+        '_tsch_action_activeCell': 2,
+        'cb': 1,
+        'ReSFEngine.action': 1,
+    }
+
+    table = profiler.write(str(tmpdir.join('profile')), info={'runNum': 0})
+    assert '_tsch_action_activeCell' in table
+    assert tmpdir.join('profile.txt').read().strip() == table
+    dump = json.loads(tmpdir.join('profile.json').read())
+    assert dump['runNum'] == 0
+    assert len(dump['entries']) == 3
+
+
+def test_profiled_run(options, tmpdir):
+    params = options(**{
+        'numMotes': 5,
+        'numCyclesPerRun': 10,
+        'maxToConverge': 300,
+        'convergeFirst': 1,
+        'settlingTime': 10,
+        'sf': 'resf',
+        'resfMode': 'sum',
+        'seed': 2,
+        'profile': 1,
+        'simDataDir': str(tmpdir),
+    })
+
+    sim = Simulation.Simulation(cpuID=0, runNum=0, outputBuffer=[], combinationKeys=[], **params)
+    try:
+        sim.run()
+        filename = sim.settings.getOutputFile('profile')
+    finally:
+        sim.destroy()
+
+    assert os.path.exists(filename+'.txt')
+    dump = json.loads(open(filename+'.json').read())
+    calls = dict((e['name'], e['calls']) for e in dump['entries'])
+    for name in ['propagation', '_tsch_action_activeCell', '_actionEndCycle', 'ReSFEngine.action', '_actionEnd']:
+        assert calls[name] > 0
+    assert dump['totalSeconds'] >= sum(e['seconds'] for e in dump['entries'] if e['name'] != 'ReSFEngine.action')
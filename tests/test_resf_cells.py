@@ -0,0 +1,33 @@
+"""
+\brief Tests for the update of the ReSF cells of a mote at each slotframe
+"""
+
+from collections import OrderedDict
+
+import SimEngine.Mote as Mote
+
+
+def test_unchanged_cells_are_kept(simulation):
+    sim = simulation()
+    (mote, parent) = sim.engine.motes[1:3]
+    cells = OrderedDict([
+        (40, (parent, 1, Mote.DIR_TX, 'a')),
+        (50, (parent, 2, Mote.DIR_TX, 'a')),
+        (60, (parent, 3, Mote.DIR_RX, 'b')),
+    ])
+    mote.ReSF._resf_applyDueCells(cells)
+    for ts in cells:
+        mote.schedule.incrementNumTx(ts)
+    (kept, moved) = (mote.schedule[40], mote.schedule[50])
+
+    # next slotframe: 40 stays, 50 changes channel, 60 is not due anymore, 70 is new
+    mote.ReSF._resf_applyDueCells(OrderedDict([
+        (40, (parent, 1, Mote.DIR_TX, 'a')),
+        (50, (parent, 5, Mote.DIR_TX, 'a')),
+        (70, (parent, 3, Mote.DIR_RX, 'b')),
+    ]))
+    assert mote.schedule[40] is kept and kept['numTx'] == 1
+    assert mote.schedule[50] is not moved and mote.schedule[50]['ch'] == 5 and mote.schedule[50]['numTx'] == 0
+    assert 60 not in mote.schedule
+    assert mote.schedule[70]['resf'] and mote.schedule[70]['resf_unique_id'] == 'b'
+    assert mote.schedule.getTimeslots(Mote.DIR_TX, resf=True) == [40, 50]
@@ -0,0 +1,35 @@
+"""
+\brief Tests for the columnar (.npz) results of a run
+"""
+
+import json
+
+import numpy as np
+
+import SimEngine.ResultsWriter as ResultsWriter
+
+
+def test_save_and_load(tmpdir):
+    results = ResultsWriter.ResultsWriter(3)
+    results.setSettings({'numMotes': 3, 'sf': 'resf'})
+    results.addCycle({'cycle': 0, 'numTx': 5, 'latency': None})
+    results.addCycle({'cycle': 1, 'numTx': 7, 'latency': 1.5})
+    results.addMoteValues('prefParent', [(0, None), (1, 0), (2, 1)])
+    results.addMoteValues('PktGen', [(1, 3), (2, 4)], total=7)
+    results.addMoteValues('resfConvergence', [('2', 1200)])
+    results.addArray('link.pdr', [0.5, 0.9])
+
+    filename = str(tmpdir.join('output_cpu0_run0.npz'))
+    results.save(filename)
+
+    # loadable without unpickling anything
+    loaded = np.load(filename, allow_pickle=False)
+    assert json.loads(str(loaded['settings'])) == {'numMotes': 3, 'sf': 'resf'}
+    assert loaded['cycle.cycle'].tolist() == [0, 1]
+    assert loaded['cycle.numTx'].tolist() == [5, 7]
+    assert np.isnan(loaded['cycle.latency'][0]) and loaded['cycle.latency'][1] == 1.5
+    assert np.isnan(loaded['mote.prefParent'][0])
+    assert loaded['mote.prefParent'][1:].tolist() == [0, 1]
+    assert loaded['total.PktGen'] == 7
+    assert loaded['mote.resfConvergence'][2] == 1200
+    assert loaded['link.pdr'].tolist() == [0.5, 0.9]
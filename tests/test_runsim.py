@@ -0,0 +1,154 @@
+"""
+\brief Tests for the batch runner of bin/runSim.py
+"""
+
+import os
+import sys
+
+import SimEngine.SimEngine as SimEngine
+import SimEngine.SimSettings as SimSettings
+import SimEngine.SimStats as SimStats
+import SimEngine.Propagation as Propagation
+import SimEngine.ReSFEngine as ReSFEngine
+
+
+def parse_options(args):
+    argv = sys.argv
+    sys.argv = [argv[0]] + args
+    try:
+        import bin.runSim as runSim
+        options = runSim.parseCliOptions()
+    finally:
+        sys.argv = argv
+    return (runSim, options)
+
+
+def read_runs(simDataDir):
+    # the stats and topology lines of each combination, leaving out the
+    # settings, which hold the start time and the cpuID
+    runs = {}
+    for dirname in sorted(os.listdir(simDataDir)):
+        with open(os.path.join(simDataDir, dirname, 'output_cpu0.dat')) as f:
+            runs[dirname] = [line for line in f.read().split('\n') if not line.startswith('##')]
+    return runs
+
+
+def test_parallel_same_output_as_sequential(tmpdir):
+    args = [
+        '--numMotes', '3',
+        '--numCyclesPerRun', '5',
+        '--seed', '1', '2',
+        '--numRuns', '2',
+    ]
+
+    # start from fresh singletons, the workers inherit them
+    for cls in [SimSettings.SimSettings, SimEngine.SimEngine, SimStats.SimStats, Propagation.PropagationFromModel, ReSFEngine.ReSFEngine]:
+        cls._instance = None
+        cls._init = False
+
+    (runSim, options) = parse_options(args + ['--simDataDir', str(tmpdir.join('par'))])
+    runSim.runSimsInParallel(2, options['numRuns'], options)
+
+    (runSim, options) = parse_options(args + ['--simDataDir', str(tmpdir.join('seq'))])
+    cwd = os.getcwd()
+    os.chdir(str(tmpdir))
+    try:
+        runSim.runSimsSequentially((0, options['numRuns'], options, False))
+    finally:
+        os.chdir(cwd)
+
+    parallel = read_runs(str(tmpdir.join('par')))
+    assert sorted(parallel.keys()) == ['numMotes_3_seed_1', 'numMotes_3_seed_2']
+    assert parallel == read_runs(str(tmpdir.join('seq')))
+
+
+def test_forked_same_output_as_sequential(tmpdir):
+    args = [
+        '--numMotes', '4',
+        '--numCyclesPerRun', '10',
+        '--maxToConverge', '300',
+        '--convergeFirst', '1',
+        '--settlingTime', '10',
+        '--sf', 'resf',
+        '--resfMode', 'sum',
+        '--seed', '1', '2',
+        '--trafficGenerator', 'pick',
+        '--sporadicTraffic', '0', '1',
+        '--numRuns', '2',
+    ]
+
+    cwd = os.getcwd()
+    os.chdir(str(tmpdir))
+    try:
+        (runSim, options) = parse_options(args + ['--simDataDir', str(tmpdir.join('forked')), '--forkSweep', 'sporadicTraffic'])
+        runSim.runSimsForked(2, options['numRuns'], options)
+
+        (runSim, options) = parse_options(args + ['--simDataDir', str(tmpdir.join('seq'))])
+        runSim.runSimsSequentially((0, options['numRuns'], options, False))
+    finally:
+        os.chdir(cwd)
+
+    forked = read_runs(str(tmpdir.join('forked')))
+    assert len(forked) == 4 and 'numMotes_4_seed_2_sporadicTraffic_1' in forked
+    assert forked == read_runs(str(tmpdir.join('seq')))
+
+
+def test_forked_setting_never_read(tmpdir, capsys):
+    # trafficFrequency is only read with the 'pick' traffic generator, the run never forks
+    args = [
+        '--numMotes', '3',
+        '--numCyclesPerRun', '5',
+        '--seed', '1',
+        '--trafficFrequency', 'short', 'long',
+        '--numRuns', '2',
+    ]
+
+    cwd = os.getcwd()
+    os.chdir(str(tmpdir))
+    try:
+        (runSim, options) = parse_options(args + ['--simDataDir', str(tmpdir.join('forked')), '--forkSweep', 'trafficFrequency'])
+        runSim.runSimsForked(2, options['numRuns'], options)
+
+        (runSim, options) = parse_options(args + ['--simDataDir', str(tmpdir.join('seq'))])
+        runSim.runSimsSequentially((0, options['numRuns'], options, False))
+    finally:
+        os.chdir(cwd)
+
+    assert 'never read trafficFrequency' in capsys.readouterr()[0]
+    forked = read_runs(str(tmpdir.join('forked')))
+    assert sorted(forked.keys()) == ['numMotes_3_seed_1_trafficFrequency_long', 'numMotes_3_seed_1_trafficFrequency_short']
+    assert forked == read_runs(str(tmpdir.join('seq')))
+    with open(str(tmpdir.join('forked', 'numMotes_3_seed_1_trafficFrequency_long', 'output_cpu0.dat'))) as f:
+        assert '## trafficFrequency = long' in f.read()
+
+
+def test_forked_setting_read_while_building(tmpdir):
+    # the slotframeLength is read while the engine and the motes are built
+    args = [
+        '--numMotes', '4',
+        '--numCyclesPerRun', '10',
+        '--maxToConverge', '300',
+        '--convergeFirst', '1',
+        '--settlingTime', '10',
+        '--sf', 'resf',
+        '--resfMode', 'sum',
+        '--seed', '1',
+        '--slotframeLength', '101', '151',
+        '--numRuns', '2',
+    ]
+
+    cwd = os.getcwd()
+    os.chdir(str(tmpdir))
+    try:
+        (runSim, options) = parse_options(args + ['--simDataDir', str(tmpdir.join('forked')), '--forkSweep', 'slotframeLength'])
+        runSim.runSimsForked(2, options['numRuns'], options)
+
+        (runSim, options) = parse_options(args + ['--simDataDir', str(tmpdir.join('seq'))])
+        runSim.runSimsSequentially((0, options['numRuns'], options, False))
+    finally:
+        os.chdir(cwd)
+
+    forked = read_runs(str(tmpdir.join('forked')))
+    assert sorted(forked.keys()) == ['numMotes_4_seed_1_slotframeLength_101', 'numMotes_4_seed_1_slotframeLength_151']
+    assert forked['numMotes_4_seed_1_slotframeLength_101'] != forked['numMotes_4_seed_1_slotframeLength_151']
+    assert forked == read_runs(str(tmpdir.join('seq')))
@@ -0,0 +1,109 @@
+"""
+\brief Tests for the Schedule of a mote
+"""
+
+import copy
+
+import SimEngine.Mote as Mote
+import SimEngine.Schedule as Schedule
+
+
+def _cell(dir, neighbor, resf=False):
+    return {'ch': 0, 'dir': dir, 'neighbor': neighbor, 'resf': resf, 'numTx': 0}
+
+
+def test_next_active_ts():
+    schedule = Schedule.Schedule()
+    assert schedule.getNextActiveTs(0) is None
+
+    schedule[5] = _cell(Mote.DIR_TX, 'a')
+    schedule[2] = _cell(Mote.DIR_RX, 'a')
+    schedule[9] = _cell(Mote.DIR_TX, 'b')
+
+    assert schedule.getNextActiveTs(0) == 2
+    assert schedule.getNextActiveTs(2) == 5
+    assert schedule.getNextActiveTs(7) == 9
+    # wraps around the slotframe
+    assert schedule.getNextActiveTs(9) == 2
+
+    del schedule[2]
+    assert schedule.getNextActiveTs(9) == 5
+    assert schedule.timeslots == [5, 9]
+
+
+def test_indexes():
+    schedule = Schedule.Schedule()
+    schedule[0] = _cell(Mote.DIR_TXRX_SHARED, ['a', 'b'])
+    schedule[3] = _cell(Mote.DIR_TX, 'a')
+    schedule[4] = _cell(Mote.DIR_TX, 'a', resf=True)
+    schedule[6] = _cell(Mote.DIR_TX, 'b')
+
+    assert schedule.getTimeslots(Mote.DIR_TX) == [3, 4, 6]
+    assert schedule.getTimeslots(Mote.DIR_TX, resf=False) == [3, 6]
+    assert schedule.getTimeslots(Mote.DIR_TX, neighbor='a') == [3, 4]
+    assert schedule.getTimeslots(Mote.DIR_TX, neighbor='a', resf=True) == [4]
+    assert schedule.getTimeslots(Mote.DIR_TXRX_SHARED) == [0]
+    assert schedule.getTimeslots(Mote.DIR_TXRX_SHARED, neighbor='a') == []
+
+    assert schedule.pop(3)['neighbor'] == 'a'
+    assert schedule.getTimeslots(Mote.DIR_TX, neighbor='a') == [4]
+
+    schedule.setNeighbor(6, 'c')
+    assert schedule.getTimeslots(Mote.DIR_TX, neighbor='b') == []
+    assert schedule.getTimeslots(Mote.DIR_TX, neighbor='c') == [6]
+
+
+def test_counts():
+    schedule = Schedule.Schedule()
+    schedule[0] = _cell(Mote.DIR_TXRX_SHARED, ['a', 'b'])
+    schedule[3] = _cell(Mote.DIR_TX, 'a')
+    schedule[4] = _cell(Mote.DIR_TX, 'a', resf=True)
+    schedule[6] = _cell(Mote.DIR_RX, 'b')
+
+    assert schedule.count(Mote.DIR_TX) == 2
+    assert schedule.count(Mote.DIR_TX, resf=False) == 1
+    assert schedule.count(Mote.DIR_RX, resf=True) == 0
+    assert schedule.numDedicated == 2
+
+    # transmissions in ReSF cells are not counted
+    schedule.incrementNumTx(3)
+    schedule.incrementNumTx(3)
+    schedule.incrementNumTx(4)
+    assert schedule[3]['numTx'] == 2
+    assert schedule.numTx == 2
+
+    # the transmissions of a removed cell are not counted anymore
+    del schedule[3]
+    assert schedule.numTx == 0
+    assert schedule.numDedicated == 1
+
+
+def test_occupancy():
+    occupancy = Schedule.Occupancy(Mote.DIR_TX)
+    a = Schedule.Schedule(occupancy=occupancy, owner='a')
+    b = Schedule.Schedule(occupancy=occupancy, owner='b')
+    a[3] = _cell(Mote.DIR_TX, 'b')
+    a[4] = _cell(Mote.DIR_RX, 'b')
+    b[3] = _cell(Mote.DIR_TX, 'c', resf=True)
+    b[5] = _cell(Mote.DIR_TX, 'c')
+
+    assert [mote for (mote, _) in occupancy.getCells(3, 0)] == ['a', 'b']
+    assert [mote for (mote, _) in occupancy.getCells(3, 0, resf=False)] == ['a']
+    assert occupancy.getCells(4, 0) == []
+    assert occupancy.getCollisions().keys() == [(3, 0)]
+    assert occupancy.getCollisions(resf=False) == {}
+
+    del b[3]
+    assert occupancy.getCollisions() == {}
+    b.clear()
+    assert occupancy.cells.keys() == [(3, 0)]
+
+
+def test_copy():
+    schedule = Schedule.Schedule()
+    schedule[1] = _cell(Mote.DIR_RX, 'a')
+
+    schedule2 = copy.deepcopy(schedule)
+    assert schedule2 == schedule
+    assert schedule2.timeslots == [1]
+    assert schedule2.getTimeslots(Mote.DIR_RX, neighbor='a') == [1]
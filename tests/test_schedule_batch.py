@@ -0,0 +1,48 @@
+"""
+\brief Tests for the batched changes of the schedule of a mote
+"""
+
+import SimEngine.Mote as Mote
+
+
+def count_reschedules(monkeypatch, engine):
+    reschedules = []
+    scheduleAtAsn = engine.scheduleAtAsn
+
+    def countingScheduleAtAsn(asn, cb, uniqueTag=None, **kwargs):
+        if uniqueTag is not None and uniqueTag[1] == '_tsch_action_activeCell':
+            reschedules.append((uniqueTag[0], asn))
+        scheduleAtAsn(asn, cb, uniqueTag=uniqueTag, **kwargs)
+    monkeypatch.setattr(engine, 'scheduleAtAsn', countingScheduleAtAsn)
+    return reschedules
+
+
+def test_batch_reschedules_once(simulation, monkeypatch):
+    sim = simulation()
+    reschedules = count_reschedules(monkeypatch, sim.engine)
+    (mote, neighbor) = sim.engine.motes[1:3]
+
+    with mote.scheduleBatch():
+        mote._tsch_addCells(neighbor, [(50, 1, Mote.DIR_TX)])
+        with mote.scheduleBatch():
+            mote._tsch_addCells(neighbor, [(40, 1, Mote.DIR_TX)])
+            mote._tsch_addCells(neighbor, [(60, 1, Mote.DIR_RX)])
+        mote._tsch_removeCells(neighbor, [60])
+        assert reschedules == []
+
+    # rescheduled once, at the next active cell after all changes
+    nextTs = mote.schedule.getNextActiveTs(sim.engine.getAsn() % sim.settings.slotframeLength)
+    assert reschedules == [(mote.id, nextTs)]
+
+    # outside of a batch, each change reschedules
+    mote._tsch_addCells(neighbor, [(70, 1, Mote.DIR_RX)])
+    mote._tsch_removeCells(neighbor, [40])
+    assert reschedules[1:] == [(mote.id, 40), (mote.id, 50)]
+
+
+def test_batch_without_changes(simulation, monkeypatch):
+    sim = simulation()
+    reschedules = count_reschedules(monkeypatch, sim.engine)
+    with sim.engine.motes[1].scheduleBatch():
+        pass
+    assert reschedules == []
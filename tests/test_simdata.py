@@ -0,0 +1,99 @@
+"""
+\brief Tests for the simData loader of the parse scripts
+"""
+
+import os
+
+import numpy as np
+
+import bin.simdata as simdata
+
+OUTPUT = '''## numMotes = 3
+## runNum = {runNum}
+## seed = {seed}
+## sf = resf
+## combinationKeys = ['seed']
+
+
+# cycle runNum numTx
+      0      {runNum}     5
+      1      {runNum}  None
+#pos runNum={runNum} 0@(0.75000,0.75000)@0 1@(0.70375,0.55538)@320 2@(0.60386,0.69686)@304
+#links runNum={runNum} 0-1@-89dBm@0.869 1-2@-91dBm@0.735
+#hopcount runNum={runNum} 0@0 1@1 2@2
+#prefParent runNum={runNum} 0@None 1@0 2@1
+#PktGen runNum={runNum} 0@None 1@3 2@{pktGen} 7
+'''
+
+
+def write_experiment(tmpdir, name, seed, runs=(0,)):
+    exp_dir = tmpdir.mkdir(name)
+    exp_dir.join('output_cpu0.dat').write(''.join(OUTPUT.format(runNum=r, seed=seed, pktGen=4+r) for r in runs))
+    return str(exp_dir.join('output_cpu0.dat'))
+
+
+def test_parse_file(tmpdir):
+    parsed = simdata.parse_file(write_experiment(tmpdir, 'seed_1_', 1, runs=(0, 1)))
+
+    assert parsed['settings']['runNum'].tolist() == [0, 1]
+    assert parsed['settings']['combinationKeys'][0] == ['seed']
+    assert parsed['cycles']['runNum'].tolist() == [0, 0, 1, 1]
+    assert parsed['cycles']['numTx'][0] == 5 and np.isnan(parsed['cycles']['numTx'][1])
+
+    motes = parsed['motes']
+    last = motes[(motes['runNum'] == 1) & (motes['tag'] == 'PktGen')]
+    assert last['mote'].tolist() == [0, 1, 2]
+    assert np.isnan(last['value'].iloc[0]) and last['value'].tolist()[1:] == [3, 5]
+    assert parsed['totals']['value'].tolist() == [7, 7]
+    assert parsed['links'][['moteA', 'moteB', 'rssi', 'pdr']].values.tolist()[0] == [0, 1, -89, 0.869]
+    assert parsed['pos']['x'].tolist()[:3] == [0.75, 0.70375, 0.60386]
+
+
+def test_mote_records(tmpdir):
+    parsed = simdata.parse_file(write_experiment(tmpdir, 'seed_1_', 1, runs=(0, 1)))
+
+    # the last run, None where a mote has no value
+    assert simdata.mote_records(parsed, {'pktGen': 'PktGen', 'prefParent': 'prefParent'}) == [
+        {'mote': 0, 'pktGen': None, 'prefParent': None},
+        {'mote': 1, 'pktGen': 3, 'prefParent': 0},
+        {'mote': 2, 'pktGen': 5, 'prefParent': 1},
+    ]
+
+
+def test_load_with_cache(tmpdir):
+    first = write_experiment(tmpdir, 'seed_1_', 1)
+    write_experiment(tmpdir, 'seed_2_', 2)
+
+    assert simdata.find_output_files(str(tmpdir), 'SEED_2') == [str(tmpdir.join('seed_2_', 'output_cpu0.dat'))]
+
+    data = simdata.load(str(tmpdir))
+    hopcount = data['motes'][data['motes']['tag'] == 'hopcount']
+    assert sorted(set(hopcount['seed'])) == [1, 2]
+    assert hopcount[hopcount['seed'] == 2]['value'].tolist() == [0, 1, 2]
+    assert os.path.exists(first + simdata.CACHE_SUFFIX)
+
+    # the cache is used while the file is unchanged
+    cached = simdata.load_file(first)
+    cached['motes'] = None
+    stat = os.stat(first)
+    with open(first + simdata.CACHE_SUFFIX, 'wb') as f:
+        simdata.pickle.dump(((simdata.CACHE_VERSION, stat.st_size, stat.st_mtime), cached), f)
+    assert simdata.load_file(first)['motes'] is None
+
+    # and parsed again once the file changes
+    with open(first, 'a') as f:
+        f.write('#children runNum=0 0@2 1@1 2@0\n')
+    assert 'children' in simdata.load_file(first)['motes']['tag'].tolist()
+
+
+def test_load_mote_tables_in_parallel(tmpdir):
+    datafiles = [write_experiment(tmpdir, 'seed_{0}_'.format(seed), seed, runs=(0, seed)) for seed in [1, 2, 3]]
+
+    tables = simdata.load_mote_tables(datafiles, {'pktGen': 'PktGen', 'hops': 'hopcount'}, numCores=2, cache=False)
+    assert tables.equals(simdata.load_mote_tables(datafiles, {'pktGen': 'PktGen', 'hops': 'hopcount'}, numCores=1, cache=False))
+
+    # one row per mote per experiment, in the order of the files, the last run of each
+    assert tables['datafile'].tolist() == [d for d in datafiles for _ in range(3)]
+    assert tables['mote'].tolist() == [0, 1, 2] * 3
+    assert tables['pktGen'].tolist()[1::3] == [3, 3, 3]
+    assert tables['pktGen'].tolist()[2::3] == [5, 6, 7]
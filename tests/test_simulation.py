@@ -0,0 +1,86 @@
+"""
+\brief Tests for the Simulation context, owning the components of a run
+"""
+
+import SimEngine.Simulation as Simulation
+import SimEngine.SimEngine as SimEngine
+import SimEngine.SimSettings as SimSettings
+import SimEngine.SimStats as SimStats
+
+
+def run_and_snapshot(options, tmpdir, **kwargs):
+    params = options(**kwargs)
+    params['simDataDir'] = str(tmpdir)
+
+    outputBuffer = []
+    sim = Simulation.Simulation(cpuID=0, runNum=0, outputBuffer=outputBuffer, combinationKeys=[], **params)
+    try:
+        sim.run()
+
+        # the components reach each other through the simulation
+        assert sim.propagation.engine is sim.engine
+        assert sim.resfEngine.settings is sim.settings
+        for mote in sim.engine.motes:
+            assert mote.engine is sim.engine
+            assert mote.settings is sim.settings
+            assert mote.ReSF.ReSFEngine is sim.resfEngine
+
+        return {
+            'asn': sim.engine.getAsn(),
+            'parents': [m.preferredParent.id if m.preferredParent else None for m in sim.engine.motes],
+            'schedules': [sorted((ts, c['ch'], c['dir']) for (ts, c) in m.schedule.items()) for m in sim.engine.motes],
+            'stats': [line for line in ''.join(outputBuffer).split('\n') if not line.startswith('#')],
+        }
+    finally:
+        sim.destroy()
+
+
+def test_runs_back_to_back_without_singletons(options, tmpdir):
+    kwargs = {
+        'numMotes': 5,
+        'numCyclesPerRun': 10,
+        'maxToConverge': 300,
+        'convergeFirst': 1,
+        'settlingTime': 10,
+        'sf': 'resf',
+        'resfMode': 'sum',
+        'seed': 2,
+    }
+
+    singletons = [cls._instance for cls in [SimSettings.SimSettings, SimEngine.SimEngine, SimStats.SimStats]]
+
+    first = run_and_snapshot(options, tmpdir, **kwargs)
+    second = run_and_snapshot(options, tmpdir, **kwargs)
+
+    assert first['stats']
+    assert first == second
+
+    # the process-wide singletons were left alone
+    assert [cls._instance for cls in [SimSettings.SimSettings, SimEngine.SimEngine, SimStats.SimStats]] == singletons
+
+
+def test_headless_without_locks(options, tmpdir):
+    kwargs = {
+        'numMotes': 5,
+        'numCyclesPerRun': 10,
+        'maxToConverge': 300,
+        'convergeFirst': 1,
+        'settlingTime': 10,
+        'sf': 'resf',
+        'resfMode': 'sum',
+        'seed': 2,
+    }
+
+    for gui in [False, True]:
+        params = options(**kwargs)
+        params.update({'gui': gui, 'simDataDir': str(tmpdir)})
+        sim = Simulation.Simulation(cpuID=0, runNum=0, outputBuffer=[], combinationKeys=[], **params)
+        try:
+            locks = [sim.engine.dataLock, sim.propagation.dataLock] + [mote.dataLock for mote in sim.engine.motes]
+            assert sim.engine.headless == (not gui)
+            assert all(isinstance(lock, SimEngine.NoLock) for lock in locks) == (not gui)
+        finally:
+            sim.destroy()
+
+    # the locks do not change the results
+    assert run_and_snapshot(options, tmpdir, gui=True, **kwargs) == run_and_snapshot(options, tmpdir, gui=False, **kwargs)
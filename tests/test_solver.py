@@ -0,0 +1,50 @@
+"""
+\brief Tests for the collision counting of ReSF reservations
+"""
+
+import random
+from fractions import gcd
+
+import SimEngine.Solver as Solver
+
+
+def _lcm(numbers):
+    lcm = numbers[0]
+    for i in numbers[1:]:
+        lcm = lcm * i / gcd(lcm, i)
+    return lcm
+
+
+def test_collision_counter_same_as_solver():
+    solver = Solver.CollisionSolver()
+    counter = Solver.CollisionCounter()
+    rand = random.Random(1)
+
+    for _ in range(500):
+        periods = [rand.choice([101, 400, 533, 600, rand.randint(1, 200)]) for _ in range(rand.randint(0, 6))]
+        starts = [rand.randint(1, 100000) for _ in periods]
+        start = rand.randint(1, 100000)
+        period = rand.choice([101, 400, 533, rand.randint(1, 200)])
+        start_max = max(starts + [start])
+        end = start_max + _lcm([period] + periods)
+        if end - start_max > 10 ** 7:
+            continue
+
+        uniqueCollisions = set()
+        for (start_two, period_two) in zip(starts, periods):
+            nrColls = solver.getCollisions(start, period, start_two, period_two, start_max, end)
+            if nrColls == []:
+                assert counter.getCollisions(start, period, start_two, period_two, start_max, end) is None
+            else:
+                assert counter.getCollisions(start, period, start_two, period_two, start_max, end) == nrColls
+                uniqueCollisions |= set(solver.getCollisions(start, period, start_two, period_two, start_max, end, unique=True))
+
+        assert counter.getUniqueCollisions(start, period, starts, periods, start_max, end) == len(uniqueCollisions)
+
+
+def test_unique_collisions_enumerated():
+    counter = Solver.CollisionCounter()
+    counter.MAX_UNION_TERMS = 0
+
+    # 3, 7, 11, 15 collide with 0 (mod 3) at 3 and 15, with 1 (mod 2) at all four
+    assert counter.getUniqueCollisions(3, 4, [0, 1], [3, 2], 3, 15) == 4
@@ -0,0 +1,90 @@
+"""
+\brief Tests for the golden traces of simulation runs
+"""
+
+import copy
+import os
+
+import SimEngine.Simulation as Simulation
+import SimEngine.Trace as Trace
+
+from tests.fixtures.options import GOLDEN_SETTINGS
+
+GOLDEN_TRACE = os.path.join(os.path.dirname(__file__), 'fixtures', 'golden_resf_sum.trace')
+
+
+def run_traced(options, tmpdir, **kwargs):
+    params = options(**GOLDEN_SETTINGS)
+    params.update(kwargs)
+    params['goldenTrace'] = 1
+    params['simDataDir'] = str(tmpdir)
+
+    sim = Simulation.Simulation(cpuID=0, runNum=0, outputBuffer=[], combinationKeys=[], **params)
+    try:
+        sim.run()
+        return Trace.read(sim.settings.getOutputFile('trace'))
+    finally:
+        sim.destroy()
+
+
+def test_same_run_same_trace(options, tmpdir):
+    first = run_traced(options, tmpdir.mkdir('first'))
+    second = run_traced(options, tmpdir.mkdir('second'))
+
+    assert Trace.compare(first, second) is None
+    assert first['digest'] == second['digest']
+    assert len(first['cycles']) > GOLDEN_SETTINGS['numCyclesPerRun']
+    assert sum(c['numEvents'] for c in first['cycles']) == len(first['events'])
+    assert first['settings']['seed'] == 2 and 'simDataDir' not in first['settings']
+
+
+def test_first_divergent_event(options, tmpdir):
+    golden = run_traced(options, tmpdir)
+
+    # two events of cycle 20 in the other order
+    cycleNum = 20
+    index = sum(c['numEvents'] for c in golden['cycles'][:cycleNum]) + 3
+    while golden['events'][index] == golden['events'][index+1]:
+        index += 1
+    trace = copy.deepcopy(golden)
+    (trace['events'][index], trace['events'][index+1]) = (trace['events'][index+1], trace['events'][index])
+    trace['cycles'][cycleNum]['events'] = 'other'
+    trace['cycles'][cycleNum]['digest'] = 'other'
+
+    divergence = Trace.compare(golden, trace)
+    assert divergence['what'] == 'events' and divergence['cycle'] == cycleNum
+    assert divergence['golden'] == Trace._event(golden, index)
+    assert divergence['trace'] == Trace._event(golden, index+1)
+    assert divergence['asn'] == golden['events'][index][0]
+    assert 'ASN {0}'.format(divergence['asn']) in Trace.formatDivergence(divergence)
+
+    # another seed, the random streams differ from the start
+    divergence = Trace.compare(golden, run_traced(options, tmpdir.mkdir('seed'), seed=3))
+    assert divergence['cycle'] == 0 and divergence['what'] == 'random'
+
+
+def test_divergent_stats_and_random_streams(options, tmpdir):
+    golden = run_traced(options, tmpdir)
+
+    trace = copy.deepcopy(golden)
+    trace['cycles'][3]['stats'] = 'other'
+    trace['cycles'][3]['digest'] = 'other'
+    assert Trace.compare(golden, trace) == {'cycle': 3, 'asn': golden['cycles'][3]['asn'], 'what': 'stats'}
+
+    trace = copy.deepcopy(golden)
+    trace['cycles'][5]['random'] = 'other'
+    trace['cycles'][5]['digest'] = 'other'
+    assert Trace.compare(golden, trace)['what'] == 'random'
+
+    # a shorter run
+    trace = copy.deepcopy(golden)
+    numEvents = trace['cycles'].pop()['numEvents']
+    del trace['events'][-numEvents:]
+    divergence = Trace.compare(golden, trace)
+    assert divergence['cycle'] == len(trace['cycles']) and divergence['trace'] is None
+
+
+def test_golden_trace(options, tmpdir):
+    # the engine still behaves as when the golden trace was recorded
+    divergence = Trace.compare(Trace.read(GOLDEN_TRACE), run_traced(options, tmpdir))
+    assert divergence is None, Trace.formatDivergence(divergence)